@@ -0,0 +1,48 @@
+"""audit_log_trgm_search
+
+Revision ID: audit_log_trgm_search
+Revises: perf_hot_fk_indexes
+Create Date: 2026-10-18 14:00:00.000000
+
+Index GIN trigrammes (pg_trgm) pour la recherche libre du journal d'audit :
+`description` et détails JSON mis à plat en texte. Ils servent les filtres
+ILIKE '%terme%' de GET /admin/audit-log sans parcours complet de la table.
+
+Créés en CONCURRENTLY (hors transaction) : audit_logs reçoit des écritures
+à chaque action d'administration.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'audit_log_trgm_search'
+down_revision = 'perf_hot_fk_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (nom, expression indexée)
+INDEXES = [
+    ('ix_audit_logs_description_trgm', 'description'),
+    ('ix_audit_logs_details_trgm', '(CAST(details_json AS TEXT))'),
+]
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        for name, expression in INDEXES:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+                f'ON audit_logs USING gin ({expression} gin_trgm_ops)'
+            )
+
+    op.execute('ANALYZE audit_logs')
+
+
+def downgrade() -> None:
+    # L'extension pg_trgm est conservée : d'autres objets peuvent en dépendre
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='audit_logs', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,69 @@
+"""perf_hot_fk_indexes
+
+Revision ID: perf_hot_fk_indexes
+Revises: b52_p1_payments
+Create Date: 2026-10-18 10:00:00.000000
+
+Index sur les clés étrangères et colonnes de date utilisées par les agrégats
+de caisse, de réception et de statistiques (sessions, ventes, tickets de dépôt).
+Index partiel sur les sessions ouvertes par poste de caisse.
+
+Les index sont créés en CONCURRENTLY (hors transaction) pour ne pas bloquer
+les écritures sur les tables volumineuses, et en IF NOT EXISTS pour les bases
+où certains existent déjà (ix_payment_transactions_sale_id).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'perf_hot_fk_indexes'
+down_revision = 'b52_p1_payments'
+branch_labels = None
+depends_on = None
+
+
+# (nom, table, colonnes, prédicat partiel)
+INDEXES = [
+    ('ix_sales_cash_session_id', 'sales', ['cash_session_id'], None),
+    ('ix_sales_created_at', 'sales', ['created_at'], None),
+    ('ix_sales_operator_id_created_at', 'sales', ['operator_id', 'created_at'], None),
+    ('ix_sale_items_sale_id', 'sale_items', ['sale_id'], None),
+    ('ix_payment_transactions_sale_id', 'payment_transactions', ['sale_id'], None),
+    ('ix_ligne_depot_ticket_id', 'ligne_depot', ['ticket_id'], None),
+    ('ix_ligne_depot_category_id', 'ligne_depot', ['category_id'], None),
+    ('ix_ticket_depot_poste_id', 'ticket_depot', ['poste_id'], None),
+    ('ix_ticket_depot_created_at', 'ticket_depot', ['created_at'], None),
+    ('ix_ticket_depot_closed_at', 'ticket_depot', ['closed_at'], None),
+    ('ix_poste_reception_opened_at', 'poste_reception', ['opened_at'], None),
+    ('ix_cash_sessions_operator_status_opened_at', 'cash_sessions', ['operator_id', 'status', 'opened_at'], None),
+    ('ix_cash_sessions_site_id_opened_at', 'cash_sessions', ['site_id', 'opened_at'], None),
+    ('ix_cash_sessions_opened_at', 'cash_sessions', ['opened_at'], None),
+    ('ix_cash_sessions_open_register', 'cash_sessions', ['register_id'], "status = 'OPEN'"),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+            )
+
+    # Statistiques à jour pour que le planificateur prenne les nouveaux index en compte
+    for table in sorted({table for _, table, _, _ in INDEXES}):
+        op.execute(f'ANALYZE {table}')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            # ix_payment_transactions_sale_id appartient à b52_p1_payments
+            if name == 'ix_payment_transactions_sale_id':
+                continue
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -28,6 +28,7 @@ from .endpoints import (
     presets_router as presets,
     transactions_router as transactions,
     legacy_import_router as legacy_import,
+    jobs_router as jobs,
 )
 
 api_router = APIRouter()
@@ -61,4 +62,4 @@ api_router.include_router(activity, prefix="/activity", tags=["activity"])
 api_router.include_router(presets, prefix="/presets", tags=["presets"])
 api_router.include_router(transactions, prefix="/transactions", tags=["transactions"])
 api_router.include_router(legacy_import, prefix="/admin", tags=["admin"])
-
+api_router.include_router(jobs, prefix="/admin/jobs", tags=["admin", "jobs"])
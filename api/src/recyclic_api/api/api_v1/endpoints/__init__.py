@@ -27,3 +27,4 @@ from .activity import router as activity_router
 from .presets import router as presets_router
 from .transactions import router as transactions_router
 from .legacy_import import router as legacy_import_router
+from .jobs import router as jobs_router
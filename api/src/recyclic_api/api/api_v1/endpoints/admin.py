@@ -14,6 +14,7 @@ from uuid import UUID
 
 from recyclic_api.core.database import get_db
 from recyclic_api.core.auth import get_current_user, require_admin_role, require_admin_role_strict, require_role_strict, require_super_admin_role
+from recyclic_api.core.permission_cache import invalidate_permission_cache
 from recyclic_api.core.audit import log_role_change, log_admin_access, log_audit, AuditActionType
 from recyclic_api.models.user import User, UserRole, UserStatus
 from recyclic_api.models.user_status_history import UserStatusHistory
@@ -41,12 +42,14 @@ from recyclic_api.services.user_history_service import UserHistoryService
 from recyclic_api.core.auth import send_reset_password_email
 from recyclic_api.schemas.email_log import EmailLogListResponse, EmailLogFilters
 from recyclic_api.services.email_log_service import EmailLogService
+from recyclic_api.services.audit_log_service import AuditLogFilters, AuditLogService
 from recyclic_api.services.activity_service import (
     ActivityService,
     DEFAULT_ACTIVITY_THRESHOLD_MINUTES,
 )
 from recyclic_api.utils.session_metrics import session_metrics
-from recyclic_api.core.logging import TRANSACTION_LOG_FILE, TRANSACTION_LOG_DIR
+from recyclic_api.utils.pagination import COUNT_AUTO, CountMode, InvalidCursorError
+from recyclic_api.core.transaction_log_store import get_transaction_log_store
 
 router = APIRouter(tags=["admin"])
 logger = logging.getLogger(__name__)
@@ -175,11 +178,15 @@ def get_users_statuses(
         online_count = 0
         offline_count = 0
 
+        # Lecture groupée de la présence Redis (MGET) au lieu de 2 GET par utilisateur
+        presence = activity_service.get_presence_bulk(
+            [str(user_data[0]) for user_data in users_with_logins]
+        )
+
         for user_data in users_with_logins:
             user_id, username, first_name, last_name, last_login = user_data
 
-            minutes_since_activity = activity_service.get_minutes_since_activity(str(user_id))
-            logout_timestamp = activity_service.get_last_logout_timestamp(str(user_id))
+            minutes_since_activity, logout_timestamp = presence.get(str(user_id), (None, None))
             last_login_utc = None
             minutes_since_login = None
 
@@ -307,8 +314,6 @@ def update_user_role(
         # Mise ├á jour du r├┤le
         old_role = user.role
         user.role = role_update.role
-        db.commit()
-        db.refresh(user)
 
         # Log de la modification de r├┤le
         log_role_change(
@@ -322,6 +327,9 @@ def update_user_role(
             db=db
         )
 
+        db.commit()
+        db.refresh(user)
+
         full_name = f"{user.first_name} {user.last_name}" if user.first_name and user.last_name else user.first_name or user.last_name
 
         return AdminResponse(
@@ -436,8 +444,6 @@ async def approve_user(
 
         # Approuver l'utilisateur
         user.status = UserStatus.APPROVED
-        db.commit()
-        db.refresh(user)
 
         # Log de l'approbation
         log_role_change(
@@ -451,6 +457,9 @@ async def approve_user(
             db=db
         )
 
+        db.commit()
+        db.refresh(user)
+
         # Envoyer notification Telegram ├á l'utilisateur
         try:
             user_name = user.first_name or user.username or f"User {user.telegram_id}"
@@ -539,8 +548,6 @@ async def reject_user(
 
         # Rejeter l'utilisateur
         user.status = UserStatus.REJECTED
-        db.commit()
-        db.refresh(user)
 
         # Log du rejet
         log_role_change(
@@ -554,6 +561,9 @@ async def reject_user(
             db=db
         )
 
+        db.commit()
+        db.refresh(user)
+
         # Envoyer notification Telegram ├á l'utilisateur
         try:
             user_name = user.first_name or user.username or f"User {user.telegram_id}"
@@ -655,8 +665,6 @@ def update_user_status(
 
         # Mettre ├á jour le statut de l'utilisateur
         user.is_active = status_update.is_active
-        db.commit()
-        db.refresh(user)
 
         # Cr├®er une entr├®e dans l'historique
         status_history = UserStatusHistory(
@@ -667,7 +675,6 @@ def update_user_status(
             reason=status_update.reason
         )
         db.add(status_history)
-        db.commit()
 
         # Log de la modification de statut
         log_role_change(
@@ -681,6 +688,9 @@ def update_user_status(
             db=db
         )
 
+        db.commit()
+        db.refresh(user)
+
         full_name = f"{user.first_name} {user.last_name}" if user.first_name and user.last_name else user.first_name or user.last_name
         status_text = "activ├®" if status_update.is_active else "d├®sactiv├®"
 
@@ -785,9 +795,6 @@ def update_user_profile(
                 detail="Aucun champ ├á mettre ├á jour fourni"
             )
 
-        db.commit()
-        db.refresh(user)
-
         # Log de la modification de profil
         log_role_change(
             admin_user_id=str(current_user.id),
@@ -800,6 +807,9 @@ def update_user_profile(
             db=db
         )
 
+        db.commit()
+        db.refresh(user)
+
         full_name = f"{user.first_name} {user.last_name}" if user.first_name and user.last_name else user.first_name or user.last_name
 
         return AdminResponse(
@@ -894,6 +904,7 @@ def get_user_history(
     event_type: Optional[str] = Query(None, description="Type d'├®v├®nement ├á filtrer (ADMINISTRATION, SESSION CAISSE, VENTE, DEPOT)"),
     skip: int = Query(0, ge=0, description="Nombre d'├®l├®ments ├á ignorer"),
     limit: int = Query(20, ge=1, le=100, description="Nombre d'├®l├®ments par page"),
+    cursor: Optional[str] = Query(None, description="Curseur next_cursor de la page pr├®c├®dente (remplace skip)"),
     current_user: User = Depends(require_admin_role),
     db: Session = Depends(get_db)
 ):
@@ -931,11 +942,17 @@ def get_user_history(
             date_to=date_to,
             event_type=event_type,
             skip=skip,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
 
         return history_response
 
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except ValueError as e:
         # Log de l'├®chec
         log_admin_access(
@@ -1235,8 +1252,6 @@ async def force_user_password(
 
         # Mettre ├á jour le mot de passe
         target_user.hashed_password = new_hashed_password
-        db.commit()
-        db.refresh(target_user)
 
         # Log de l'action de for├ºage de mot de passe
         log_role_change(
@@ -1260,7 +1275,6 @@ async def force_user_password(
             reason=f"Mot de passe forc├® par Super Admin. Raison: {force_request.reason or 'Non sp├®cifi├®e'}"
         )
         db.add(password_force_history)
-        db.commit()
 
         # Log audit pour le for├ºage de mot de passe
         log_audit(
@@ -1278,6 +1292,9 @@ async def force_user_password(
             db=db
         )
 
+        db.commit()
+        db.refresh(target_user)
+
         full_name = f"{target_user.first_name} {target_user.last_name}" if target_user.first_name and target_user.last_name else target_user.first_name or target_user.last_name
 
         return AdminResponse(
@@ -1358,7 +1375,6 @@ def reset_user_pin(
 
         # Effacer le PIN (mettre ├á NULL)
         target_user.hashed_pin = None
-        db.commit()
 
         # Log audit pour la r├®initialisation de PIN
         log_audit(
@@ -1375,6 +1391,8 @@ def reset_user_pin(
             db=db
         )
 
+        db.commit()
+
         # Log de l'action
         full_name = f"{target_user.first_name} {target_user.last_name}".strip() if target_user.first_name and target_user.last_name else target_user.first_name or target_user.last_name
         logger.info(
@@ -1436,139 +1454,22 @@ async def get_transaction_logs(
     Seuls les administrateurs peuvent accéder à cette fonctionnalité.
     
     B48-P2: Endpoint pour consulter les logs transactionnels depuis l'interface admin.
-    """
-    import json
-    from pathlib import Path
     
+    Les filtres et la pagination sont résolus par l'index SQLite des logs
+    (voir `core.transaction_log_store`) : le coût dépend de la page demandée,
+    pas du volume total des fichiers rotatifs.
+    """
     try:
-        # Diagnostic: logger le chemin et l'existence du fichier
-        log_path = TRANSACTION_LOG_FILE.absolute()
-        log_exists = TRANSACTION_LOG_FILE.exists()
-        logger.info(f"Reading transaction logs from: {log_path}")
-        logger.info(f"Log file exists: {log_exists}")
-        
-        # Lire les fichiers rotatifs dans l'ordre (transactions.log, transactions.log.1, etc.)
-        log_files = []
-        if TRANSACTION_LOG_FILE.exists():
-            log_files.append(TRANSACTION_LOG_FILE)
-            logger.info(f"Found main log file: {TRANSACTION_LOG_FILE}")
-        else:
-            logger.warning(f"Transaction log file not found: {log_path}")
-            # Retourner une réponse vide plutôt qu'une erreur
-            return {
-                "entries": [],
-                "pagination": {
-                    "page": page,
-                    "page_size": page_size,
-                    "total_count": 0,
-                    "total_pages": 0,
-                    "has_next": False,
-                    "has_prev": False
-                }
-            }
-        
-        # Ajouter les fichiers de backup
-        for i in range(1, 6):  # BACKUP_COUNT = 5
-            backup_file = Path(f"{TRANSACTION_LOG_FILE}.{i}")
-            if backup_file.exists():
-                log_files.append(backup_file)
-                logger.info(f"Found backup log file: {backup_file}")
-        
-        # Parser les logs ligne par ligne
-        all_entries = []
-        for log_file in log_files:
-            try:
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    for line_num, line in enumerate(f, 1):
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            entry = json.loads(line)
-                            # Si l'entry a un champ "message" qui contient un dict Python stringifié,
-                            # essayer de le parser (format ancien - avant la correction)
-                            # Format ancien: {"message": "{'event': 'SESSION_OPENED', ...}", "timestamp": "...", "level": "INFO"}
-                            # Format nouveau: {"event": "SESSION_OPENED", "timestamp": "...", ...}
-                            if "message" in entry and isinstance(entry["message"], str) and "event" not in entry:
-                                try:
-                                    import ast
-                                    # Essayer de parser le message comme dict Python (format: "{'key': 'value'}")
-                                    parsed_msg = ast.literal_eval(entry["message"])
-                                    if isinstance(parsed_msg, dict):
-                                        # Remplacer l'entry par le contenu du message (format correct)
-                                        entry = parsed_msg
-                                        # Le timestamp est déjà dans parsed_msg, pas besoin de le copier
-                                except (ValueError, SyntaxError):
-                                    # Si le parsing échoue, garder l'entry tel quel
-                                    pass
-                            all_entries.append(entry)
-                        except json.JSONDecodeError:
-                            # Ignorer les lignes invalides
-                            logger.warning(f"Ligne invalide dans {log_file}:{line_num}: {line[:100]}")
-                            continue
-            except Exception as e:
-                logger.error(f"Erreur lors de la lecture de {log_file}: {e}", exc_info=True)
-                continue
-        
-        logger.info(f"Total entries parsed: {len(all_entries)}")
-        
-        # Trier par timestamp (plus récent en premier)
-        # Utiliser une clé de tri sécurisée qui gère les timestamps manquants
-        def get_sort_key(entry):
-            timestamp = entry.get('timestamp', '')
-            if not timestamp:
-                return '0000-00-00T00:00:00'  # Mettre les entrées sans timestamp à la fin
-            return timestamp
-        
-        all_entries.sort(key=get_sort_key, reverse=True)
-        logger.info(f"Entries sorted, first entry event: {all_entries[0].get('event') if all_entries else 'None'}")
-        
-        # Appliquer les filtres
-        filtered_entries = []
-        logger.info(f"Applying filters: event_type={event_type}, user_id={user_id}, session_id={session_id}, start_date={start_date}, end_date={end_date}")
-        
-        for entry in all_entries:
-            # Filtrer par event_type
-            if event_type and entry.get('event') != event_type:
-                continue
-            
-            # Filtrer par user_id
-            if user_id and entry.get('user_id') != user_id:
-                continue
-            
-            # Filtrer par session_id
-            if session_id and entry.get('session_id') != session_id:
-                continue
-            
-            # Filtrer par date
-            entry_timestamp = entry.get('timestamp')
-            if entry_timestamp:
-                try:
-                    # Gérer le format avec 'Z' à la fin (ISO 8601)
-                    # Format attendu: "2025-12-10T23:52:54.686286+00:00Z" ou "2025-12-10T23:52:54.686286Z"
-                    timestamp_str = entry_timestamp
-                    if timestamp_str.endswith('Z'):
-                        # Remplacer 'Z' par '+00:00' seulement si pas déjà de timezone
-                        if '+00:00' not in timestamp_str and '-00:00' not in timestamp_str:
-                            timestamp_str = timestamp_str[:-1] + '+00:00'
-                    entry_dt = datetime.fromisoformat(timestamp_str)
-                    if start_date and entry_dt < start_date:
-                        continue
-                    if end_date and entry_dt > end_date:
-                        continue
-                except (ValueError, AttributeError) as e:
-                    # Logger l'erreur mais continuer (ne pas ignorer l'entrée)
-                    logger.warning(f"Erreur de parsing timestamp '{entry_timestamp}': {e}")
-                    # Ne pas continuer ici - inclure l'entrée même si le timestamp est invalide
-            
-            filtered_entries.append(entry)
-        
-        logger.info(f"Filtered entries count: {len(filtered_entries)}")
-        
-        # Appliquer la pagination
-        total_count = len(filtered_entries)
         offset = (page - 1) * page_size
-        paginated_entries = filtered_entries[offset:offset + page_size]
+        paginated_entries, total_count = get_transaction_log_store().query(
+            event_type=event_type,
+            user_id=user_id,
+            session_id=session_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=page_size,
+            offset=offset,
+        )
         
         # Calculer les informations de pagination
         total_pages = (total_count + page_size - 1) // page_size if total_count > 0 else 0
@@ -1596,6 +1497,23 @@ async def get_transaction_logs(
         )
 
 
+def _user_display_name(user: User) -> str:
+    """Nom affiché d'un utilisateur : nom complet, prénom ou identifiant, avec fallback."""
+    identifier = user.username or user.telegram_id
+    if user.first_name and user.last_name:
+        name = f"{user.first_name} {user.last_name}"
+    elif user.first_name:
+        name = user.first_name
+    else:
+        name = None
+
+    if name:
+        return f"{name} (@{identifier})" if identifier else name
+    if identifier:
+        return f"@{identifier}"
+    return f"ID: {str(user.id)[:8]}..."
+
+
 @router.get(
     "/audit-log",
     response_model=dict,
@@ -1614,123 +1532,61 @@ async def get_audit_log(
     target_type: Optional[str] = Query(None, description="Filtrer par type de cible"),
     start_date: Optional[datetime] = Query(None, description="Date de d├®but (ISO format)"),
     end_date: Optional[datetime] = Query(None, description="Date de fin (ISO format)"),
-    search: Optional[str] = Query(None, description="Recherche dans description ou d├®tails")
+    search: Optional[str] = Query(None, description="Recherche dans description ou d├®tails"),
+    count_mode: CountMode = Query(
+        COUNT_AUTO, description="Total exact (COUNT), estim├® (plan PostgreSQL) ou auto selon le volume"
+    )
 ):
     """
     R├®cup├¿re le journal d'audit avec filtres et pagination.
     Seuls les administrateurs peuvent acc├®der ├á cette fonctionnalit├®.
     """
     try:
-        from recyclic_api.models.audit_log import AuditLog
-        from sqlalchemy import and_, or_, desc
-        
-        # Construire la requ├¬te de base
-        query = db.query(AuditLog)
-        
-        # Appliquer les filtres
-        filters = []
-        
-        if action_type:
-            filters.append(AuditLog.action_type == action_type)
-        
-        if actor_username:
-            filters.append(AuditLog.actor_username.ilike(f"%{actor_username}%"))
-        
-        if target_type:
-            filters.append(AuditLog.target_type == target_type)
-        
-        if start_date:
-            filters.append(AuditLog.timestamp >= start_date)
-        
-        if end_date:
-            filters.append(AuditLog.timestamp <= end_date)
-        
-        if search:
-            from sqlalchemy import cast, String
-            search_filter = or_(
-                AuditLog.description.ilike(f"%{search}%"),
-                cast(AuditLog.details_json, String).ilike(f"%{search}%")
-            )
-            filters.append(search_filter)
-        
-        if filters:
-            query = query.filter(and_(*filters))
-        
-        # Compter le total d'entr├®es
-        total_count = query.count()
-        
-        # Appliquer la pagination et l'ordre
-        offset = (page - 1) * page_size
-        audit_entries = query.order_by(desc(AuditLog.timestamp)).offset(offset).limit(page_size).all()
+        # Filtres et recherche servis par les index trigrammes ; total estimé
+        # au-delà de AUDIT_LOG_EXACT_COUNT_THRESHOLD en mode auto
+        audit_entries, total_count, total_estimated = AuditLogService(db).search(
+            AuditLogFilters(
+                action_type=action_type,
+                actor_username=actor_username,
+                target_type=target_type,
+                start_date=start_date,
+                end_date=end_date,
+                search=search,
+            ),
+            page=page,
+            page_size=page_size,
+            count_mode=count_mode,
+        )
         
         # Calculer les informations de pagination
         total_pages = (total_count + page_size - 1) // page_size
         has_next = page < total_pages
         has_prev = page > 1
         
+        # Acteurs et utilisateurs cibles de la page résolus en une seule requête
+        user_ids = {entry.actor_id for entry in audit_entries if entry.actor_id}
+        user_ids.update(
+            entry.target_id for entry in audit_entries
+            if entry.target_id and entry.target_type == "user"
+        )
+        users_by_id = {}
+        if user_ids:
+            users_by_id = {user.id: user for user in db.query(User).filter(User.id.in_(user_ids)).all()}
+
         # Formater les entr├®es pour la r├®ponse
         entries = []
         for entry in audit_entries:
-            # R├®cup├®rer le nom complet de l'acteur avec fallback intelligent
             actor_display_name = entry.actor_username or "Syst├¿me"
-            if entry.actor_id:
-                actor_user = db.query(User).filter(User.id == entry.actor_id).first()
-                if actor_user:
-                    # Logique de fallback intelligente
-                    if actor_user.first_name and actor_user.last_name:
-                        # Nom complet + identifiant
-                        if actor_user.username:
-                            actor_display_name = f"{actor_user.first_name} {actor_user.last_name} (@{actor_user.username})"
-                        elif actor_user.telegram_id:
-                            actor_display_name = f"{actor_user.first_name} {actor_user.last_name} (@{actor_user.telegram_id})"
-                        else:
-                            actor_display_name = f"{actor_user.first_name} {actor_user.last_name}"
-                    elif actor_user.first_name:
-                        # Pr├®nom seul + identifiant
-                        if actor_user.username:
-                            actor_display_name = f"{actor_user.first_name} (@{actor_user.username})"
-                        elif actor_user.telegram_id:
-                            actor_display_name = f"{actor_user.first_name} (@{actor_user.telegram_id})"
-                        else:
-                            actor_display_name = actor_user.first_name
-                    elif actor_user.username:
-                        actor_display_name = f"@{actor_user.username}"
-                    elif actor_user.telegram_id:
-                        actor_display_name = f"@{actor_user.telegram_id}"
-                    else:
-                        # Dernier recours : ID
-                        actor_display_name = f"ID: {str(actor_user.id)[:8]}..."
-            
-            # R├®cup├®rer le nom complet de l'utilisateur cible avec fallback intelligent
+            actor_user = users_by_id.get(entry.actor_id) if entry.actor_id else None
+            if actor_user:
+                actor_display_name = _user_display_name(actor_user)
+
             target_display_name = None
             if entry.target_id and entry.target_type == "user":
-                target_user = db.query(User).filter(User.id == entry.target_id).first()
+                target_user = users_by_id.get(entry.target_id)
                 if target_user:
-                    # Logique de fallback intelligente
-                    if target_user.first_name and target_user.last_name:
-                        # Nom complet + identifiant
-                        if target_user.username:
-                            target_display_name = f"{target_user.first_name} {target_user.last_name} (@{target_user.username})"
-                        elif target_user.telegram_id:
-                            target_display_name = f"{target_user.first_name} {target_user.last_name} (@{target_user.telegram_id})"
-                        else:
-                            target_display_name = f"{target_user.first_name} {target_user.last_name}"
-                    elif target_user.first_name:
-                        # Pr├®nom seul + identifiant
-                        if target_user.username:
-                            target_display_name = f"{target_user.first_name} (@{target_user.username})"
-                        elif target_user.telegram_id:
-                            target_display_name = f"{target_user.first_name} (@{target_user.telegram_id})"
-                        else:
-                            target_display_name = target_user.first_name
-                    elif target_user.username:
-                        target_display_name = f"@{target_user.username}"
-                    elif target_user.telegram_id:
-                        target_display_name = f"@{target_user.telegram_id}"
-                    else:
-                        # Dernier recours : ID
-                        target_display_name = f"ID: {str(target_user.id)[:8]}..."
-            
+                    target_display_name = _user_display_name(target_user)
+
             # Am├®liorer la description en rempla├ºant les IDs par des noms
             improved_description = entry.description
             if entry.description and entry.target_id and target_display_name:
@@ -1784,6 +1640,7 @@ async def get_audit_log(
                 "page": page,
                 "page_size": page_size,
                 "total_count": total_count,
+                "total_count_estimated": total_estimated,
                 "total_pages": total_pages,
                 "has_next": has_next,
                 "has_prev": has_prev
@@ -1987,10 +1844,6 @@ async def update_activity_threshold(
             )
             db.add(setting)
 
-        db.commit()
-        db.refresh(setting)
-        ActivityService.refresh_cache(threshold)
-        
         # Log de l'audit
         log_audit(
             action_type=AuditActionType.SETTING_UPDATED,
@@ -2005,6 +1858,10 @@ async def update_activity_threshold(
             user_agent=request.headers.get("user-agent", "unknown"),
             db=db
         )
+
+        db.commit()
+        db.refresh(setting)
+        ActivityService.refresh_cache(threshold)
         
         return {
             "message": f"Seuil d'activit├® mis ├á jour ├á {threshold} minutes",
@@ -2094,6 +1951,7 @@ def update_user_groups(
         # Mettre à jour les groupes de l'utilisateur
         user.groups = existing_groups
         db.commit()
+        invalidate_permission_cache()
         db.refresh(user)
 
         # Log de la modification des groupes
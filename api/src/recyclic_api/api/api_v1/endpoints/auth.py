@@ -1,4 +1,5 @@
-﻿from fastapi import APIRouter, Depends, HTTPException, status, Request
+﻿from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from slowapi import _rate_limit_exceeded_handler
@@ -7,14 +8,16 @@ from recyclic_api.utils.rate_limit import limiter, conditional_rate_limit
 import logging
 import time
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
-from recyclic_api.core.database import get_db
-from recyclic_api.core.security import create_access_token, verify_password, hash_password, create_password_reset_token, verify_reset_token
-from recyclic_api.core.audit import log_audit, AuditActionType
+from recyclic_api.core.database import SessionLocal, get_db
+from recyclic_api.core.security import create_access_token, verify_password_pooled, hash_password, create_password_reset_token, verify_reset_token
+from recyclic_api.core.audit import build_audit_entry, log_audit, AuditActionType
 from recyclic_api.core.auth import get_current_user
 from recyclic_api.models.user import User, UserRole, UserStatus
 from recyclic_api.models.login_history import LoginHistory
+from recyclic_api.models.audit_log import AuditLog
 from recyclic_api.schemas.auth import LoginRequest, LoginResponse, AuthUser, SignupRequest, SignupResponse, ForgotPasswordRequest, ForgotPasswordResponse, ResetPasswordRequest, ResetPasswordResponse, LogoutResponse, RefreshTokenRequest, RefreshTokenResponse
 from recyclic_api.schemas.pin import PinAuthRequest, PinAuthResponse
 from recyclic_api.utils.auth_metrics import auth_metrics
@@ -33,180 +36,112 @@ logger = logging.getLogger(__name__)
 # Add rate limit exception handler (should be added to main app, not router)
 # router.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-@router.post("/login", response_model=LoginResponse)
-@conditional_rate_limit("10/minute")
-async def login(request: Request, payload: LoginRequest, db: Session = Depends(get_db)) -> LoginResponse:
-    """Authentifie un utilisateur via son nom d'utilisateur et mot de passe, et retourne un JWT."""
-
-    start_time = time.time()
-    client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
+INVALID_CREDENTIALS_DETAIL = "Identifiants invalides ou utilisateur inactif"
 
-    # Récupérer l'utilisateur par son nom d'utilisateur
-    logger.info(f"Recherche utilisateur avec username: '{payload.username}' (len={len(payload.username)})")
-    
-    # S'assurer que la session est propre avant la requête
-    # Si la session est dans un état invalide (rollback précédent), on la réinitialise
-    try:
-        db.expire_all()
-    except Exception as expire_error:
-        logger.warning(f"Erreur expire_all, rollback de la session: {expire_error}")
-        try:
-            db.rollback()
-        except Exception:
-            pass
-    
-    # Essayer d'abord avec une requête SQL brute pour diagnostiquer le problème
-    user = None
-    try:
-        from sqlalchemy import text
-        logger.info(f"Tentative requête SQL brute pour username: '{payload.username}'")
-        
-        # D'abord, vérifier quelle base de données on utilise
-        db_info = db.execute(text("SELECT current_database(), current_user")).first()
-        logger.info(f"Connexion DB: database={db_info[0] if db_info else 'unknown'}, user={db_info[1] if db_info else 'unknown'}")
-        
-        # Compter le nombre total d'utilisateurs
-        count_result = db.execute(text("SELECT COUNT(*) FROM users")).first()
-        logger.info(f"Nombre total d'utilisateurs dans la DB: {count_result[0] if count_result else 'unknown'}")
-        
-        # Lister quelques usernames pour debug
-        usernames_result = db.execute(text("SELECT username FROM users LIMIT 5")).fetchall()
-        logger.info(f"Exemples d'usernames dans la DB: {[r[0] for r in usernames_result]}")
-        
-        # Maintenant chercher l'utilisateur spécifique
-        result = db.execute(text("SELECT id, username, is_active, status FROM users WHERE username = :username"), {"username": payload.username})
-        row = result.first()
-        if row:
-            logger.info(f"✅ Utilisateur trouvé via SQL brut: id={row[0]}, username={row[1]}, is_active={row[2]}, status={row[3]}")
-            # Charger l'utilisateur depuis la DB avec l'ID trouvé
-            user = db.query(User).filter(User.id == row[0]).first()
-            if user:
-                logger.info(f"✅ Utilisateur chargé depuis DB via query: id={user.id}, is_active={user.is_active}")
-            else:
-                logger.error(f"❌ Utilisateur trouvé via SQL brut mais query() échoue pour id={row[0]}")
-        else:
-            logger.warning(f"❌ Aucun utilisateur trouvé via SQL brut pour username: '{payload.username}'")
-    except Exception as sql_error:
-        logger.error(f"Erreur avec requête SQL brute: {sql_error}", exc_info=True)
-    
-    # Si toujours pas trouvé, essayer avec select() (fallback)
-    if not user:
-        try:
-            result = db.execute(select(User).where(User.username == payload.username))
-            user = result.scalar_one_or_none()
-            if user:
-                logger.info(f"✅ Utilisateur trouvé via select(): id={user.id}")
-        except Exception as select_error:
-            logger.error(f"Erreur avec select(): {select_error}", exc_info=True)
-    
-    if user:
-        logger.info(f"✅ Utilisateur final trouvé: id={user.id}, username={user.username}, is_active={user.is_active}, status={user.status}")
-    else:
-        logger.error(f"❌ Utilisateur NON trouvé pour username: '{payload.username}' après toutes les tentatives")
-
-    # Vérifier si l'utilisateur existe et est actif
-    if not user:
-        logger.warning(f"Failed login attempt: user not found for username: '{payload.username}' (len={len(payload.username)}), IP: {client_ip}")
-        # Log failed login attempt
-        logger.warning(f"Failed login attempt for username: {payload.username}, IP: {client_ip}")
-    elif not user.is_active:
-        logger.warning(f"Failed login attempt: user inactive for username: {payload.username}, is_active={user.is_active}, IP: {client_ip}")
-        # Log failed login attempt
-        logger.warning(f"Failed login attempt for username: {payload.username}, IP: {client_ip}")
-    
-    if not user or not user.is_active:
 
-        # Record metrics for failed login
-        elapsed_ms = (time.time() - start_time) * 1000
-        auth_metrics.record_login_attempt(
-            username=payload.username,
-            success=False,
-            elapsed_ms=elapsed_ms,
-            client_ip=client_ip,
-            error_type="invalid_user_or_inactive"
-        )
+def _record_login_attempt(history: LoginHistory, audit_entry: AuditLog) -> None:
+    """Écrit l'historique de connexion et l'entrée d'audit en un seul commit (tâche de fond, après la réponse).
 
-        # Persist failed login attempt
+    La tâche ouvre sa propre session : celle de la requête est fermée une fois la réponse envoyée.
+    """
+    with SessionLocal() as db:
         try:
-            db.add(LoginHistory(
-                id=__import__("uuid").uuid4(),
-                user_id=None,
-                username=payload.username,
-                success=False,
-                client_ip=client_ip,
-                error_type="invalid_user_or_inactive",
-            ))
+            db.add_all([history, audit_entry])
             db.commit()
-        except Exception:
+        except Exception as exc:
+            logger.debug(f"Échec de l'enregistrement de la tentative de connexion: {exc}")
             db.rollback()
 
-        # Log audit for failed login
-        log_audit(
-            action_type=AuditActionType.LOGIN_FAILED,
-            actor=None,
-            details={"username": payload.username, "error_type": "invalid_user_or_inactive"},
-            description=f"Tentative de connexion échouée pour l'utilisateur {payload.username}",
-            ip_address=client_ip,
-            user_agent=request.headers.get("user-agent"),
-            db=db
-        )
 
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Identifiants invalides ou utilisateur inactif",
-        )
+def _queue_login_attempt(
+    background_tasks: BackgroundTasks,
+    request: Request,
+    client_ip: str,
+    username: str,
+    user: Optional[User],
+    success: bool,
+    error_type: Optional[str],
+    audit_details: dict,
+    description: str,
+) -> None:
+    history = LoginHistory(
+        id=uuid.uuid4(),
+        user_id=user.id if user else None,
+        username=username,
+        success=success,
+        client_ip=client_ip,
+        error_type=error_type,
+    )
+    audit_entry = build_audit_entry(
+        action_type=AuditActionType.LOGIN_SUCCESS if success else AuditActionType.LOGIN_FAILED,
+        actor=user,
+        details=audit_details,
+        description=description,
+        ip_address=client_ip,
+        user_agent=request.headers.get("user-agent"),
+    )
+    background_tasks.add_task(_record_login_attempt, history, audit_entry)
 
-    # Vérifier le mot de passe
-    logger.debug(f"Vérification du mot de passe pour username: {payload.username}, user_id: {user.id}")
-    password_valid = verify_password(payload.password, user.hashed_password)
-    logger.debug(f"Résultat vérification mot de passe: {password_valid}")
-    
-    if not password_valid:
-        # Log failed login attempt due to invalid password
-        logger.warning(f"Failed login attempt: invalid password for username: {payload.username}, IP: {client_ip}")
+
+@router.post("/login", response_model=LoginResponse)
+@conditional_rate_limit("10/minute")
+def login(
+    request: Request,
+    payload: LoginRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """Authentifie un utilisateur via son nom d'utilisateur et mot de passe, et retourne un JWT.
+
+    Handler synchrone (exécuté dans le pool de threads, hors boucle d'événements) :
+    une recherche indexée sur username, bcrypt dans le pool dédié, historique de
+    connexion et audit écrits ensemble après l'envoi de la réponse.
+    """
+
+    start_time = time.time()
+    client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
+
+    user = db.execute(select(User).where(User.username == payload.username)).scalar_one_or_none()
+
+    error_type = None
+    if not user or not user.is_active:
+        error_type = "invalid_user_or_inactive"
+    elif not verify_password_pooled(payload.password, user.hashed_password):
+        error_type = "invalid_password"
+
+    if error_type:
+        logger.warning(f"Failed login attempt for username: {payload.username}, IP: {client_ip} ({error_type})")
 
         # Record metrics for failed login
-        elapsed_ms = (time.time() - start_time) * 1000
         auth_metrics.record_login_attempt(
             username=payload.username,
             success=False,
-            elapsed_ms=elapsed_ms,
+            elapsed_ms=(time.time() - start_time) * 1000,
             client_ip=client_ip,
-            error_type="invalid_password"
+            error_type=error_type
         )
 
-        # Persist failed login attempt
-        try:
-            db.add(LoginHistory(
-                id=__import__("uuid").uuid4(),
-                user_id=user.id if user else None,
-                username=payload.username,
-                success=False,
-                client_ip=client_ip,
-                error_type="invalid_password",
-            ))
-            db.commit()
-        except Exception:
-            db.rollback()
-
-        # Log audit for failed login
-        log_audit(
-            action_type=AuditActionType.LOGIN_FAILED,
-            actor=user,
-            details={"username": payload.username, "error_type": "invalid_password"},
-            description=f"Tentative de connexion échouée pour l'utilisateur {payload.username} (mot de passe invalide)",
-            ip_address=client_ip,
-            user_agent=request.headers.get("user-agent"),
-            db=db
+        description = f"Tentative de connexion échouée pour l'utilisateur {payload.username}"
+        if error_type == "invalid_password":
+            description += " (mot de passe invalide)"
+        _queue_login_attempt(
+            background_tasks, request, client_ip, payload.username,
+            user=user if error_type == "invalid_password" else None,
+            success=False,
+            error_type=error_type,
+            audit_details={"username": payload.username, "error_type": error_type},
+            description=description,
         )
 
-        raise HTTPException(
+        # Réponse construite directement : une HTTPException annulerait les tâches de fond
+        return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Identifiants invalides ou utilisateur inactif",
+            content={"detail": INVALID_CREDENTIALS_DETAIL},
         )
 
-    # Créer le token JWT
-    token = create_access_token({"sub": str(user.id)})
+    # Créer le token JWT (durée lue une seule fois, réutilisée pour expires_in)
+    expiration_minutes = get_token_expiration_minutes(db)
+    token = create_access_token({"sub": str(user.id)}, expires_delta=timedelta(minutes=expiration_minutes))
 
     # Créer un refresh token (Story B42-P2)
     refresh_service = RefreshTokenService(db)
@@ -215,15 +150,13 @@ async def login(request: Request, payload: LoginRequest, db: Session = Depends(g
     
     try:
         refresh_token = refresh_service.generate_refresh_token()
-        logger.debug(f"Refresh token généré pour user_id: {user.id}")
-        
         refresh_service.create_session(
             user_id=user.id,
             refresh_token=refresh_token,
             ip_address=client_ip,
             user_agent=user_agent,
         )
-        logger.info(f"Refresh token créé pour user_id: {user.id}")
+        logger.debug(f"Refresh token créé pour user_id: {user.id}")
     except Exception as exc:
         # Capturer user_id avant d'accéder à user.id (qui peut échouer si la session DB est invalide)
         user_id_str = str(user.id) if user and hasattr(user, 'id') else 'unknown'
@@ -252,29 +185,14 @@ async def login(request: Request, payload: LoginRequest, db: Session = Depends(g
         user_id=str(user.id)
     )
 
-    # Persist successful login
-    try:
-        db.add(LoginHistory(
-            id=__import__("uuid").uuid4(),
-            user_id=user.id,
-            username=payload.username,
-            success=True,
-            client_ip=client_ip,
-            error_type=None,
-        ))
-        db.commit()
-    except Exception:
-        db.rollback()
-
-    # Log audit for successful login
-    log_audit(
-        action_type=AuditActionType.LOGIN_SUCCESS,
-        actor=user,
-        details={"username": payload.username, "user_role": user.role.value},
+    # Historique de connexion + audit : un seul commit, après la réponse
+    _queue_login_attempt(
+        background_tasks, request, client_ip, payload.username,
+        user=user,
+        success=True,
+        error_type=None,
+        audit_details={"username": payload.username, "user_role": user.role.value},
         description=f"Connexion réussie pour l'utilisateur {payload.username}",
-        ip_address=client_ip,
-        user_agent=user_agent,
-        db=db
     )
 
     # B42-P6: Record initial activity on login
@@ -283,13 +201,10 @@ async def login(request: Request, payload: LoginRequest, db: Session = Depends(g
         activity_service = ActivityService(db)
         activity_service.record_user_activity(str(user.id))
     except Exception as act_exc:
-        logger.warning(f"Failed to record initial activity on login: {act_exc}")
+        logger.debug(f"Failed to record initial activity on login: {act_exc}")
 
     # Calculer expires_in en secondes
-    expires_in = get_token_expiration_minutes() * 60
-
-    # Log avant création de LoginResponse pour debug
-    logger.info(f"Avant création LoginResponse pour user_id={user.id}, refresh_token={'présent' if refresh_token else 'None'}")
+    expires_in = expiration_minutes * 60
 
     try:
         # Construire AuthUser d'abord pour détecter les erreurs de sérialisation tôt
@@ -297,7 +212,7 @@ async def login(request: Request, payload: LoginRequest, db: Session = Depends(g
         try:
             auth_user = AuthUser.model_validate(user)
         except Exception as validation_error:
-            logger.warning(f"Erreur lors de model_validate, fallback sur construction manuelle: {validation_error}")
+            logger.debug(f"Erreur lors de model_validate, fallback sur construction manuelle: {validation_error}")
             # Fallback: construction manuelle si model_validate échoue
             auth_user = AuthUser(
                 id=str(user.id),
@@ -311,19 +226,14 @@ async def login(request: Request, payload: LoginRequest, db: Session = Depends(g
                 created_at=user.created_at,
                 updated_at=user.updated_at,
             )
-        logger.debug(f"AuthUser créé avec succès pour user_id={user.id}")
 
-        # Créer LoginResponse
-        response = LoginResponse(
+        return LoginResponse(
             access_token=token,
             refresh_token=refresh_token,
             token_type="bearer",
             expires_in=expires_in,
             user=auth_user,
         )
-        logger.info(f"LoginResponse créé avec succès pour user_id={user.id}, avant return")
-
-        return response
 
     except Exception as e:
         logger.error(
@@ -344,9 +254,9 @@ async def login(request: Request, payload: LoginRequest, db: Session = Depends(g
                 if session:
                     session.revoked_at = datetime.now(timezone.utc)
                     db.commit()
-                    logger.info(f"Session orpheline révoquée pour user_id={user.id}")
+                    logger.debug(f"Session orpheline révoquée pour user_id={user.id}")
             except Exception as revoke_error:
-                logger.warning(f"Impossible de révoquer la session orpheline: {revoke_error}")
+                logger.debug(f"Impossible de révoquer la session orpheline: {revoke_error}")
 
         # Lever une HTTPException avec un message clair
         raise HTTPException(
@@ -354,7 +264,6 @@ async def login(request: Request, payload: LoginRequest, db: Session = Depends(g
             detail=f"Erreur lors de la génération de la réponse de connexion: {str(e)}"
         )
 
-
 @router.post("/signup", response_model=SignupResponse)
 @conditional_rate_limit("5/minute")
 async def signup(request: Request, payload: SignupRequest, db: Session = Depends(get_db)) -> SignupResponse:
@@ -518,7 +427,7 @@ async def reset_password(payload: ResetPasswordRequest, db: Session = Depends(ge
 
 @router.post("/pin", response_model=PinAuthResponse)
 @conditional_rate_limit("5/minute")
-async def authenticate_with_pin(
+def authenticate_with_pin(
     request: Request,
     payload: PinAuthRequest,
     db: Session = Depends(get_db)
@@ -558,7 +467,7 @@ async def authenticate_with_pin(
         )
 
     # Vérifier le PIN
-    if not verify_password(payload.pin, user.hashed_pin):
+    if not verify_password_pooled(payload.pin, user.hashed_pin):
         logger.warning(f"Failed PIN auth attempt for user_id: {payload.user_id}, IP: {client_ip}")
 
         # Record metrics for failed PIN auth
@@ -785,7 +694,7 @@ async def refresh_token(
         new_access_token = create_access_token({"sub": str(new_session.user_id)})
 
         # Calculer expires_in en secondes
-        expires_in = get_token_expiration_minutes() * 60
+        expires_in = get_token_expiration_minutes(db) * 60
 
         # Log audit pour le refresh
         try:
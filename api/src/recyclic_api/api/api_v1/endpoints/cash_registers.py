@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -13,6 +13,7 @@ from recyclic_api.schemas.cash_register import (
 )
 from recyclic_api.services.cash_register_service import CashRegisterService
 from recyclic_api.services.cash_session_service import CashSessionService
+from recyclic_api.utils.http_cache import conditional_json_response
 
 
 router = APIRouter()
@@ -33,28 +34,36 @@ async def list_cash_registers(
 
 @router.get("/status", summary="Statut des postes de caisse")
 async def list_cash_registers_status(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_strict([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN]))
 ):
-    """Retourne pour chaque poste de caisse: id, name, is_open (session en cours), enable_virtual, enable_deferred."""
+    """Retourne pour chaque poste de caisse: id, name, is_open (session en cours), enable_virtual, enable_deferred.
+
+    Sessions ouvertes de tous les postes lues en une seule requête. La réponse
+    porte un ETag : un terminal qui renvoie `If-None-Match` reçoit `304 Not
+    Modified` tant qu'aucun poste n'a changé (ouverture, fermeture, configuration).
+    """
     reg_service = CashRegisterService(db)
     sess_service = CashSessionService(db)
 
     registers = reg_service.list(skip=0, limit=200, site_id=None, only_active=True)
+    # Ordre stable : l'ETag ne doit dépendre que du contenu
+    registers.sort(key=lambda r: (r.name or "", str(r.id)))
+    open_register_ids = sess_service.get_open_register_ids([r.id for r in registers])
 
     results = []
     for r in registers:
-        is_open = bool(sess_service.get_open_session_by_register(str(r.id)))
         results.append({
             "id": str(r.id),
             "name": r.name,
-            "is_open": is_open,
+            "is_open": r.id in open_register_ids,
             "enable_virtual": r.enable_virtual if hasattr(r, 'enable_virtual') else False,
             "enable_deferred": r.enable_deferred if hasattr(r, 'enable_deferred') else False,
             "location": r.location,  # Story B49-P5: Toujours retourner location (peut être None)
         })
 
-    return {"data": results, "total": len(results)}
+    return conditional_json_response(request, {"data": results, "total": len(results)})
 
 
 @router.get("/{register_id}", response_model=CashRegisterResponse, summary="Récupérer un poste de caisse par ID")
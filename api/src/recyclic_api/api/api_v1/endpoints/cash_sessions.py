@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime, timezone
 
 from recyclic_api.core.database import get_db
@@ -17,10 +17,8 @@ from recyclic_api.core.audit import (
 from recyclic_api.models.user import User, UserRole
 from recyclic_api.models.cash_session import CashSession, CashSessionStatus, CashSessionStep
 from recyclic_api.models.sale import Sale
-from recyclic_api.core.config import settings
-from recyclic_api.core.email_service import EmailAttachment, get_email_service
-from recyclic_api.services.export_service import generate_cash_session_report
-from recyclic_api.utils.report_tokens import generate_download_token
+from recyclic_api.services.cash_session_close_jobs import CASH_SESSION_CLOSE_JOB
+from recyclic_api.services.job_queue import JobStatus, get_job_queue
 from recyclic_api.schemas.cash_session import (
     CashSessionCreate,
     CashSessionUpdate,
@@ -36,8 +34,10 @@ from recyclic_api.schemas.cash_session import (
     CashSessionStep
 )
 from recyclic_api.services.cash_session_service import CashSessionService
+from recyclic_api.utils.pagination import InvalidCursorError
 from uuid import UUID
 
+# Handlers synchrones : FastAPI les exécute dans son pool de threads, la Session bloquante ne gèle pas la boucle d'événements
 router = APIRouter()
 
 
@@ -151,7 +151,7 @@ def enrich_session_response(
     },
     tags=["Sessions de Caisse"]
 )
-async def create_cash_session(
+def create_cash_session(
     session_data: CashSessionCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_strict([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN]))
@@ -211,9 +211,6 @@ async def create_cash_session(
         # Initialiser les métriques d'étape (commencer par 'entry' pour les sessions de réception)
         cash_session.set_current_step(CashSessionStep.ENTRY)
 
-        # Sauvegarder l'initialisation des métriques
-        db.commit()
-
         # Log de l'ouverture de session (avec flag is_deferred si opened_at fourni)
         is_deferred = session_data.opened_at is not None
         log_cash_session_opening(
@@ -228,6 +225,9 @@ async def create_cash_session(
             db=db
         )
 
+        # Sauvegarder l'initialisation des métriques (et l'entrée d'audit)
+        db.commit()
+
         # Sérialiser la réponse - utiliser from_orm pour éviter les problèmes de lazy loading
         try:
             # Rafraîchir l'objet depuis la DB pour s'assurer que tous les champs sont chargés
@@ -289,7 +289,7 @@ async def create_cash_session(
     description="Retourne si une session est active pour le poste donné et l'ID de session le cas échéant.",
     tags=["Sessions de Caisse"]
 )
-async def get_cash_session_status(
+def get_cash_session_status(
     register_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_strict([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN]))
@@ -308,7 +308,7 @@ async def get_cash_session_status(
     description="Vérifie si l'opérateur a déjà une session différée ouverte pour la date spécifiée.",
     tags=["Sessions de Caisse"]
 )
-async def check_deferred_session_by_date(
+def check_deferred_session_by_date(
     date: str = Query(..., description="Date au format YYYY-MM-DD"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_strict([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN]))
@@ -417,7 +417,7 @@ async def check_deferred_session_by_date(
     },
     tags=["Sessions de Caisse"]
 )
-async def get_cash_sessions(
+def get_cash_sessions(
     skip: int = Query(0, ge=0, description="Nombre d'éléments à ignorer"),
     limit: int = Query(20, ge=1, le=100, description="Nombre maximum d'éléments à retourner"),
     status: Optional[CashSessionStatus] = Query(None, description="Filtrer par statut"),
@@ -436,6 +436,8 @@ async def get_cash_sessions(
     duration_max_hours: Optional[float] = Query(None, ge=0, description="Durée maximum de session (en heures)"),
     payment_methods: Optional[List[str]] = Query(None, description="Méthodes de paiement (multi-sélection)"),
     has_donation: Optional[bool] = Query(None, description="Filtrer par présence de don"),
+    cursor: Optional[str] = Query(None, description="Curseur next_cursor de la page précédente (remplace skip)"),
+    count_mode: Literal["exact", "estimated"] = Query("exact", description="Total exact (COUNT) ou estimé (plan PostgreSQL)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_strict([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN]))
 ):
@@ -459,21 +461,28 @@ async def get_cash_sessions(
         duration_max_hours=duration_max_hours,
         payment_methods=payment_methods,
         has_donation=has_donation,
+        cursor=cursor,
+        count_mode=count_mode,
     )
     
-    sessions, total = service.get_sessions_with_filters(filters)
+    try:
+        page = service.get_sessions_page(filters)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Story B49-P1: Enrichir chaque session avec les options du register
     return CashSessionListResponse(
-        data=[enrich_session_response(session, service) for session in sessions],
-        total=total,
+        data=[enrich_session_response(session, service) for session in page.items],
+        total=page.total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=page.next_cursor,
+        total_estimated=page.total_estimated,
     )
 
 
 @router.get("/current", response_model=Optional[CashSessionResponse])
-async def get_current_cash_session(
+def get_current_cash_session(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_strict([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN]))
 ):
@@ -587,7 +596,7 @@ async def get_current_cash_session(
     },
     tags=["Sessions de Caisse"]
 )
-async def get_cash_session_detail(
+def get_cash_session_detail(
     session_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role_strict([UserRole.ADMIN, UserRole.SUPER_ADMIN]))
@@ -656,7 +665,7 @@ async def get_cash_session_detail(
 
 
 @router.put("/{session_id}", response_model=CashSessionResponse)
-async def update_cash_session(
+def update_cash_session(
     session_id: str,
     session_update: CashSessionUpdate,
     db: Session = Depends(get_db),
@@ -760,7 +769,7 @@ async def update_cash_session(
     },
     tags=["Sessions de Caisse"]
 )
-async def close_cash_session(
+def close_cash_session(
     session_id: str,
     close_data: CashSessionClose,
     db: Session = Depends(get_db),
@@ -892,70 +901,30 @@ async def close_cash_session(
         )
         
 
-        report_path = generate_cash_session_report(db, closed_session)
-        download_token = generate_download_token(report_path.name)
-        report_download_url = f"{settings.API_V1_STR}/admin/reports/cash-sessions/{report_path.name}?token={download_token}"
-        email_sent = False
-
-        recipient = settings.CASH_SESSION_REPORT_RECIPIENT
-        if not recipient:
-            logger.warning("CASH_SESSION_REPORT_RECIPIENT is not configured; skipping report email dispatch")
-        else:
-            try:
-                email_service = get_email_service()
-                with report_path.open('rb') as report_file:
-                    attachment = EmailAttachment(
-                        filename=report_path.name,
-                        content=report_file.read(),
-                        mime_type='text/csv',
-                    )
-
-                if closed_session.operator:
-                    operator_label = (
-                        closed_session.operator.username
-                        or getattr(closed_session.operator, 'telegram_id', None)
-                        or str(closed_session.operator_id)
-                    )
-                else:
-                    operator_label = str(closed_session.operator_id)
-
-                if closed_session.actual_amount is not None:
-                    final_amount = closed_session.actual_amount
-                elif closed_session.closing_amount is not None:
-                    final_amount = closed_session.closing_amount
-                else:
-                    final_amount = closed_session.initial_amount or 0.0
-
-                html_rows = [
-                    '<p>Bonjour,</p>',
-                    f'<p>Veuillez trouver en pièce jointe le rapport CSV de la session de caisse {closed_session.id}.</p>',
-                    f'<p>Opérateur : {operator_label}</p>',
-                    f"<p>Montant final déclaré : {final_amount:.2f} €</p>",
-                    f'<p>Vous pouvez également le télécharger via {report_download_url} (valide pendant {settings.CASH_SESSION_REPORT_TOKEN_TTL_SECONDS // 60} minutes).</p>',
-                    '<p>- Recyclic</p>',
-                ]
-
-                email_sent = email_service.send_email(
-                    to_email=recipient,
-                    subject=f"Rapport de session de caisse {closed_session.id}",
-                    html_content=''.join(html_rows),
-                    db_session=db,
-                    attachments=[attachment],
-                )
-            except Exception as exc:  # noqa: BLE001 - keep closing flow resilient
-                logger.error("Failed to send cash session report email: %s", exc)
+        # Rapport, e-mail et dépôt kDrive sont traités par la file de tâches, hors du chemin de la requête
+        report_job = get_job_queue().enqueue(
+            CASH_SESSION_CLOSE_JOB,
+            {'session_id': str(closed_session.id)},
+            db=db,
+        )
+        finished = report_job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+        report_download_url = report_job.result.get('report_download_url')
+        email_sent = report_job.result.get('email_sent', False) if finished else None
 
         # Story B49-P1: Enrichir avec les options du register
         response_model = enrich_session_response(closed_session, service)
         response_model = response_model.model_copy(update={
             'report_download_url': report_download_url,
             'report_email_sent': email_sent,
+            'report_job_id': report_job.id,
         })
         return response_model
 
     except HTTPException:
         raise
     except Exception as e:
+        # Abandonner la fermeture partielle pour que l'échec soit journalisé seul
+        db.rollback()
         log_cash_session_closing(
             user_id=str(current_user.id),
             username=current_user.username or "Unknown",
@@ -968,7 +937,7 @@ async def close_cash_session(
 
 
 @router.get("/stats/summary", response_model=CashSessionStats)
-async def get_cash_session_stats(
+def get_cash_session_stats(
     date_from: Optional[datetime] = Query(None, description="Date de début (ISO 8601)"),
     date_to: Optional[datetime] = Query(None, description="Date de fin (ISO 8601)"),
     site_id: Optional[str] = Query(None, description="Filtrer par ID de site"),
@@ -1051,7 +1020,7 @@ async def get_cash_session_stats(
     },
     tags=["Sessions de Caisse - Métriques d'Étape"]
 )
-async def get_session_step_metrics(
+def get_session_step_metrics(
     session_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN]))
@@ -1146,7 +1115,7 @@ async def get_session_step_metrics(
     },
     tags=["Sessions de Caisse - Métriques d'Étape"]
 )
-async def update_session_step(
+def update_session_step(
     session_id: str,
     step_update: CashSessionStepUpdate,
     db: Session = Depends(get_db),
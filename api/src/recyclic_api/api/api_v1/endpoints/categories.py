@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
 from fastapi.responses import StreamingResponse, Response
 import io
 from sqlalchemy.orm import Session
@@ -20,6 +20,8 @@ from recyclic_api.services.category_service import CategoryService
 from recyclic_api.services.category_management import CategoryManagementService
 from recyclic_api.services.category_export_service import CategoryExportService
 from recyclic_api.services.category_import_service import CategoryImportService
+from recyclic_api.services.catalogue_cache import catalogue_cache
+from recyclic_api.utils.http_cache import conditional_response
 from pydantic import BaseModel
 
 
@@ -194,6 +196,55 @@ async def execute_categories_import(
     return result
 
 
+# Déclarées avant /{category_id}, qui capturerait sinon ces chemins
+@router.get(
+    "/entry-tickets",
+    response_model=List[CategoryRead],
+    summary="Get categories for ENTRY tickets",
+    description="Get categories filtered by visibility for ENTRY/DEPOT tickets. Requires authentication."
+)
+async def get_categories_for_entry_tickets(
+    request: Request,
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get categories for ENTRY tickets (respects visibility settings)
+
+    Pre-serialised body shared until the next catalogue write; 304 on a matching If-None-Match.
+    """
+    service = CategoryManagementService(db)
+    cached = await catalogue_cache.aget(
+        ("categories:entry-tickets", is_active),
+        lambda: service.get_categories_for_entry_tickets(is_active=is_active),
+    )
+    return conditional_response(request, cached.body, cached.etag)
+
+
+@router.get(
+    "/sale-tickets",
+    response_model=List[CategoryRead],
+    summary="Get categories for SALE tickets",
+    description="Get all categories for SALE/CASH REGISTER tickets (ignores visibility). Requires authentication."
+)
+async def get_categories_for_sale_tickets(
+    request: Request,
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get categories for SALE tickets (always shows all categories)
+
+    Pre-serialised body shared until the next catalogue write; 304 on a matching If-None-Match.
+    """
+    service = CategoryManagementService(db)
+    cached = await catalogue_cache.aget(
+        ("categories:sale-tickets", is_active),
+        lambda: service.get_categories_for_sale_tickets(is_active=is_active),
+    )
+    return conditional_response(request, cached.body, cached.etag)
+
+
 @router.get(
     "/{category_id}",
     response_model=CategoryRead,
@@ -426,35 +477,3 @@ async def update_category_display_order_entry(
     """Story B48-P4: Update category display order for ENTRY/DEPOT tickets"""
     service = CategoryManagementService(db)
     return await service.update_display_order_entry(category_id, order_data.display_order_entry)
-
-
-@router.get(
-    "/entry-tickets",
-    response_model=List[CategoryRead],
-    summary="Get categories for ENTRY tickets",
-    description="Get categories filtered by visibility for ENTRY/DEPOT tickets. Requires authentication."
-)
-async def get_categories_for_entry_tickets(
-    is_active: Optional[bool] = Query(None, description="Filter by active status"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get categories for ENTRY tickets (respects visibility settings)"""
-    service = CategoryManagementService(db)
-    return await service.get_categories_for_entry_tickets(is_active=is_active)
-
-
-@router.get(
-    "/sale-tickets",
-    response_model=List[CategoryRead],
-    summary="Get categories for SALE tickets",
-    description="Get all categories for SALE/CASH REGISTER tickets (ignores visibility). Requires authentication."
-)
-async def get_categories_for_sale_tickets(
-    is_active: Optional[bool] = Query(None, description="Filter by active status"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get categories for SALE tickets (always shows all categories)"""
-    service = CategoryManagementService(db)
-    return await service.get_categories_for_sale_tickets(is_active=is_active)
@@ -7,6 +7,7 @@ import logging
 
 from recyclic_api.core.database import get_db
 from recyclic_api.core.auth import require_admin_role
+from recyclic_api.core.permission_cache import invalidate_permission_cache
 from recyclic_api.models.user import User
 from recyclic_api.models.permission import Group, Permission
 from recyclic_api.schemas.permission import (
@@ -208,6 +209,7 @@ def update_group(
         group.description = group_data.description
 
     db.commit()
+    invalidate_permission_cache()
     db.refresh(group)
 
     # Reload with relationships
@@ -255,6 +257,7 @@ def delete_group(
 
     db.delete(group)
     db.commit()
+    invalidate_permission_cache()
 
     logger.info(f"Group {group_id} deleted by user {current_user.id}")
     return None
@@ -328,6 +331,7 @@ def assign_permissions_to_group(
     # Add permissions to group
     group.permissions.extend(permissions_to_add)
     db.commit()
+    invalidate_permission_cache()
 
     # Reload with all relationships
     stmt = (
@@ -389,6 +393,7 @@ def remove_permission_from_group(
 
     group.permissions.remove(permission)
     db.commit()
+    invalidate_permission_cache()
 
     # Reload with all relationships
     stmt = (
@@ -471,6 +476,7 @@ def assign_users_to_group(
     # Add users to group
     group.users.extend(users_to_add)
     db.commit()
+    invalidate_permission_cache()
 
     # Reload with all relationships
     stmt = (
@@ -532,6 +538,7 @@ def remove_user_from_group(
 
     group.users.remove(user)
     db.commit()
+    invalidate_permission_cache()
 
     # Reload with all relationships
     stmt = (
@@ -0,0 +1,55 @@
+"""
+Inspection de la file de tâches de fond (rapports de caisse, e-mails, dépôts kDrive).
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from recyclic_api.core.auth import require_role_strict
+from recyclic_api.models.user import User, UserRole
+from recyclic_api.schemas.job import JobListResponse, JobQueueDepth, JobResponse
+from recyclic_api.services.job_queue import JobQueue, JobStatus, get_job_queue
+
+router = APIRouter()
+
+
+@router.get("/", response_model=JobListResponse)
+def list_jobs(
+    status: Optional[JobStatus] = Query(None, description="Filtrer par statut"),
+    limit: int = Query(50, ge=1, le=500, description="Nombre maximal de tâches retournées"),
+    queue: JobQueue = Depends(get_job_queue),
+    current_user: User = Depends(require_role_strict([UserRole.ADMIN, UserRole.SUPER_ADMIN])),
+):
+    """Liste les tâches récentes avec la profondeur de la file."""
+    return JobListResponse(
+        jobs=[JobResponse.model_validate(job) for job in queue.list_recent(limit=limit, status=status)],
+        depth=JobQueueDepth(**queue.depth()),
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: str,
+    queue: JobQueue = Depends(get_job_queue),
+    current_user: User = Depends(require_role_strict([UserRole.ADMIN, UserRole.SUPER_ADMIN])),
+):
+    """Statut, tentatives et résultat d'une tâche."""
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    return JobResponse.model_validate(job)
+
+
+@router.post("/{job_id}/retry", response_model=JobResponse)
+def retry_job(
+    job_id: str,
+    queue: JobQueue = Depends(get_job_queue),
+    current_user: User = Depends(require_role_strict([UserRole.ADMIN, UserRole.SUPER_ADMIN])),
+):
+    """Remet en file une tâche en échec définitif."""
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    if job.status != JobStatus.FAILED:
+        raise HTTPException(status_code=409, detail="Seules les tâches en échec peuvent être relancées")
+    return JobResponse.model_validate(queue.retry(job_id))
@@ -2,6 +2,7 @@
 Endpoints pour l'import de données legacy depuis CSV.
 """
 
+import asyncio
 import base64
 import csv
 import io
@@ -320,7 +321,9 @@ async def analyze_legacy_import(
         
         # Créer le service et analyser
         service = LegacyImportService(db)
-        result = service.analyze(
+        # Analyse (fuzzy + batches LLM concurrents) hors de la boucle d'événements
+        result = await asyncio.to_thread(
+            service.analyze,
             content,
             confidence_threshold=confidence_threshold,
             llm_model_override=llm_model_id,
@@ -500,7 +503,8 @@ async def analyze_legacy_import_llm_only(
     """
     try:
         service = LegacyImportService(db)
-        result = service.analyze_llm_only(
+        result = await asyncio.to_thread(
+            service.analyze_llm_only,
             unmapped_categories=request.unmapped_categories,
             llm_model_override=request.llm_model_id,
         )
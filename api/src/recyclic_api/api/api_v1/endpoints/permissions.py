@@ -7,6 +7,7 @@ import logging
 
 from recyclic_api.core.database import get_db
 from recyclic_api.core.auth import require_admin_role
+from recyclic_api.core.permission_cache import invalidate_permission_cache
 from recyclic_api.models.user import User
 from recyclic_api.models.permission import Permission
 from recyclic_api.schemas.permission import (
@@ -172,6 +173,7 @@ def update_permission(
         permission.description = permission_data.description
 
     db.commit()
+    invalidate_permission_cache()
     db.refresh(permission)
 
     logger.info(f"Permission {permission_id} updated by user {current_user.id}")
@@ -210,6 +212,7 @@ def delete_permission(
 
     db.delete(permission)
     db.commit()
+    invalidate_permission_cache()
 
     logger.info(f"Permission {permission_id} deleted by user {current_user.id}")
     return None
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from recyclic_api.core.database import get_db
 from recyclic_api.services.preset_management import PresetManagementService
+from recyclic_api.services.catalogue_cache import catalogue_cache
+from recyclic_api.utils.http_cache import conditional_response
 from recyclic_api.schemas.preset_button import (
     PresetButtonRead,
     PresetButtonWithCategory,
@@ -33,14 +35,16 @@ async def get_preset_buttons(
 
 
 @router.get("/active", response_model=List[PresetButtonWithCategory])
-async def get_active_preset_buttons(db: Session = Depends(get_db)):
+async def get_active_preset_buttons(request: Request, db: Session = Depends(get_db)):
     """
     Get all active preset buttons for use in the interface.
 
-    Optimized endpoint for frontend consumption.
+    Optimized endpoint for frontend consumption: the serialised body is shared
+    until the next catalogue write and a matching If-None-Match returns 304.
     """
     service = PresetManagementService(db)
-    return await service.get_active_preset_buttons()
+    cached = await catalogue_cache.aget("presets:active", service.get_active_preset_buttons)
+    return conditional_response(request, cached.body, cached.etag)
 
 
 @router.get("/{preset_id}", response_model=PresetButtonWithCategory)
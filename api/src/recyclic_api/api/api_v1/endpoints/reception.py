@@ -3,7 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, Query, Response, Body, Request
 from sqlalchemy.orm import Session
 from uuid import UUID
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import date, datetime
 import csv
 import io
@@ -12,6 +12,8 @@ from recyclic_api.core.database import get_db
 from recyclic_api.core.auth import require_role_strict
 from recyclic_api.models.user import UserRole, User
 from recyclic_api.utils.report_tokens import generate_download_token, verify_download_token
+from recyclic_api.utils.pagination import InvalidCursorError
+from recyclic_api.utils.http_cache import conditional_response
 from recyclic_api.schemas.reception import (
     OpenPosteRequest,
     OpenPosteResponse,
@@ -32,6 +34,7 @@ from recyclic_api.schemas.stats import ReceptionLiveStatsResponse
 from recyclic_api.models.category import Category
 from recyclic_api.services.reception_service import ReceptionService
 from recyclic_api.services.reception_stats_service import ReceptionLiveStatsService
+from recyclic_api.services.catalogue_cache import catalogue_cache
 from recyclic_api.services.statistics_recalculation_service import StatisticsRecalculationService
 from recyclic_api.core.audit import log_audit
 from recyclic_api.models.audit_log import AuditActionType
@@ -139,23 +142,31 @@ def add_ligne(
 
 @router.get("/categories")
 def get_categories(
+    request: Request,
     db: Session = Depends(get_db),
     current_user=Depends(require_role_strict([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN])),
 ):
     """Récupérer les catégories disponibles.
     
     Story B48-P5: Retourne name (nom court/rapide) pour l'affichage opérationnel.
+    Corps pré-sérialisé partagé jusqu'à la prochaine écriture du catalogue ;
+    304 si l'en-tête If-None-Match correspond.
     """
-    categories = db.query(Category).filter(
-        Category.is_active == True
-    ).all()
-    return [
-        {
-            "id": str(cat.id),
-            "name": cat.name  # Story B48-P5: Nom court/rapide (toujours utilisé)
-        }
-        for cat in categories
-    ]
+    def _build():
+        # Ordre stable : même corps (donc même ETag) sur tous les workers
+        categories = db.query(Category).filter(
+            Category.is_active == True
+        ).order_by(Category.name, Category.id).all()
+        return [
+            {
+                "id": str(cat.id),
+                "name": cat.name  # Story B48-P5: Nom court/rapide (toujours utilisé)
+            }
+            for cat in categories
+        ]
+
+    cached = catalogue_cache.get("reception:categories", _build)
+    return conditional_response(request, cached.body, cached.etag)
 
 
 @router.put("/lignes/{ligne_id}", response_model=LigneResponse)
@@ -321,10 +332,12 @@ def get_tickets(
     destinations: Optional[List[str]] = Query(None, description="Destinations (multi-sélection)"),
     lignes_min: Optional[int] = Query(None, ge=0, description="Nombre minimum de lignes"),
     lignes_max: Optional[int] = Query(None, ge=0, description="Nombre maximum de lignes"),
+    cursor: Optional[str] = Query(None, description="Curseur next_cursor de la page précédente (remplace page)"),
+    count_mode: Literal["exact", "estimated"] = Query("exact", description="Total exact (COUNT) ou estimé (plan PostgreSQL)"),
     db: Session = Depends(get_db),
     current_user=Depends(require_role_strict([UserRole.USER, UserRole.ADMIN, UserRole.SUPER_ADMIN])),
 ):
-    """Récupérer la liste des tickets de réception avec pagination."""
+    """Récupérer la liste des tickets de réception avec pagination (par page ou par curseur)."""
     from uuid import UUID
     
     service = ReceptionService(db)
@@ -345,23 +358,30 @@ def get_tickets(
             from fastapi import HTTPException, status
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="categories invalides")
     
-    tickets, total = service.get_tickets_list(
-        page=page, 
-        per_page=per_page, 
-        status=status,
-        date_from=date_from,
-        date_to=date_to,
-        benevole_id=benevole_uuid,
-        search=search,
-        include_empty=include_empty,
-        poids_min=poids_min,
-        poids_max=poids_max,
-        categories=category_uuids,
-        destinations=destinations,
-        lignes_min=lignes_min,
-        lignes_max=lignes_max,
-    )
-    
+    try:
+        result = service.get_tickets_page(
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            count_mode=count_mode,
+            status=status,
+            date_from=date_from,
+            date_to=date_to,
+            benevole_id=benevole_uuid,
+            search=search,
+            include_empty=include_empty,
+            poids_min=poids_min,
+            poids_max=poids_max,
+            categories=category_uuids,
+            destinations=destinations,
+            lignes_min=lignes_min,
+            lignes_max=lignes_max,
+        )
+    except InvalidCursorError as e:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=400, detail=str(e))
+    tickets, total = result.items, result.total
+
     # Calculer les totaux pour chaque ticket
     ticket_summaries = []
     for ticket in tickets:
@@ -387,7 +407,9 @@ def get_tickets(
         total=total,
         page=page,
         per_page=per_page,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=result.next_cursor,
+        total_estimated=result.total_estimated,
     )
 
 
@@ -372,8 +372,8 @@ def export_bulk_cash_sessions(
 ):
     """Exporte toutes les sessions de caisse filtrées en CSV ou Excel."""
     from recyclic_api.services.report_service import (
-        generate_bulk_cash_sessions_csv,
-        generate_bulk_cash_sessions_excel
+        stream_bulk_cash_sessions_csv,
+        stream_bulk_cash_sessions_excel
     )
     
     def _export_bulk():
@@ -391,13 +391,13 @@ def export_bulk_cash_sessions(
             include_empty=request_body.filters.include_empty
         )
         
-        # Générer l'export selon le format
+        # Générer l'export en flux selon le format (mémoire bornée quel que soit le volume)
         if request_body.format == "csv":
-            buffer = generate_bulk_cash_sessions_csv(db, filters)
+            content = stream_bulk_cash_sessions_csv(db, filters)
             media_type = "text/csv"
             extension = "csv"
         else:  # excel
-            buffer = generate_bulk_cash_sessions_excel(db, filters)
+            content = stream_bulk_cash_sessions_excel(db, filters)
             media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             extension = "xlsx"
         
@@ -406,7 +406,7 @@ def export_bulk_cash_sessions(
         filename = f"export_sessions_caisse_{date_str}.{extension}"
         
         return StreamingResponse(
-            iter([buffer.getvalue()]),
+            content,
             media_type=media_type,
             headers={
                 "Content-Disposition": f'attachment; filename="{filename}"'
@@ -448,8 +448,8 @@ def export_bulk_reception_tickets(
 ):
     """Exporte tous les tickets de réception filtrés en CSV ou Excel."""
     from recyclic_api.services.report_service import (
-        generate_bulk_reception_tickets_csv,
-        generate_bulk_reception_tickets_excel
+        stream_bulk_reception_tickets_csv,
+        stream_bulk_reception_tickets_excel
     )
     
     # B50-P2: Logging amélioré pour faciliter le debug
@@ -470,9 +470,9 @@ def export_bulk_reception_tickets(
                 logger.warning(f"benevole_id invalide reçu: {request_body.filters.benevole_id}")
                 raise HTTPException(status_code=400, detail="benevole_id invalide")
         
-        # Générer l'export selon le format
+        # Générer l'export en flux selon le format (mémoire bornée quel que soit le volume)
         if request_body.format == "csv":
-            buffer = generate_bulk_reception_tickets_csv(
+            content = stream_bulk_reception_tickets_csv(
                 db,
                 status=request_body.filters.status,
                 date_from=request_body.filters.date_from,
@@ -484,7 +484,7 @@ def export_bulk_reception_tickets(
             media_type = "text/csv"
             extension = "csv"
         else:  # excel
-            buffer = generate_bulk_reception_tickets_excel(
+            content = stream_bulk_reception_tickets_excel(
                 db,
                 status=request_body.filters.status,
                 date_from=request_body.filters.date_from,
@@ -501,7 +501,7 @@ def export_bulk_reception_tickets(
         filename = f"export_tickets_reception_{date_str}.{extension}"
         
         return StreamingResponse(
-            iter([buffer.getvalue()]),
+            content,
             media_type=media_type,
             headers={
                 "Content-Disposition": f'attachment; filename="{filename}"'
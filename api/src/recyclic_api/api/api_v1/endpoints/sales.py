@@ -1,7 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from typing import List, Literal
 from uuid import UUID
 from datetime import datetime, timezone
 from recyclic_api.core.database import get_db
@@ -17,25 +16,61 @@ from recyclic_api.schemas.sale import SaleResponse, SaleCreate, SaleUpdate, Sale
 from recyclic_api.core.logging import log_transaction_event
 from recyclic_api.core.auth import require_role_strict
 from recyclic_api.services.statistics_recalculation_service import StatisticsRecalculationService
+from recyclic_api.services.cash_session_service import CashSessionService
 from recyclic_api.core.audit import log_audit
 from recyclic_api.models.audit_log import AuditActionType
 from sqlalchemy.orm import selectinload
+from recyclic_api.utils.pagination import InvalidCursorError, count_rows, fetch_keyset_page
 
+# Handlers synchrones : FastAPI les exécute dans son pool de threads, la Session bloquante ne gèle pas la boucle d'événements
 router = APIRouter()
 auth_scheme = HTTPBearer(auto_error=False)
 
 @router.get("/", response_model=List[SaleResponse])
-async def get_sales(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all sales"""
+def get_sales(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    pagination: Literal["offset", "keyset"] = Query(
+        "offset", description="keyset : ventes les plus récentes d'abord, curseur de la page suivante dans X-Next-Cursor"
+    ),
+    cursor: Optional[str] = Query(None, description="Curseur X-Next-Cursor de la page précédente (implique pagination=keyset)"),
+    count_mode: Optional[Literal["exact", "estimated"]] = Query(
+        None, description="Total renvoyé dans X-Total-Count (exact ou estimé) ; pas de comptage par défaut"
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Get all sales.
+
+    By default the page is read with skip/limit, in the table's natural order.
+    With pagination=keyset (or a cursor), sales are returned most recent first
+    (created_at desc, id desc) and the cursor of the next page is returned in
+    the X-Next-Cursor header.
+    """
     # Story B52-P1: Eager load payments pour éviter N+1 queries
-    sales = db.query(Sale).options(
+    query = db.query(Sale).options(
         selectinload(Sale.payments),
         selectinload(Sale.items)
-    ).offset(skip).limit(limit).all()
+    )
+    if cursor or pagination == "keyset":
+        try:
+            sales, next_cursor = fetch_keyset_page(query, Sale.created_at, Sale.id, limit, cursor=cursor, offset=skip)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        sales = query.offset(skip).limit(limit).all()
+
+    if count_mode:
+        total, estimated = count_rows(db, db.query(Sale), count_mode)
+        response.headers["X-Total-Count"] = str(max(total, len(sales)) if estimated else total)
+        response.headers["X-Total-Count-Estimated"] = "true" if estimated else "false"
     return sales
 
 @router.get("/{sale_id}", response_model=SaleResponse)
-async def get_sale(sale_id: str, db: Session = Depends(get_db)):
+def get_sale(sale_id: str, db: Session = Depends(get_db)):
     """Get sale by ID"""
     try:
         sale_uuid = UUID(sale_id)
@@ -53,7 +88,7 @@ async def get_sale(sale_id: str, db: Session = Depends(get_db)):
     return sale
 
 @router.put("/{sale_id}", response_model=SaleResponse)
-async def update_sale_note(
+def update_sale_note(
     sale_id: str,
     sale_update: SaleUpdate,
     db: Session = Depends(get_db),
@@ -105,7 +140,7 @@ async def update_sale_note(
 
 
 @router.patch("/{sale_id}/items/{item_id}/weight", response_model=SaleItemResponse)
-async def update_sale_item_weight(
+def update_sale_item_weight(
     sale_id: str,
     item_id: str,
     weight_update: SaleItemWeightUpdate,
@@ -195,7 +230,7 @@ async def update_sale_item_weight(
 
 
 @router.post("/", response_model=SaleResponse)
-async def create_sale(
+def create_sale(
     sale_data: SaleCreate,
     db: Session = Depends(get_db),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(auth_scheme),
@@ -335,23 +370,11 @@ async def create_sale(
         )
         db.add(db_payment)
 
-    # Commit to ensure the sale is in the database before querying
-    db.commit()
-
-    # Update cash session counters (cash_session déjà récupéré plus haut)
-    if cash_session:
-        # Calculate total sales and items for this session (includes the sale we just created)
-        session_sales = db.query(
-            func.coalesce(func.sum(Sale.total_amount), 0).label('total_sales'),
-            func.count(Sale.id).label('total_items')
-        ).filter(Sale.cash_session_id == sale_data.cash_session_id).first()
-
-        # Update session with totals from all sales
-        cash_session.total_sales = float(session_sales.total_sales)
-        cash_session.total_items = session_sales.total_items
-        cash_session.current_amount = cash_session.initial_amount + cash_session.total_sales
+    # Mise à jour incrémentale des compteurs de la session dans la même transaction
+    # (les écarts éventuels sont corrigés par CashSessionService.reconcile_session_totals)
+    CashSessionService(db).increment_session_totals(cash_session.id, sale_data.total_amount)
 
-        db.commit()
+    db.commit()
     
     # B48-P2: Logger la validation paiement
     # Construire l'état du panier AVANT validation (items reçus dans la requête)
@@ -402,7 +425,7 @@ async def create_sale(
     return db_sale
 
 @router.patch("/{sale_id}/items/{item_id}", response_model=SaleItemResponse)
-async def update_sale_item(
+def update_sale_item(
     sale_id: str,
     item_id: str,
     item_update: SaleItemUpdate,
@@ -6,6 +6,7 @@ from recyclic_api.models.setting import Setting
 from recyclic_api.models.user import UserRole
 from recyclic_api.schemas.setting import SettingResponse, SettingCreate, SettingUpdate
 from recyclic_api.core.auth import require_role_strict
+from recyclic_api.core.settings_cache import invalidate_settings
 
 router = APIRouter()
 
@@ -49,6 +50,7 @@ async def create_setting(
     db.add(db_setting)
     db.commit()
     db.refresh(db_setting)
+    invalidate_settings(db_setting.key)
     return db_setting
 
 
@@ -67,6 +69,7 @@ async def update_setting(
     setting.value = setting_update.value
     db.commit()
     db.refresh(setting)
+    invalidate_settings(key)
     return setting
 
 
@@ -83,4 +86,5 @@ async def delete_setting(
 
     db.delete(setting)
     db.commit()
+    invalidate_settings(key)
     return {"message": "Setting deleted successfully"}
@@ -155,10 +155,9 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
     db_user = User(**user_data)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
-    # Log audit for user creation
+    db.flush()
+
+    # Log audit for user creation (same transaction as the new user)
     log_audit(
         action_type=AuditActionType.USER_CREATED,
         actor=None,  # System creation, no specific actor
@@ -172,7 +171,9 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
         description=f"Utilisateur créé: {db_user.username}",
         db=db
     )
-    
+
+    db.commit()
+    db.refresh(db_user)
     return db_user
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -202,9 +203,6 @@ async def update_user(user_id: str, user_update: UserUpdate, db: Session = Depen
     for field, value in update_data.items():
         setattr(user, field, value)
 
-    db.commit()
-    db.refresh(user)
-    
     # Log audit for user update
     log_audit(
         action_type=AuditActionType.USER_UPDATED,
@@ -218,7 +216,9 @@ async def update_user(user_id: str, user_update: UserUpdate, db: Session = Depen
         description=f"Utilisateur modifié: {user.username} (champs: {', '.join(updated_fields)})",
         db=db
     )
-    
+
+    db.commit()
+    db.refresh(user)
     return user
 
 @router.delete("/{user_id}")
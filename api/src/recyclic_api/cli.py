@@ -112,6 +112,23 @@ def generate_ecologic_export(date_from: str, date_to: str, output_dir: str | Non
     finally:
         db.close()
 
+def backfill_transaction_logs() -> None:
+    """Rebuild the transaction log index from the rotated log files."""
+    from recyclic_api.core.transaction_log_store import (
+        TRANSACTION_LOG_INDEX_FILE,
+        backfill_transaction_log_store,
+        transaction_log_files,
+    )
+
+    files = transaction_log_files()
+    if not files:
+        print("ℹ️  No transaction log file found, nothing to index.")
+        return
+
+    indexed = backfill_transaction_log_store(files=files)
+    print(f"✅ Indexed {indexed} transaction log entries from {len(files)} file(s)")
+    print(f"   Index: {TRANSACTION_LOG_INDEX_FILE}")
+
 def main():
     parser = argparse.ArgumentParser(description="Recyclic API CLI")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
@@ -133,6 +150,11 @@ def main():
         help="Optional output directory (defaults to settings.ECOLOGIC_EXPORT_DIR)",
     )
 
+    subparsers.add_parser(
+        "backfill-transaction-logs",
+        help="Rebuild the transaction log index from existing (rotated) log files",
+    )
+
     args = parser.parse_args()
 
     if args.command == "create-super-admin":
@@ -143,6 +165,8 @@ def main():
             date_to=args.date_to,
             output_dir=args.output_dir,
         )
+    elif args.command == "backfill-transaction-logs":
+        backfill_transaction_logs()
     else:
         parser.print_help()
 
@@ -4,13 +4,69 @@ Module de gestion du journal d'audit centralisé
 from typing import Optional, Dict, Any, Union
 from uuid import UUID
 from datetime import datetime
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 
 from recyclic_api.models.audit_log import AuditLog, AuditActionType
 from recyclic_api.models.user import User
 
 
+_PENDING_WRITES_KEY = "audit_pending_writes"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_pending_writes(session: Session, flush_context) -> None:
+    session.info[_PENDING_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_pending_writes(session: Session) -> None:
+    session.info.pop(_PENDING_WRITES_KEY, None)
+
+
+def has_pending_writes(db: Session) -> bool:
+    """
+    Indique si la transaction en cours de la session contient des écritures
+    non committées (objets en attente ou déjà flushés).
+    """
+    return bool(db.new or db.dirty or db.deleted) or bool(db.info.get(_PENDING_WRITES_KEY))
+
+
+def build_audit_entry(
+    action_type: Union[str, AuditActionType],
+    actor: Optional[User] = None,
+    target_id: Optional[UUID] = None,
+    target_type: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None,
+    description: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> AuditLog:
+    """
+    Construit une entrée d'audit sans l'ajouter à la session, pour l'écrire
+    dans la même transaction que d'autres lignes (un seul commit).
+    """
+    # Convertir l'action_type en string si c'est un enum
+    if isinstance(action_type, AuditActionType):
+        action_type_str = action_type.value
+    else:
+        action_type_str = str(action_type)
+
+    return AuditLog(
+        timestamp=datetime.utcnow(),
+        actor_id=actor.id if actor else None,
+        actor_username=actor.username if actor else None,
+        action_type=action_type_str,
+        target_id=target_id,
+        target_type=target_type,
+        details_json=details,
+        description=description,
+        ip_address=ip_address,
+        user_agent=user_agent
+    )
+
+
 def log_audit(
     action_type: Union[str, AuditActionType],
     actor: Optional[User] = None,
@@ -24,6 +80,10 @@ def log_audit(
 ) -> Optional[AuditLog]:
     """
     Enregistre un événement d'audit dans le journal centralisé.
+
+    Si la session porte des écritures non committées, l'entrée rejoint la
+    transaction de l'appelant (pas de commit intermédiaire) : il suffit de
+    journaliser avant le `db.commit()` métier. Sinon l'entrée est committée seule.
     
     Args:
         action_type: Type d'action (enum AuditActionType ou string)
@@ -44,34 +104,29 @@ def log_audit(
         # Cette fonction doit être appelée dans un contexte avec une session DB
         return None
     
+    audit_entry = build_audit_entry(
+        action_type=action_type,
+        actor=actor,
+        target_id=target_id,
+        target_type=target_type,
+        details=details,
+        description=description,
+        ip_address=ip_address,
+        user_agent=user_agent,
+    )
+
+    if has_pending_writes(db):
+        # L'appelant a une transaction en cours : l'entrée sera écrite par son
+        # commit, avec les données métier (et annulée avec elles en cas d'échec)
+        db.add(audit_entry)
+        return audit_entry
+
     try:
-        # Convertir l'action_type en string si c'est un enum
-        if isinstance(action_type, AuditActionType):
-            action_type_str = action_type.value
-        else:
-            action_type_str = str(action_type)
-        
-        # Créer l'entrée d'audit
-        audit_entry = AuditLog(
-            timestamp=datetime.utcnow(),
-            actor_id=actor.id if actor else None,
-            actor_username=actor.username if actor else None,
-            action_type=action_type_str,
-            target_id=target_id,
-            target_type=target_type,
-            details_json=details,
-            description=description,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-        
-        # Sauvegarder en base
+        # Rien d'autre à écrire : l'entrée est committée seule
         db.add(audit_entry)
         db.commit()
-        db.refresh(audit_entry)
-        
         return audit_entry
-        
+
     except Exception as e:
         # En cas d'erreur, on log mais on ne fait pas échouer l'opération principale
         print(f"Erreur lors de l'enregistrement de l'audit: {e}")
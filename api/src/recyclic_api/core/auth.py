@@ -15,11 +15,12 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
 from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
 
 from .config import settings
 from .database import get_db
 from .email_service import get_email_service
+from .permission_cache import permission_cache
 from .redis import get_redis
 from .security import create_access_token, create_password_reset_token, verify_token
 from ..models.permission import Group, Permission
@@ -446,9 +447,31 @@ async def send_reset_password_email(email: str, db: Session) -> None:
 # Permission-Based Access Control
 # ============================================================================
 
+def _load_permission_names(user_id: uuid.UUID, db: Session) -> set:
+    """Load the permission names granted to a user through their groups."""
+    stmt = (
+        select(Permission.name)
+        .join(Permission.groups)
+        .join(Group.users)
+        .where(User.id == user_id)
+        .distinct()
+    )
+    return set(db.execute(stmt).scalars().all())
+
+
+def get_cached_permission_names(user: User, db: Session) -> frozenset:
+    """Return the user's group permissions, served from the permission cache."""
+    return permission_cache.get_permissions(
+        str(user.id), lambda: _load_permission_names(user.id, db)
+    )
+
+
 def user_has_permission(user: User, permission_name: str, db: Session) -> bool:
     """Check if a user has a specific permission through their groups.
 
+    The permission set is resolved through the permission cache, so repeated
+    checks cost a set lookup instead of a query.
+
     Args:
         user: The user to check
         permission_name: The name of the permission (e.g., 'caisse.access')
@@ -461,27 +484,7 @@ def user_has_permission(user: User, permission_name: str, db: Session) -> bool:
     if user.role in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
         return True
 
-    # Load user with groups and their permissions (anti N+1)
-    stmt = (
-        select(User)
-        .options(
-            selectinload(User.groups).selectinload(Group.permissions)
-        )
-        .where(User.id == user.id)
-    )
-    result = db.execute(stmt)
-    user_with_groups = result.scalar_one_or_none()
-
-    if not user_with_groups or not user_with_groups.groups:
-        return False
-
-    # Check if any of the user's groups have the required permission
-    for group in user_with_groups.groups:
-        for permission in group.permissions:
-            if permission.name == permission_name:
-                return True
-
-    return False
+    return permission_name in get_cached_permission_names(user, db)
 
 
 def require_permission(permission_name: str):
@@ -535,24 +538,4 @@ def get_user_permissions(user: User, db: Session) -> List[str]:
         all_permissions = result.scalars().all()
         return [perm.name for perm in all_permissions]
 
-    # Load user with groups and their permissions (anti N+1)
-    stmt = (
-        select(User)
-        .options(
-            selectinload(User.groups).selectinload(Group.permissions)
-        )
-        .where(User.id == user.id)
-    )
-    result = db.execute(stmt)
-    user_with_groups = result.scalar_one_or_none()
-
-    if not user_with_groups or not user_with_groups.groups:
-        return []
-
-    # Collect unique permissions from all groups
-    permissions = set()
-    for group in user_with_groups.groups:
-        for permission in group.permissions:
-            permissions.add(permission.name)
-
-    return sorted(list(permissions))
+    return sorted(get_cached_permission_names(user, db))
@@ -10,12 +10,19 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     TEST_DATABASE_URL: str | None = None
+    # Pool de connexions (par processus)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 300
     REDIS_URL: str
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Threads dédiés à bcrypt (vérification des mots de passe hors boucle d'événements)
+    PASSWORD_HASH_WORKERS: int = 4
     
     # API
     API_V1_STR: str = "/v1"
@@ -40,6 +47,10 @@ class Settings(BaseSettings):
     KDRIVE_SYNC_INTERVAL_SECONDS: int = 3600
     KDRIVE_RETRY_DELAY_SECONDS: float = 5.0
     KDRIVE_MAX_RETRIES: int = 3
+    # Envois parallèles par cycle de synchronisation
+    KDRIVE_SYNC_MAX_WORKERS: int = 4
+    # Manifeste des fichiers déjà synchronisés (par défaut : .kdrive-manifest.json dans le dossier exporté)
+    KDRIVE_SYNC_MANIFEST_PATH: str | None = None
 
     # Cash Session Reports
     CASH_SESSION_REPORT_DIR: str = '/app/reports/cash_sessions'
@@ -47,6 +58,29 @@ class Settings(BaseSettings):
     CASH_SESSION_REPORT_TOKEN_TTL_SECONDS: int = 900
     CASH_SESSION_REPORT_RETENTION_DAYS: int = 30
 
+    # File de tâches de fond (Redis) : effets de bord de la fermeture de caisse
+    JOB_QUEUE_WORKERS: int = 2
+    # Exécution immédiate dans la requête, sans Redis ni worker (tests)
+    JOB_QUEUE_EAGER: bool = False
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_DELAY_SECONDS: float = 10.0
+    # Délai avant de considérer un job réservé comme abandonné : doit dépasser le plus long job
+    # (restauration : DB_BACKUP_TIMEOUT_SECONDS + DB_RESTORE_TIMEOUT_SECONDS)
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 1800
+    JOB_RESULT_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Export / import de la base (pg_dump / pg_restore)
+    # Dossier des dumps importés et des sauvegardes de sécurité (volume partagé avec les workers)
+    DB_BACKUP_DIR: str = '/backups'
+    DB_IMPORT_MAX_BYTES: int = 500 * 1024 * 1024
+    # Export interrompu si pg_dump ne produit aucune donnée pendant ce délai
+    DB_EXPORT_IDLE_TIMEOUT_SECONDS: int = 600
+    DB_IMPORT_VALIDATION_TIMEOUT_SECONDS: int = 60
+    DB_BACKUP_TIMEOUT_SECONDS: int = 300
+    DB_RESTORE_TIMEOUT_SECONDS: int = 1200
+    # Processus pg_restore parallèles (0 = nombre de CPU, plafonné à 4)
+    DB_RESTORE_JOBS: int = 0
+
     # Legacy Import - LLM Fallback (B47-P5)
     # Provider à utiliser pour le fallback LLM sur les catégories legacy.
     # Exemples : "openrouter", "none" (par défaut = désactivé).
@@ -55,6 +89,12 @@ class Settings(BaseSettings):
     LEGACY_IMPORT_LLM_MODEL: str | None = None
     # Taille de batch maximale pour l'envoi de catégories non mappées au LLM.
     LEGACY_IMPORT_LLM_BATCH_SIZE: int = 20
+    # Nombre de batches envoyés en parallèle au LLM.
+    LEGACY_IMPORT_LLM_CONCURRENCY: int = 4
+    # Timeout (secondes) et nouvelles tentatives (backoff exponentiel + jitter) par batch.
+    LEGACY_IMPORT_LLM_BATCH_TIMEOUT_SECONDS: float = 60.0
+    LEGACY_IMPORT_LLM_MAX_RETRIES: int = 2
+    LEGACY_IMPORT_LLM_RETRY_BASE_DELAY_SECONDS: float = 1.0
 
     # Clé API OpenRouter (si LEGACY_IMPORT_LLM_PROVIDER = "openrouter").
     OPENROUTER_API_KEY: str | None = None
@@ -70,6 +110,25 @@ class Settings(BaseSettings):
 
     # Reception Live Stats Feature Flag
     LIVE_RECEPTION_STATS_ENABLED: bool = True
+    # Durée (secondes) du cache Redis partagé des stats live ; 0 = désactivé
+    LIVE_STATS_CACHE_TTL_SECONDS: int = 5
+
+    # Journal d'audit : au-delà de ce nombre de lignes prévues, le total est estimé (count_mode=auto)
+    AUDIT_LOG_EXACT_COUNT_THRESHOLD: int = 10000
+
+    # Cache en mémoire des paramètres applicatifs (table settings), invalidé par Redis pub/sub ; 0 = désactivé
+    SETTINGS_CACHE_TTL_SECONDS: int = 300
+    SETTINGS_INVALIDATION_CHANNEL: str = "settings:invalidate"
+
+    # Métriques auth / sessions / emails agrégées dans Redis par minute et par heure (partagées entre workers)
+    METRICS_RETENTION_HOURS: int = 168
+
+    # Arbre des catégories gardé en mémoire, invalidé par une version Redis à chaque écriture ; 0 = désactivé
+    CATEGORY_TREE_CACHE_TTL_SECONDS: int = 300
+
+    # Réponses du catalogue (catégories de caisse/réception, boutons prédéfinis) pré-sérialisées,
+    # invalidées par une version Redis à chaque écriture ; 0 = désactivé (ETag conservé)
+    CATALOGUE_CACHE_TTL_SECONDS: int = 300
     
     model_config = ConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -86,6 +145,16 @@ if os.getenv("TESTING") == "true":
         settings.DATABASE_URL = settings.TEST_DATABASE_URL
     # In tests, always use a fixed bot token to ensure deterministic behavior
     settings.TELEGRAM_BOT_TOKEN = "test_bot_token_123"
+    # Stats live toujours recalculées en test (les fixtures modifient les données entre deux appels)
+    settings.LIVE_STATS_CACHE_TTL_SECONDS = 0
+    # Paramètres relus à chaque appel (les tests écrivent directement dans la table settings)
+    settings.SETTINGS_CACHE_TTL_SECONDS = 0
+    # Arbre des catégories relu à chaque appel (les fixtures insèrent des catégories directement)
+    settings.CATEGORY_TREE_CACHE_TTL_SECONDS = 0
+    # Catalogue resérialisé à chaque appel (mêmes raisons)
+    settings.CATALOGUE_CACHE_TTL_SECONDS = 0
+    # Tâches de fond exécutées dans la requête (assertions synchrones sur leurs effets)
+    settings.JOB_QUEUE_EAGER = True
 
 
 
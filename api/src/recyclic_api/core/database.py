@@ -1,15 +1,29 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from recyclic_api.core.config import settings
 
 db_url = settings.DATABASE_URL
 
+
+def pool_options(url: str) -> dict:
+    """Pool sizing from settings (SQLite keeps its default single-connection pools)."""
+    options = {"pool_recycle": settings.DB_POOL_RECYCLE}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
 # Create database engine
 engine = create_engine(
     db_url,
     pool_pre_ping=True,
-    pool_recycle=300,
-    echo=settings.ENVIRONMENT == "development"
+    echo=settings.ENVIRONMENT == "development",
+    **pool_options(db_url)
 )
 
 # Create session factory
@@ -9,7 +9,7 @@ import json
 import queue
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 # Configuration du logger
@@ -79,6 +79,22 @@ class JSONFormatter(logging.Formatter):
         return json.dumps(log_data, ensure_ascii=False, separators=(',', ':'))
 
 
+class IndexedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler qui prévient l'index interrogeable après chaque rotation."""
+
+    def __init__(self, *args, on_rollover: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_rollover = on_rollover
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        if self.on_rollover is not None:
+            try:
+                self.on_rollover()
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Failed to prune transaction log index: {e}", exc_info=True)
+
+
 def _setup_transaction_logger() -> logging.Logger:
     """Configure le logger transaction_audit avec rotation et format JSON."""
     standard_logger = logging.getLogger(__name__)
@@ -89,7 +105,7 @@ def _setup_transaction_logger() -> logging.Logger:
         standard_logger.info(f"Transaction log directory: {TRANSACTION_LOG_DIR.absolute()}")
         
         # Créer le handler rotatif
-        file_handler = RotatingFileHandler(
+        file_handler = IndexedRotatingFileHandler(
             str(TRANSACTION_LOG_FILE),
             maxBytes=MAX_BYTES,
             backupCount=BACKUP_COUNT,
@@ -103,8 +119,26 @@ def _setup_transaction_logger() -> logging.Logger:
         _log_queue = queue.Queue(-1)  # Queue illimitée
         queue_handler = QueueHandler(_log_queue)
         
-        # Créer le queue listener pour écrire dans le fichier depuis un thread séparé
-        _queue_listener = QueueListener(_log_queue, file_handler)
+        handlers = [file_handler]
+        
+        # Index interrogeable (best-effort : le fichier reste la source de vérité)
+        try:
+            from recyclic_api.core.transaction_log_store import (
+                TransactionLogStoreHandler,
+                get_transaction_log_store,
+                prune_transaction_log_store,
+            )
+            store = get_transaction_log_store()
+            store_handler = TransactionLogStoreHandler(store)
+            store_handler.setFormatter(JSONFormatter())
+            handlers.append(store_handler)
+            # Les fichiers rotatifs supprimés sortent aussi de l'index
+            file_handler.on_rollover = lambda: prune_transaction_log_store(store)
+        except Exception as e:
+            standard_logger.error(f"Failed to setup transaction log index: {e}", exc_info=True)
+        
+        # Créer le queue listener pour écrire dans le fichier (et l'index) depuis un thread séparé
+        _queue_listener = QueueListener(_log_queue, *handlers)
         _queue_listener.start()
         
         # Créer et configurer le logger
@@ -0,0 +1,125 @@
+"""
+Permission-set cache for group-based access control.
+
+Resolved permission names are cached per user in Redis and in a small
+in-process LRU. Both layers are keyed by a global version counter stored in
+Redis: any change to groups, permissions or memberships bumps the version,
+which invalidates every cached set across all workers at once.
+
+If Redis is unavailable the version cannot be checked, so the cache is
+bypassed and permissions are loaded from the database.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, FrozenSet, Iterable, Optional, Tuple
+
+from .redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+PERMISSIONS_CACHE_VERSION_KEY = "permissions_cache_version"
+PERMISSIONS_CACHE_KEY_PREFIX = "user_permissions"
+PERMISSIONS_CACHE_TTL_SECONDS = 300
+LOCAL_CACHE_MAX_SIZE = 1024
+
+
+class PermissionCache:
+    """Two-level (in-process LRU + Redis) cache of user permission sets."""
+
+    def __init__(
+        self,
+        max_size: int = LOCAL_CACHE_MAX_SIZE,
+        ttl_seconds: int = PERMISSIONS_CACHE_TTL_SECONDS,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._local: "OrderedDict[Tuple[str, str], Tuple[float, FrozenSet[str]]]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _redis_key(version: str, user_id: str) -> str:
+        return f"{PERMISSIONS_CACHE_KEY_PREFIX}:{version}:{user_id}"
+
+    def _get_version(self, redis_client) -> Optional[str]:
+        try:
+            version = redis_client.get(PERMISSIONS_CACHE_VERSION_KEY)
+        except Exception as exc:
+            logger.debug("Permission cache disabled, Redis unavailable: %s", exc)
+            return None
+        return str(version) if version is not None else "0"
+
+    def _get_local(self, key: Tuple[str, str]) -> Optional[FrozenSet[str]]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, permissions = entry
+            if expires_at <= time.time():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return permissions
+
+    def _set_local(self, key: Tuple[str, str], permissions: FrozenSet[str]) -> None:
+        with self._lock:
+            self._local[key] = (time.time() + self.ttl_seconds, permissions)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def get_permissions(
+        self,
+        user_id: str,
+        loader: Callable[[], Iterable[str]],
+    ) -> FrozenSet[str]:
+        """Return the permission names of a user, calling ``loader`` on a miss."""
+        redis_client = get_redis()
+        version = self._get_version(redis_client)
+        if version is None:
+            return frozenset(loader())
+
+        key = (version, user_id)
+        permissions = self._get_local(key)
+        if permissions is not None:
+            return permissions
+
+        redis_key = self._redis_key(version, user_id)
+        try:
+            cached = redis_client.get(redis_key)
+            if cached is not None:
+                permissions = frozenset(json.loads(cached))
+        except (TypeError, ValueError):
+            permissions = None
+        except Exception as exc:
+            logger.debug("Failed to read cached permissions for %s: %s", user_id, exc)
+
+        if permissions is None:
+            permissions = frozenset(loader())
+            try:
+                redis_client.set(redis_key, json.dumps(sorted(permissions)), ex=self.ttl_seconds)
+            except Exception as exc:
+                logger.debug("Failed to cache permissions for %s: %s", user_id, exc)
+
+        self._set_local(key, permissions)
+        return permissions
+
+    def invalidate(self) -> None:
+        """Invalidate every cached permission set (all users, all workers)."""
+        with self._lock:
+            self._local.clear()
+        try:
+            get_redis().incr(PERMISSIONS_CACHE_VERSION_KEY)
+        except Exception as exc:
+            logger.warning("Failed to bump permission cache version: %s", exc)
+
+
+permission_cache = PermissionCache()
+
+
+def invalidate_permission_cache() -> None:
+    """Call after any change to groups, permissions or group memberships."""
+    permission_cache.invalidate()
@@ -14,6 +14,7 @@ except ImportError:
     pass
 
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import List, Tuple, Optional
 from passlib.context import CryptContext
@@ -22,11 +23,18 @@ from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from .config import settings
-from ..models.setting import Setting
+from .settings_cache import TOKEN_EXPIRATION_MINUTES, get_setting
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Bounded pool for bcrypt (CPU-bound, releases the GIL): keeps the event loop free
+# and caps concurrent hashing so a burst of logins cannot starve the other requests
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+
 # JWT Configuration
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -39,6 +47,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the bcrypt worker pool (caps concurrent hashing across request threads)"""
+    return _password_executor.submit(verify_password, plain_password, hashed_password).result()
+
 def validate_password_strength(password: str) -> Tuple[bool, List[str]]:
     """
     Validate password strength according to security best practices.
@@ -73,35 +85,14 @@ def validate_password_strength(password: str) -> Tuple[bool, List[str]]:
     return len(errors) == 0, errors
 
 
-def get_token_expiration_minutes() -> int:
+def get_token_expiration_minutes(db: Optional[Session] = None) -> int:
     """
-    Récupère la durée d'expiration des tokens depuis la base de données.
-    Retourne 480 minutes (8 heures) par défaut si la valeur n'est pas trouvée.
+    Récupère la durée d'expiration des tokens (paramètre token_expiration_minutes).
+    Retourne 480 minutes (8 heures) par défaut si la valeur est absente ou invalide.
+
+    La valeur est servie par le cache des paramètres : pas de requête par token émis.
     """
-    try:
-        from ..core.database import get_db
-        db = next(get_db())
-        setting = db.query(Setting).filter(Setting.key == "token_expiration_minutes").first()
-        if setting:
-            value = int(setting.value)
-            # Validation de la valeur pour éviter les valeurs aberrantes
-            if 1 <= value <= 10080:  # Entre 1 minute et 7 jours
-                return value
-            else:
-                # Log l'erreur mais utilise la valeur par défaut
-                import logging
-                logging.warning(f"Token expiration value {value} is out of range (1-10080), using default 480")
-    except (ValueError, TypeError) as e:
-        # Log l'erreur de conversion
-        import logging
-        logging.warning(f"Invalid token expiration value: {e}, using default 480")
-    except Exception as e:
-        # Log l'erreur de base de données
-        import logging
-        logging.warning(f"Database error retrieving token expiration: {e}, using default 480")
-    
-    # Valeur par défaut : 480 minutes (8 heures)
-    return 480
+    return get_setting(TOKEN_EXPIRATION_MINUTES, db)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
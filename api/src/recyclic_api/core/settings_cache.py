@@ -0,0 +1,172 @@
+"""
+Cache typé des paramètres applicatifs stockés dans la table `settings`.
+
+Les paramètres lus à chaque requête (durée des tokens, durée max des refresh
+tokens, seuil d'activité) sont chargés en une seule requête puis servis depuis
+la mémoire du processus pendant SETTINGS_CACHE_TTL_SECONDS.
+
+Toute écriture d'un paramètre appelle `invalidate_settings`, qui vide le cache
+local et publie la clé sur le canal Redis SETTINGS_INVALIDATION_CHANNEL ; chaque
+processus API écoute ce canal (`start_settings_invalidation_listener`) et vide
+son propre cache. Le TTL borne la durée d'un cache périmé si un message est perdu.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.models.setting import Setting
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IntSetting:
+    """Paramètre entier avec valeur par défaut et bornes inclusives."""
+
+    key: str
+    default: int
+    minimum: int = 1
+    maximum: Optional[int] = None
+
+    def parse(self, raw: Optional[str]) -> int:
+        if raw is None:
+            return self.default
+        try:
+            value = int(str(raw))
+        except (TypeError, ValueError):
+            logger.warning("Valeur invalide pour %s (%r), utilisation de la valeur par défaut %s", self.key, raw, self.default)
+            return self.default
+        if value < self.minimum or (self.maximum is not None and value > self.maximum):
+            logger.warning(
+                "Valeur %s hors limites pour %s (%s-%s), utilisation de la valeur par défaut %s",
+                value,
+                self.key,
+                self.minimum,
+                self.maximum if self.maximum is not None else "∞",
+                self.default,
+            )
+            return self.default
+        return value
+
+
+TOKEN_EXPIRATION_MINUTES = IntSetting("token_expiration_minutes", default=480, minimum=1, maximum=10080)
+REFRESH_TOKEN_MAX_HOURS = IntSetting("refresh_token_max_hours", default=24, minimum=1, maximum=168)
+ACTIVITY_THRESHOLD_MINUTES = IntSetting("activity_threshold_minutes", default=15, minimum=1)
+
+CACHED_SETTINGS = (TOKEN_EXPIRATION_MINUTES, REFRESH_TOKEN_MAX_HOURS, ACTIVITY_THRESHOLD_MINUTES)
+
+
+class SettingsCache:
+    """Valeurs typées des paramètres connus, rechargées ensemble à expiration ou invalidation."""
+
+    def __init__(self, specs: Iterable[IntSetting]):
+        self._specs: Dict[str, IntSetting] = {spec.key: spec for spec in specs}
+        self._values: Dict[str, int] = {}
+        self._expires_at = 0.0
+        # Incrémenté à chaque invalidation : un chargement concurrent plus ancien n'est pas conservé
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, spec: IntSetting, db: Optional[Session] = None) -> int:
+        """
+        Valeur du paramètre. `db` est utilisée pour le rechargement si fournie
+        (transaction de l'appelant), sinon une session courte est ouverte.
+        """
+        with self._lock:
+            if self._expires_at > time.monotonic() and spec.key in self._values:
+                return self._values[spec.key]
+            generation = self._generation
+
+        values = self._load(db)
+        if values is None:
+            return spec.default
+
+        ttl = settings.SETTINGS_CACHE_TTL_SECONDS
+        if ttl > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._values = values
+                    self._expires_at = time.monotonic() + ttl
+        return values.get(spec.key, spec.default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._values = {}
+            self._expires_at = 0.0
+
+    def _load(self, db: Optional[Session]) -> Optional[Dict[str, int]]:
+        try:
+            if db is not None:
+                rows = self._query(db)
+            else:
+                from recyclic_api.core.database import SessionLocal
+
+                with SessionLocal() as session:
+                    rows = self._query(session)
+        except Exception as exc:
+            logger.warning("Impossible de charger les paramètres applicatifs : %s", exc)
+            return None
+
+        raw_values = dict(rows)
+        return {key: spec.parse(raw_values.get(key)) for key, spec in self._specs.items()}
+
+    def _query(self, db: Session):
+        return db.query(Setting.key, Setting.value).filter(Setting.key.in_(list(self._specs))).all()
+
+
+settings_cache = SettingsCache(CACHED_SETTINGS)
+
+
+def get_setting(spec: IntSetting, db: Optional[Session] = None) -> int:
+    return settings_cache.get(spec, db)
+
+
+def invalidate_settings(*keys: str) -> None:
+    """
+    Vide le cache local et notifie les autres processus. À appeler après le
+    commit d'une écriture dans la table `settings`.
+    """
+    settings_cache.clear()
+    try:
+        get_redis().publish(settings.SETTINGS_INVALIDATION_CHANNEL, ",".join(keys) or "*")
+    except Exception as exc:
+        logger.warning("Impossible de publier l'invalidation des paramètres : %s", exc)
+
+
+def _on_invalidation(message) -> None:
+    settings_cache.clear()
+
+
+def _on_listener_error(exc: BaseException, pubsub, thread) -> None:
+    # Des invalidations ont pu être manquées pendant la coupure
+    settings_cache.clear()
+    logger.warning("Écoute des invalidations de paramètres interrompue : %s", exc)
+    time.sleep(1.0)
+
+
+def start_settings_invalidation_listener():
+    """Démarre l'écoute du canal d'invalidation dans un thread ; retourne le thread ou None."""
+    try:
+        pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{settings.SETTINGS_INVALIDATION_CHANNEL: _on_invalidation})
+        return pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=_on_listener_error)
+    except Exception as exc:
+        logger.warning("Écoute des invalidations de paramètres indisponible (cache limité au TTL) : %s", exc)
+        return None
+
+
+def stop_settings_invalidation_listener(thread) -> None:
+    if thread is None:
+        return
+    thread.stop()
+    thread.join(timeout=2.0)
@@ -0,0 +1,349 @@
+"""
+Index interrogeable des logs transactionnels (B48-P2).
+
+Les événements émis par `log_transaction_event` sont écrits dans le fichier rotatif
+JSON (source de vérité, lisible à la main) ET dans un index SQLite append-only posé
+à côté des logs. L'index est indexé sur timestamp, event, user_id et session_id :
+l'endpoint admin peut ainsi filtrer et paginer sans relire tous les fichiers rotatifs.
+
+L'index peut être reconstruit à tout moment depuis les fichiers existants
+(`backfill_transaction_log_store`, exposé par la commande CLI
+`backfill-transaction-logs`). Il suit la rotation des fichiers : à chaque
+rotation, les entrées antérieures au plus ancien fichier conservé sont supprimées
+(`prune_transaction_log_store`), l'index ne couvre donc jamais plus que les logs.
+"""
+import ast
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from recyclic_api.core.logging import (
+    BACKUP_COUNT,
+    TRANSACTION_LOG_DIR,
+    TRANSACTION_LOG_FILE,
+)
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_LOG_INDEX_FILE = TRANSACTION_LOG_DIR / "transactions_index.sqlite3"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS transaction_log_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts TEXT,
+        event TEXT,
+        user_id TEXT,
+        session_id TEXT,
+        payload TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tle_ts ON transaction_log_entries (ts, id)",
+    "CREATE INDEX IF NOT EXISTS ix_tle_event_ts ON transaction_log_entries (event, ts)",
+    "CREATE INDEX IF NOT EXISTS ix_tle_user_ts ON transaction_log_entries (user_id, ts)",
+    "CREATE INDEX IF NOT EXISTS ix_tle_session_ts ON transaction_log_entries (session_id, ts)",
+)
+
+
+def _to_utc(value: datetime) -> datetime:
+    """Convertit un datetime en UTC (les datetimes naïfs sont considérés UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _sortable_timestamp(value: datetime) -> str:
+    """Représentation texte UTC triable lexicographiquement."""
+    return _to_utc(value).strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def parse_entry_timestamp(raw: Any) -> Optional[datetime]:
+    """
+    Parse un timestamp de log ("...Z", "...+00:00Z", "...+00:00").
+
+    Retourne None si le timestamp est absent ou invalide.
+    """
+    if not isinstance(raw, str) or not raw:
+        return None
+    timestamp_str = raw
+    if timestamp_str.endswith("Z"):
+        if "+00:00" in timestamp_str or "-00:00" in timestamp_str:
+            timestamp_str = timestamp_str[:-1]
+        else:
+            timestamp_str = timestamp_str[:-1] + "+00:00"
+    try:
+        return _to_utc(datetime.fromisoformat(timestamp_str))
+    except ValueError:
+        return None
+
+
+def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse une ligne du fichier de logs transactionnels.
+
+    Gère l'ancien format où l'événement était un dict Python stringifié dans
+    le champ "message". Retourne None pour une ligne vide ou invalide.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(entry, dict):
+        return None
+    if "message" in entry and isinstance(entry["message"], str) and "event" not in entry:
+        try:
+            parsed_msg = ast.literal_eval(entry["message"])
+            if isinstance(parsed_msg, dict):
+                entry = parsed_msg
+        except (ValueError, SyntaxError):
+            pass
+    return entry
+
+
+class TransactionLogStore:
+    """Index SQLite append-only des événements transactionnels."""
+
+    def __init__(self, path: Path = TRANSACTION_LOG_INDEX_FILE) -> None:
+        self.path = Path(path)
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Une connexion par opération : le store est utilisé à la fois par le thread
+        # du QueueListener (écriture) et par les requêtes HTTP (lecture).
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._schema_ready:
+            with self._schema_lock:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                conn.commit()
+                self._schema_ready = True
+        return conn
+
+    @staticmethod
+    def _row_values(entry: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str], str]:
+        parsed_ts = parse_entry_timestamp(entry.get("timestamp"))
+        user_id = entry.get("user_id")
+        session_id = entry.get("session_id")
+        return (
+            _sortable_timestamp(parsed_ts) if parsed_ts else None,
+            entry.get("event"),
+            str(user_id) if user_id is not None else None,
+            str(session_id) if session_id is not None else None,
+            json.dumps(entry, ensure_ascii=False, separators=(",", ":")),
+        )
+
+    def append_many(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Ajoute des événements dans l'index et retourne le nombre d'entrées écrites."""
+        rows = [self._row_values(entry) for entry in entries]
+        if not rows:
+            return 0
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT INTO transaction_log_entries (ts, event, user_id, session_id, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        self.append_many([entry])
+
+    def reset(self) -> None:
+        """Vide l'index (utilisé avant un backfill complet)."""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM transaction_log_entries")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def prune_before(self, cutoff: datetime) -> int:
+        """
+        Supprime les entrées indexées avant la première entrée datée de `cutoff` ou après.
+
+        L'index est append-only : l'ordre des identifiants suit l'ordre d'écriture,
+        les entrées sans timestamp sont donc supprimées avec leurs voisines.
+        Retourne le nombre d'entrées supprimées.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM transaction_log_entries WHERE id < "
+                "(SELECT MIN(id) FROM transaction_log_entries WHERE ts >= ?)",
+                [_sortable_timestamp(cutoff)],
+            )
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def query(
+        self,
+        *,
+        event_type: Optional[str] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Retourne une page d'événements (plus récents en premier) et le total filtré.
+
+        Comme l'ancienne lecture des fichiers, les entrées sans timestamp exploitable
+        ne sont pas exclues par les filtres de date et apparaissent en fin de liste.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if event_type:
+            clauses.append("event = ?")
+            params.append(event_type)
+        if user_id:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if session_id:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if start_date:
+            clauses.append("(ts IS NULL OR ts >= ?)")
+            params.append(_sortable_timestamp(start_date))
+        if end_date:
+            clauses.append("(ts IS NULL OR ts <= ?)")
+            params.append(_sortable_timestamp(end_date))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = self._connect()
+        try:
+            total_count = conn.execute(
+                f"SELECT COUNT(*) FROM transaction_log_entries{where}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT payload FROM transaction_log_entries{where} "
+                "ORDER BY ts IS NULL, ts DESC, id DESC LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(row[0]) for row in rows], total_count
+
+
+class TransactionLogStoreHandler(logging.Handler):
+    """Handler qui recopie les logs transactionnels formatés en JSON dans l'index."""
+
+    def __init__(self, store: TransactionLogStore) -> None:
+        super().__init__(level=logging.INFO)
+        self.store = store
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            entry = parse_log_line(self.format(record))
+            if entry is not None:
+                self.store.append(entry)
+        except Exception:
+            self.handleError(record)
+
+
+_store: Optional[TransactionLogStore] = None
+
+
+def get_transaction_log_store() -> TransactionLogStore:
+    """Retourne l'index partagé du processus."""
+    global _store
+    if _store is None:
+        _store = TransactionLogStore()
+    return _store
+
+
+def transaction_log_files() -> List[Path]:
+    """Fichiers de logs existants, du plus récent au plus ancien."""
+    candidates = [TRANSACTION_LOG_FILE] + [
+        Path(f"{TRANSACTION_LOG_FILE}.{i}") for i in range(1, BACKUP_COUNT + 1)
+    ]
+    return [path for path in candidates if path.exists()]
+
+
+def _first_timestamp(log_file: Path) -> Optional[datetime]:
+    """Timestamp de la première entrée datée d'un fichier de logs."""
+    try:
+        with open(log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                entry = parse_log_line(line)
+                parsed_ts = parse_entry_timestamp(entry.get("timestamp")) if entry else None
+                if parsed_ts is not None:
+                    return parsed_ts
+    except OSError as e:
+        logger.warning(f"Impossible de lire {log_file}: {e}")
+    return None
+
+
+def prune_transaction_log_store(
+    store: Optional[TransactionLogStore] = None,
+    files: Optional[List[Path]] = None,
+) -> int:
+    """
+    Aligne l'index sur les fichiers conservés après une rotation : les entrées
+    antérieures au plus ancien fichier restant sont supprimées.
+
+    Retourne le nombre d'entrées supprimées (0 si aucun fichier rotatif n'existe).
+    """
+    store = store or get_transaction_log_store()
+    files = transaction_log_files() if files is None else files
+    if len(files) < 2:
+        return 0
+    cutoff = _first_timestamp(files[-1])
+    if cutoff is None:
+        return 0
+    return store.prune_before(cutoff)
+
+
+def backfill_transaction_log_store(
+    store: Optional[TransactionLogStore] = None,
+    files: Optional[List[Path]] = None,
+    batch_size: int = 5000,
+) -> int:
+    """
+    Reconstruit l'index depuis les fichiers de logs (principal + rotatifs).
+
+    L'index est vidé puis rechargé : la commande est idempotente.
+    Retourne le nombre d'entrées indexées.
+    """
+    store = store or get_transaction_log_store()
+    files = transaction_log_files() if files is None else files
+    store.reset()
+
+    indexed = 0
+    batch: List[Dict[str, Any]] = []
+    # Ordre chronologique : du backup le plus ancien au fichier courant
+    for log_file in reversed(files):
+        try:
+            with open(log_file, "r", encoding="utf-8") as f:
+                for line_num, line in enumerate(f, 1):
+                    entry = parse_log_line(line)
+                    if entry is None:
+                        if line.strip():
+                            logger.warning(f"Ligne invalide dans {log_file}:{line_num}: {line[:100]}")
+                        continue
+                    batch.append(entry)
+                    if len(batch) >= batch_size:
+                        indexed += store.append_many(batch)
+                        batch = []
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture de {log_file}: {e}", exc_info=True)
+    indexed += store.append_many(batch)
+    return indexed
@@ -18,6 +18,11 @@ from recyclic_api.core.config import settings
 from recyclic_api.api.api_v1.api import api_router
 from recyclic_api.services.sync_service import schedule_periodic_kdrive_sync
 from recyclic_api.services.scheduler_service import get_scheduler_service
+from recyclic_api.services.job_queue import start_job_workers, stop_job_workers
+from recyclic_api.core.settings_cache import (
+    start_settings_invalidation_listener,
+    stop_settings_invalidation_listener,
+)
 from recyclic_api.utils.rate_limit import limiter
 from recyclic_api.core.database import engine
 from recyclic_api.models import Base
@@ -39,11 +44,18 @@ async def lifespan(app: FastAPI):
     # Démarrer le scheduler de tâches planifiées (désactivé en test)
     scheduler = None
     sync_task = None
+    job_workers = None
+    settings_listener = None
     if not is_test_env:
         scheduler = get_scheduler_service()
         await scheduler.start()
         # Démarrer la synchronisation kDrive (si nécessaire)
         sync_task = schedule_periodic_kdrive_sync()
+        # Workers de la file de tâches de fond (rapports, e-mails, dépôts kDrive)
+        if not settings.JOB_QUEUE_EAGER:
+            job_workers = start_job_workers()
+        # Invalidation du cache des paramètres publiée par les autres processus
+        settings_listener = start_settings_invalidation_listener()
 
     logger.info("API ready - use migrations for database setup")
     
@@ -79,6 +91,12 @@ async def lifespan(app: FastAPI):
         if scheduler is not None:
             await scheduler.stop()
 
+        # Laisser les workers terminer le job en cours
+        if job_workers is not None:
+            await stop_job_workers(*job_workers)
+
+        stop_settings_invalidation_listener(settings_listener)
+
         # Annuler la tâche de sync kDrive
         if sync_task:
             sync_task.cancel()
@@ -134,6 +152,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # En-têtes de pagination de GET /sales et ETag des GET conditionnels lisibles par le frontend
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated", "ETag"],
 )
 
 # Add trusted host middleware
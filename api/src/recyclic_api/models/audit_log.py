@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index, cast
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
@@ -77,3 +77,18 @@ class AuditLog(Base):
 
     def __repr__(self):
         return f"<AuditLog(id={self.id}, action={self.action_type}, actor={self.actor_username}, timestamp={self.timestamp})>"
+
+
+# Recherche libre du journal (ILIKE '%terme%') : index trigrammes (extension pg_trgm)
+Index(
+    "ix_audit_logs_description_trgm",
+    AuditLog.description,
+    postgresql_using="gin",
+    postgresql_ops={"description": "gin_trgm_ops"},
+)
+Index(
+    "ix_audit_logs_details_trgm",
+    cast(AuditLog.details_json, Text).label("details_text"),
+    postgresql_using="gin",
+    postgresql_ops={"details_text": "gin_trgm_ops"},
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, ForeignKey, Enum as SAEnum
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, ForeignKey, Enum as SAEnum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
@@ -28,6 +28,17 @@ class CashSession(Base):
     avec un fond initial et un suivi des ventes.
     """
     __tablename__ = "cash_sessions"
+    __table_args__ = (
+        Index("ix_cash_sessions_operator_status_opened_at", "operator_id", "status", "opened_at"),
+        Index("ix_cash_sessions_site_id_opened_at", "site_id", "opened_at"),
+        Index("ix_cash_sessions_opened_at", "opened_at"),
+        # Session ouverte d'un poste de caisse (au plus une par registre)
+        Index(
+            "ix_cash_sessions_open_register",
+            "register_id",
+            postgresql_where=text("status = 'OPEN'"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
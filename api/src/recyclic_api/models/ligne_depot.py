@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Numeric, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Numeric, String, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy import Enum as SAEnum
 import enum
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
@@ -17,6 +17,10 @@ class Destination(str, enum.Enum):
 
 class LigneDepot(Base):
     __tablename__ = "ligne_depot"
+    __table_args__ = (
+        Index("ix_ligne_depot_ticket_id", "ticket_id"),
+        Index("ix_ligne_depot_category_id", "category_id"),
+    )
     __allow_unmapped__ = True
 
     id = Column(PGUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, ForeignKey, Enum as SQLEnum, DateTime
+from sqlalchemy import Column, Float, ForeignKey, Enum as SQLEnum, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -11,6 +11,9 @@ from recyclic_api.models.sale import PaymentMethod
 class PaymentTransaction(Base):
     """Modèle pour les transactions de paiement - Story B52-P1: Paiements multiples"""
     __tablename__ = "payment_transactions"
+    __table_args__ = (
+        Index("ix_payment_transactions_sale_id", "sale_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     sale_id = Column(UUID(as_uuid=True), ForeignKey("sales.id"), nullable=False)
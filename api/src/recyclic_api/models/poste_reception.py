@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import Column, DateTime, ForeignKey, String, Index
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -15,6 +15,9 @@ class PosteReceptionStatus(str, enum.Enum):
 
 class PosteReception(Base):
     __tablename__ = "poste_reception"
+    __table_args__ = (
+        Index("ix_poste_reception_opened_at", "opened_at"),
+    )
     __allow_unmapped__ = True
 
     id = Column(PGUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Enum as SQLEnum, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -19,6 +19,11 @@ class PaymentMethod(str, enum.Enum):
 class Sale(Base):
     """Modèle pour les ventes - étendu pour Story 1.1.1 avec traçage des boutons prédéfinis"""
     __tablename__ = "sales"
+    __table_args__ = (
+        Index("ix_sales_cash_session_id", "cash_session_id"),
+        Index("ix_sales_created_at", "created_at"),
+        Index("ix_sales_operator_id_created_at", "operator_id", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     cash_session_id = Column(UUID(as_uuid=True), ForeignKey("cash_sessions.id"), nullable=False)
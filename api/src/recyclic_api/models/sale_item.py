@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -9,6 +9,9 @@ from recyclic_api.core.database import Base
 class SaleItem(Base):
     """Modèle pour les articles d'une vente - étendu pour Story 1.1.2 avec preset par item"""
     __tablename__ = "sale_items"
+    __table_args__ = (
+        Index("ix_sale_items_sale_id", "sale_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     sale_id = Column(UUID(as_uuid=True), ForeignKey("sales.id"), nullable=False)
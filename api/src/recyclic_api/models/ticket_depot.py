@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import Column, DateTime, ForeignKey, String, Index
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -15,6 +15,11 @@ class TicketDepotStatus(str, enum.Enum):
 
 class TicketDepot(Base):
     __tablename__ = "ticket_depot"
+    __table_args__ = (
+        Index("ix_ticket_depot_poste_id", "poste_id"),
+        Index("ix_ticket_depot_created_at", "created_at"),
+        Index("ix_ticket_depot_closed_at", "closed_at"),
+    )
     __allow_unmapped__ = True
 
     id = Column(PGUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional
 from uuid import UUID
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from recyclic_api.models import PosteReception, TicketDepot, User, LigneDepot, Category
@@ -85,6 +86,27 @@ class LigneDepotRepository:
         self.db.delete(ligne)
         self.db.commit()
 
+    def bulk_insert(self, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """Insère des lignes par lots (INSERT multi-lignes) sans commit.
+
+        Les lignes doivent être déjà validées par l'appelant : aucune vérification
+        de ticket ou de catégorie n'est faite ici. Le commit (ou rollback) reste à
+        la charge de l'appelant, ce qui permet d'inclure l'insertion dans une
+        transaction plus large.
+        """
+        inserted = 0
+        batch: List[Dict[str, Any]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self.db.execute(insert(LigneDepot), batch)
+                inserted += len(batch)
+                batch = []
+        if batch:
+            self.db.execute(insert(LigneDepot), batch)
+            inserted += len(batch)
+        return inserted
+
 
 class CategoryRepository:
     def __init__(self, db: Session) -> None:
@@ -104,4 +126,16 @@ class CategoryRepository:
     def get_all_active(self) -> list[Category]:
         return self.db.query(Category).filter(Category.is_active.is_(True)).all()
 
+    def get_active_ids(self, category_ids: Iterable[UUID]) -> set[UUID]:
+        """Retourne, en une seule requête, le sous-ensemble des IDs correspondant à des catégories actives."""
+        ids = set(category_ids)
+        if not ids:
+            return set()
+        rows = (
+            self.db.query(Category.id)
+            .filter(Category.id.in_(ids), Category.is_active.is_(True))
+            .all()
+        )
+        return {row[0] for row in rows}
+
 
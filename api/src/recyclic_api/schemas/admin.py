@@ -157,6 +157,7 @@ class UserHistoryResponse(BaseModel):
     limit: int = Field(..., ge=1, le=100, description="Nombre d'éléments par page")
     has_next: bool = Field(..., description="Y a-t-il une page suivante")
     has_prev: bool = Field(..., description="Y a-t-il une page précédente")
+    next_cursor: Optional[str] = Field(None, description="Curseur à passer pour obtenir la page suivante (pagination par clé)")
     
     model_config = {"from_attributes": True}
     
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -103,6 +103,7 @@ class CashSessionResponse(CashSessionBase):
     
     report_download_url: Optional[str] = Field(None, description="URL de telechargement du rapport genere")
     report_email_sent: Optional[bool] = Field(None, description="Indique si l'envoi du rapport par email a reussi")
+    report_job_id: Optional[str] = Field(None, description="Identifiant de la tache de fond (rapport, email, kDrive) lancee a la fermeture")
     
     # Story B49-P1: Options de workflow du registre associé
     register_options: Optional[Dict[str, Any]] = Field(None, description="Options de workflow du poste de caisse associé")
@@ -137,6 +138,8 @@ class CashSessionListResponse(BaseModel):
     total: int = Field(..., description="Nombre total de sessions")
     skip: int = Field(..., description="Nombre de sessions ignorées")
     limit: int = Field(..., description="Limite de sessions par page")
+    next_cursor: Optional[str] = Field(None, description="Curseur à passer pour obtenir la page suivante (pagination par clé)")
+    total_estimated: bool = Field(False, description="Total estimé par le planificateur (count_mode=estimated)")
 
 
 class CashSessionFilters(BaseModel):
@@ -162,6 +165,9 @@ class CashSessionFilters(BaseModel):
     duration_max_hours: Optional[float] = Field(None, ge=0, description="Durée maximum de session (en heures)")
     payment_methods: Optional[List[str]] = Field(None, description="Méthodes de paiement (multi-sélection)")
     has_donation: Optional[bool] = Field(None, description="Filtrer par présence de don (true=avec don, false=sans don)")
+    # Pagination par clé (opened_at, id) et mode de comptage du total
+    cursor: Optional[str] = Field(None, description="Curseur next_cursor de la page précédente (remplace skip)")
+    count_mode: Literal["exact", "estimated"] = Field("exact", description="Total exact (COUNT) ou estimé (plan PostgreSQL)")
 
 
 class CashSessionStats(BaseModel):
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from recyclic_api.services.job_queue import JobStatus
+
+
+class JobResponse(BaseModel):
+    """Etat d'une tache de fond."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str = Field(..., description="Identifiant de la tache")
+    type: str = Field(..., description="Type de tache")
+    status: JobStatus = Field(..., description="Statut courant")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Parametres de la tache")
+    attempts: int = Field(..., description="Nombre de tentatives effectuees")
+    max_attempts: int = Field(..., description="Nombre maximal de tentatives")
+    created_at: datetime = Field(..., description="Date de mise en file")
+    started_at: Optional[datetime] = Field(None, description="Debut de la derniere tentative")
+    finished_at: Optional[datetime] = Field(None, description="Fin de la derniere tentative")
+    wait_seconds: Optional[float] = Field(None, description="Attente en file avant la derniere tentative")
+    duration_seconds: Optional[float] = Field(None, description="Duree de la derniere tentative")
+    last_error: Optional[str] = Field(None, description="Derniere erreur rencontree")
+    result: Dict[str, Any] = Field(default_factory=dict, description="Resultat (etapes realisees)")
+
+
+class JobQueueDepth(BaseModel):
+    """Profondeur de la file de taches."""
+
+    queued: int = Field(..., description="Taches pretes a etre executees")
+    delayed: int = Field(..., description="Nouvelles tentatives programmees")
+    processing: int = Field(..., description="Taches en cours d'execution")
+
+
+class JobListResponse(BaseModel):
+    """Taches recentes et profondeur de la file."""
+
+    jobs: List[JobResponse] = Field(..., description="Taches les plus recentes")
+    depth: JobQueueDepth = Field(..., description="Profondeur de la file")
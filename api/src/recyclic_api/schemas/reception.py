@@ -128,6 +128,8 @@ class TicketListResponse(BaseModel):
     page: int = Field(..., description="Page actuelle")
     per_page: int = Field(..., description="Nombre d'éléments par page")
     total_pages: int = Field(..., description="Nombre total de pages")
+    next_cursor: Optional[str] = Field(None, description="Curseur à passer pour obtenir la page suivante (pagination par clé)")
+    total_estimated: bool = Field(False, description="Total estimé par le planificateur (count_mode=estimated)")
 
 
 # Schémas pour les rapports de réception
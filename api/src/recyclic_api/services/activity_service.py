@@ -1,16 +1,15 @@
 import logging
 import time
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from recyclic_api.core.redis import get_redis
-from recyclic_api.models.setting import Setting
+from recyclic_api.core.settings_cache import ACTIVITY_THRESHOLD_MINUTES, get_setting, invalidate_settings
 
 logger = logging.getLogger(__name__)
 
-DEFAULT_ACTIVITY_THRESHOLD_MINUTES = 15
-_SETTINGS_CACHE_TTL_SECONDS = 60
+DEFAULT_ACTIVITY_THRESHOLD_MINUTES = ACTIVITY_THRESHOLD_MINUTES.default
 
 
 class ActivityService:
@@ -19,57 +18,20 @@ class ActivityService:
     KEY_PREFIX = "last_activity"
     META_PREFIX = "last_activity_meta"
     LOGOUT_PREFIX = "last_logout"
-
-    _cached_threshold_minutes = DEFAULT_ACTIVITY_THRESHOLD_MINUTES
-    _cache_expiration_timestamp = 0.0
+    BULK_CHUNK_SIZE = 500  # Utilisateurs par MGET (2 clés chacun)
 
     def __init__(self, db: Optional[Session] = None):
         self.db = db
         self.redis = get_redis()
 
-    @classmethod
-    def _cache_is_valid(cls) -> bool:
-        return cls._cache_expiration_timestamp > time.time()
-
-    @classmethod
-    def _update_cache(cls, value: int) -> None:
-        cls._cached_threshold_minutes = value
-        cls._cache_expiration_timestamp = time.time() + _SETTINGS_CACHE_TTL_SECONDS
-
     @classmethod
     def refresh_cache(cls, value: int) -> None:
-        """Met à jour explicitement le cache du seuil d'activité."""
-        cls._update_cache(value)
+        """Invalide le seuil d'activité en cache (tous processus) après sa modification."""
+        invalidate_settings(ACTIVITY_THRESHOLD_MINUTES.key)
 
     def get_activity_threshold_minutes(self) -> int:
-        """Récupère le seuil d'activité (en minutes), avec un cache léger."""
-        cls = type(self)
-        if cls._cache_is_valid():
-            return cls._cached_threshold_minutes
-
-        threshold_minutes = DEFAULT_ACTIVITY_THRESHOLD_MINUTES
-        if self.db is not None:
-            try:
-                setting = (
-                    self.db.query(Setting)
-                    .filter(Setting.key == "activity_threshold_minutes")
-                    .first()
-                )
-                if setting is not None:
-                    candidate = int(str(setting.value))
-                    if candidate > 0:
-                        threshold_minutes = candidate
-            except (ValueError, TypeError):
-                logger.warning(
-                    "Valeur invalide pour activity_threshold_minutes, utilisation de la valeur par défaut."
-                )
-            except Exception as exc:
-                logger.error(
-                    "Erreur lors de la récupération du seuil d'activité : %s", exc
-                )
-
-        cls._update_cache(threshold_minutes)
-        return threshold_minutes
+        """Récupère le seuil d'activité (en minutes) depuis le cache des paramètres."""
+        return get_setting(ACTIVITY_THRESHOLD_MINUTES, self.db)
 
     def _activity_key(self, user_id: str) -> str:
         return f"{self.KEY_PREFIX}:{user_id}"
@@ -209,3 +171,66 @@ class ActivityService:
                 exc,
             )
             return None
+
+    def get_presence_bulk(
+        self, user_ids: Iterable[str]
+    ) -> Dict[str, Tuple[Optional[float], Optional[int]]]:
+        """
+        Retourne pour chaque utilisateur (minutes depuis la dernière activité,
+        timestamp de la dernière déconnexion).
+
+        Équivalent groupé de `get_minutes_since_activity` + `get_last_logout_timestamp` :
+        les clés `last_activity:*` et `last_logout:*` sont lues par MGET, soit un
+        aller-retour Redis par tranche de `BULK_CHUNK_SIZE` utilisateurs au lieu
+        de deux par utilisateur.
+        """
+        ids: List[str] = [user_id for user_id in user_ids if user_id]
+        presence: Dict[str, Tuple[Optional[float], Optional[int]]] = {
+            user_id: (None, None) for user_id in ids
+        }
+        if not ids:
+            return presence
+
+        now = time.time()
+        invalid_keys: List[str] = []
+        for start in range(0, len(ids), self.BULK_CHUNK_SIZE):
+            chunk = ids[start:start + self.BULK_CHUNK_SIZE]
+            activity_keys = [self._activity_key(user_id) for user_id in chunk]
+            logout_keys = [self._logout_key(user_id) for user_id in chunk]
+            try:
+                values = self.redis.mget(activity_keys + logout_keys)
+            except Exception as exc:
+                logger.warning("Impossible de récupérer l'activité groupée : %s", exc)
+                continue
+
+            for index, user_id in enumerate(chunk):
+                activity_value = values[index]
+                logout_value = values[len(chunk) + index]
+
+                minutes_since_activity = None
+                if activity_value is not None:
+                    try:
+                        minutes_since_activity = (now - int(activity_value)) / 60
+                    except (TypeError, ValueError):
+                        invalid_keys.extend([activity_keys[index], self._meta_key(user_id)])
+
+                logout_timestamp = None
+                if logout_value is not None:
+                    try:
+                        logout_timestamp = int(logout_value)
+                    except (TypeError, ValueError):
+                        invalid_keys.append(logout_keys[index])
+
+                presence[user_id] = (minutes_since_activity, logout_timestamp)
+
+        if invalid_keys:
+            logger.debug(
+                "Valeurs d'activité invalides détectées, suppression de %s clé(s).",
+                len(invalid_keys),
+            )
+            try:
+                self.redis.delete(*invalid_keys)
+            except Exception as exc:
+                logger.warning("Impossible de supprimer les clés d'activité invalides : %s", exc)
+
+        return presence
@@ -0,0 +1,117 @@
+"""
+Recherche dans le journal d'audit.
+
+La recherche libre porte sur `description` et sur le JSON des détails mis à
+plat en texte ; ces deux expressions sont couvertes par des index GIN trigrammes
+(pg_trgm), qui servent les `ILIKE '%terme%'` sans parcourir toute la table.
+
+Le total peut être exact (`COUNT(*)`) ou estimé à partir du plan d'exécution
+PostgreSQL, ce qui évite de compter des centaines de milliers de lignes à
+chaque frappe dans le champ de recherche.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Text, and_, cast, desc, or_
+from sqlalchemy.orm import Query, Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.models.audit_log import AuditLog
+from recyclic_api.utils.pagination import COUNT_AUTO, count_rows, estimate_row_count
+
+
+def audit_details_text():
+    """Détails JSON mis à plat en texte (expression de l'index ix_audit_logs_details_trgm)."""
+    return cast(AuditLog.details_json, Text)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@dataclass
+class AuditLogFilters:
+    action_type: Optional[str] = None
+    actor_username: Optional[str] = None
+    target_type: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    search: Optional[str] = None
+
+
+class AuditLogService:
+    """Filtrage, recherche et comptage des entrées du journal d'audit."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def build_query(self, filters: AuditLogFilters) -> Query:
+        query = self.db.query(AuditLog)
+        conditions = []
+
+        if filters.action_type:
+            conditions.append(AuditLog.action_type == filters.action_type)
+        if filters.actor_username:
+            conditions.append(AuditLog.actor_username.ilike(f"%{_escape_like(filters.actor_username)}%", escape="\\"))
+        if filters.target_type:
+            conditions.append(AuditLog.target_type == filters.target_type)
+        if filters.start_date:
+            conditions.append(AuditLog.timestamp >= filters.start_date)
+        if filters.end_date:
+            conditions.append(AuditLog.timestamp <= filters.end_date)
+
+        search = (filters.search or "").strip()
+        if search:
+            pattern = f"%{_escape_like(search)}%"
+            conditions.append(
+                or_(
+                    AuditLog.description.ilike(pattern, escape="\\"),
+                    audit_details_text().ilike(pattern, escape="\\"),
+                )
+            )
+
+        if conditions:
+            query = query.filter(and_(*conditions))
+        return query
+
+    def search(
+        self,
+        filters: AuditLogFilters,
+        page: int,
+        page_size: int,
+        count_mode: str = COUNT_AUTO,
+    ) -> Tuple[List[AuditLog], int, bool]:
+        """
+        Page d'entrées (plus récentes d'abord) et total.
+
+        Retourne (entrées, total, total_estimé).
+        """
+        query = self.build_query(filters)
+        entries = (
+            query.order_by(desc(AuditLog.timestamp))
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+            .all()
+        )
+        total, estimated = self.count(query, count_mode)
+        # Une estimation ne doit pas annoncer moins d'entrées que celles déjà affichées
+        if estimated:
+            total = max(total, (page - 1) * page_size + len(entries))
+        return entries, total, estimated
+
+    def count(self, query: Query, count_mode: str = COUNT_AUTO) -> Tuple[int, bool]:
+        """
+        Total des entrées correspondant à la requête, et s'il est estimé.
+
+        En mode `auto`, le total est estimé au-delà de
+        AUDIT_LOG_EXACT_COUNT_THRESHOLD lignes prévues par le planificateur.
+        """
+        return count_rows(self.db, query, count_mode, settings.AUDIT_LOG_EXACT_COUNT_THRESHOLD)
+
+    def estimate_count(self, query: Query) -> Optional[int]:
+        """Nombre de lignes prévu par EXPLAIN (PostgreSQL uniquement)."""
+        return estimate_row_count(self.db, query)
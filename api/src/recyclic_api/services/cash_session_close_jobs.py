@@ -0,0 +1,106 @@
+"""
+Effets de bord de la fermeture d'une session de caisse, exécutés par la file de tâches.
+
+Chaque étape enregistre son résultat sur le job : une nouvelle tentative reprend
+à la première étape non réalisée (pas de second rapport ni de second e-mail).
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.email_service import EmailAttachment, get_email_service
+from recyclic_api.models.cash_session import CashSession
+from recyclic_api.services.export_service import generate_cash_session_report
+from recyclic_api.services.job_queue import Job, job_handler
+from recyclic_api.services.sync_service import KDriveSyncService
+from recyclic_api.utils.report_tokens import generate_download_token
+
+logger = logging.getLogger(__name__)
+
+CASH_SESSION_CLOSE_JOB = "cash_session_close"
+
+
+def _operator_label(cash_session: CashSession) -> str:
+    if cash_session.operator:
+        return (
+            cash_session.operator.username
+            or getattr(cash_session.operator, 'telegram_id', None)
+            or str(cash_session.operator_id)
+        )
+    return str(cash_session.operator_id)
+
+
+def _final_amount(cash_session: CashSession) -> float:
+    if cash_session.actual_amount is not None:
+        return cash_session.actual_amount
+    if cash_session.closing_amount is not None:
+        return cash_session.closing_amount
+    return cash_session.initial_amount or 0.0
+
+
+def _send_report_email(db: Session, cash_session: CashSession, report_path: Path, download_url: str, recipient: str) -> bool:
+    with report_path.open('rb') as report_file:
+        attachment = EmailAttachment(
+            filename=report_path.name,
+            content=report_file.read(),
+            mime_type='text/csv',
+        )
+
+    html_rows = [
+        '<p>Bonjour,</p>',
+        f'<p>Veuillez trouver en pièce jointe le rapport CSV de la session de caisse {cash_session.id}.</p>',
+        f'<p>Opérateur : {_operator_label(cash_session)}</p>',
+        f"<p>Montant final déclaré : {_final_amount(cash_session):.2f} €</p>",
+        f'<p>Vous pouvez également le télécharger via {download_url} (valide pendant {settings.CASH_SESSION_REPORT_TOKEN_TTL_SECONDS // 60} minutes).</p>',
+        '<p>- Recyclic</p>',
+    ]
+
+    return get_email_service().send_email(
+        to_email=recipient,
+        subject=f"Rapport de session de caisse {cash_session.id}",
+        html_content=''.join(html_rows),
+        db_session=db,
+        attachments=[attachment],
+    )
+
+
+@job_handler(CASH_SESSION_CLOSE_JOB)
+def run_cash_session_close_job(db: Session, job: Job) -> Dict[str, Any]:
+    """Rapport CSV, envoi par e-mail puis dépôt kDrive d'une session fermée."""
+    result = job.result
+    cash_session = db.query(CashSession).filter(CashSession.id == job.payload['session_id']).first()
+    if cash_session is None:
+        raise LookupError(f"Cash session {job.payload['session_id']} not found")
+
+    report_path = Path(settings.CASH_SESSION_REPORT_DIR) / result['report_filename'] if result.get('report_filename') else None
+    if report_path is None or not report_path.exists():
+        report_path = generate_cash_session_report(db, cash_session)
+        download_token = generate_download_token(report_path.name)
+        result['report_filename'] = report_path.name
+        result['report_path'] = str(report_path)
+        result['report_download_url'] = (
+            f"{settings.API_V1_STR}/admin/reports/cash-sessions/{report_path.name}?token={download_token}"
+        )
+
+    if 'email_sent' not in result:
+        recipient = settings.CASH_SESSION_REPORT_RECIPIENT
+        if not recipient:
+            logger.warning("CASH_SESSION_REPORT_RECIPIENT is not configured; skipping report email dispatch")
+            result['email_sent'] = False
+        else:
+            sent = _send_report_email(db, cash_session, Path(result['report_path']), result['report_download_url'], recipient)
+            if not sent:
+                # Laisser la file retenter l'envoi (le rapport déjà généré est réutilisé)
+                raise RuntimeError(f"Report email for cash session {cash_session.id} was not accepted")
+            result['email_sent'] = True
+
+    if settings.KDRIVE_SYNC_ENABLED and not result.get('kdrive_path'):
+        remote_path = f"{settings.KDRIVE_REMOTE_BASE_PATH.rstrip('/')}/cash_sessions/{result['report_filename']}"
+        result['kdrive_path'] = KDriveSyncService().upload_file_to_kdrive(result['report_path'], remote_path)
+
+    return result
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func, cast, String
-from typing import List, Optional, Tuple, Dict, Any
+from sqlalchemy import and_, or_, desc, func, cast, String, update, select
+from typing import List, Optional, Set, Tuple, Dict, Any
 from datetime import datetime, timedelta, timezone
 import json
 
@@ -14,6 +14,7 @@ from recyclic_api.models.sale_item import SaleItem
 from recyclic_api.models.ligne_depot import LigneDepot
 from recyclic_api.models.ticket_depot import TicketDepot
 from recyclic_api.schemas.cash_session import CashSessionFilters
+from recyclic_api.utils.pagination import KeysetPage, count_rows, fetch_keyset_page
 from recyclic_api.core.logging import log_transaction_event
 
 
@@ -293,6 +294,27 @@ class CashSessionService:
             .first()
         )
     
+    def get_open_register_ids(self, register_ids: List[UUID]) -> Set[UUID]:
+        """Postes de caisse (parmi `register_ids`) ayant une session ouverte, en une requête.
+
+        Même règle que get_open_session_by_register() : sessions OPEN ouvertes
+        depuis moins de 90 jours (les sessions différées sont exclues).
+        """
+        if not register_ids:
+            return set()
+        threshold = datetime.now(timezone.utc) - timedelta(days=90)
+        rows = (
+            self.db.query(CashSession.register_id)
+            .filter(
+                CashSession.register_id.in_(register_ids),
+                CashSession.status == CashSessionStatus.OPEN,
+                CashSession.opened_at >= threshold,
+            )
+            .distinct()
+            .all()
+        )
+        return {row.register_id for row in rows}
+
     def get_deferred_session_by_operator(self, operator_id: str) -> Optional[CashSession]:
         """Récupère la session différée ouverte d'un opérateur.
         
@@ -381,6 +403,35 @@ class CashSessionService:
     
     def get_sessions_with_filters(self, filters: CashSessionFilters) -> Tuple[List[CashSession], int]:
         """Récupère les sessions avec filtres et pagination."""
+        page = self.get_sessions_page(filters)
+        return page.items, page.total
+
+    def get_sessions_page(self, filters: CashSessionFilters) -> KeysetPage[CashSession]:
+        """
+        Page de sessions triées par (opened_at, id) décroissants.
+
+        Avec `filters.cursor`, la page est lue par clé (coût constant en profondeur) ;
+        sinon par `skip`. Le total est exact ou estimé selon `filters.count_mode`.
+        """
+        query = self.build_sessions_query(filters)
+
+        sessions, next_cursor = fetch_keyset_page(
+            query,
+            CashSession.opened_at,
+            CashSession.id,
+            filters.limit,
+            cursor=filters.cursor,
+            offset=filters.skip,
+        )
+        total, estimated = count_rows(self.db, query, filters.count_mode)
+        if estimated:
+            total = max(total, len(sessions))
+        self.enrich_sessions_aggregates(sessions)
+
+        return KeysetPage(sessions, total, next_cursor, estimated)
+
+    def build_sessions_query(self, filters: CashSessionFilters):
+        """Construit la requête filtrée des sessions (sans ordre ni pagination)."""
         query = self.db.query(CashSession)
 
         # Appliquer les filtres
@@ -548,15 +599,14 @@ class CashSessionService:
                 )
                 query = query.filter(~subquery)
 
-        # Compter le total avant la pagination
-        total = query.count()
+        return query
 
-        # Appliquer la pagination et l'ordre
-        sessions = query.order_by(desc(CashSession.opened_at)).offset(filters.skip).limit(filters.limit).all()
+    def enrich_sessions_aggregates(self, sessions: List[CashSession]) -> None:
+        """Renseigne number_of_sales et total_donations sur un lot de sessions."""
         session_ids = [s.id for s in sessions]
 
         if not session_ids:
-            return [], total
+            return
 
         # --- Optimisation N+1 ---
         # 1. Calculer le nombre de ventes par session en une seule requête
@@ -593,8 +643,6 @@ class CashSessionService:
         for session in sessions:
             session.number_of_sales = sales_map.get(str(session.id), 0)
             session.total_donations = float(donations_map.get(str(session.id), 0.0))
-
-        return sessions, total
     
     def update_session(self, session_id: str, update_data: Dict[str, Any]) -> Optional[CashSession]:
         """Met à jour une session de caisse."""
@@ -716,6 +764,89 @@ class CashSessionService:
         
         return session
     
+    def increment_session_totals(self, session_id, amount: float, sales_count: int = 1) -> None:
+        """Met à jour les compteurs de la session de manière incrémentale, sans commit.
+
+        Un seul UPDATE atomique (total_sales = total_sales + :amount) remplace la
+        ré-agrégation de toutes les ventes de la session : le coût ne dépend plus
+        du nombre de tickets, et l'appelant inclut la mise à jour dans la même
+        transaction que la vente.
+        """
+        current_total = func.coalesce(CashSession.total_sales, 0.0)
+        self.db.execute(
+            update(CashSession)
+            .where(CashSession.id == session_id)
+            .values(
+                total_sales=current_total + amount,
+                total_items=func.coalesce(CashSession.total_items, 0) + sales_count,
+                current_amount=CashSession.initial_amount + current_total + amount,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def reconcile_session_totals(
+        self,
+        session_id: Optional[str] = None,
+        opened_since: Optional[datetime] = None,
+    ) -> List[UUID]:
+        """Recalcule depuis zéro les compteurs des sessions et corrige les écarts.
+
+        Job de réparation des compteurs incrémentaux (total_sales, total_items,
+        current_amount) : seules les sessions dont les compteurs divergent de
+        l'agrégat réel des ventes sont mises à jour.
+
+        Args:
+            session_id: Limiter à une session (optionnel)
+            opened_since: Limiter aux sessions ouvertes depuis cette date (optionnel)
+
+        Returns:
+            Liste des IDs des sessions corrigées
+        """
+        sales_totals = (
+            select(
+                Sale.cash_session_id.label("session_id"),
+                func.coalesce(func.sum(Sale.total_amount), 0.0).label("total_sales"),
+                func.count(Sale.id).label("total_items"),
+            )
+            .group_by(Sale.cash_session_id)
+            .subquery()
+        )
+        expected_sales = func.coalesce(sales_totals.c.total_sales, 0.0)
+        expected_items = func.coalesce(sales_totals.c.total_items, 0)
+
+        query = (
+            self.db.query(CashSession.id, CashSession.initial_amount, expected_sales, expected_items)
+            .outerjoin(sales_totals, sales_totals.c.session_id == CashSession.id)
+            .filter(
+                or_(
+                    func.abs(func.coalesce(CashSession.total_sales, 0.0) - expected_sales) > 0.005,
+                    func.coalesce(CashSession.total_items, 0) != expected_items,
+                )
+            )
+        )
+        if session_id is not None:
+            query = query.filter(CashSession.id == session_id)
+        if opened_since is not None:
+            query = query.filter(CashSession.opened_at >= opened_since)
+
+        repaired: List[UUID] = []
+        for drifted_id, initial_amount, total_sales, total_items in query.all():
+            self.db.execute(
+                update(CashSession)
+                .where(CashSession.id == drifted_id)
+                .values(
+                    total_sales=float(total_sales),
+                    total_items=int(total_items),
+                    current_amount=(initial_amount or 0.0) + float(total_sales),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            repaired.append(drifted_id)
+
+        if repaired:
+            self.db.commit()
+        return repaired
+
     def add_sale_to_session(self, session_id: str, amount: float) -> bool:
         """Ajoute une vente à une session."""
         session = self.get_session_by_id(session_id)
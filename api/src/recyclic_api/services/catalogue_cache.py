@@ -0,0 +1,112 @@
+"""
+Réponses du catalogue (catégories et boutons prédéfinis) pré-sérialisées.
+
+Chaque poste de caisse et de réception relit le catalogue à l'ouverture et à
+chaque nouveau ticket. Le corps JSON de ces listes est conservé en mémoire,
+déjà sérialisé et accompagné de son ETag fort, et associé à un numéro de
+version stocké dans Redis (CATALOGUE_VERSION_KEY).
+
+Toute écriture sur les catégories (via `invalidate_category_tree`) ou sur les
+boutons prédéfinis appelle `invalidate_catalogue` après son commit, ce qui
+incrémente la version : chaque processus reconstruit ses réponses à la
+prochaine lecture. Le TTL (CATALOGUE_CACHE_TTL_SECONDS) borne la durée d'une
+réponse périmée après une écriture hors application ; sans Redis, la réponse
+est reconstruite à chaque lecture (l'ETag permet toujours de répondre 304).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.utils.http_cache import render_json, strong_etag
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_VERSION_KEY = "catalogue_version"
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """Corps JSON sérialisé, son ETag fort et la version du catalogue dont il est issu."""
+
+    body: bytes
+    etag: str
+    version: Optional[str] = None
+
+
+class CatalogueResponseCache:
+    """Corps JSON du processus, indexés par endpoint et paramètres, invalidés par la version Redis."""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[CachedBody, float]] = {}
+        self._lock = threading.Lock()
+
+    def _remote_version(self) -> Optional[str]:
+        try:
+            version = get_redis().get(CATALOGUE_VERSION_KEY)
+        except Exception as exc:
+            logger.debug("Cache du catalogue désactivé, Redis indisponible : %s", exc)
+            return None
+        return str(version) if version is not None else "0"
+
+    def _lookup(self, key: Hashable) -> Tuple[Optional[CachedBody], Optional[str]]:
+        """Entrée valide pour `key` et version courante (None : pas de mise en cache)."""
+        if settings.CATALOGUE_CACHE_TTL_SECONDS <= 0:
+            return None, None
+        version = self._remote_version()
+        if version is None:
+            return None, None
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            cached, expires_at = entry
+            if cached.version == version and expires_at > time.monotonic():
+                return cached, version
+        return None, version
+
+    def _store(self, key: Hashable, payload: Any, version: Optional[str]) -> CachedBody:
+        body = render_json(payload)
+        cached = CachedBody(body=body, etag=strong_etag(body), version=version)
+        if version is not None:
+            with self._lock:
+                self._entries[key] = (cached, time.monotonic() + settings.CATALOGUE_CACHE_TTL_SECONDS)
+        return cached
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> CachedBody:
+        """Corps en cache pour `key`, ou construit par `build` puis sérialisé."""
+        cached, version = self._lookup(key)
+        if cached is not None:
+            return cached
+        return self._store(key, build(), version)
+
+    async def aget(self, key: Hashable, build: Callable[[], Awaitable[Any]]) -> CachedBody:
+        """Variante de `get` pour un constructeur asynchrone (méthodes de service async)."""
+        cached, version = self._lookup(key)
+        if cached is not None:
+            return cached
+        return self._store(key, await build(), version)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+catalogue_cache = CatalogueResponseCache()
+
+
+def invalidate_catalogue() -> None:
+    """
+    Vide les réponses locales et incrémente la version partagée. À appeler après
+    le commit de toute écriture sur les catégories ou les boutons prédéfinis.
+    """
+    catalogue_cache.clear()
+    try:
+        get_redis().incr(CATALOGUE_VERSION_KEY)
+    except Exception as exc:
+        logger.warning("Impossible d'invalider le catalogue partagé : %s", exc)
@@ -17,8 +17,8 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 
-from ..models.category import Category
 from ..schemas.category import CategoryRead
+from .category_tree import CategoryNode, CategoryTree, get_category_tree
 
 
 class CategoryExportService:
@@ -26,26 +26,18 @@ class CategoryExportService:
 
     def __init__(self, db: Session):
         self.db = db
+        self._tree: Optional[CategoryTree] = None
 
-    def _get_all_categories_hierarchy(self) -> List[Tuple[Category, int]]:
-        """Get all categories ordered hierarchically (root first, then children)"""
-        # Get all active categories
-        categories = self.db.query(Category).filter(Category.is_active == True).order_by(Category.name).all()
+    @property
+    def tree(self) -> CategoryTree:
+        """Category tree snapshot (parent/root lookups by id)"""
+        if self._tree is None:
+            self._tree = get_category_tree(self.db)
+        return self._tree
 
-        # Build hierarchy: root categories first, then their children recursively
-        hierarchy = []
-        root_categories = [cat for cat in categories if cat.parent_id is None]
-
-        def add_category_and_children(category: Category, level: int = 0):
-            hierarchy.append((category, level))
-            children = [cat for cat in categories if cat.parent_id == category.id]
-            for child in sorted(children, key=lambda x: x.name):
-                add_category_and_children(child, level + 1)
-
-        for root in sorted(root_categories, key=lambda x: x.name):
-            add_category_and_children(root)
-
-        return hierarchy
+    def _get_all_categories_hierarchy(self) -> List[Tuple[CategoryNode, int]]:
+        """Get all active categories ordered hierarchically (root first, then children by name)"""
+        return self.tree.walk(include=lambda cat: cat.is_active)
 
     def _format_price(self, price: Optional[Decimal]) -> str:
         """Format price for display"""
@@ -120,6 +112,10 @@ class CategoryExportService:
         else:
             # Process categories grouped by root category
             root_categories = [cat for cat, level in hierarchy if level == 0]
+            descendants = {root.id: [] for root in root_categories}
+            for cat, level in hierarchy:
+                if level > 0:
+                    descendants[self.tree.root(cat.id).id].append(cat)
 
             for root_idx, root_cat in enumerate(root_categories):
                 # Build a group block (title + spacer + table) and keep it together across pages
@@ -153,13 +149,12 @@ class CategoryExportService:
                     ])
 
                 # Add children
-                for cat, level in hierarchy:
-                    if level > 0 and self._is_descendant_of(cat, root_cat.id, hierarchy):
-                        group_data.append([
-                            Paragraph(cat.name, styles['Normal']),
-                            Paragraph(self._format_price(cat.price), styles['Normal']),
-                            Paragraph(self._format_price(cat.max_price), styles['Normal'])
-                        ])
+                for cat in descendants[root_cat.id]:
+                    group_data.append([
+                        Paragraph(cat.name, styles['Normal']),
+                        Paragraph(self._format_price(cat.price), styles['Normal']),
+                        Paragraph(self._format_price(cat.max_price), styles['Normal'])
+                    ])
 
                 # Create table for this group
                 col_widths = [10*cm, 3*cm, 3*cm]
@@ -216,19 +211,6 @@ class CategoryExportService:
         buffer.seek(0)
         return buffer
 
-    def _is_descendant_of(self, cat: Category, root_id: str, hierarchy: List[Tuple[Category, int]]) -> bool:
-        """Check if a category is a descendant of the given root category"""
-        current = cat
-        while current.parent_id is not None:
-            if current.parent_id == root_id:
-                return True
-            # Find parent in hierarchy
-            parent = next((c for c, _ in hierarchy if c.id == current.parent_id), None)
-            if parent is None:
-                break
-            current = parent
-        return False
-
     def export_to_excel(self) -> BytesIO:
         """
         Generate an Excel export of all categories.
@@ -258,20 +240,9 @@ class CategoryExportService:
         # Get categories hierarchy
         hierarchy = self._get_all_categories_hierarchy()
 
-        # Build a map to find root category for each category
-        def get_root_category(cat: Category) -> Category:
-            """Get the root category for any category"""
-            current = cat
-            while current.parent_id is not None:
-                parent = next((c for c, _ in hierarchy if c.id == current.parent_id), None)
-                if parent is None:
-                    break
-                current = parent
-            return current
-
         # Data rows
         for cat, level in hierarchy:
-            root_cat = get_root_category(cat)
+            root_cat = self.tree.root(cat.id)
 
             # For root categories, show their name in first column and empty second column
             # For children, show root name in first column and child name in second column
@@ -327,19 +298,6 @@ class CategoryExportService:
         """
         hierarchy = self._get_all_categories_hierarchy()
 
-        # Build a quick map from category to level
-        level_map = {cat.id: level for cat, level in hierarchy}
-
-        # Helper to find root for any category
-        def get_root(cat: Category) -> Category:
-            current = cat
-            while current.parent_id is not None:
-                parent = next((c for c, _ in hierarchy if c.id == current.parent_id), None)
-                if parent is None:
-                    break
-                current = parent
-            return current
-
         buf = io.StringIO()
         writer = csv.writer(buf)
         writer.writerow(["Catégorie racine", "Sous-catégorie", "Prix minimum (€)", "Prix maximum (€)"])
@@ -355,7 +313,7 @@ class CategoryExportService:
                 ])
             # First-level children only to respect import contract
             elif level == 1:
-                root = get_root(cat)
+                root = self.tree.root(cat.id)
                 writer.writerow([
                     root.name,
                     cat.name,
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from recyclic_api.core.redis import get_redis
 from recyclic_api.models.category import Category
+from recyclic_api.services.category_tree import invalidate_category_tree
 
 
 class CategoryImportService:
@@ -276,6 +277,9 @@ class CategoryImportService:
             self.db.rollback()
             errors.append(f"Erreur d'exécution: {exc}")
 
+        # Des commits intermédiaires ont pu avoir lieu même en cas d'erreur
+        invalidate_category_tree()
+
         # Nettoyage session
         self.redis.delete(key)
 
@@ -9,6 +9,7 @@ from fastapi import HTTPException
 from ..models.category import Category
 from ..schemas.category import CategoryRead
 from .category_service import CategoryService
+from .category_tree import invalidate_category_tree
 
 
 class CategoryManagementService:
@@ -105,6 +106,7 @@ class CategoryManagementService:
         # Update visibility
         category.is_visible = is_visible
         self.db.commit()
+        invalidate_category_tree()
         self.db.refresh(category)
         
         return CategoryRead.model_validate(category)
@@ -140,6 +142,7 @@ class CategoryManagementService:
         # Update display order
         category.display_order = display_order
         self.db.commit()
+        invalidate_category_tree()
         self.db.refresh(category)
 
         return CategoryRead.model_validate(category)
@@ -175,6 +178,7 @@ class CategoryManagementService:
         # Story B48-P4: Update display order for ENTRY/DEPOT tickets
         category.display_order_entry = display_order_entry
         self.db.commit()
+        invalidate_category_tree()
         self.db.refresh(category)
 
         return CategoryRead.model_validate(category)
@@ -231,12 +235,13 @@ class CategoryManagementService:
         result_ids = set(visible_ids)
         
         # Add parents of visible categories
+        categories_by_id = {c.id: c for c in all_categories}
         for cat in visible_categories:
             parent_id = cat.parent_id
             while parent_id:
                 if parent_id not in result_ids:
                     # Find parent category
-                    parent_cat = next((c for c in all_categories if c.id == parent_id), None)
+                    parent_cat = categories_by_id.get(parent_id)
                     if parent_cat:
                         result_ids.add(parent_id)
                         parent_id = parent_cat.parent_id
@@ -0,0 +1,110 @@
+"""
+Index de matching flou des catégories (import legacy).
+
+Les noms normalisés du catalogue et les index nom → catégorie / id → catégorie
+sont calculés une seule fois. `match_many` score toute une liste de libellés
+contre le catalogue en un appel vectorisé (`rapidfuzz.process.cdist` si numpy
+est disponible, sinon `process.extractOne` par libellé, tous deux en C).
+
+Le score est le ratio de Levenshtein (distance InDel normalisée) en
+pourcentage, identique à `Levenshtein.ratio` (python-Levenshtein).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from rapidfuzz import fuzz, process
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def normalize_category_name(name: str) -> str:
+    """Normalise un nom pour le matching (lowercase, strip)."""
+    return name.strip().lower()
+
+
+class CategoryMatcher:
+    """Catalogue de catégories prêt pour le matching flou et les résolutions par nom ou id."""
+
+    def __init__(self, categories: Iterable[Dict[str, Any]]) -> None:
+        self.categories: List[Dict[str, Any]] = list(categories)
+        self._normalized_names = [
+            cat.get("normalized_name") or normalize_category_name(cat["name"]) for cat in self.categories
+        ]
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._by_normalized: Dict[str, int] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        for index, cat in enumerate(self.categories):
+            self._by_name.setdefault(cat["name"], cat)
+            self._by_normalized.setdefault(self._normalized_names[index], index)
+            self._by_id.setdefault(str(cat["id"]).lower(), cat)
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def get_by_name(self, name: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Catégorie portant exactement ce nom (cible proposée par le LLM)."""
+        if not name:
+            return None
+        return self._by_name.get(name)
+
+    def get_by_id(self, category_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not category_id:
+            return None
+        return self._by_id.get(str(category_id).lower())
+
+    def match(self, label: str, confidence_threshold: float) -> Optional[Dict[str, Any]]:
+        """Meilleure catégorie pour un libellé, ou None sous le seuil."""
+        return self.match_many([label], confidence_threshold)[label]
+
+    def match_many(self, labels: List[str], confidence_threshold: float) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Meilleure catégorie pour chaque libellé (None si le score est sous le seuil).
+
+        En cas d'égalité, la première catégorie du catalogue l'emporte.
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        if not self.categories:
+            return {label: None for label in labels}
+
+        pending: List[str] = []
+        for label in labels:
+            # Correspondance exacte (après normalisation) : score 100 sans calcul
+            # (la première occurrence est retenue, comme par le scorer)
+            exact = self._by_normalized.get(normalize_category_name(label))
+            if exact is not None:
+                results[label] = self._result(exact, 100.0, confidence_threshold)
+            else:
+                pending.append(label)
+
+        if pending:
+            for label, (index, score) in zip(pending, self._best_scores([normalize_category_name(l) for l in pending])):
+                results[label] = self._result(index, score, confidence_threshold)
+        return results
+
+    def _best_scores(self, queries: List[str]) -> List[tuple[int, float]]:
+        if np is not None:
+            matrix = process.cdist(queries, self._normalized_names, scorer=fuzz.ratio, dtype=np.float64, workers=-1)
+            best = matrix.argmax(axis=1)
+            return [(int(index), float(matrix[row, index])) for row, index in enumerate(best)]
+
+        scored = []
+        for query in queries:
+            _, score, index = process.extractOne(query, self._normalized_names, scorer=fuzz.ratio, processor=None)
+            scored.append((index, score))
+        return scored
+
+    def _result(self, index: int, score: float, confidence_threshold: float) -> Optional[Dict[str, Any]]:
+        confidence = round(score, 2)
+        if score <= 0 or confidence < confidence_threshold:
+            return None
+        cat = self.categories[index]
+        return {
+            "category_id": cat["id"],
+            "category_name": cat["name"],
+            "confidence": confidence,
+        }
@@ -0,0 +1,79 @@
+"""Résolution des catégories et presets pour les exports et rapports.
+
+Les articles vendus référencent leur catégorie par UUID ou par nom (codes
+historiques type "EEE-1"). Plutôt qu'une requête par article (ou par niveau de
+parenté), le résolveur répond depuis l'arbre des catégories partagé
+(`services.category_tree`), figé pour la durée de l'instance. Une instance est
+prévue pour la durée d'une requête / d'un export.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from recyclic_api.models.preset_button import PresetButton
+from recyclic_api.services.category_tree import CategoryNode, CategoryTree, get_category_tree
+
+
+class CategoryResolver:
+    """Recherches par id, nom et parenté dans l'arbre des catégories, et noms des presets."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._tree: Optional[CategoryTree] = None
+        self._preset_names: Optional[Dict[str, str]] = None
+
+    @property
+    def tree(self) -> CategoryTree:
+        """Instantané de l'arbre, lu une fois par instance (cohérent pendant tout l'export)."""
+        if self._tree is None:
+            self._tree = get_category_tree(self.db)
+        return self._tree
+
+    def get_by_id(self, value) -> Optional[CategoryNode]:
+        """Catégorie par UUID (objet UUID ou chaîne, casse indifférente)."""
+        if value is None:
+            return None
+        try:
+            key = value if isinstance(value, UUID) else UUID(str(value))
+        except (ValueError, TypeError, AttributeError):
+            return None
+        return self.tree.get(key)
+
+    def get(self, value) -> Optional[CategoryNode]:
+        """Catégorie par UUID ou, à défaut, par nom."""
+        node = self.get_by_id(value)
+        if node is None and isinstance(value, str):
+            node = self.tree.get_by_name(value)
+        return node
+
+    def parent(self, node: CategoryNode) -> Optional[CategoryNode]:
+        return self.tree.parent(node.id)
+
+    def chain(self, node: CategoryNode) -> List[CategoryNode]:
+        """Chaîne catégorie → racine (s'arrête sur un parent manquant)."""
+        return list(reversed(self.tree.breadcrumb(node.id)))
+
+    def main_and_secondary(self, value) -> Optional[Tuple[CategoryNode, str]]:
+        """
+        Catégorie principale (sommet de la chaîne) et nom de la catégorie secondaire
+        (enfant direct de la principale, '' si la catégorie est elle-même principale).
+        """
+        node = self.get(value)
+        if node is None:
+            return None
+        path = self.tree.breadcrumb(node.id)
+        return path[0], path[1].name if len(path) >= 2 else ''
+
+    def preset_name(self, preset_id) -> Optional[str]:
+        """Nom d'un bouton preset (tous les presets sont chargés en une requête)."""
+        if preset_id is None:
+            return None
+        if self._preset_names is None:
+            rows = self.db.execute(select(PresetButton.id, PresetButton.name)).all()
+            self._preset_names = {str(pid): name for pid, name in rows}
+        return self._preset_names.get(str(preset_id))
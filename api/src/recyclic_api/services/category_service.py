@@ -1,5 +1,5 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
 from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from uuid import UUID
@@ -8,6 +8,7 @@ from datetime import datetime, timezone
 
 from ..models.category import Category
 from ..schemas.category import CategoryCreate, CategoryUpdate, CategoryRead, CategoryWithChildren
+from .category_tree import CategoryNode, CategoryTree, get_category_tree, invalidate_category_tree
 
 
 class CategoryService:
@@ -19,23 +20,18 @@ class CategoryService:
         self.db = db
 
 
+    def _tree(self) -> CategoryTree:
+        """Snapshot of the whole category tree (one query, shared while no category changes)"""
+        return get_category_tree(self.db)
+
+    def _commit(self) -> None:
+        """Commit and invalidate the category tree snapshot of every worker"""
+        self.db.commit()
+        invalidate_category_tree()
+
     def _get_hierarchy_depth(self, category_id: UUID) -> int:
         """Calculate the depth of a category in the hierarchy (1-based)"""
-        depth = 1  # Start at 1 for the category itself
-        current_id = category_id
-        
-        while current_id:
-            category = self.db.query(Category).filter(Category.id == current_id).first()
-            if not category or not category.parent_id:
-                break
-            current_id = category.parent_id
-            depth += 1
-            
-            # Safety check to prevent infinite loops
-            if depth > self.MAX_HIERARCHY_DEPTH + 1:
-                break
-                
-        return depth
+        return self._tree().depth(category_id)
 
     async def create_category(self, category_data: CategoryCreate) -> CategoryRead:
         """Create a new category with unique name validation and optional parent"""
@@ -64,7 +60,7 @@ class CategoryService:
                     parent.price = None
                     parent.max_price = None
                     # Commit the parent update immediately
-                    self.db.commit()
+                    self._commit()
 
                 # Check hierarchy depth
                 parent_depth = self._get_hierarchy_depth(parent_id)
@@ -92,7 +88,7 @@ class CategoryService:
         self.db.add(new_category)
 
         try:
-            self.db.commit()
+            self._commit()
             self.db.refresh(new_category)
         except IntegrityError:
             self.db.rollback()
@@ -180,7 +176,7 @@ class CategoryService:
                         parent.price = None
                         parent.max_price = None
                         # Commit the parent update immediately
-                        self.db.commit()
+                        self._commit()
 
                     # Prevent self-reference
                     if final_parent_id == cat_uuid:
@@ -229,7 +225,7 @@ class CategoryService:
                 setattr(category, key, value)
 
             try:
-                self.db.commit()
+                self._commit()
                 self.db.refresh(category)
             except IntegrityError:
                 self.db.rollback()
@@ -243,51 +239,33 @@ class CategoryService:
         Story B48-P1: Par défaut, exclut les catégories archivées (deleted_at IS NULL).
         """
         
-        query = self.db.query(Category)
+        tree = self._tree()
         
-        # Story B48-P1: Filtrer les catégories archivées par défaut
-        if not include_archived:
-            query = query.filter(Category.deleted_at.is_(None))
+        # Get only root categories (no parent), sorted by name
+        root_categories = [
+            cat for cat in tree.roots()
+            if cat.parent_id is None
+            # Story B48-P1: Filtrer les catégories archivées par défaut
+            and (include_archived or cat.deleted_at is None)
+            and (is_active is None or cat.is_active == is_active)
+        ]
         
-        if is_active is not None:
-            query = query.filter(Category.is_active == is_active)
-        
-        # Load parent-child relationships with recursive loading
-        query = query.options(selectinload(Category.children).selectinload(Category.children))
-        
-        # Get only root categories (no parent)
-        query = query.filter(Category.parent_id.is_(None))
-        
-        query = query.order_by(Category.name)
-        root_categories = query.all()
-        
-        return [self._build_category_hierarchy(cat, include_archived) for cat in root_categories]
+        return [self._build_category_hierarchy(tree, cat, include_archived) for cat in root_categories]
     
-    def _build_category_hierarchy(self, category: Category, include_archived: bool = False) -> CategoryWithChildren:
-        """Recursively build category hierarchy.
+    def _build_category_hierarchy(self, tree: CategoryTree, category: CategoryNode, include_archived: bool = False) -> CategoryWithChildren:
+        """Recursively build category hierarchy (children sorted by name).
         
         Story B48-P1: Filtre les enfants archivés si include_archived=False.
         """
         children = []
-        for child in category.children:
+        for child in tree.children(category.id):
             # Story B48-P1: Filtrer les enfants archivés si nécessaire
             if include_archived or child.deleted_at is None:
                 if child.is_active:  # Only include active children
-                    children.append(self._build_category_hierarchy(child, include_archived))
-        
-        # Sort children by name for consistent ordering
-        children.sort(key=lambda x: x.name)
+                    children.append(self._build_category_hierarchy(tree, child, include_archived))
         
-        return CategoryWithChildren(
-            id=str(category.id),
-            name=category.name,
-            is_active=category.is_active,
-            parent_id=str(category.parent_id) if category.parent_id else None,
-            created_at=category.created_at,
-            updated_at=category.updated_at,
-            deleted_at=category.deleted_at,
-            children=children
-        )
+        node = CategoryRead.model_validate(category)
+        return CategoryWithChildren(**node.model_dump(), children=children)
     
     async def get_category_children(self, category_id: str) -> List[CategoryRead]:
         """Get direct children of a category.
@@ -300,11 +278,10 @@ class CategoryService:
         except ValueError:
             return []
         
-        children = self.db.query(Category).filter(
-            Category.parent_id == cat_uuid,
-            Category.is_active == True,
-            Category.deleted_at.is_(None)  # Story B48-P1: Exclure les enfants archivés
-        ).order_by(Category.name).all()
+        children = [
+            child for child in self._tree().children(cat_uuid)
+            if child.is_active and child.deleted_at is None  # Story B48-P1: Exclure les enfants archivés
+        ]
         
         return [CategoryRead.model_validate(child) for child in children]
     
@@ -316,17 +293,9 @@ class CategoryService:
         except ValueError:
             return None
         
-        category = self.db.query(Category).filter(Category.id == cat_uuid).first()
-        
-        if not category or not category.parent_id:
-            return None
+        parent = self._tree().parent(cat_uuid)
         
-        parent = self.db.query(Category).filter(
-            Category.id == category.parent_id,
-            Category.is_active == True
-        ).first()
-        
-        return CategoryRead.model_validate(parent) if parent else None
+        return CategoryRead.model_validate(parent) if parent and parent.is_active else None
 
     async def get_category_breadcrumb(self, category_id: str) -> List[CategoryRead]:
         """Get the full breadcrumb path from root to category"""
@@ -336,27 +305,7 @@ class CategoryService:
         except ValueError:
             return []
         
-        # Get the category
-        category = self.db.query(Category).filter(Category.id == cat_uuid).first()
-        if not category:
-            return []
-        
-        # Build breadcrumb by traversing up the hierarchy
-        breadcrumb = []
-        current_id = cat_uuid
-        
-        while current_id:
-            cat = self.db.query(Category).filter(Category.id == current_id).first()
-            if not cat:
-                break
-            breadcrumb.insert(0, CategoryRead.model_validate(cat))  # Insert at beginning for root->leaf order
-            current_id = cat.parent_id
-            
-            # Safety check to prevent infinite loops
-            if len(breadcrumb) > self.MAX_HIERARCHY_DEPTH + 1:
-                break
-        
-        return breadcrumb
+        return [CategoryRead.model_validate(cat) for cat in self._tree().breadcrumb(cat_uuid)]
 
     async def soft_delete_category(self, category_id: str) -> Optional[CategoryRead]:
         """Soft delete a category by setting deleted_at timestamp.
@@ -394,7 +343,7 @@ class CategoryService:
 
         # Soft delete by setting deleted_at timestamp
         category.deleted_at = datetime.now(timezone.utc)
-        self.db.commit()
+        self._commit()
         self.db.refresh(category)
 
         return CategoryRead.model_validate(category)
@@ -419,7 +368,7 @@ class CategoryService:
             raise HTTPException(status_code=422, detail="Impossible de supprimer: la catégorie possède des sous-catégories")
 
         self.db.delete(category)
-        self.db.commit()
+        self._commit()
 
     async def restore_category(self, category_id: str) -> Optional[CategoryRead]:
         """Restore a soft-deleted category by setting deleted_at to NULL.
@@ -447,7 +396,7 @@ class CategoryService:
 
         # Restore by setting deleted_at to NULL
         category.deleted_at = None
-        self.db.commit()
+        self._commit()
         self.db.refresh(category)
 
         return CategoryRead.model_validate(category)
@@ -0,0 +1,219 @@
+"""
+Arbre des catégories chargé en une requête et partagé par le processus.
+
+Toute la table `categories` (quelques centaines de lignes) est lue en une seule
+requête et figée dans un `CategoryTree` immuable : parent, enfants, racine,
+profondeur et fil d'Ariane sont ensuite des lectures de dictionnaires.
+
+L'arbre est conservé en mémoire et associé à un numéro de version stocké dans
+Redis (CATEGORY_TREE_VERSION_KEY). Toute écriture sur les catégories appelle
+`invalidate_category_tree` après son commit, ce qui incrémente la version :
+chaque processus recharge l'arbre à sa prochaine lecture. Le TTL
+(CATEGORY_TREE_CACHE_TTL_SECONDS) borne la durée d'un arbre périmé après une
+écriture hors application (import SQL, restauration) ; sans Redis, l'arbre est
+rechargé à chaque lecture. L'invalidation de l'arbre invalide aussi les réponses
+du catalogue (services.catalogue_cache).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+from recyclic_api.models.category import Category
+from recyclic_api.services.catalogue_cache import invalidate_catalogue
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_TREE_VERSION_KEY = "category_tree_version"
+
+
+@dataclass(frozen=True)
+class CategoryNode:
+    """Ligne de la table `categories`, détachée de toute session (lisible par CategoryRead)."""
+
+    id: UUID
+    name: str
+    official_name: Optional[str]
+    is_active: bool
+    parent_id: Optional[UUID]
+    price: Optional[Decimal]
+    max_price: Optional[Decimal]
+    display_order: int
+    display_order_entry: int
+    is_visible: bool
+    shortcut_key: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    deleted_at: Optional[datetime]
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_id is None
+
+
+_NODE_COLUMNS = [getattr(Category, name) for name in CategoryNode.__dataclass_fields__]
+
+
+class CategoryTree:
+    """Instantané immuable de l'arbre ; toutes les catégories, y compris inactives et archivées."""
+
+    def __init__(self, nodes: Iterable[CategoryNode], version: Optional[str] = None):
+        self.version = version
+        self._nodes: Dict[UUID, CategoryNode] = {node.id: node for node in nodes}
+        self._by_name: Dict[str, CategoryNode] = {node.name: node for node in self._nodes.values()}
+        children: Dict[Optional[UUID], List[CategoryNode]] = {}
+        for node in self._nodes.values():
+            # Parent absent : la catégorie est traitée comme une racine
+            parent_key = node.parent_id if node.parent_id in self._nodes else None
+            children.setdefault(parent_key, []).append(node)
+        self._children: Dict[Optional[UUID], Tuple[CategoryNode, ...]] = {
+            key: tuple(sorted(nodes_, key=lambda n: n.name)) for key, nodes_ in children.items()
+        }
+        self._depth: Dict[UUID, int] = {}
+        self._root: Dict[UUID, UUID] = {}
+        # Parcours depuis les racines : profondeur (1 = racine) et racine de chaque catégorie
+        stack = [(root, 1, root.id) for root in self._children.get(None, ())]
+        while stack:
+            node, depth, root_id = stack.pop()
+            self._depth[node.id] = depth
+            self._root[node.id] = root_id
+            stack.extend((child, depth + 1, root_id) for child in self._children.get(node.id, ()))
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, category_id: UUID) -> bool:
+        return category_id in self._nodes
+
+    def get(self, category_id: Optional[UUID]) -> Optional[CategoryNode]:
+        return self._nodes.get(category_id) if category_id is not None else None
+
+    def get_by_name(self, name: str) -> Optional[CategoryNode]:
+        """Catégorie par nom exact (codes historiques des articles, ex. "EEE-1")."""
+        return self._by_name.get(name)
+
+    def parent(self, category_id: UUID) -> Optional[CategoryNode]:
+        node = self._nodes.get(category_id)
+        return self._nodes.get(node.parent_id) if node is not None and node.parent_id is not None else None
+
+    def children(self, category_id: Optional[UUID]) -> Tuple[CategoryNode, ...]:
+        """Enfants directs triés par nom (`None` : catégories racines)."""
+        return self._children.get(category_id, ())
+
+    def roots(self) -> Tuple[CategoryNode, ...]:
+        return self._children.get(None, ())
+
+    def depth(self, category_id: UUID) -> int:
+        """
+        Profondeur (1 pour une racine ou une catégorie inconnue). Une catégorie
+        prise dans une boucle de parents est considérée plus profonde que l'arbre entier.
+        """
+        if category_id in self._depth or category_id not in self._nodes:
+            return self._depth.get(category_id, 1)
+        return len(self._nodes) + 1
+
+    def root(self, category_id: UUID) -> Optional[CategoryNode]:
+        root_id = self._root.get(category_id)
+        return self._nodes.get(root_id) if root_id is not None else self._nodes.get(category_id)
+
+    def breadcrumb(self, category_id: UUID) -> List[CategoryNode]:
+        """Chemin racine → catégorie (vide si la catégorie est inconnue)."""
+        path: List[CategoryNode] = []
+        node = self._nodes.get(category_id)
+        while node is not None and len(path) < len(self._nodes):
+            path.append(node)
+            node = self._nodes.get(node.parent_id) if node.parent_id is not None else None
+        path.reverse()
+        return path
+
+    def walk(self, include: Callable[[CategoryNode], bool] = lambda node: True) -> List[Tuple[CategoryNode, int]]:
+        """
+        Parcours en profondeur (racines puis enfants, par nom) avec le niveau (0 = racine).
+        Une catégorie exclue par `include` masque toute sa descendance.
+        """
+        result: List[Tuple[CategoryNode, int]] = []
+        stack = [(root, 0) for root in reversed(self.roots()) if include(root)]
+        while stack:
+            node, level = stack.pop()
+            result.append((node, level))
+            stack.extend((child, level + 1) for child in reversed(self.children(node.id)) if include(child))
+        return result
+
+
+def load_category_tree(db: Session, version: Optional[str] = None) -> CategoryTree:
+    """Charge toute la table `categories` en une requête."""
+    rows = db.execute(select(*_NODE_COLUMNS)).all()
+    return CategoryTree((CategoryNode(*row) for row in rows), version=version)
+
+
+class CategoryTreeCache:
+    """Arbre en mémoire du processus, rechargé quand la version Redis change ou à expiration."""
+
+    def __init__(self):
+        self._tree: Optional[CategoryTree] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def _remote_version(self) -> Optional[str]:
+        try:
+            version = get_redis().get(CATEGORY_TREE_VERSION_KEY)
+        except Exception as exc:
+            logger.debug("Cache de l'arbre des catégories désactivé, Redis indisponible : %s", exc)
+            return None
+        return str(version) if version is not None else "0"
+
+    def get(self, db: Session) -> CategoryTree:
+        ttl = settings.CATEGORY_TREE_CACHE_TTL_SECONDS
+        if ttl <= 0:
+            return load_category_tree(db)
+        version = self._remote_version()
+        if version is None:
+            return load_category_tree(db)
+
+        with self._lock:
+            tree = self._tree
+            if tree is not None and tree.version == version and self._expires_at > time.monotonic():
+                return tree
+
+        tree = load_category_tree(db, version)
+        with self._lock:
+            self._tree = tree
+            self._expires_at = time.monotonic() + ttl
+        return tree
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tree = None
+            self._expires_at = 0.0
+
+
+category_tree_cache = CategoryTreeCache()
+
+
+def get_category_tree(db: Session) -> CategoryTree:
+    return category_tree_cache.get(db)
+
+
+def invalidate_category_tree() -> None:
+    """
+    Vide l'arbre local et incrémente la version partagée (ainsi que celle du
+    catalogue). À appeler après le commit de toute écriture sur la table `categories`.
+    """
+    invalidate_catalogue()
+    category_tree_cache.clear()
+    try:
+        get_redis().incr(CATEGORY_TREE_VERSION_KEY)
+    except Exception as exc:
+        logger.warning("Impossible d'invalider l'arbre des catégories partagé : %s", exc)
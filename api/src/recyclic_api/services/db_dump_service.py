@@ -0,0 +1,285 @@
+"""
+Exécution de pg_dump / pg_restore pour l'export et l'import de la base.
+
+- Export : la sortie standard de pg_dump est lue par blocs et transmise telle
+  quelle à la réponse HTTP, sans fichier intermédiaire.
+- Import : le fichier reçu est écrit sur disque par blocs puis validé avec
+  `pg_restore --list` ; la sauvegarde de sécurité et la restauration parallèle
+  (`pg_restore --jobs N`) sont exécutées par la file de tâches (db_restore_jobs).
+
+La mémoire utilisée est bornée par la taille des blocs, quelle que soit la
+taille du dump.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import unquote, urlparse
+
+from fastapi import UploadFile
+
+from recyclic_api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+# Fin de la sortie d'erreur conservée pour les messages (le début est rarement utile)
+STDERR_TAIL_BYTES = 64 * 1024
+MAX_RESTORE_JOBS = 4
+
+
+class DatabaseUrlError(ValueError):
+    """DATABASE_URL inutilisable par les outils PostgreSQL."""
+
+
+class PgCommandError(RuntimeError):
+    """Échec d'une commande pg_dump / pg_restore."""
+
+    def __init__(self, message: str, stderr: str = ""):
+        super().__init__(message)
+        self.stderr = stderr
+
+
+class UploadTooLargeError(ValueError):
+    def __init__(self, size: int, limit: int):
+        super().__init__(f"Upload exceeds {limit} bytes")
+        self.size = size
+        self.limit = limit
+
+
+@dataclass(frozen=True)
+class PgConnectionParams:
+    host: str
+    port: str
+    user: str
+    password: str
+    dbname: str
+
+    @property
+    def env(self) -> Dict[str, str]:
+        # Mot de passe passé par l'environnement : jamais visible dans la ligne de commande
+        env = os.environ.copy()
+        env["PGPASSWORD"] = self.password
+        return env
+
+    def connection_args(self, dbname: Optional[str] = None) -> List[str]:
+        return ["-h", self.host, "-p", self.port, "-U", self.user, "-d", dbname or self.dbname]
+
+
+def parse_database_url(db_url: str) -> PgConnectionParams:
+    parsed = urlparse(db_url)
+    if parsed.scheme not in ("postgresql", "postgres"):
+        raise DatabaseUrlError("Invalid database URL scheme (must be postgresql:// or postgres://)")
+
+    try:
+        port = str(parsed.port) if parsed.port else "5432"
+    except ValueError as exc:
+        raise DatabaseUrlError(f"Invalid database URL format: {exc}") from exc
+
+    params = PgConnectionParams(
+        host=parsed.hostname or "localhost",
+        port=port,
+        user=unquote(parsed.username) if parsed.username else "",
+        password=unquote(parsed.password) if parsed.password else "",
+        dbname=parsed.path.lstrip("/") if parsed.path else "",
+    )
+    if not params.dbname:
+        raise DatabaseUrlError("Database name is required in DATABASE_URL")
+    if not params.user:
+        raise DatabaseUrlError("Database user is required in DATABASE_URL")
+    return params
+
+
+def pg_dump_command(conn: PgConnectionParams, output_path: Optional[str] = None) -> List[str]:
+    """Dump au format custom compressé ; sur la sortie standard si `output_path` est absent."""
+    command = [
+        "pg_dump",
+        *conn.connection_args(),
+        "-F", "c",  # Custom format (binary)
+        "-Z", "9",  # Compression level 9
+    ]
+    if output_path:
+        command += ["-f", output_path]
+    command += [
+        "--clean",  # Include DROP statements
+        "--if-exists",  # Use IF EXISTS for DROP
+        "--no-owner",  # Don't include ownership commands
+        "--no-privileges",  # Don't include privilege commands
+    ]
+    return command
+
+
+def restore_jobs() -> int:
+    if settings.DB_RESTORE_JOBS > 0:
+        return settings.DB_RESTORE_JOBS
+    return max(1, min(os.cpu_count() or 1, MAX_RESTORE_JOBS))
+
+
+def pg_restore_command(conn: PgConnectionParams, dump_path: str, jobs: int) -> List[str]:
+    # Pas de --exit-on-error : certains paramètres du dump peuvent être inconnus du serveur
+    # (ex: transaction_timeout) ; les erreurs sont analysées après coup.
+    return [
+        "pg_restore",
+        *conn.connection_args(),
+        "--clean",
+        "--if-exists",
+        "--no-owner",
+        "--no-privileges",
+        "--disable-triggers",  # Désactiver les triggers/contraintes pendant la restauration
+        "--verbose",  # Une ligne par élément restauré : sert au suivi d'avancement
+        f"--jobs={jobs}",
+        dump_path,
+    ]
+
+
+def terminate_connections_command(conn: PgConnectionParams) -> List[str]:
+    # --clean nécessite des verrous exclusifs qui peuvent être bloqués par des connexions actives
+    return [
+        "psql",
+        *conn.connection_args(dbname="postgres"),
+        "-c",
+        f"SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = '{conn.dbname}' AND pid <> pg_backend_pid();",
+    ]
+
+
+async def _read_tail(stream: asyncio.StreamReader, limit: int = STDERR_TAIL_BYTES) -> str:
+    """Lit un flux jusqu'au bout en ne gardant que ses `limit` derniers octets."""
+    tail = bytearray()
+    while True:
+        chunk = await stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        tail += chunk
+        del tail[:-limit]
+    return tail.decode("utf-8", errors="replace")
+
+
+class PgDumpStream:
+    """
+    Sortie de pg_dump lue par blocs.
+
+    `start()` attend le premier bloc : une erreur immédiate (connexion, droits)
+    est levée avant l'envoi des en-têtes HTTP. Le processus est tué si le client
+    se déconnecte en cours de téléchargement.
+    """
+
+    def __init__(self, command: List[str], env: Dict[str, str], idle_timeout: float, chunk_size: int = CHUNK_SIZE):
+        self.command = command
+        self.env = env
+        self.idle_timeout = idle_timeout
+        self.chunk_size = chunk_size
+        self.bytes_sent = 0
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._first_chunk = b""
+
+    async def start(self) -> None:
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.env,
+        )
+        # Lu en parallèle : un tampon stderr plein bloquerait pg_dump
+        self._stderr_task = asyncio.create_task(_read_tail(self._process.stderr))
+        try:
+            self._first_chunk = await self._read()
+            if not self._first_chunk and await self._process.wait() != 0:
+                raise PgCommandError("pg_dump failed", await self._stderr())
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def _read(self) -> bytes:
+        return await asyncio.wait_for(self._process.stdout.read(self.chunk_size), self.idle_timeout)
+
+    async def _stderr(self) -> str:
+        return await self._stderr_task if self._stderr_task else ""
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        try:
+            chunk = self._first_chunk
+            self._first_chunk = b""
+            while chunk:
+                self.bytes_sent += len(chunk)
+                yield chunk
+                chunk = await self._read()
+            returncode = await self._process.wait()
+            if returncode != 0:
+                stderr = await self._stderr()
+                logger.error(f"pg_dump failed after {self.bytes_sent} bytes with return code {returncode}: {stderr}")
+                # Lever interrompt la réponse : le client voit un téléchargement en échec, pas un dump tronqué
+                raise PgCommandError("pg_dump failed", stderr)
+            logger.info(f"Database export streamed: {self.bytes_sent} bytes")
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        process = self._process
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+        if self._stderr_task is not None and not self._stderr_task.done():
+            self._stderr_task.cancel()
+
+
+async def save_upload(upload: UploadFile, destination: Path, max_bytes: int, chunk_size: int = CHUNK_SIZE) -> int:
+    """Copie le fichier reçu sur disque par blocs ; supprime la copie partielle en cas d'échec."""
+    size = 0
+    try:
+        with destination.open("wb") as handle:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(size, max_bytes)
+                await asyncio.to_thread(handle.write, chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+    return size
+
+
+async def count_dump_items(dump_path: Path, timeout: float) -> int:
+    """
+    Valide l'archive avec `pg_restore --list` et retourne le nombre d'éléments
+    de sa table des matières (base du suivi d'avancement de la restauration).
+    """
+    process = await asyncio.create_subprocess_exec(
+        "pg_restore",
+        "--list",
+        str(dump_path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stderr_task = asyncio.create_task(_read_tail(process.stderr))
+
+    async def _count() -> int:
+        items = 0
+        async for line in process.stdout:
+            # Lignes de commentaire préfixées par ';'
+            if line.strip() and not line.startswith(b";"):
+                items += 1
+        await process.wait()
+        return items
+
+    try:
+        items = await asyncio.wait_for(_count(), timeout)
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        stderr_task.cancel()
+        raise
+
+    stderr = await stderr_task
+    if process.returncode != 0:
+        raise PgCommandError("pg_restore --list failed", stderr)
+    return items
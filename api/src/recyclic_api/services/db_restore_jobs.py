@@ -0,0 +1,210 @@
+"""
+Restauration d'un dump importé, exécutée par la file de tâches.
+
+Étapes : sauvegarde de sécurité (pg_dump), fermeture des connexions actives,
+puis `pg_restore --jobs N`. L'avancement est publié sur le job
+(`result["progress"]`) à partir de la sortie verbose de pg_restore.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.audit import log_system_action
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
+from recyclic_api.models.audit_log import AuditActionType
+from recyclic_api.models.user import User
+from recyclic_api.services.db_dump_service import (
+    PgCommandError,
+    PgConnectionParams,
+    parse_database_url,
+    pg_dump_command,
+    pg_restore_command,
+    restore_jobs,
+    terminate_connections_command,
+)
+from recyclic_api.services.job_queue import Job, job_handler, report_job_progress
+
+logger = logging.getLogger(__name__)
+
+DB_RESTORE_JOB = "db_restore"
+
+# Lignes verbose de pg_restore marquant un élément restauré (séquentiel et parallèle)
+_ITEM_DONE = re.compile(r"^pg_restore: (creating|processing data for|finished item) ")
+_STDERR_TAIL_LINES = 200
+_PROGRESS_INTERVAL_SECONDS = 1.0
+
+
+def _run(command: List[str], conn: PgConnectionParams, timeout: float) -> subprocess.CompletedProcess:
+    return subprocess.run(command, env=conn.env, capture_output=True, text=True, timeout=timeout, check=False)
+
+
+def _restore_failed(returncode: int, stderr: str) -> bool:
+    """
+    pg_restore peut retourner un code non-zéro même en cas de succès s'il y a des
+    warnings : seules les erreurs non ignorées font échouer l'import.
+    """
+    if returncode == 0:
+        return False
+    stderr_lower = stderr.lower()
+
+    # Détecter les warnings non-bloquants (comme "errors ignored on restore")
+    has_ignored_warnings = "errors ignored on restore" in stderr_lower or "warning:" in stderr_lower
+
+    # Détecter les vraies erreurs critiques (mais pas les warnings ignorés)
+    has_critical_errors = any(
+        keyword in stderr_lower and "ignored" not in stderr_lower
+        for keyword in ["error:", "fatal:", "could not", "unable to", "failed to"]
+    ) and "errors ignored on restore" not in stderr_lower
+
+    return not (has_ignored_warnings and not has_critical_errors)
+
+
+def _restore(job: Job, conn: PgConnectionParams, dump_path: Path, total_items: int) -> None:
+    """pg_restore parallèle ; la sortie verbose est lue ligne à ligne (seule la fin est conservée)."""
+    jobs = restore_jobs()
+    process = subprocess.Popen(
+        pg_restore_command(conn, str(dump_path), jobs),
+        env=conn.env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    timed_out = threading.Event()
+
+    def _kill() -> None:
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(settings.DB_RESTORE_TIMEOUT_SECONDS, _kill)
+    timer.start()
+    tail: deque = deque(maxlen=_STDERR_TAIL_LINES)
+    done = 0
+    last_report = 0.0
+    try:
+        for line in process.stderr:
+            tail.append(line)
+            if _ITEM_DONE.match(line):
+                done += 1
+                now = time.monotonic()
+                if now - last_report >= _PROGRESS_INTERVAL_SECONDS:
+                    last_report = now
+                    # Estimation : en parallèle certains éléments produisent plusieurs lignes
+                    percent = min(99, done * 100 // total_items) if total_items else None
+                    report_job_progress(job, step="restore", items_done=done, items_total=total_items, percent=percent, jobs=jobs)
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+    if timed_out.is_set():
+        raise TimeoutError(f"La restauration a dépassé {settings.DB_RESTORE_TIMEOUT_SECONDS} secondes")
+
+    stderr = "".join(tail)
+    if _restore_failed(returncode, stderr):
+        logger.error(f"Database restore failed: {stderr[-1000:]}")
+        raise PgCommandError(f"Erreur lors de la restauration de la base de données: {stderr[-1000:] or 'Unknown error'}", stderr)
+    if returncode != 0:
+        logger.warning(f"Database restore completed with ignored warnings: {stderr[-500:]}")
+
+
+def _audit(job: Job, success: bool, duration_seconds: float, error_message: Optional[str] = None) -> None:
+    payload = job.payload
+    details: Dict[str, Any] = {
+        "filename": payload["filename"],
+        "file_size_bytes": payload["file_size_bytes"],
+        "file_size_mb": round(payload["file_size_bytes"] / (1024 * 1024), 2),
+        "duration_seconds": round(duration_seconds, 2),
+        "backup_created": payload["backup_filename"],
+        "backup_path": payload["backup_path"],
+        "job_id": job.id,
+        "success": success,
+    }
+    if success:
+        description = (
+            f"Import de base de données réussi: {payload['filename']} "
+            f"({details['file_size_mb']}MB) en {details['duration_seconds']}s"
+        )
+    else:
+        details["error_type"] = "restore_job"
+        details["error_message"] = error_message
+        description = f"Échec import de base de données: {payload['filename']} - {error_message}"
+
+    # Nouvelle session : la restauration a fermé les connexions existantes
+    try:
+        with SessionLocal() as audit_db:
+            actor = None
+            if payload.get("actor_id"):
+                actor = audit_db.get(User, UUID(payload["actor_id"]))
+            log_system_action(
+                action_type=AuditActionType.DB_IMPORT,
+                actor=actor,
+                target_type="database",
+                details=details,
+                description=description,
+                db=audit_db,
+            )
+    except Exception as audit_error:
+        # L'audit ne doit pas changer l'issue de l'import
+        logger.error(f"Failed to log audit entry for database import job {job.id}: {audit_error}")
+
+
+@job_handler(DB_RESTORE_JOB)
+def run_db_restore_job(db: Session, job: Job) -> Dict[str, Any]:
+    """Sauvegarde de sécurité puis restauration du dump importé (jamais relancée automatiquement)."""
+    payload = job.payload
+    dump_path = Path(payload["dump_path"])
+    backup_path = payload["backup_path"]
+    started = time.monotonic()
+    try:
+        conn = parse_database_url(settings.DATABASE_URL)
+
+        report_job_progress(job, step="backup")
+        logger.info(f"Creating safety backup before import: {backup_path}")
+        backup_result = _run(pg_dump_command(conn, backup_path), conn, settings.DB_BACKUP_TIMEOUT_SECONDS)
+        if backup_result.returncode != 0:
+            logger.error(f"Backup creation failed: {backup_result.stderr}")
+            raise PgCommandError(f"Impossible de créer une sauvegarde automatique: {backup_result.stderr}", backup_result.stderr)
+
+        report_job_progress(job, step="terminate_connections")
+        terminate_result = _run(terminate_connections_command(conn), conn, 30)
+        if terminate_result.returncode != 0:
+            logger.warning(f"Could not terminate all connections: {terminate_result.stderr}")
+        else:
+            # Laisser les connexions se fermer proprement
+            time.sleep(2)
+
+        report_job_progress(job, step="restore", items_done=0, items_total=payload["items_total"], percent=0)
+        logger.info(f"Executing database restore from {dump_path}")
+        _restore(job, conn, dump_path, payload["items_total"])
+    except Exception as exc:
+        _audit(job, success=False, duration_seconds=time.monotonic() - started, error_message=str(exc))
+        raise
+    finally:
+        try:
+            dump_path.unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning(f"Could not delete imported dump file {dump_path}: {exc}")
+
+    duration_seconds = time.monotonic() - started
+    logger.warning(f"Database import job {job.id} completed successfully")
+    _audit(job, success=True, duration_seconds=duration_seconds)
+    return {
+        "progress": {"step": "done", "items_done": payload["items_total"], "items_total": payload["items_total"], "percent": 100},
+        "backup_created": payload["backup_filename"],
+        "backup_path": backup_path,
+        "duration_seconds": round(duration_seconds, 2),
+    }
@@ -19,8 +19,7 @@ from recyclic_api.models.sale_item import SaleItem
 from recyclic_api.models.cash_session import CashSession
 from recyclic_api.models.user import User
 from recyclic_api.models.site import Site
-from recyclic_api.models.preset_button import PresetButton
-from recyclic_api.models.category import Category
+from recyclic_api.services.category_resolver import CategoryResolver
 
 
 @dataclass(frozen=True)
@@ -306,43 +305,12 @@ def generate_cash_session_report(
         ("Rapport Généré Le", _format_date(datetime.utcnow())),
     ]
 
-    # Charger les ventes avec les relations nécessaires (preset_button pour récupérer le nom)
     sales = db.query(Sale).filter(Sale.cash_session_id == session.id).options(
-        joinedload(Sale.items).joinedload(SaleItem.preset_button)
+        joinedload(Sale.items)
     ).all()
 
-    # Créer un cache des catégories pour éviter les requêtes multiples
-    # Récupérer tous les IDs de catégories uniques utilisés dans les items
-    category_ids = set()
-    for sale in sales:
-        for item in sale.items:
-            if item.category:
-                # Vérifier si c'est un UUID (format avec tirets) ou un code (EEE-X)
-                try:
-                    # Essayer de parser comme UUID
-                    UUIDType(item.category)
-                    category_ids.add(item.category)
-                except (ValueError, AttributeError):
-                    # Ce n'est pas un UUID, probablement un code comme "EEE-1"
-                    pass
-    
-    # Charger toutes les catégories en une seule requête
-    category_map = {}
-    if category_ids:
-        # Convertir les strings en UUID pour la requête
-        uuid_category_ids = []
-        for cat_id in category_ids:
-            try:
-                uuid_category_ids.append(UUIDType(cat_id))
-            except (ValueError, AttributeError):
-                pass
-        
-        if uuid_category_ids:
-            categories = db.query(Category).filter(Category.id.in_(uuid_category_ids)).all()
-            # Créer le mapping avec les deux formats (UUID et string) pour faciliter la recherche
-            for cat in categories:
-                category_map[str(cat.id)] = cat.name
-                category_map[cat.id] = cat.name  # Support aussi pour comparaison directe UUID
+    # Catégories et presets résolus en mémoire (une requête chacun, pas de requête par article)
+    resolver = CategoryResolver(db)
 
     # Utiliser le séparateur point-virgule (;) pour compatibilité avec Excel/OpenOffice français
     # et virgule (,) pour les décimales
@@ -385,14 +353,7 @@ def generate_cash_session_report(
             if sale.items:
                 for item in sale.items:
                     # Récupérer le nom du preset si présent et nettoyer
-                    preset_name = ''
-                    if item.preset_button:
-                        preset_name = (item.preset_button.name or '').replace('\n', ' ').replace('\r', ' ').strip()
-                    elif item.preset_id:
-                        # Fallback: si la relation n'est pas chargée, chercher le preset
-                        preset = db.query(PresetButton).filter(PresetButton.id == item.preset_id).first()
-                        if preset:
-                            preset_name = (preset.name or '').replace('\n', ' ').replace('\r', ' ').strip()
+                    preset_name = (resolver.preset_name(item.preset_id) or '').replace('\n', ' ').replace('\r', ' ').strip()
                     
                     # Récupérer les notes et nettoyer les caractères problématiques
                     notes = (item.notes or '').replace('\n', ' ').replace('\r', ' ').strip()
@@ -404,19 +365,14 @@ def generate_cash_session_report(
                     
                     # Résoudre le nom de la catégorie depuis l'ID et nettoyer
                     category_name = item.category
-                    if item.category in category_map:
-                        category_name = (category_map[item.category] or item.category).replace('\n', ' ').replace('\r', ' ').strip()
+                    category = resolver.get_by_id(item.category)
+                    if category:
+                        category_name = (category.name or item.category).replace('\n', ' ').replace('\r', ' ').strip()
                     elif item.category:
-                        # Si ce n'est pas un UUID mais un code (ex: "EEE-1"), garder tel quel
-                        # Sinon essayer de chercher la catégorie
                         try:
                             UUIDType(item.category)
-                            # C'est un UUID mais pas dans le cache, chercher
-                            cat = db.query(Category).filter(Category.id == item.category).first()
-                            if cat:
-                                category_name = (cat.name or item.category).replace('\n', ' ').replace('\r', ' ').strip()
                         except (ValueError, AttributeError):
-                            # Ce n'est pas un UUID, probablement un code, garder tel quel mais nettoyer
+                            # Ce n'est pas un UUID, probablement un code (ex: "EEE-1"), garder tel quel mais nettoyer
                             category_name = item.category.replace('\n', ' ').replace('\r', ' ').strip()
                     
                     writer.writerow([
@@ -0,0 +1,440 @@
+"""
+File de tâches de fond persistée dans Redis.
+
+Les effets de bord lents (génération de rapports, envoi d'e-mails, dépôt kDrive)
+sont mis en file par les endpoints puis exécutés par des workers : coroutines
+démarrées avec l'application, ou processus séparé (`python -m recyclic_api.services.job_queue`).
+
+Structures Redis :
+- `jobs:job:{id}`     : état JSON du job (statut, tentatives, résultat, erreurs)
+- `jobs:queue`        : liste des jobs prêts (LPUSH / BLMOVE vers `jobs:processing`)
+- `jobs:processing`   : jobs réservés par un worker, remis en file s'ils restent bloqués
+- `jobs:delayed`      : zset des nouvelles tentatives, score = date d'exécution
+- `jobs:recent`       : zset des jobs par date de création (inspection admin)
+
+En mode JOB_QUEUE_EAGER (tests) ou si Redis est indisponible, le job est exécuté
+immédiatement dans la requête, avec la session DB de l'appelant.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import SessionLocal
+from recyclic_api.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_KEY = "jobs:queue"
+JOB_PROCESSING_KEY = "jobs:processing"
+JOB_DELAYED_KEY = "jobs:delayed"
+JOB_RECENT_KEY = "jobs:recent"
+
+# Modules déclarant des handlers (importés par les workers avant de consommer la file)
+JOB_HANDLER_MODULES = (
+    "recyclic_api.services.cash_session_close_jobs",
+    "recyclic_api.services.db_restore_jobs",
+)
+
+_jobs_total = Counter(
+    "background_jobs_total",
+    "Background jobs by type and final status",
+    ["job_type", "status"],
+)
+_job_queue_depth = Gauge(
+    "background_jobs_queue_depth",
+    "Background jobs waiting or in progress",
+    ["state"],
+)
+_job_wait_seconds = Histogram(
+    "background_job_wait_seconds",
+    "Time between enqueue and start of a background job",
+    ["job_type"],
+)
+_job_duration_seconds = Histogram(
+    "background_job_duration_seconds",
+    "Execution time of a background job attempt",
+    ["job_type"],
+)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class Job:
+    id: str
+    type: str
+    payload: Dict[str, Any]
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_attempts: int = 5
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    # Résultat partiel conservé entre deux tentatives (étapes déjà réalisées)
+    result: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.started_at - self.created_at).total_seconds()
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["status"] = self.status.value
+        for key in ("created_at", "started_at", "finished_at"):
+            data[key] = data[key].isoformat() if data[key] else None
+        return json.dumps(data, default=str)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Job":
+        data = json.loads(raw)
+        data["status"] = JobStatus(data["status"])
+        for key in ("created_at", "started_at", "finished_at"):
+            data[key] = datetime.fromisoformat(data[key]) if data[key] else None
+        return cls(**data)
+
+
+JobHandler = Callable[[Session, Job], Optional[Dict[str, Any]]]
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """Déclare la fonction exécutant un type de job : handler(db, job) -> résultat."""
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[job_type] = func
+        return func
+    return decorator
+
+
+def load_job_handlers() -> None:
+    for module in JOB_HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def _job_key(job_id: str) -> str:
+    return f"jobs:job:{job_id}"
+
+
+# File du job en cours d'exécution dans ce thread (None si le job n'est pas persisté)
+_progress_queue: ContextVar[Optional["JobQueue"]] = ContextVar("job_progress_queue", default=None)
+
+
+def report_job_progress(job: Job, **progress: Any) -> None:
+    """Publie l'avancement d'un job en cours dans `result["progress"]` (lisible via GET /admin/jobs/{id})."""
+    job.result["progress"] = progress
+    queue = _progress_queue.get()
+    if queue is None:
+        return
+    try:
+        queue._save(job)
+    except Exception as exc:  # noqa: BLE001 - l'avancement est indicatif
+        logger.debug("Could not publish progress of job %s: %s", job.id, exc)
+
+
+class JobQueue:
+    """Mise en file, exécution avec nouvelles tentatives et inspection des jobs."""
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client if redis_client is not None else get_redis()
+
+    # --- Persistance -----------------------------------------------------
+
+    def _save(self, job: Job) -> None:
+        ttl = settings.JOB_RESULT_TTL_SECONDS if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED) else None
+        self.redis.set(_job_key(job.id), job.to_json(), ex=ttl)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raw = self.redis.get(_job_key(job_id))
+        return Job.from_json(raw) if raw else None
+
+    def list_recent(self, limit: int = 50, status: Optional[JobStatus] = None) -> List[Job]:
+        """Jobs les plus récents (les entrées expirées sont purgées au passage)."""
+        jobs: List[Job] = []
+        expired: List[str] = []
+        for job_id in self.redis.zrevrange(JOB_RECENT_KEY, 0, -1):
+            job = self.get(job_id)
+            if job is None:
+                expired.append(job_id)
+                continue
+            if status is None or job.status == status:
+                jobs.append(job)
+                if len(jobs) >= limit:
+                    break
+        if expired:
+            self.redis.zrem(JOB_RECENT_KEY, *expired)
+        return jobs
+
+    def depth(self) -> Dict[str, int]:
+        """Profondeur de la file (exportée aussi en jauge Prometheus)."""
+        pipe = self.redis.pipeline()
+        pipe.llen(JOB_QUEUE_KEY)
+        pipe.zcard(JOB_DELAYED_KEY)
+        pipe.llen(JOB_PROCESSING_KEY)
+        queued, delayed, processing = pipe.execute()
+        depth = {"queued": int(queued), "delayed": int(delayed), "processing": int(processing)}
+        for state, value in depth.items():
+            _job_queue_depth.labels(state=state).set(value)
+        return depth
+
+    # --- Production ------------------------------------------------------
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        *,
+        max_attempts: Optional[int] = None,
+        db: Optional[Session] = None,
+    ) -> Job:
+        """
+        Met un job en file et le retourne.
+
+        `db` n'est utilisé que pour l'exécution immédiate (mode eager ou Redis
+        indisponible) : le job voit alors les écritures non encore visibles
+        des autres connexions.
+        """
+        job = Job(
+            id=str(uuid.uuid4()),
+            type=job_type,
+            payload=payload,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        )
+        if settings.JOB_QUEUE_EAGER:
+            return self.execute(job, db=db, persist=False)
+
+        try:
+            self._save(job)
+            pipe = self.redis.pipeline()
+            pipe.zadd(JOB_RECENT_KEY, {job.id: job.created_at.timestamp()})
+            pipe.lpush(JOB_QUEUE_KEY, job.id)
+            pipe.execute()
+        except Exception as exc:  # noqa: BLE001 - ne jamais perdre l'effet de bord
+            logger.warning("Job queue unavailable (%s); running %s inline", exc, job_type)
+            return self.execute(job, db=db, persist=False)
+
+        logger.info("Queued job %s (%s)", job.id, job_type)
+        return job
+
+    def retry(self, job_id: str) -> Optional[Job]:
+        """Remet en file un job en échec définitif (action admin)."""
+        job = self.get(job_id)
+        if job is None or job.status != JobStatus.FAILED:
+            return job
+        job.status = JobStatus.QUEUED
+        job.attempts = 0
+        job.finished_at = None
+        self._save(job)
+        self.redis.lpush(JOB_QUEUE_KEY, job.id)
+        return job
+
+    # --- Consommation ----------------------------------------------------
+
+    def promote_due(self, now: Optional[float] = None) -> int:
+        """Déplace vers la file les nouvelles tentatives arrivées à échéance."""
+        now = time.time() if now is None else now
+        promoted = 0
+        for job_id in self.redis.zrangebyscore(JOB_DELAYED_KEY, "-inf", now):
+            # zrem arbitre entre workers concurrents : un seul le remet en file
+            if self.redis.zrem(JOB_DELAYED_KEY, job_id):
+                self.redis.lpush(JOB_QUEUE_KEY, job_id)
+                promoted += 1
+        return promoted
+
+    def _fail_exhausted(self, job: Job, reason: str) -> Job:
+        """Passe en échec définitif un job dont toutes les tentatives ont été consommées."""
+        job.status = JobStatus.FAILED
+        job.finished_at = _now()
+        job.last_error = reason
+        _jobs_total.labels(job_type=job.type, status=job.status.value).inc()
+        self._save(job)
+        return job
+
+    def requeue_stale(self, older_than_seconds: Optional[int] = None) -> int:
+        """
+        Remet en file les jobs réservés par un worker disparu (crash, redéploiement).
+
+        Un job dont la dernière tentative autorisée a démarré n'est pas relancé
+        (ex. restauration de base, max_attempts=1) : il passe en échec, l'admin
+        peut le relancer explicitement.
+        """
+        threshold = older_than_seconds if older_than_seconds is not None else settings.JOB_VISIBILITY_TIMEOUT_SECONDS
+        requeued = 0
+        for job_id in self.redis.lrange(JOB_PROCESSING_KEY, 0, -1):
+            job = self.get(job_id)
+            stale = job is None or job.started_at is None or (_now() - job.started_at).total_seconds() > threshold
+            if stale and self.redis.lrem(JOB_PROCESSING_KEY, 1, job_id):
+                if job is None:
+                    continue
+                if job.attempts >= job.max_attempts:
+                    logger.warning("Stale job %s (%s) has no attempt left; marking it failed", job.id, job.type)
+                    self._fail_exhausted(job, "Worker perdu pendant la dernière tentative autorisée")
+                    continue
+                self.redis.lpush(JOB_QUEUE_KEY, job_id)
+                requeued += 1
+        return requeued
+
+    def reserve(self, timeout: float = 1.0) -> Optional[Job]:
+        """Attend le prochain job (bloquant, à appeler hors boucle d'événements)."""
+        job_id = self.redis.blmove(JOB_QUEUE_KEY, JOB_PROCESSING_KEY, timeout, "RIGHT", "LEFT")
+        if job_id is None:
+            return None
+        job = self.get(job_id)
+        if job is None:
+            self.redis.lrem(JOB_PROCESSING_KEY, 1, job_id)
+        return job
+
+    def execute(self, job: Job, db: Optional[Session] = None, persist: bool = True) -> Job:
+        """Exécute une tentative du job ; planifie une nouvelle tentative en cas d'échec."""
+        handler = _handlers.get(job.type)
+        if handler is None:
+            load_job_handlers()
+            handler = _handlers.get(job.type)
+
+        # Job remis en file alors que ses tentatives sont épuisées : ne jamais le rejouer
+        if persist and job.attempts >= job.max_attempts:
+            logger.warning("Job %s (%s) already used its %s attempt(s); not running it again", job.id, job.type, job.max_attempts)
+            self._fail_exhausted(job, job.last_error or "Nombre maximal de tentatives atteint")
+            self.redis.lrem(JOB_PROCESSING_KEY, 1, job.id)
+            return job
+
+        job.attempts += 1
+        job.status = JobStatus.RUNNING
+        job.started_at = _now()
+        if job.attempts == 1:
+            _job_wait_seconds.labels(job_type=job.type).observe(job.wait_seconds)
+        if persist:
+            self._save(job)
+
+        owns_session = db is None
+        session = SessionLocal() if owns_session else db
+        # Session de la requête (exécution immédiate) : le job travaille dans un savepoint,
+        # annulé en cas d'échec pour que la requête puisse continuer sur sa session
+        savepoint = None if owns_session else session.begin_nested()
+        progress_token = _progress_queue.set(self if persist else None)
+        try:
+            with _job_duration_seconds.labels(job_type=job.type).time():
+                if handler is None:
+                    raise LookupError(f"No handler registered for job type '{job.type}'")
+                result = handler(session, job)
+            if savepoint is not None and savepoint.is_active:
+                savepoint.commit()
+            if result is not None:
+                job.result = result
+            job.status = JobStatus.SUCCEEDED
+            job.last_error = None
+        except Exception as exc:  # noqa: BLE001 - l'erreur est conservée sur le job
+            logger.warning("Job %s (%s) attempt %s/%s failed: %s", job.id, job.type, job.attempts, job.max_attempts, exc)
+            job.last_error = f"{type(exc).__name__}: {exc}"
+            # Une exécution immédiate (non persistée) ne peut pas être reprogrammée
+            retry = persist and handler is not None and job.attempts < job.max_attempts
+            job.status = JobStatus.RETRYING if retry else JobStatus.FAILED
+            if savepoint is not None:
+                # Savepoint déjà refermé par un commit du handler : annuler la suite de sa transaction
+                if savepoint.is_active:
+                    savepoint.rollback()
+                else:
+                    session.rollback()
+        finally:
+            _progress_queue.reset(progress_token)
+            if owns_session:
+                session.close()
+
+        job.finished_at = _now()
+        if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+            _jobs_total.labels(job_type=job.type, status=job.status.value).inc()
+
+        if persist:
+            self._save(job)
+            pipe = self.redis.pipeline()
+            if job.status == JobStatus.RETRYING:
+                delay = settings.JOB_RETRY_BASE_DELAY_SECONDS * (2 ** (job.attempts - 1))
+                pipe.zadd(JOB_DELAYED_KEY, {job.id: time.time() + delay})
+            pipe.lrem(JOB_PROCESSING_KEY, 1, job.id)
+            pipe.execute()
+        return job
+
+
+def get_job_queue() -> JobQueue:
+    return JobQueue()
+
+
+async def run_job_worker(queue: JobQueue, stop: asyncio.Event, poll_timeout: float = 1.0) -> None:
+    """Boucle d'un worker : les appels Redis bloquants et les handlers tournent dans un thread."""
+    while not stop.is_set():
+        try:
+            await asyncio.to_thread(queue.promote_due)
+            job = await asyncio.to_thread(queue.reserve, poll_timeout)
+            if job is not None:
+                await asyncio.to_thread(queue.execute, job)
+            await asyncio.to_thread(queue.depth)
+        except Exception as exc:  # noqa: BLE001 - garder le worker vivant
+            logger.exception("Job worker iteration failed: %s", exc)
+            await asyncio.sleep(poll_timeout)
+
+
+def start_job_workers(count: Optional[int] = None) -> tuple[asyncio.Event, List[asyncio.Task]]:
+    """Démarre les workers dans la boucle courante ; retourne (événement d'arrêt, tâches)."""
+    load_job_handlers()
+    queue = get_job_queue()
+    stop = asyncio.Event()
+    try:
+        requeued = queue.requeue_stale()
+        if requeued:
+            logger.info("Requeued %s stale background jobs", requeued)
+    except Exception as exc:  # noqa: BLE001 - Redis peut démarrer après l'API
+        logger.warning("Could not inspect stale background jobs: %s", exc)
+    workers = count if count is not None else settings.JOB_QUEUE_WORKERS
+    tasks = [asyncio.create_task(run_job_worker(queue, stop)) for _ in range(max(workers, 0))]
+    return stop, tasks
+
+
+async def stop_job_workers(stop: asyncio.Event, tasks: List[asyncio.Task]) -> None:
+    stop.set()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run_forever() -> None:
+    stop, tasks = start_job_workers()
+    logger.info("Background job worker process started (%s workers)", len(tasks))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await stop_job_workers(stop, tasks)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_forever())
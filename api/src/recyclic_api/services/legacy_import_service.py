@@ -26,6 +26,8 @@ from recyclic_api.services.llm_category_mapping_client import (
     CategoryMappingLike,
 )
 from recyclic_api.services.llm_openrouter_client import OpenRouterCategoryMappingClient
+from recyclic_api.services.llm_batch_dispatcher import LLMBatchDispatcher, LLMBatchOutcome
+from recyclic_api.services.category_matcher import CategoryMatcher
 from recyclic_api.models.legacy_category_mapping_cache import LegacyCategoryMappingCache
 from recyclic_api.models.poste_reception import PosteReception, PosteReceptionStatus
 from recyclic_api.models.ticket_depot import TicketDepot, TicketDepotStatus
@@ -36,39 +38,20 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-try:
-    # La fonction `levenshtein_ratio` DOIT toujours retourner une valeur normalisée entre 0 et 1.
-    # Le service se charge ensuite de convertir en pourcentage (0-100).
-    from Levenshtein import ratio as _levenshtein_ratio
-
-    def levenshtein_ratio(s1: str, s2: str) -> float:
-        """Retourne un score de similarité normalisé entre 0 et 1."""
-        return _levenshtein_ratio(s1, s2)
-
-except ImportError:
-    # Fallback si python-Levenshtein n'est pas disponible
-    try:
-        from difflib import SequenceMatcher
-
-        def levenshtein_ratio(s1: str, s2: str) -> float:
-            """Retourne un score de similarité normalisé entre 0 et 1."""
-            return SequenceMatcher(None, s1, s2).ratio()
-
-    except ImportError:
-        raise ImportError("python-Levenshtein ou difflib requis pour le fuzzy matching")
-
 
 class LegacyImportService:
     """Service d'import de données legacy avec fuzzy matching des catégories."""
 
     REQUIRED_HEADERS = ["date", "category", "poids_kg", "destination", "notes"]
     DEFAULT_CONFIDENCE_THRESHOLD = 80.0  # Seuil de confiance par défaut (80%)
+    BULK_INSERT_BATCH_SIZE = 1000  # Lignes par INSERT multi-lignes lors de l'exécution
 
     def __init__(self, db: Session, llm_client: Optional[LLMCategoryMappingClient] = None):
         self.db = db
         self.category_service = CategoryService(db)
         self.reception_service = ReceptionService(db)
         self._categories_cache: Optional[List[Dict[str, Any]]] = None
+        self._matcher: Optional[CategoryMatcher] = None
         self._llm_client = llm_client or self._build_default_llm_client()
 
     # ---------- LLM & Cache Utilities ----------
@@ -188,6 +171,144 @@ class LegacyImportService:
                 exc_info=True,
             )
 
+    def _persist_llm_mappings(self, entries: List[Tuple[str, UUID, float]], provider: str) -> None:
+        """
+        Enregistre (upsert) les mappings LLM d'un batch dans le cache et valide la transaction.
+
+        Appelé à l'arrivée de chaque batch : les mappings déjà obtenus restent
+        acquis même si l'analyse est interrompue ensuite. Best-effort.
+        """
+        if not entries:
+            return
+        try:
+            by_normalized = {self._normalize_string(name): (target_id, confidence) for name, target_id, confidence in entries}
+            existing = {
+                cached.source_name_normalized: cached
+                for cached in self.db.query(LegacyCategoryMappingCache).filter(
+                    LegacyCategoryMappingCache.source_name_normalized.in_(list(by_normalized))
+                )
+            }
+            for normalized, (target_id, confidence) in by_normalized.items():
+                cached = existing.get(normalized)
+                if cached:
+                    cached.target_category_id = target_id
+                    cached.provider = provider
+                    cached.confidence = confidence
+                else:
+                    self.db.add(
+                        LegacyCategoryMappingCache(
+                            source_name_normalized=normalized,
+                            target_category_id=target_id,
+                            provider=provider,
+                            confidence=confidence,
+                        )
+                    )
+            self.db.commit()
+        except Exception as exc:  # noqa: BLE001
+            try:
+                self.db.rollback()
+            except Exception:
+                pass
+
+            logger.error(
+                "Erreur lors de l'écriture dans le cache legacy_category_mapping_cache: %s",
+                exc,
+                exc_info=True,
+            )
+
+    def _run_llm_batches(
+        self,
+        llm_client: LLMCategoryMappingClient,
+        categories: List[str],
+        log_prefix: str,
+    ) -> Dict[str, Any]:
+        """
+        Envoie les catégories au LLM par batches concurrents (LLMBatchDispatcher).
+
+        Les mappings de chaque batch sont validés contre les catégories connues
+        et persistés dans le cache dès réception. Retourne les mappings, les
+        catégories restantes (ordre d'origine) et les statistiques LLM.
+        """
+        matcher = self._category_matcher()
+        known_categories = [c["name"] for c in matcher.categories]
+        batch_size = max(1, settings.LEGACY_IMPORT_LLM_BATCH_SIZE or 20)
+        batches = [categories[i : i + batch_size] for i in range(0, len(categories), batch_size)]
+
+        mappings: Dict[str, Dict[str, Any]] = {}
+        confidences: List[float] = []
+        provider_used: Optional[str] = None
+
+        def _on_batch(outcome: LLMBatchOutcome) -> None:
+            nonlocal provider_used
+            if not outcome.succeeded:
+                logger.error(
+                    "%s: erreur lors du batch LLM %d/%d: %s",
+                    log_prefix,
+                    outcome.index + 1,
+                    len(batches),
+                    outcome.error,
+                )
+                return
+            if outcome.suggestions:
+                provider_used = llm_client.provider_name
+
+            to_cache: List[Tuple[str, UUID, float]] = []
+            for source_name in outcome.batch:
+                suggestion = outcome.suggestions.get(source_name)
+                if not suggestion:
+                    continue
+
+                # Clamp du score dans [0, 100]
+                confidence = min(max(float(suggestion.get("confidence", 0.0)), 0.0), 100.0)
+                confidences.append(confidence)
+
+                # Retrouver la catégorie cible correspondante
+                target = matcher.get_by_name(suggestion.get("target_name"))
+                if not target:
+                    continue
+
+                mappings[source_name] = {
+                    "category_id": target["id"],
+                    "category_name": target["name"],
+                    "confidence": round(confidence, 2),
+                }
+                to_cache.append((source_name, UUID(target["id"]), confidence))
+
+            # Stocker dans le cache pour réutilisation future
+            self._persist_llm_mappings(to_cache, llm_client.provider_name)
+
+        logger.info(
+            "%s: %d catégories à mapper via LLM (provider=%s, batch_size=%d, batches=%d)",
+            log_prefix,
+            len(categories),
+            llm_client.provider_name,
+            batch_size,
+            len(batches),
+        )
+        outcomes = LLMBatchDispatcher(llm_client).dispatch(batches, known_categories, on_batch=_on_batch)
+
+        failed = [outcome for outcome in outcomes if not outcome.succeeded]
+        remaining = [name for outcome in outcomes for name in outcome.batch if name not in mappings]
+
+        logger.info(
+            "%s: %d catégories mappées par LLM, %d restantes unmapped (batches: %d réussis, %d échoués)",
+            log_prefix,
+            len(mappings),
+            len(remaining),
+            len(outcomes) - len(failed),
+            len(failed),
+        )
+        return {
+            "mappings": mappings,
+            "remaining": remaining,
+            "batches_total": len(outcomes),
+            "batches_succeeded": len(outcomes) - len(failed),
+            "batches_failed": len(failed),
+            "last_error": failed[-1].error if failed else None,
+            "confidences": confidences,
+            "provider_used": provider_used,
+        }
+
     # ---------- Utilities ----------
 
     @staticmethod
@@ -257,33 +378,13 @@ class LegacyImportService:
         if confidence_threshold is None:
             confidence_threshold = self.DEFAULT_CONFIDENCE_THRESHOLD
         
-        normalized_input = self._normalize_string(category_name)
-        categories = self._load_categories()
-        
-        if not categories:
-            return None
-        
-        best_match = None
-        best_score = 0.0
-        
-        for cat in categories:
-            # `levenshtein_ratio` retourne un score normalisé entre 0 et 1,
-            # que l'on convertit ici en pourcentage (0-100).
-            score = levenshtein_ratio(normalized_input, cat["normalized_name"]) * 100
-
-            if score > best_score:
-                best_score = score
-                best_match = {
-                    "category_id": cat["id"],
-                    "category_name": cat["name"],
-                    "confidence": round(best_score, 2)
-                }
-        
-        # Retourner seulement si le score dépasse le seuil
-        if best_match and best_match["confidence"] >= confidence_threshold:
-            return best_match
-        
-        return None
+        return self._category_matcher().match(category_name, confidence_threshold)
+
+    def _category_matcher(self) -> CategoryMatcher:
+        """Index de matching construit une fois par service sur les catégories actives."""
+        if self._matcher is None:
+            self._matcher = CategoryMatcher(self._load_categories())
+        return self._matcher
 
     def _generate_mapping(
         self,
@@ -300,8 +401,12 @@ class LegacyImportService:
           avec le provider "fuzzy" pour réutilisation future ;
         - sinon, la catégorie est considérée comme `unmapped`.
         """
+        if confidence_threshold is None:
+            confidence_threshold = self.DEFAULT_CONFIDENCE_THRESHOLD
+
         mappings: Dict[str, Dict[str, Any]] = {}
         unmapped: List[str] = []
+        to_match: List[str] = []
 
         for cat_name in unique_categories:
             # 1) Vérifier le cache
@@ -312,10 +417,13 @@ class LegacyImportService:
                     "category_name": self._find_category_name_by_id(cached["category_id"]),
                     "confidence": round(float(cached["confidence"]), 2),
                 }
-                continue
+            else:
+                to_match.append(cat_name)
 
-            # 2) Fuzzy matching standard
-            match = self._fuzzy_match_category(cat_name, confidence_threshold)
+        # 2) Fuzzy matching de tous les libellés restants en un seul appel vectorisé
+        matches = self._category_matcher().match_many(to_match, confidence_threshold)
+        for cat_name in to_match:
+            match = matches[cat_name]
             if match:
                 mappings[cat_name] = match
 
@@ -345,10 +453,9 @@ class LegacyImportService:
         Utilise le cache local de catégories si possible pour éviter des requêtes
         répétées en base.
         """
-        categories = self._load_categories()
-        for cat in categories:
-            if cat["id"] == category_id_str:
-                return cat["name"]
+        cat = self._category_matcher().get_by_id(category_id_str)
+        if cat:
+            return cat["name"]
         # Fallback : requête directe si non trouvé dans le cache (cas rare)
         try:
             cat_obj = self.db.query(Category).filter(Category.id == UUID(category_id_str)).first()
@@ -492,112 +599,18 @@ class LegacyImportService:
         if unmapped and llm_client_to_use is not None:
             llm_attempted = True
             try:
-                # Travail uniquement sur les catégories uniques déjà collectées
-                known_categories = [c["name"] for c in self._load_categories()]
-
-                batch_size = settings.LEGACY_IMPORT_LLM_BATCH_SIZE or 20
-                batch_size = max(1, batch_size)
-
-                remaining_unmapped: List[str] = []
-
-                logger.info(
-                    "LegacyImport analyze: %d catégories unmapped avant LLM (provider=%s, model=%s, batch_size=%d)",
-                    len(unmapped),
-                    llm_client_to_use.provider_name,
-                    llm_model_used or "non spécifié",
-                    batch_size,
-                )
-
-                for i in range(0, len(unmapped), batch_size):
-                    batch = unmapped[i : i + batch_size]
-                    llm_batches_total += 1
-
-                    try:
-                        suggestions = llm_client_to_use.suggest_mappings(batch, known_categories)
-                        llm_batches_succeeded += 1
-
-                        if suggestions:
-                            llm_provider_used = llm_client_to_use.provider_name
-
-                        logger.debug(
-                            "LegacyImport analyze: appel LLM pour batch de %d catégories (exemples=%s)",
-                            len(batch),
-                            batch[:5],
-                        )
-
-                        for source_name in batch:
-                            suggestion = suggestions.get(source_name)
-                            if not suggestion:
-                                remaining_unmapped.append(source_name)
-                                continue
-
-                            target_name = suggestion.get("target_name")
-                            confidence = float(suggestion.get("confidence", 0.0))
-
-                            # Clamp du score dans [0, 100]
-                            if confidence < 0:
-                                confidence = 0.0
-                            if confidence > 100:
-                                confidence = 100.0
-
-                            llm_confidences.append(confidence)
-
-                            # Retrouver la catégorie cible correspondante
-                            target = next(
-                                (c for c in self._load_categories() if c["name"] == target_name),
-                                None,
-                            )
-                            if not target:
-                                remaining_unmapped.append(source_name)
-                                continue
-
-                            mappings[source_name] = {
-                                "category_id": target["id"],
-                                "category_name": target["name"],
-                                "confidence": round(confidence, 2),
-                            }
-                            llm_mapped_count += 1
-
-                            # Stocker dans le cache pour réutilisation future
-                            try:
-                                self._store_mapping_in_cache(
-                                    source_name=source_name,
-                                    target_category_id=UUID(target["id"]),
-                                    provider=llm_client_to_use.provider_name,
-                                    confidence=confidence,
-                                )
-                            except Exception:
-                                # Toute erreur est déjà loggée en interne
-                                pass
-
-                    except Exception as batch_exc:  # noqa: BLE001
-                        llm_batches_failed += 1
-                        error_msg = str(batch_exc)
-                        # Tronquer l'erreur à 200 caractères
-                        if len(error_msg) > 200:
-                            error_msg = error_msg[:200]
-                        llm_last_error = error_msg
-
-                        logger.error(
-                            "LegacyImport analyze: erreur lors du batch LLM %d/%d: %s",
-                            i // batch_size + 1,
-                            (len(unmapped) + batch_size - 1) // batch_size,
-                            batch_exc,
-                            exc_info=True,
-                        )
-                        # En cas d'erreur batch, toutes les catégories du batch restent unmapped
-                        remaining_unmapped.extend(batch)
-
-                logger.info(
-                    "LegacyImport analyze: %d catégories mappées par LLM, %d restantes unmapped "
-                    "(batches: %d réussis, %d échoués)",
-                    llm_mapped_count,
-                    len(remaining_unmapped),
-                    llm_batches_succeeded,
-                    llm_batches_failed,
+                llm_run = self._run_llm_batches(
+                    llm_client_to_use, unmapped, "LegacyImport analyze"
                 )
-
-                unmapped = remaining_unmapped
+                mappings.update(llm_run["mappings"])
+                llm_mapped_count = len(llm_run["mappings"])
+                llm_batches_total = llm_run["batches_total"]
+                llm_batches_succeeded = llm_run["batches_succeeded"]
+                llm_batches_failed = llm_run["batches_failed"]
+                llm_last_error = llm_run["last_error"]
+                llm_confidences = llm_run["confidences"]
+                llm_provider_used = llm_run["provider_used"]
+                unmapped = llm_run["remaining"]
 
             except Exception as exc:  # noqa: BLE001
                 # Best-effort : logguer mais ne pas casser l'analyse
@@ -871,92 +884,18 @@ class LegacyImportService:
         remaining_unmapped: List[str] = []
 
         try:
-            known_categories = [c["name"] for c in self._load_categories()]
-            batch_size = settings.LEGACY_IMPORT_LLM_BATCH_SIZE or 20
-            batch_size = max(1, batch_size)
-
-            logger.info(
-                "LegacyImport analyze_llm_only: %d catégories à mapper via LLM (model=%s, batch_size=%d)",
-                len(unmapped_categories),
-                llm_model_used or "non spécifié",
-                batch_size,
-            )
-
-            for i in range(0, len(unmapped_categories), batch_size):
-                batch = unmapped_categories[i : i + batch_size]
-                llm_batches_total += 1
-
-                try:
-                    suggestions = llm_client_to_use.suggest_mappings(batch, known_categories)
-                    llm_batches_succeeded += 1
-
-                    if suggestions:
-                        llm_provider_used = llm_client_to_use.provider_name
-
-                    for source_name in batch:
-                        suggestion = suggestions.get(source_name)
-                        if not suggestion:
-                            remaining_unmapped.append(source_name)
-                            continue
-
-                        target_name = suggestion.get("target_name")
-                        confidence = float(suggestion.get("confidence", 0.0))
-
-                        if confidence < 0:
-                            confidence = 0.0
-                        if confidence > 100:
-                            confidence = 100.0
-
-                        llm_confidences.append(confidence)
-
-                        target = next(
-                            (c for c in self._load_categories() if c["name"] == target_name),
-                            None,
-                        )
-                        if not target:
-                            remaining_unmapped.append(source_name)
-                            continue
-
-                        mappings[source_name] = {
-                            "category_id": target["id"],
-                            "category_name": target["name"],
-                            "confidence": round(confidence, 2),
-                        }
-                        llm_mapped_count += 1
-
-                        try:
-                            self._store_mapping_in_cache(
-                                source_name=source_name,
-                                target_category_id=UUID(target["id"]),
-                                provider=llm_client_to_use.provider_name,
-                                confidence=confidence,
-                            )
-                        except Exception:
-                            pass
-
-                except Exception as batch_exc:  # noqa: BLE001
-                    llm_batches_failed += 1
-                    error_msg = str(batch_exc)
-                    if len(error_msg) > 200:
-                        error_msg = error_msg[:200]
-                    llm_last_error = error_msg
-
-                    logger.error(
-                        "LegacyImport analyze_llm_only: erreur lors du batch LLM %d: %s",
-                        i // batch_size + 1,
-                        batch_exc,
-                        exc_info=True,
-                    )
-                    remaining_unmapped.extend(batch)
-
-            logger.info(
-                "LegacyImport analyze_llm_only: %d catégories mappées par LLM, %d restantes "
-                "(batches: %d réussis, %d échoués)",
-                llm_mapped_count,
-                len(remaining_unmapped),
-                llm_batches_succeeded,
-                llm_batches_failed,
+            llm_run = self._run_llm_batches(
+                llm_client_to_use, unmapped_categories, "LegacyImport analyze_llm_only"
             )
+            mappings = llm_run["mappings"]
+            llm_mapped_count = len(mappings)
+            llm_batches_total = llm_run["batches_total"]
+            llm_batches_succeeded = llm_run["batches_succeeded"]
+            llm_batches_failed = llm_run["batches_failed"]
+            llm_last_error = llm_run["last_error"]
+            llm_confidences = llm_run["confidences"]
+            llm_provider_used = llm_run["provider_used"]
+            remaining_unmapped = llm_run["remaining"]
 
         except Exception as exc:  # noqa: BLE001
             error_msg = str(exc)
@@ -1000,6 +939,9 @@ class LegacyImportService:
         """
         Récupère ou crée un poste de réception pour une date donnée.
         
+        Le poste créé est seulement flushé (pas de commit) : il fait partie de la
+        transaction globale de l'import.
+        
         Args:
             date_obj: Date du poste
             admin_user_id: ID de l'utilisateur admin qui importe
@@ -1030,13 +972,47 @@ class LegacyImportService:
         if existing_poste:
             return existing_poste, False
         
-        # Créer un nouveau poste
-        new_poste = self.reception_service.open_poste(
+        # Même règle que ReceptionService.open_poste : pas de date dans le futur
+        if opened_at > datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La date d'ouverture ne peut pas être dans le futur"
+            )
+        
+        new_poste = PosteReception(
             opened_by_user_id=admin_user_id,
+            status=PosteReceptionStatus.OPENED.value,
             opened_at=opened_at
         )
+        self.db.add(new_poste)
+        self.db.flush()
         return new_poste, True
 
+    def _create_import_ticket(self, poste: PosteReception, admin_user_id: UUID) -> TicketDepot:
+        """
+        Crée le ticket d'import d'un poste (flush sans commit).
+        
+        Comme ReceptionService.create_ticket, un poste différé (date passée)
+        donne sa date d'ouverture au ticket.
+        """
+        ticket_created_at = None
+        if poste.opened_at:
+            poste_opened_at = poste.opened_at
+            if poste_opened_at.tzinfo is None:
+                poste_opened_at = poste_opened_at.replace(tzinfo=timezone.utc)
+            if poste_opened_at < datetime.now(timezone.utc):
+                ticket_created_at = poste_opened_at
+        
+        ticket = TicketDepot(
+            poste_id=poste.id,
+            benevole_user_id=admin_user_id,
+            status=TicketDepotStatus.OPENED.value,
+            created_at=ticket_created_at
+        )
+        self.db.add(ticket)
+        self.db.flush()
+        return ticket
+
     def execute(
         self, 
         file_bytes: bytes, 
@@ -1066,22 +1042,26 @@ class LegacyImportService:
         mappings = mapping_json["mappings"]
         unmapped = mapping_json.get("unmapped", [])
         
-        # Valider que tous les category_id existent en base
-        category_ids = [m["category_id"] for m in mappings.values() if "category_id" in m]
-        for cat_id_str in category_ids:
+        # Valider que tous les category_id existent en base (une seule requête IN)
+        category_ids: Dict[str, UUID] = {}
+        for m in mappings.values():
+            if "category_id" not in m:
+                continue
+            cat_id_str = m["category_id"]
             try:
-                cat_id = UUID(cat_id_str)
-                cat = self.db.query(Category).filter(Category.id == cat_id, Category.is_active == True).first()
-                if not cat:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"category_id invalide ou catégorie inactive: {cat_id_str}"
-                    )
+                category_ids[cat_id_str] = UUID(cat_id_str)
             except ValueError:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Format UUID invalide: {cat_id_str}"
                 )
+        active_ids = self.reception_service.category_repo.get_active_ids(category_ids.values())
+        for cat_id_str, cat_id in category_ids.items():
+            if cat_id not in active_ids:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"category_id invalide ou catégorie inactive: {cat_id_str}"
+                )
         
         # Décoder et parser le CSV
         try:
@@ -1147,85 +1127,64 @@ class LegacyImportService:
                 errors.append(f"L{idx}: Poids invalide (doit être > 0): {poids_str}")
                 continue
             
+            mapped_category_id = category_ids.get(mappings[category].get("category_id", ""))
+            if mapped_category_id is None:
+                errors.append(f"L{idx}: Catégorie sans category_id dans le mapping: {category}")
+                continue
+            
+            try:
+                dest_value = DBLigneDestination(destination if destination else "MAGASIN")
+            except ValueError:
+                errors.append(f"L{idx}: Destination invalide: {destination}")
+                continue
+            
             # Ajouter la ligne à la liste
             all_rows.append({
                 "category": category,
-                "category_id": UUID(mappings[category]["category_id"]),
+                "category_id": mapped_category_id,
                 "poids_kg": poids,
-                "destination": destination if destination else "MAGASIN",
+                "destination": dest_value,
                 "notes": notes if notes else None,
                 "parsed_date": parsed_date  # Pour le groupement si pas d'import_date
             })
         
-        # Transaction: tout ou rien
+        # Grouper par date : une seule date si import_date est fourni (B47-P11),
+        # sinon la date du CSV (comportement historique)
+        rows_by_date: Dict[date, List[Dict[str, Any]]] = {}
+        for row in all_rows:
+            rows_by_date.setdefault(import_date or row["parsed_date"], []).append(row)
+        if import_date and not rows_by_date:
+            rows_by_date[import_date] = []
+        
+        # Transaction: tout ou rien. Postes et tickets sont flushés, les lignes
+        # insérées par lots, et un unique commit clôt l'import.
         try:
-            if import_date:
-                # Mode date unique : créer un seul poste/ticket (B47-P11)
-                poste, is_new = self._get_or_create_poste_for_date(import_date, admin_user_id)
+            for date_obj, rows in rows_by_date.items():
+                # Récupérer ou créer le poste pour cette date
+                poste, is_new = self._get_or_create_poste_for_date(date_obj, admin_user_id)
                 if is_new:
                     postes_created += 1
                 else:
                     postes_reused += 1
                 
-                # Créer un seul ticket pour cette date
-                ticket = self.reception_service.create_ticket(
-                    poste_id=poste.id,
-                    benevole_user_id=admin_user_id
-                )
+                # Créer un ticket pour cette date
+                ticket = self._create_import_ticket(poste, admin_user_id)
                 tickets_created += 1
                 
-                # Associer toutes les lignes à ce ticket unique
-                for row in all_rows:
-                    try:
-                        ligne = self.reception_service.create_ligne(
-                            ticket_id=ticket.id,
-                            category_id=row["category_id"],
-                            poids_kg=row["poids_kg"],
-                            destination=row["destination"],
-                            notes=row["notes"]
-                        )
-                        lignes_imported += 1
-                    except Exception as e:
-                        errors.append(f"Ligne {row}: Erreur lors de la création: {str(e)}")
-            else:
-                # Mode normal : grouper par date du CSV (comportement actuel)
-                rows_by_date: Dict[date, List[Dict[str, Any]]] = {}
-                for row in all_rows:
-                    date_obj = row["parsed_date"]
-                    if date_obj not in rows_by_date:
-                        rows_by_date[date_obj] = []
-                    rows_by_date[date_obj].append(row)
-                
-                # Créer postes et tickets par date
-                for date_obj, rows in rows_by_date.items():
-                    # Récupérer ou créer le poste pour cette date
-                    poste, is_new = self._get_or_create_poste_for_date(date_obj, admin_user_id)
-                    if is_new:
-                        postes_created += 1
-                    else:
-                        postes_reused += 1
-                    
-                    # Créer un ticket pour cette date
-                    ticket = self.reception_service.create_ticket(
-                        poste_id=poste.id,
-                        benevole_user_id=admin_user_id
-                    )
-                    tickets_created += 1
-                    
-                    # Créer les lignes
-                    for row in rows:
-                        try:
-                            # create_ligne accepte une string pour destination et la convertit en enum
-                            ligne = self.reception_service.create_ligne(
-                                ticket_id=ticket.id,
-                                category_id=row["category_id"],
-                                poids_kg=row["poids_kg"],
-                                destination=row["destination"],
-                                notes=row["notes"]
-                            )
-                            lignes_imported += 1
-                        except Exception as e:
-                            errors.append(f"Ligne {row}: Erreur lors de la création: {str(e)}")
+                lignes_imported += self.reception_service.ligne_repo.bulk_insert(
+                    (
+                        {
+                            "ticket_id": ticket.id,
+                            "category_id": row["category_id"],
+                            "poids_kg": row["poids_kg"],
+                            "destination": row["destination"],
+                            "notes": row["notes"],
+                            "is_exit": False,
+                        }
+                        for row in rows
+                    ),
+                    batch_size=self.BULK_INSERT_BATCH_SIZE,
+                )
             
             # Commit final
             self.db.commit()
@@ -0,0 +1,172 @@
+"""
+Envoi concurrent des batches de catégories legacy au LLM (B47-P5).
+
+Les batches partent en parallèle (concurrence bornée) sur un client HTTP
+asynchrone partagé, avec timeout et nouvelles tentatives (backoff exponentiel
++ jitter) par batch. Chaque résultat est remis au callback `on_batch` dès son
+arrivée, ce qui permet de persister les mappings au fil de l'eau.
+
+Les clients qui n'implémentent que `suggest_mappings` (synchrone) sont appelés
+dans des threads, avec la même concurrence bornée.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import httpx
+
+from recyclic_api.core.config import settings
+from recyclic_api.services.llm_category_mapping_client import (
+    CategoryMappingLike,
+    LLMCategoryMappingClient,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class LLMBatchOutcome:
+    """Résultat d'un batch : suggestions reçues ou dernière erreur rencontrée."""
+
+    index: int
+    batch: List[str]
+    suggestions: Dict[str, CategoryMappingLike] = field(default_factory=dict)
+    error: Optional[str] = None
+    attempts: int = 0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+BatchCallback = Callable[[LLMBatchOutcome], None]
+
+
+def run_coroutine_sync(factory: Callable[[], Awaitable[T]]) -> T:
+    """
+    Exécute une coroutine depuis du code synchrone.
+
+    Si une boucle tourne déjà dans ce thread (handler async), la coroutine est
+    exécutée dans un thread dédié pour ne pas imbriquer les boucles.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(factory())
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-dispatch") as executor:
+        return executor.submit(lambda: asyncio.run(factory())).result()
+
+
+class LLMBatchDispatcher:
+    """Répartit des batches de catégories sur un client LLM avec concurrence bornée."""
+
+    def __init__(
+        self,
+        client: LLMCategoryMappingClient,
+        concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay_seconds: Optional[float] = None,
+        http_client_factory: Optional[Callable[[], httpx.AsyncClient]] = None,
+    ) -> None:
+        self._client = client
+        self._concurrency = max(1, concurrency or settings.LEGACY_IMPORT_LLM_CONCURRENCY)
+        self._timeout_seconds = timeout_seconds or settings.LEGACY_IMPORT_LLM_BATCH_TIMEOUT_SECONDS
+        self._max_retries = max(0, settings.LEGACY_IMPORT_LLM_MAX_RETRIES if max_retries is None else max_retries)
+        self._retry_base_delay = (
+            settings.LEGACY_IMPORT_LLM_RETRY_BASE_DELAY_SECONDS
+            if retry_base_delay_seconds is None
+            else retry_base_delay_seconds
+        )
+        self._http_client_factory = http_client_factory or self._default_http_client
+
+    def _default_http_client(self) -> httpx.AsyncClient:
+        # Un pool de connexions keep-alive partagé par tous les batches de l'analyse
+        return httpx.AsyncClient(
+            timeout=self._timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self._concurrency,
+                max_keepalive_connections=self._concurrency,
+            ),
+        )
+
+    def dispatch(
+        self,
+        batches: List[List[str]],
+        known_categories: List[str],
+        on_batch: Optional[BatchCallback] = None,
+    ) -> List[LLMBatchOutcome]:
+        """Version synchrone de `adispatch` (utilisée par LegacyImportService)."""
+        return run_coroutine_sync(lambda: self.adispatch(batches, known_categories, on_batch))
+
+    async def adispatch(
+        self,
+        batches: List[List[str]],
+        known_categories: List[str],
+        on_batch: Optional[BatchCallback] = None,
+    ) -> List[LLMBatchOutcome]:
+        """Envoie tous les batches et retourne leurs résultats dans l'ordre d'origine."""
+        if not batches:
+            return []
+
+        semaphore = asyncio.Semaphore(self._concurrency)
+        supports_async = callable(getattr(self._client, "asuggest_mappings", None))
+
+        async with self._http_client_factory() as http_client:
+
+            async def _call(batch: List[str]) -> Dict[str, CategoryMappingLike]:
+                if supports_async:
+                    return await self._client.asuggest_mappings(batch, known_categories, http_client=http_client)
+                return await asyncio.to_thread(self._client.suggest_mappings, batch, known_categories)
+
+            async def _run(index: int, batch: List[str]) -> LLMBatchOutcome:
+                outcome = LLMBatchOutcome(index=index, batch=batch)
+                async with semaphore:
+                    while True:
+                        outcome.attempts += 1
+                        try:
+                            outcome.suggestions = await asyncio.wait_for(_call(batch), self._timeout_seconds) or {}
+                            outcome.error = None
+                            break
+                        except Exception as exc:  # noqa: BLE001 - erreur conservée sur le batch
+                            outcome.error = self._describe(exc)
+                            if outcome.attempts > self._max_retries:
+                                break
+                            delay = self._retry_base_delay * (2 ** (outcome.attempts - 1))
+                            delay += random.uniform(0, self._retry_base_delay or 0)
+                            logger.warning(
+                                "LLM batch %d (%d catégories) en échec (tentative %d/%d): %s – nouvel essai dans %.2fs",
+                                index + 1,
+                                len(batch),
+                                outcome.attempts,
+                                self._max_retries + 1,
+                                outcome.error,
+                                delay,
+                            )
+                            await asyncio.sleep(delay)
+
+                if on_batch is not None:
+                    try:
+                        on_batch(outcome)
+                    except Exception as exc:  # noqa: BLE001 - la persistance est best-effort
+                        logger.error("Traitement du batch LLM %d en échec: %s", index + 1, exc, exc_info=True)
+                return outcome
+
+            tasks = [asyncio.create_task(_run(index, batch)) for index, batch in enumerate(batches)]
+            return list(await asyncio.gather(*tasks))
+
+    @staticmethod
+    def _describe(exc: BaseException) -> str:
+        if isinstance(exc, asyncio.TimeoutError):
+            return "Timeout de l'appel LLM"
+        message = str(exc) or type(exc).__name__
+        return message[:200]
@@ -13,7 +13,7 @@ afin de respecter le caractère "best-effort" du fallback LLM.
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 import json
 
 import httpx
@@ -47,17 +47,7 @@ class OpenRouterCategoryMappingClient(LLMCategoryMappingClient):
     def provider_name(self) -> str:
         return "llm-openrouter"
 
-    def suggest_mappings(
-        self,
-        unmapped: List[str],
-        known_categories: List[str],
-    ) -> Dict[str, CategoryMappingLike]:
-        """
-        Propose des mappings via OpenRouter.
-
-        Retourne un dict {source_name: {"target_name": str, "confidence": float}}.
-        """
-        # Si pas de clé ou de modèle configuré, ne rien faire.
+    def _is_configured(self) -> bool:
         if not self._api_key or not self._model:
             logger.info(
                 "OpenRouterCategoryMappingClient désactivé (clé ou modèle manquant). "
@@ -65,14 +55,15 @@ class OpenRouterCategoryMappingClient(LLMCategoryMappingClient):
                 bool(self._api_key),
                 self._model,
             )
-            return {}
-
-        if not unmapped:
-            logger.debug(
-                "OpenRouterCategoryMappingClient.suggest_mappings appelé avec unmapped=[] – rien à faire."
-            )
-            return {}
+            return False
+        return True
 
+    def _build_request(
+        self,
+        unmapped: List[str],
+        known_categories: List[str],
+    ) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """Construit (url, body, headers) de l'appel chat/completions."""
         request = LLMCategoryMappingRequest(
             known_categories=known_categories,
             unmapped_categories=unmapped,
@@ -125,6 +116,29 @@ class OpenRouterCategoryMappingClient(LLMCategoryMappingClient):
             len(unmapped),
             len(known_categories),
         )
+        return url, body, headers
+
+    def suggest_mappings(
+        self,
+        unmapped: List[str],
+        known_categories: List[str],
+    ) -> Dict[str, CategoryMappingLike]:
+        """
+        Propose des mappings via OpenRouter.
+
+        Retourne un dict {source_name: {"target_name": str, "confidence": float}}.
+        """
+        # Si pas de clé ou de modèle configuré, ne rien faire.
+        if not self._is_configured():
+            return {}
+
+        if not unmapped:
+            logger.debug(
+                "OpenRouterCategoryMappingClient.suggest_mappings appelé avec unmapped=[] – rien à faire."
+            )
+            return {}
+
+        url, body, headers = self._build_request(unmapped, known_categories)
 
         try:
             with httpx.Client(timeout=self._timeout_seconds) as client:
@@ -146,6 +160,37 @@ class OpenRouterCategoryMappingClient(LLMCategoryMappingClient):
             )
             return {}
 
+        return self._parse_response(response, len(unmapped))
+
+    async def asuggest_mappings(
+        self,
+        unmapped: List[str],
+        known_categories: List[str],
+        http_client: Optional[httpx.AsyncClient] = None,
+    ) -> Dict[str, CategoryMappingLike]:
+        """
+        Variante asynchrone utilisée par `LLMBatchDispatcher`, sur un client HTTP partagé.
+
+        Contrairement à `suggest_mappings`, les erreurs réseau et HTTP sont
+        propagées afin que le dispatcher puisse retenter le batch ; une réponse
+        mal formée retourne toujours un dict vide.
+        """
+        if not self._is_configured() or not unmapped:
+            return {}
+
+        url, body, headers = self._build_request(unmapped, known_categories)
+
+        if http_client is None:
+            async with httpx.AsyncClient(timeout=self._timeout_seconds) as client:
+                response = await client.post(url, json=body, headers=headers)
+        else:
+            response = await http_client.post(url, json=body, headers=headers)
+        response.raise_for_status()
+
+        return self._parse_response(response, len(unmapped))
+
+    def _parse_response(self, response: Any, unmapped_count: int) -> Dict[str, CategoryMappingLike]:
+        """Extrait les mappings d'une réponse chat/completions (dict vide si mal formée)."""
         try:
             data = response.json()
             logger.debug(
@@ -204,7 +249,7 @@ class OpenRouterCategoryMappingClient(LLMCategoryMappingClient):
             logger.info(
                 "OpenRouterCategoryMappingClient: %d mappings proposés par le LLM pour %d entrées unmapped.",
                 len(result),
-                len(unmapped),
+                unmapped_count,
             )
 
             return result
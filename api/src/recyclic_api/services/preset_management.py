@@ -14,6 +14,7 @@ from ..schemas.preset_button import (
     PresetButtonWithCategory
 )
 from .category_service import CategoryService
+from .catalogue_cache import invalidate_catalogue
 
 
 class PresetManagementService:
@@ -23,6 +24,11 @@ class PresetManagementService:
         self.db = db
         self.category_service = CategoryService(db)
 
+    def _commit(self) -> None:
+        """Commit and invalidate the cached catalogue responses of every worker"""
+        self.db.commit()
+        invalidate_catalogue()
+
     async def create_preset_button(self, preset_data: PresetButtonCreate) -> PresetButtonRead:
         """Create a new preset button with category validation"""
 
@@ -47,7 +53,7 @@ class PresetManagementService:
         self.db.add(new_preset)
 
         try:
-            self.db.commit()
+            self._commit()
             self.db.refresh(new_preset)
         except IntegrityError:
             self.db.rollback()
@@ -147,7 +153,7 @@ class PresetManagementService:
                     setattr(preset, key, value)
 
             try:
-                self.db.commit()
+                self._commit()
                 self.db.refresh(preset)
             except IntegrityError:
                 self.db.rollback()
@@ -170,7 +176,7 @@ class PresetManagementService:
 
         # Soft delete
         preset.is_active = False
-        self.db.commit()
+        self._commit()
         self.db.refresh(preset)
 
         return True
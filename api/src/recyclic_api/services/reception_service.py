@@ -24,6 +24,7 @@ from recyclic_api.repositories.reception import (
     LigneDepotRepository,
     CategoryRepository,
 )
+from recyclic_api.utils.pagination import COUNT_EXACT, KeysetPage, count_rows, fetch_keyset_page
 
 
 class ReceptionService:
@@ -301,8 +302,72 @@ class ReceptionService:
         lignes_max: Optional[int] = None,
     ) -> Tuple[List[TicketDepot], int]:
         """Récupérer la liste paginée des tickets avec leurs informations de base."""
-        offset = (page - 1) * per_page
-        
+        result = self.get_tickets_page(
+            page=page,
+            per_page=per_page,
+            status=status,
+            date_from=date_from,
+            date_to=date_to,
+            benevole_id=benevole_id,
+            search=search,
+            include_empty=include_empty,
+            poids_min=poids_min,
+            poids_max=poids_max,
+            categories=categories,
+            destinations=destinations,
+            lignes_min=lignes_min,
+            lignes_max=lignes_max,
+        )
+        return result.items, result.total
+
+    def get_tickets_page(
+        self,
+        page: int = 1,
+        per_page: int = 10,
+        cursor: Optional[str] = None,
+        count_mode: str = COUNT_EXACT,
+        **filters,
+    ) -> KeysetPage[TicketDepot]:
+        """
+        Page de tickets triés par (created_at, id) décroissants.
+
+        Avec `cursor`, la page est lue par clé (coût constant en profondeur) ;
+        sinon par numéro de page. Le total est exact ou estimé selon `count_mode`.
+        Les filtres sont ceux de `build_tickets_query`.
+        """
+        query = self.build_tickets_query(**filters)
+
+        tickets, next_cursor = fetch_keyset_page(
+            query,
+            TicketDepot.created_at,
+            TicketDepot.id,
+            per_page,
+            cursor=cursor,
+            offset=(page - 1) * per_page,
+        )
+        total, estimated = count_rows(self.db, query, count_mode)
+        if estimated:
+            total = max(total, len(tickets))
+
+        return KeysetPage(tickets, total, next_cursor, estimated)
+
+    def build_tickets_query(
+        self,
+        status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        benevole_id: Optional[UUID] = None,
+        search: Optional[str] = None,
+        include_empty: bool = False,
+        # B45-P2: Filtres avancés
+        poids_min: Optional[float] = None,
+        poids_max: Optional[float] = None,
+        categories: Optional[List[UUID]] = None,
+        destinations: Optional[List[str]] = None,
+        lignes_min: Optional[int] = None,
+        lignes_max: Optional[int] = None,
+    ):
+        """Construire la requête filtrée des tickets, triée par date de création décroissante."""
         # Requête avec eager loading pour éviter les N+1 queries
         query = self.db.query(TicketDepot).options(
             selectinload(TicketDepot.benevole),
@@ -414,14 +479,8 @@ class ReceptionService:
                 query = query.filter(lignes_count_subq.c.lignes_count >= lignes_min)
             if lignes_max is not None:
                 query = query.filter(lignes_count_subq.c.lignes_count <= lignes_max)
-        
-        # Compter le total
-        total = query.count()
-        
-        # Récupérer les tickets paginés
-        tickets = query.offset(offset).limit(per_page).all()
-        
-        return tickets, total
+
+        return query
 
     def get_ticket_detail(self, ticket_id: UUID) -> Optional[TicketDepot]:
         """Récupérer les détails complets d'un ticket avec ses lignes."""
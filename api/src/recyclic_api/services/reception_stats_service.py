@@ -3,14 +3,20 @@ Service for live reception statistics aggregation.
 """
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
 from typing import Optional, Literal, Dict, Any
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc
+from sqlalchemy import func, and_, or_, select, distinct
 from prometheus_client import Counter, Histogram
 
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+
 from recyclic_api.models.ticket_depot import TicketDepot, TicketDepotStatus
 from recyclic_api.models.ligne_depot import LigneDepot
 from recyclic_api.models.sale import Sale
@@ -31,6 +37,69 @@ _stats_errors = Counter(
     'reception_live_stats_errors_total',
     'Total number of errors during stats calculation'
 )
+_stats_cache_hits = Counter(
+    'reception_live_stats_cache_hits_total',
+    'Number of live stats requests served from the shared cache',
+    ['kind']
+)
+_stats_cache_misses = Counter(
+    'reception_live_stats_cache_misses_total',
+    'Number of live stats requests that required a computation',
+    ['kind']
+)
+
+logger = logging.getLogger(__name__)
+
+LIVE_STATS_CACHE_KEY_PREFIX = "live_stats"
+# Champs datetime sérialisés en ISO 8601 dans le cache
+_DATETIME_FIELDS = ("period_start", "period_end")
+
+
+def _live_stats_cache_key(kind: str, site_id: Optional[str], window: str) -> str:
+    return f"{LIVE_STATS_CACHE_KEY_PREFIX}:{kind}:{site_id or 'all'}:{window}"
+
+
+def _get_cached_stats(key: str, kind: str) -> Optional[Dict[str, Any]]:
+    """
+    Lit des stats depuis le cache Redis partagé.
+
+    Tous les écrans admin qui interrogent le même site et la même fenêtre partagent
+    une seule entrée : une seule agrégation SQL par intervalle de TTL.
+    Retourne None si le cache est désactivé, vide ou indisponible.
+    """
+    if settings.LIVE_STATS_CACHE_TTL_SECONDS <= 0:
+        return None
+    try:
+        cached = get_redis().get(key)
+    except Exception as exc:
+        logger.debug("Live stats cache unavailable: %s", exc)
+        cached = None
+    if cached is None:
+        _stats_cache_misses.labels(kind=kind).inc()
+        return None
+    try:
+        stats = json.loads(cached)
+        for field in _DATETIME_FIELDS:
+            if field in stats:
+                stats[field] = datetime.fromisoformat(stats[field])
+    except (TypeError, ValueError):
+        _stats_cache_misses.labels(kind=kind).inc()
+        return None
+    _stats_cache_hits.labels(kind=kind).inc()
+    return stats
+
+
+def _set_cached_stats(key: str, stats: Dict[str, Any]) -> None:
+    if settings.LIVE_STATS_CACHE_TTL_SECONDS <= 0:
+        return
+    payload = {
+        k: v.isoformat() if isinstance(v, datetime) else v
+        for k, v in stats.items()
+    }
+    try:
+        get_redis().set(key, json.dumps(payload), ex=settings.LIVE_STATS_CACHE_TTL_SECONDS)
+    except Exception as exc:
+        logger.debug("Failed to cache live stats: %s", exc)
 
 
 class ReceptionLiveStatsService:
@@ -67,47 +136,33 @@ class ReceptionLiveStatsService:
         if site_id is not None and not isinstance(site_id, str):
             raise ValueError("site_id must be a string or None")
 
+        _stats_requests.inc()
+        cache_key = _live_stats_cache_key("reception", site_id, "24h")
+        cached = _get_cached_stats(cache_key, "reception")
+        if cached is not None:
+            return cached
+
         with _stats_duration.time():
             try:
-                _stats_requests.inc()
-
                 # Calculate time threshold (24 hours ago)
                 threshold_24h = datetime.now(timezone.utc) - timedelta(hours=24)
-                
+
                 # Calculate start of today (00:00:00) to exclude deferred tickets/sessions
                 # This ensures that only tickets/sessions opened today are included in live stats
                 now = datetime.now(timezone.utc)
                 start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
 
-                # 1. Count open tickets (exclude deferred tickets)
-                tickets_open = self._count_open_tickets(site_id, start_of_today)
-
-                # 2. Count tickets closed in last 24h (exclude deferred tickets)
-                tickets_closed_24h = self._count_closed_tickets_24h(site_id, threshold_24h, start_of_today)
-
-                # 3. Count items/lines received (from closed tickets in 24h, exclude deferred)
-                items_received = self._count_items_received_24h(site_id, threshold_24h, start_of_today)
-
-                # 4. Calculate turnover (sales in last 24h, exclude deferred sessions)
-                turnover_eur = self._calculate_turnover_24h(site_id, threshold_24h, start_of_today)
-
-                # 5. Calculate donations (from sales in last 24h, exclude deferred sessions)
-                donations_eur = self._calculate_donations_24h(site_id, threshold_24h, start_of_today)
-
-                # 6. Calculate weight received (open tickets + closed in 24h, exclude deferred)
-                weight_in = self._calculate_weight_in(site_id, threshold_24h, start_of_today)
-
-                # 7. Calculate weight sold (from sales in last 24h, exclude deferred sessions)
-                weight_out = self._calculate_weight_out(site_id, threshold_24h, start_of_today)
-
-                return {
-                    "tickets_open": tickets_open,
-                    "tickets_closed_24h": tickets_closed_24h,
-                    "items_received": items_received,
-                    "turnover_eur": float(turnover_eur),
-                    "donations_eur": float(donations_eur),
-                    "weight_in": float(weight_in),
-                    "weight_out": float(weight_out),
+                # Deux requêtes agrégées au lieu d'une requête par KPI
+                reception, sales = await self._run_aggregations(site_id, threshold_24h, start_of_today)
+
+                stats = {
+                    "tickets_open": reception["tickets_open"],
+                    "tickets_closed_24h": reception["tickets_closed"],
+                    "items_received": reception["items_received"],
+                    "turnover_eur": float(sales["turnover"]),
+                    "donations_eur": float(sales["donations"]),
+                    "weight_in": float(reception["weight_in"]),
+                    "weight_out": float(sales["weight_sold"] + reception["weight_exit"]),
                 }
 
             except Exception as e:
@@ -115,179 +170,115 @@ class ReceptionLiveStatsService:
                 # Re-raise with more context for debugging
                 raise RuntimeError(f"Failed to calculate live reception stats: {str(e)}") from e
 
-    def _count_open_tickets(self, site_id: Optional[str], start_of_today: datetime) -> int:
-        """Count currently open tickets, excluding deferred tickets (tickets from posts opened in the past)."""
-        query = self.db.query(func.count(TicketDepot.id)).join(
-            PosteReception, TicketDepot.poste_id == PosteReception.id
-        ).filter(
-            and_(
-                TicketDepot.status == TicketDepotStatus.OPENED.value,
-                # Exclude deferred tickets: only include tickets from posts opened today
-                PosteReception.opened_at >= start_of_today
-            )
-        )
-
-        # Note: site filtering not implemented yet as tickets don't have direct site relationship
-        # This will be added when multi-site support is implemented
-
-        return query.scalar() or 0
-
-    def _count_closed_tickets_24h(self, site_id: Optional[str], threshold: datetime, start_of_today: datetime) -> int:
-        """Count tickets closed within the last 24 hours, excluding deferred tickets."""
-        query = self.db.query(func.count(TicketDepot.id)).join(
-            PosteReception, TicketDepot.poste_id == PosteReception.id
-        ).filter(
-            and_(
-                TicketDepot.status == TicketDepotStatus.CLOSED.value,
-                TicketDepot.closed_at.isnot(None),
-                TicketDepot.closed_at >= threshold,
-                # Exclude deferred tickets: only include tickets from posts opened today
-                PosteReception.opened_at >= start_of_today
+        _set_cached_stats(cache_key, stats)
+        return stats
+
+    async def _run_aggregations(
+        self, site_id: Optional[str], threshold: datetime, start_of_today: datetime
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run both aggregation queries in a worker thread: the Session is blocking and must not stall the event loop."""
+        def _aggregate():
+            return (
+                self._aggregate_reception_stats(site_id, threshold, start_of_today),
+                self._aggregate_sales_stats(site_id, threshold, start_of_today),
             )
-        )
-
-        return query.scalar() or 0
-
-    def _count_items_received_24h(self, site_id: Optional[str], threshold: datetime, start_of_today: datetime) -> int:
-        """Count items/lines received from tickets closed in the last 24 hours, excluding deferred tickets."""
-        query = self.db.query(func.count(LigneDepot.id)).join(
-            TicketDepot, LigneDepot.ticket_id == TicketDepot.id
-        ).join(
-            PosteReception, TicketDepot.poste_id == PosteReception.id
-        ).filter(
-            and_(
-                TicketDepot.status == TicketDepotStatus.CLOSED.value,
-                TicketDepot.closed_at.isnot(None),
-                TicketDepot.closed_at >= threshold,
-                # Exclude deferred tickets: only include tickets from posts opened today
-                PosteReception.opened_at >= start_of_today
-            )
-        )
 
-        return query.scalar() or 0
+        return await asyncio.to_thread(_aggregate)
 
-    def _calculate_turnover_24h(self, site_id: Optional[str], threshold: datetime, start_of_today: datetime) -> Decimal:
-        """Calculate total sales amount in EUR for the last 24 hours, excluding sales from deferred sessions."""
-        query = self.db.query(func.coalesce(func.sum(Sale.total_amount), 0)).join(
-            CashSession, Sale.cash_session_id == CashSession.id
-        ).filter(
-            and_(
-                Sale.created_at >= threshold,
-                # Exclude deferred sessions: only include sales from sessions opened today
-                CashSession.opened_at >= start_of_today
-            )
-        )
-
-        # Note: For now, we calculate all sales in the last 24h
-        # In the future, this could be filtered by site if sales are linked to sites
-
-        return Decimal(str(query.scalar() or 0))
+    def _aggregate_reception_stats(self, site_id: Optional[str], threshold: datetime, start_of_today: datetime) -> Dict[str, Any]:
+        """
+        Agrège tous les KPIs réception en une seule requête (FILTER).
 
-    def _calculate_donations_24h(self, site_id: Optional[str], threshold: datetime, start_of_today: datetime) -> Decimal:
-        """Calculate total donations in EUR for the last 24 hours, excluding donations from deferred sessions."""
-        query = self.db.query(func.coalesce(func.sum(Sale.donation), 0)).join(
-            CashSession, Sale.cash_session_id == CashSession.id
-        ).filter(
-            and_(
-                Sale.created_at >= threshold,
-                Sale.donation.isnot(None),
-                # Exclude deferred sessions: only include donations from sessions opened today
-                CashSession.opened_at >= start_of_today
+        Périmètre : tickets ouverts + tickets fermés depuis `threshold`, issus de postes
+        ouverts depuis `start_of_today` (exclusion des tickets différés). Les lignes
+        sont jointes en LEFT OUTER JOIN pour compter aussi les tickets sans ligne.
+        """
+        is_open = TicketDepot.status == TicketDepotStatus.OPENED.value
+        is_closed = TicketDepot.status == TicketDepotStatus.CLOSED.value
+        # Story B48-P3: is_exit IS NULL traité comme une entrée (rétrocompatibilité)
+        is_entry = or_(LigneDepot.is_exit == False, LigneDepot.is_exit.is_(None))
+
+        stmt = (
+            select(
+                func.count(distinct(TicketDepot.id)).filter(is_open),
+                func.count(distinct(TicketDepot.id)).filter(is_closed),
+                func.count(LigneDepot.id).filter(is_closed),
+                func.coalesce(func.sum(LigneDepot.poids_kg).filter(is_entry), 0),
+                func.coalesce(func.sum(LigneDepot.poids_kg).filter(LigneDepot.is_exit == True), 0),
             )
-        )
-
-        return Decimal(str(query.scalar() or 0))
-
-    def _calculate_weight_in(self, site_id: Optional[str], threshold: datetime, start_of_today: datetime) -> Decimal:
-        """Calculate total weight received in kg (open tickets + closed in 24h), excluding deferred tickets and exit lines."""
-        # Story B48-P3: Exclure les lignes avec is_exit=true du calcul weight_in
-        # Rétrocompatibilité: inclure les lignes avec is_exit IS NULL (lignes existantes avant migration)
-        
-        # Get weight from open tickets (exclude deferred and exit lines)
-        open_weight_query = self.db.query(func.coalesce(func.sum(LigneDepot.poids_kg), 0)).join(
-            TicketDepot, LigneDepot.ticket_id == TicketDepot.id
-        ).join(
-            PosteReception, TicketDepot.poste_id == PosteReception.id
-        ).filter(
-            and_(
-                TicketDepot.status == TicketDepotStatus.OPENED.value,
+            .select_from(TicketDepot)
+            .join(PosteReception, TicketDepot.poste_id == PosteReception.id)
+            .outerjoin(LigneDepot, LigneDepot.ticket_id == TicketDepot.id)
+            .where(
                 # Exclude deferred tickets: only include tickets from posts opened today
                 PosteReception.opened_at >= start_of_today,
-                # Story B48-P3: Exclure les sorties (is_exit=true), inclure is_exit IS NULL pour rétrocompatibilité
-                or_(LigneDepot.is_exit == False, LigneDepot.is_exit.is_(None))
+                or_(
+                    is_open,
+                    and_(
+                        is_closed,
+                        TicketDepot.closed_at.isnot(None),
+                        TicketDepot.closed_at >= threshold,
+                    ),
+                ),
             )
         )
+        # Note: site filtering not implemented yet as tickets don't have direct site relationship
 
-        # Get weight from tickets closed in last 24h (exclude deferred and exit lines)
-        closed_weight_query = self.db.query(func.coalesce(func.sum(LigneDepot.poids_kg), 0)).join(
-            TicketDepot, LigneDepot.ticket_id == TicketDepot.id
-        ).join(
-            PosteReception, TicketDepot.poste_id == PosteReception.id
-        ).filter(
-            and_(
-                TicketDepot.status == TicketDepotStatus.CLOSED.value,
-                TicketDepot.closed_at.isnot(None),
-                TicketDepot.closed_at >= threshold,
-                # Exclude deferred tickets: only include tickets from posts opened today
-                PosteReception.opened_at >= start_of_today,
-                # Story B48-P3: Exclure les sorties (is_exit=true), inclure is_exit IS NULL pour rétrocompatibilité
-                or_(LigneDepot.is_exit == False, LigneDepot.is_exit.is_(None))
-            )
-        )
+        tickets_open, tickets_closed, items_received, weight_in, weight_exit = self.db.execute(stmt).one()
+        return {
+            "tickets_open": tickets_open or 0,
+            "tickets_closed": tickets_closed or 0,
+            "items_received": items_received or 0,
+            "weight_in": Decimal(str(weight_in or 0)),
+            "weight_exit": Decimal(str(weight_exit or 0)),
+        }
+
+    def _aggregate_sales_stats(self, site_id: Optional[str], threshold: datetime, start_of_today: datetime) -> Dict[str, Any]:
+        """
+        Agrège tous les KPIs caisse en une seule requête (CTE des ventes de la période).
 
-        open_weight = Decimal(str(open_weight_query.scalar() or 0))
-        closed_weight = Decimal(str(closed_weight_query.scalar() or 0))
-
-        return open_weight + closed_weight
-
-    def _calculate_weight_out(self, site_id: Optional[str], threshold: datetime, start_of_today: datetime) -> Decimal:
-        """Calculate total weight sold in kg from sales in the last 24 hours, plus exit lines from reception, excluding deferred sessions."""
-        # Story B48-P3: weight_out = poids des ventes + poids des lignes avec is_exit=true
-        
-        # 1. Calculer le poids des ventes (comportement existant)
-        poids_ventes_query = self.db.query(func.coalesce(func.sum(SaleItem.weight), 0)).join(
-            Sale, SaleItem.sale_id == Sale.id
-        ).join(
-            CashSession, Sale.cash_session_id == CashSession.id
-        ).filter(
-            and_(
+        Le poids vendu et le montant du dernier ticket sont calculés par sous-requêtes
+        scalaires sur la CTE, pour ne pas dupliquer les ventes via la jointure des lignes.
+        """
+        live_sales = (
+            select(Sale.id, Sale.total_amount, Sale.donation, Sale.created_at)
+            .join(CashSession, Sale.cash_session_id == CashSession.id)
+            .where(
                 Sale.created_at >= threshold,
                 # Exclude deferred sessions: only include sales from sessions opened today
-                CashSession.opened_at >= start_of_today
+                CashSession.opened_at >= start_of_today,
             )
+            .cte("live_sales")
         )
-        poids_ventes = Decimal(str(poids_ventes_query.scalar() or 0))
-        
-        # 2. Calculer le poids des sorties depuis réception (lignes avec is_exit=true)
-        # Appliquer les mêmes filtres de date/threshold que pour weight_in (exclure deferred)
-        poids_exit_reception_query = self.db.query(func.coalesce(func.sum(LigneDepot.poids_kg), 0)).join(
-            TicketDepot, LigneDepot.ticket_id == TicketDepot.id
-        ).join(
-            PosteReception, TicketDepot.poste_id == PosteReception.id
-        ).filter(
-            and_(
-                # Story B48-P3: Inclure uniquement les lignes avec is_exit=true
-                LigneDepot.is_exit == True,
-                # Exclude deferred tickets: only include tickets from posts opened today
-                PosteReception.opened_at >= start_of_today,
-                # Filtrer par date de fermeture du ticket (si fermé) ou date de création (si ouvert)
-                # Pour les tickets ouverts, inclure toutes les lignes sortie
-                # Pour les tickets fermés, inclure uniquement ceux fermés dans les 24h
-                or_(
-                    and_(
-                        TicketDepot.status == TicketDepotStatus.OPENED.value
-                    ),
-                    and_(
-                        TicketDepot.status == TicketDepotStatus.CLOSED.value,
-                        TicketDepot.closed_at.isnot(None),
-                        TicketDepot.closed_at >= threshold
-                    )
-                )
-            )
+        # Note: Sales don't have direct site relationship, site filtering not implemented yet
+
+        last_ticket_amount = (
+            select(live_sales.c.total_amount)
+            .order_by(live_sales.c.created_at.desc())
+            .limit(1)
+            .scalar_subquery()
         )
-        poids_exit_reception = Decimal(str(poids_exit_reception_query.scalar() or 0))
-        
-        return poids_ventes + poids_exit_reception
+        weight_sold = (
+            select(func.coalesce(func.sum(SaleItem.weight), 0))
+            .join(live_sales, SaleItem.sale_id == live_sales.c.id)
+            .scalar_subquery()
+        )
+        stmt = select(
+            func.count(live_sales.c.id),
+            func.coalesce(func.sum(live_sales.c.total_amount), 0),
+            func.coalesce(func.sum(live_sales.c.donation), 0),
+            last_ticket_amount,
+            weight_sold,
+        ).select_from(live_sales)
+
+        tickets_count, turnover, donations, last_amount, weight = self.db.execute(stmt).one()
+        return {
+            "tickets_count": tickets_count or 0,
+            "turnover": Decimal(str(turnover or 0)),
+            "donations": Decimal(str(donations or 0)),
+            "last_ticket_amount": Decimal(str(last_amount or 0)),
+            "weight_sold": Decimal(str(weight or 0)),
+        }
 
     async def get_unified_live_stats(
         self,
@@ -311,13 +302,17 @@ class ReceptionLiveStatsService:
         if site_id is not None and not isinstance(site_id, str):
             raise ValueError("site_id must be a string or None")
 
+        _stats_requests.inc()
+        cache_key = _live_stats_cache_key("unified", site_id, period_type)
+        cached = _get_cached_stats(cache_key, "unified")
+        if cached is not None:
+            return cached
+
         with _stats_duration.time():
             try:
-                _stats_requests.inc()
-
                 # Calculate period based on period_type
                 now = datetime.now(timezone.utc)
-                
+
                 if period_type == "daily":
                     # Journée complète : minuit-minuit (UTC)
                     start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -332,17 +327,11 @@ class ReceptionLiveStatsService:
                     period_start = threshold
                     period_end = now
 
-                # Stats Réception (utiliser méthodes existantes)
-                tickets_open = self._count_open_tickets(site_id, start_of_today)
-                tickets_closed_24h = self._count_closed_tickets_24h(site_id, threshold, start_of_today)
-                items_received = self._count_items_received_24h(site_id, threshold, start_of_today)
-                weight_in = self._calculate_weight_in(site_id, threshold, start_of_today)
-                weight_out = self._calculate_weight_out(site_id, threshold, start_of_today)
+                # Deux requêtes agrégées : réception (tickets/lignes) et caisse (ventes)
+                reception, sales = await self._run_aggregations(site_id, threshold, start_of_today)
+                cash_stats = self._format_cash_stats(sales)
 
-                # Stats Caisse (nouvelle méthode)
-                cash_stats = self._calculate_cash_stats(site_id, threshold, start_of_today, period_type)
-
-                return {
+                stats = {
                     # Stats Caisse
                     "tickets_count": cash_stats["tickets_count"],
                     "last_ticket_amount": cash_stats["last_ticket_amount"],
@@ -350,12 +339,12 @@ class ReceptionLiveStatsService:
                     "donations": cash_stats["donations"],
                     "weight_out_sales": cash_stats["weight_out_sales"],
                     # Stats Réception
-                    "tickets_open": tickets_open,
-                    "tickets_closed_24h": tickets_closed_24h,
-                    "items_received": items_received,
+                    "tickets_open": reception["tickets_open"],
+                    "tickets_closed_24h": reception["tickets_closed"],
+                    "items_received": reception["items_received"],
                     # Stats Matière (unifiées)
-                    "weight_in": float(weight_in),
-                    "weight_out": float(weight_out),
+                    "weight_in": float(reception["weight_in"]),
+                    "weight_out": float(sales["weight_sold"] + reception["weight_exit"]),
                     # Métadonnées
                     "period_start": period_start,
                     "period_end": period_end,
@@ -365,6 +354,9 @@ class ReceptionLiveStatsService:
                 _stats_errors.inc()
                 raise RuntimeError(f"Failed to calculate unified live stats: {str(e)}") from e
 
+        _set_cached_stats(cache_key, stats)
+        return stats
+
     def _calculate_cash_stats(
         self,
         site_id: Optional[str],
@@ -384,55 +376,18 @@ class ReceptionLiveStatsService:
         Returns:
             Dict with cash stats
         """
-        # Base query for sales in period
-        sales_query = self.db.query(Sale).join(
-            CashSession, Sale.cash_session_id == CashSession.id
-        ).filter(
-            and_(
-                Sale.created_at >= threshold,
-                # Exclude deferred sessions: only include sales from sessions opened today (or in period for 24h)
-                CashSession.opened_at >= start_of_today
-            )
-        )
-
-        # Filter by site if provided (future multi-site support)
-        # Note: Sales don't have direct site relationship, would need to join through CashSession
-        if site_id:
-            # For now, site filtering not implemented for sales
-            # This will be added when multi-site support is implemented
-            pass
-
-        # 1. tickets_count: Nombre de tickets vendus (Sale) dans période
-        tickets_count = sales_query.count()
+        sales = self._aggregate_sales_stats(site_id, threshold, start_of_today)
+        return self._format_cash_stats(sales)
 
-        # 2. last_ticket_amount: Montant dernier ticket (dernière Sale.created_at)
-        last_sale = sales_query.order_by(desc(Sale.created_at)).first()
-        last_ticket_amount = float(last_sale.total_amount) if last_sale else 0.0
-
-        # 3. ca: Chiffre d'affaires total (SUM Sale.total_amount)
-        ca_result = sales_query.with_entities(func.sum(Sale.total_amount)).scalar()
-        ca = float(ca_result or 0.0)
-
-        # 4. donations: Dons totaux (SUM Sale.donation)
-        donations_result = sales_query.with_entities(func.sum(Sale.donation)).scalar()
-        donations = float(donations_result or 0.0)
-
-        # 5. weight_out_sales: Poids vendus uniquement (SUM SaleItem.weight, exclut is_exit=true)
+    @staticmethod
+    def _format_cash_stats(sales: Dict[str, Any]) -> Dict[str, Any]:
+        """Met en forme les agrégats de ventes pour la réponse unifiée (caisse)."""
         # Note: weight_out_sales = seulement ventes (SaleItem.weight)
-        # weight_out (dans réponse unifiée) = ventes + is_exit=true (calculé via _calculate_weight_out)
-        sale_ids_subq = sales_query.with_entities(Sale.id).subquery()
-        weight_out_sales_result = (
-            self.db.query(func.sum(SaleItem.weight))
-            .join(Sale, SaleItem.sale_id == Sale.id)
-            .filter(Sale.id.in_(self.db.query(sale_ids_subq.c.id)))
-            .scalar()
-        )
-        weight_out_sales = float(weight_out_sales_result or 0.0)
-
+        # weight_out (dans réponse unifiée) = ventes + is_exit=true
         return {
-            "tickets_count": tickets_count,
-            "last_ticket_amount": last_ticket_amount,
-            "ca": ca,
-            "donations": donations,
-            "weight_out_sales": weight_out_sales,
+            "tickets_count": sales["tickets_count"],
+            "last_ticket_amount": float(sales["last_ticket_amount"]),
+            "ca": float(sales["turnover"]),
+            "donations": float(sales["donations"]),
+            "weight_out_sales": float(sales["weight_sold"]),
         }
@@ -13,14 +13,14 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 
 from recyclic_api.core.security import get_token_expiration_minutes
-from recyclic_api.models.setting import Setting
+from recyclic_api.core.settings_cache import REFRESH_TOKEN_MAX_HOURS, get_setting
 from recyclic_api.models.user_session import UserSession
 from recyclic_api.services.activity_service import ActivityService
 
 logger = logging.getLogger(__name__)
 
 # Valeurs par défaut
-DEFAULT_REFRESH_TOKEN_MAX_HOURS = 24
+DEFAULT_REFRESH_TOKEN_MAX_HOURS = REFRESH_TOKEN_MAX_HOURS.default
 DEFAULT_ACTIVITY_THRESHOLD_MINUTES = 15
 
 
@@ -32,29 +32,8 @@ class RefreshTokenService:
         self.activity_service = ActivityService(db)
 
     def _get_refresh_token_max_hours(self) -> int:
-        """Récupère la durée max du refresh token depuis les settings (en heures)."""
-        try:
-            setting = (
-                self.db.query(Setting)
-                .filter(Setting.key == "refresh_token_max_hours")
-                .first()
-            )
-            if setting is not None:
-                value = int(str(setting.value))
-                if 1 <= value <= 168:  # Entre 1h et 7 jours
-                    return value
-                else:
-                    logger.warning(
-                        f"Valeur refresh_token_max_hours {value} hors limites (1-168), utilisation de la valeur par défaut {DEFAULT_REFRESH_TOKEN_MAX_HOURS}"
-                    )
-        except (ValueError, TypeError) as e:
-            logger.warning(
-                f"Valeur invalide pour refresh_token_max_hours: {e}, utilisation de la valeur par défaut"
-            )
-        except Exception as e:
-            logger.error(f"Erreur lors de la récupération de refresh_token_max_hours: {e}")
-
-        return DEFAULT_REFRESH_TOKEN_MAX_HOURS
+        """Récupère la durée max du refresh token depuis les settings (en heures, 1 à 168)."""
+        return get_setting(REFRESH_TOKEN_MAX_HOURS, self.db)
 
     def _hash_refresh_token(self, token: str) -> str:
         """Hash un refresh token avec SHA-256 pour stockage sécurisé."""
@@ -151,7 +130,7 @@ class RefreshTokenService:
             raise ValueError("Refresh token expiré")
 
         # Vérifier activité récente via ActivityService
-        token_expiration_minutes = get_token_expiration_minutes()
+        token_expiration_minutes = get_token_expiration_minutes(self.db)
         minutes_since_activity = self.activity_service.get_minutes_since_activity(
             str(session.user_id)
         )
@@ -1,26 +1,81 @@
-"""Service for generating bulk exports of cash sessions and reception tickets (Story B45-P1)."""
+"""Service for generating bulk exports of cash sessions and reception tickets (Story B45-P1).
+
+Les exports sont produits en flux : les sessions/tickets sont lus par lots via un
+curseur serveur (``yield_per``), le CSV est émis morceau par morceau et le XLSX est
+écrit avec openpyxl en mode ``write_only``. La mémoire consommée ne dépend donc pas
+de la période exportée.
+"""
 
 import csv
+import tempfile
 from io import BytesIO, StringIO
-from typing import List, Optional, Dict, Any
+from itertools import islice
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Dict, Any
 from datetime import datetime
 from pathlib import Path
 
+from sqlalchemy import desc
 from sqlalchemy.orm import Session, joinedload, selectinload
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 
 from recyclic_api.models.cash_session import CashSession
+from recyclic_api.models.ligne_depot import LigneDepot
+from recyclic_api.models.sale import Sale
 from recyclic_api.models.ticket_depot import TicketDepot
 from recyclic_api.models.user import User
 from recyclic_api.models.site import Site
 from recyclic_api.models.cash_register import CashRegister
 from recyclic_api.schemas.cash_session import CashSessionFilters
 from recyclic_api.services.cash_session_service import CashSessionService
+from recyclic_api.services.category_resolver import CategoryResolver
 from recyclic_api.services.reception_service import ReceptionService
 from uuid import UUID
 
 
+# Nombre d'objets racines (sessions/tickets) chargés par aller-retour base de données
+EXPORT_BATCH_SIZE = 500
+# Taille des morceaux envoyés au client lors du streaming d'un fichier XLSX
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+CASH_SESSION_HEADERS = [
+    'Date Ouverture',
+    'Date Fermeture',
+    'Opérateur',
+    'Caisse',
+    'Site',
+    'Montant Initial (€)',
+    'Total Ventes (€)',
+    'Nombre Ventes',
+    'Nombre Articles',
+    'Total Dons (€)',
+    'Montant Clôture (€)',
+    'Montant Réel (€)',
+    'Écart (€)',
+    'Commentaire Écart',
+    'Statut',
+    'ID Session'
+]
+
+RECEPTION_TICKET_CSV_HEADERS = [
+    'ticket_id',
+    'poste_id',
+    'ticket_status',
+    'ticket_created_at',
+    'ticket_closed_at',
+    'benevole_username',
+    'ticket_total_poids_kg',
+    'ticket_total_lignes',
+    'ligne_id',
+    'category_id',
+    'category_label',
+    'destination',
+    'poids_kg',
+    'notes'
+]
+
+
 def _format_amount(value: Optional[float]) -> str:
     """Format un montant avec virgule comme séparateur décimal (format français)"""
     if value is None:
@@ -35,6 +90,190 @@ def _format_date(dt: Optional[datetime]) -> str:
     return dt.strftime('%Y-%m-%d %H:%M:%S')
 
 
+def _format_weight(value: Optional[float]) -> str:
+    """Format un poids avec virgule comme séparateur décimal (format français)"""
+    if value is None:
+        return ''
+    return f"{value:.3f}".replace('.', ',')
+
+
+def _display_name(user: Optional[User]) -> str:
+    """Nom affiché d'un opérateur ou bénévole (nom complet, username ou telegram_id)."""
+    if not user:
+        return ''
+    return (getattr(user, 'full_name', None) or
+            getattr(user, 'username', None) or
+            getattr(user, 'telegram_id', None) or '')
+
+
+def _status_str(session: CashSession) -> str:
+    """Conversion sécurisée du statut d'une session."""
+    status = session.status
+    return str(status.value) if hasattr(status, 'value') else str(status) if status else ''
+
+
+def _iter_batches(query, batch_size: Optional[int] = None) -> Iterator[list]:
+    """
+    Parcourt une requête par lots via un curseur serveur (yield_per).
+
+    Les objets d'un lot ne sont plus référencés une fois le lot traité : la session
+    SQLAlchemy ne les retient que par référence faible, la mémoire reste bornée.
+    """
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    rows = iter(query.yield_per(batch_size))
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _csv_chunk(rows: Iterable[List[str]], bom: bool = False) -> bytes:
+    """Encode des lignes CSV (séparateur ';'). Le premier morceau porte le BOM UTF-8 (compatibilité Excel)."""
+    output = StringIO()
+    writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_MINIMAL)
+    writer.writerows(rows)
+    return output.getvalue().encode('utf-8-sig' if bom else 'utf-8')
+
+
+def _iter_file_chunks(fileobj: BinaryIO, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Lit un fichier temporaire par morceaux puis le ferme (et donc le supprime)."""
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def _spool_workbook(write: Callable[[BinaryIO], None]) -> Iterator[bytes]:
+    """
+    Écrit un classeur dans un fichier temporaire et retourne un itérateur sur son contenu.
+
+    L'écriture est faite immédiatement (les erreurs remontent avant l'envoi de la réponse),
+    seule la lecture du fichier est différée.
+    """
+    tmp = tempfile.TemporaryFile()
+    try:
+        write(tmp)
+        tmp.seek(0)
+    except Exception:
+        tmp.close()
+        raise
+    return _iter_file_chunks(tmp)
+
+
+# === Styles XLSX (mode write_only : les styles sont portés par des WriteOnlyCell) ===
+
+_HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+_HEADER_FILL = PatternFill(start_color="3498DB", end_color="3498DB", fill_type="solid")
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+_HEADER_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+_TOTAL_FONT = Font(bold=True)
+_TOTAL_FILL = PatternFill(start_color="E8F4F8", end_color="E8F4F8", fill_type="solid")
+
+
+def _header_row(ws, headers: List[str]) -> List[WriteOnlyCell]:
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = _HEADER_FONT
+        cell.fill = _HEADER_FILL
+        cell.alignment = _HEADER_ALIGNMENT
+        cell.border = _HEADER_BORDER
+        cells.append(cell)
+    return cells
+
+
+def _total_row(ws, values: List[str]) -> List[WriteOnlyCell]:
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = _TOTAL_FONT
+        cell.fill = _TOTAL_FILL
+        cells.append(cell)
+    return cells
+
+
+def _set_column_widths(ws, widths: Dict[str, float]) -> None:
+    # En mode write_only, les largeurs doivent être définies avant la première ligne
+    for column, width in widths.items():
+        ws.column_dimensions[column].width = width
+
+
+# === SESSIONS DE CAISSE ===
+
+def _cash_session_row(s: CashSession) -> List[str]:
+    """Ligne détaillée d'une session (CSV et onglet "Détails")."""
+    return [
+        _format_date(s.opened_at),
+        _format_date(s.closed_at),
+        _display_name(s.operator),
+        getattr(s.register, 'name', '') if s.register else '',
+        getattr(s.site, 'name', '') if s.site else '',
+        _format_amount(s.initial_amount),
+        _format_amount(s.total_sales),
+        str(s.number_of_sales or 0),
+        str(s.total_items or 0),
+        _format_amount(s.total_donations),
+        _format_amount(s.closing_amount),
+        _format_amount(s.actual_amount),
+        _format_amount(s.variance),
+        s.variance_comment or '',
+        _status_str(s),
+        str(s.id)
+    ]
+
+
+def _prepare_cash_sessions_export(db: Session, filters: CashSessionFilters, max_items: int):
+    """Construit la requête filtrée et vérifie la limite de sécurité avant tout envoi."""
+    service = CashSessionService(db)
+    query = service.build_sessions_query(filters)
+
+    total = query.count()
+    if total > max_items:
+        raise ValueError(f"Trop de sessions à exporter ({total}). Maximum: {max_items}")
+
+    return service, query
+
+
+def stream_bulk_cash_sessions_csv(
+    db: Session,
+    filters: CashSessionFilters,
+    max_items: int = 10000
+) -> Iterator[bytes]:
+    """
+    Génère en flux un export CSV consolidé de toutes les sessions de caisse filtrées.
+
+    La limite `max_items` est vérifiée immédiatement ; les lignes sont ensuite produites
+    par lots de EXPORT_BATCH_SIZE sessions au fil de la lecture du flux.
+
+    Returns:
+        Itérateur de morceaux CSV encodés (UTF-8 avec BOM)
+    """
+    service, query = _prepare_cash_sessions_export(db, filters, max_items)
+    query = query.order_by(desc(CashSession.opened_at)).options(
+        joinedload(CashSession.operator),
+        joinedload(CashSession.site),
+        joinedload(CashSession.register)
+    )
+
+    def _generate() -> Iterator[bytes]:
+        yield _csv_chunk([CASH_SESSION_HEADERS], bom=True)
+        for batch in _iter_batches(query):
+            service.enrich_sessions_aggregates(batch)
+            yield _csv_chunk(_cash_session_row(s) for s in batch)
+
+    return _generate()
+
+
 def generate_bulk_cash_sessions_csv(
     db: Session,
     filters: CashSessionFilters,
@@ -42,358 +281,105 @@ def generate_bulk_cash_sessions_csv(
 ) -> BytesIO:
     """
     Génère un export CSV consolidé de toutes les sessions de caisse filtrées.
-    
+
     Args:
         db: Session de base de données
         filters: Filtres à appliquer
         max_items: Nombre maximum d'éléments à exporter (sécurité)
-    
+
     Returns:
         BytesIO contenant le CSV
     """
-    service = CashSessionService(db)
-    
-    # Récupérer toutes les sessions (sans limite de pagination pour export)
-    # Mais limiter à max_items pour sécurité
-    
-    # Utiliser une copie propre pour ne pas modifier l'objet original par effet de bord
-    import copy
-    filters_export = copy.deepcopy(filters)
-    
-    # Utiliser object.__setattr__ pour contourner la validation Pydantic sur limit
-    object.__setattr__(filters_export, 'limit', max_items)
-    object.__setattr__(filters_export, 'skip', 0)
-    
-    sessions, total = service.get_sessions_with_filters(filters_export)
-    
-    if total > max_items:
-        raise ValueError(f"Trop de sessions à exporter ({total}). Maximum: {max_items}")
-    
-    # Charger les relations nécessaires
-    session_ids = [s.id for s in sessions]
-    sessions_with_relations = db.query(CashSession).filter(
-        CashSession.id.in_(session_ids)
-    ).options(
-        joinedload(CashSession.operator),
-        joinedload(CashSession.site),
-        joinedload(CashSession.register)
-    ).all()
-    
-    # Créer un mapping pour accès rapide
-    sessions_map = {s.id: s for s in sessions_with_relations}
-    
-    buffer = BytesIO()
-    # Utiliser utf-8-sig pour BOM UTF-8 (compatibilité Excel)
-    writer = csv.writer(StringIO(), delimiter=';', quoting=csv.QUOTE_MINIMAL)
-    
-    # En-têtes CSV ordonnés selon la demande
-    headers = [
-        'Date Ouverture',
-        'Date Fermeture',
-        'Opérateur',
-        'Caisse',
-        'Site',
-        'Montant Initial (€)',
-        'Total Ventes (€)',
-        'Nombre Ventes',
-        'Nombre Articles',
-        'Total Dons (€)',
-        'Montant Clôture (€)',
-        'Montant Réel (€)',
-        'Écart (€)',
-        'Commentaire Écart',
-        'Statut',
-        'ID Session'
-    ]
-    
-    # Écrire les en-têtes
-    output = StringIO()
-    writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_MINIMAL)
-    writer.writerow(headers)
-    
-    # Écrire les données
-    for session in sessions:
-        s = sessions_map.get(session.id, session)
-        operator = s.operator if hasattr(s, 'operator') else None
-        site = s.site if hasattr(s, 'site') else None
-        register = s.register if hasattr(s, 'register') else None
-        
-        operator_name = ''
-        if operator:
-            operator_name = (getattr(operator, 'full_name', None) or 
-                           getattr(operator, 'username', None) or 
-                           getattr(operator, 'telegram_id', None) or '')
-        
-        site_name = getattr(site, 'name', '') if site else ''
-        register_name = getattr(register, 'name', '') if register else ''
-        
-        # Conversion sécurisée du statut
-        status_str = str(s.status.value) if hasattr(s.status, 'value') else str(s.status) if s.status else ''
-        
-        row = [
-            _format_date(s.opened_at),
-            _format_date(s.closed_at),
-            operator_name,
-            register_name,
-            site_name,
-            _format_amount(s.initial_amount),
-            _format_amount(s.total_sales),
-            str(s.number_of_sales or 0),
-            str(s.total_items or 0),
-            _format_amount(s.total_donations),
-            _format_amount(s.closing_amount),
-            _format_amount(s.actual_amount),
-            _format_amount(s.variance),
-            s.variance_comment or '',
-            status_str,
-            str(s.id)
-        ]
-        writer.writerow(row)
-    
-    # Convertir en bytes
-    csv_content = output.getvalue()
-    buffer.write(csv_content.encode('utf-8-sig'))
-    buffer.seek(0)
-    
-    return buffer
+    return BytesIO(b"".join(stream_bulk_cash_sessions_csv(db, filters, max_items)))
 
 
-def generate_bulk_cash_sessions_excel(
+def write_bulk_cash_sessions_excel(
     db: Session,
     filters: CashSessionFilters,
+    destination: BinaryIO,
     max_items: int = 10000
-) -> BytesIO:
+) -> None:
     """
-    Génère un export Excel avec onglets "Résumé" et "Détails" pour toutes les sessions filtrées.
-    
+    Écrit un export Excel avec onglets "Résumé", "Détails" et "Détails Tickets"
+    dans `destination`, en mode write_only (mémoire bornée quel que soit le volume).
+
     Args:
         db: Session de base de données
         filters: Filtres à appliquer
+        destination: Fichier (ou buffer) binaire de sortie
         max_items: Nombre maximum d'éléments à exporter (sécurité)
-    
-    Returns:
-        BytesIO contenant le fichier Excel
     """
-    service = CashSessionService(db)
-    
-    # Récupérer toutes les sessions
-    # Créer une copie des filtres avec limit modifié
-    import copy
-    filters_export = copy.deepcopy(filters)
-    
-    # Utiliser object.__setattr__ pour contourner la validation Pydantic sur limit
-    object.__setattr__(filters_export, 'limit', max_items)
-    object.__setattr__(filters_export, 'skip', 0)
-    
-    sessions, total = service.get_sessions_with_filters(filters_export)
-    
-    if total > max_items:
-        raise ValueError(f"Trop de sessions à exporter ({total}). Maximum: {max_items}")
-    
-    # Charger les relations nécessaires
-    session_ids = [s.id for s in sessions]
-    from recyclic_api.models.sale import Sale
-    from recyclic_api.models.sale_item import SaleItem
-    sessions_with_relations = db.query(CashSession).filter(
-        CashSession.id.in_(session_ids)
-    ).options(
+    service, base_query = _prepare_cash_sessions_export(db, filters, max_items)
+    # Arbre des catégories chargé une fois pour tout l'export
+    categories = CategoryResolver(db)
+
+    query = base_query.order_by(desc(CashSession.opened_at)).options(
         joinedload(CashSession.operator),
         joinedload(CashSession.site),
         joinedload(CashSession.register),
         selectinload(CashSession.sales).selectinload(Sale.items)
-    ).all()
-    
-    sessions_map = {s.id: s for s in sessions_with_relations}
-    
-    buffer = BytesIO()
-    wb = Workbook()
-    
-    # Supprimer la feuille par défaut si elle existe
-    if 'Sheet' in wb.sheetnames:
-        wb.remove(wb['Sheet'])
-    
+    )
+
+    wb = Workbook(write_only=True)
+
     # === ONGLET RÉSUMÉ ===
     ws_summary = wb.create_sheet("Résumé")
-    
-    # Style des en-têtes
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    header_fill = PatternFill(start_color="3498DB", end_color="3498DB", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    # En-têtes résumé
-    summary_headers = [
+    _set_column_widths(ws_summary, {
+        'A': 20,  # Date
+        'B': 25,  # Opérateur
+        'C': 20,  # Caisse
+        'D': 20,  # Site
+        'E': 15,  # CA
+        'F': 12,  # Nb Ventes
+        'G': 12,  # Nb Articles
+        'H': 15,  # Ecart
+        'I': 12,  # Statut
+    })
+    ws_summary.append(_header_row(ws_summary, [
         'Date Ouverture', 'Opérateur', 'Caisse', 'Site',
         'CA Total (€)', 'Nb Ventes', 'Nb Articles', 'Écart (€)', 'Statut'
-    ]
-    ws_summary.append(summary_headers)
-    
-    # Appliquer style aux en-têtes
-    for cell in ws_summary[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = border
-    
-    # Données résumé
-    total_ca = 0.0
-    total_ventes = 0
-    total_articles = 0
-    
-    for session in sessions:
-        s = sessions_map.get(session.id, session)
-        operator = s.operator if hasattr(s, 'operator') else None
-        site = s.site if hasattr(s, 'site') else None
-        register = s.register if hasattr(s, 'register') else None
-        
-        operator_name = ''
-        if operator:
-            operator_name = (getattr(operator, 'full_name', None) or 
-                           getattr(operator, 'username', None) or 
-                           getattr(operator, 'telegram_id', None) or '')
-        
-        site_name = getattr(site, 'name', '') if site else ''
-        register_name = getattr(register, 'name', '') if register else ''
-        
-        # Conversion sécurisée du statut
-        status_str = str(s.status.value) if hasattr(s.status, 'value') else str(s.status) if s.status else ''
-        
-        ca = s.total_sales or 0.0
-        nb_ventes = s.number_of_sales or 0
-        nb_articles = s.total_items or 0
-        
-        total_ca += ca
-        total_ventes += nb_ventes
-        total_articles += nb_articles
-        
-        row = [
-            _format_date(s.opened_at),
-            operator_name,
-            register_name,
-            site_name,
-            _format_amount(ca),
-            str(nb_ventes),
-            str(nb_articles),
-            _format_amount(s.variance),
-            status_str
-        ]
-        ws_summary.append(row)
-    
-    # Ligne de totaux
-    ws_summary.append([
-        'TOTAL',
-        '',
-        '',
-        '',
-        _format_amount(total_ca),
-        str(total_ventes),
-        str(total_articles),
-        '',
-        ''
-    ])
-    
-    # Style ligne totaux
-    for cell in ws_summary[ws_summary.max_row]:
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="E8F4F8", end_color="E8F4F8", fill_type="solid")
-    
-    # Largeurs colonnes résumé
-    ws_summary.column_dimensions['A'].width = 20 # Date
-    ws_summary.column_dimensions['B'].width = 25 # Opérateur
-    ws_summary.column_dimensions['C'].width = 20 # Caisse
-    ws_summary.column_dimensions['D'].width = 20 # Site
-    ws_summary.column_dimensions['E'].width = 15 # CA
-    ws_summary.column_dimensions['F'].width = 12 # Nb Ventes
-    ws_summary.column_dimensions['G'].width = 12 # Nb Articles
-    ws_summary.column_dimensions['H'].width = 15 # Ecart
-    ws_summary.column_dimensions['I'].width = 12 # Statut
-    
+    ]))
+
     # === ONGLET DÉTAILS ===
     ws_details = wb.create_sheet("Détails")
-    
-    # En-têtes détails ordonnés
-    detail_headers = [
+    _set_column_widths(ws_details, {
+        'A': 20,  # Date Ouv
+        'B': 20,  # Date Ferm
+        'C': 25,  # Operateur
+        'D': 20,  # Caisse
+        'E': 20,  # Site
+        'F': 15,  # Mnt Init
+        'G': 15,  # Tot Ventes
+        'H': 12,  # Nb Ventes
+        'I': 12,  # Nb Articles
+        'J': 15,  # Tot Dons
+        'K': 15,  # Mnt Clot
+        'L': 15,  # Mnt Reel
+        'M': 15,  # Ecart
+        'N': 30,  # Comm
+        'O': 12,  # Statut
+        'P': 38,  # UUID
+    })
+    ws_details.append(_header_row(ws_details, [
         'Date Ouverture', 'Date Fermeture', 'Opérateur', 'Caisse', 'Site',
         'Montant Initial (€)', 'Total Ventes (€)', 'Nb Ventes', 'Nb Articles',
         'Total Dons (€)', 'Montant Clôture (€)', 'Montant Réel (€)',
         'Écart (€)', 'Commentaire Écart', 'Statut', 'ID Session'
-    ]
-    ws_details.append(detail_headers)
-    
-    # Appliquer style aux en-têtes
-    for cell in ws_details[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = border
-    
-    # Données détails
-    for session in sessions:
-        s = sessions_map.get(session.id, session)
-        operator = s.operator if hasattr(s, 'operator') else None
-        site = s.site if hasattr(s, 'site') else None
-        register = s.register if hasattr(s, 'register') else None
-        
-        operator_name = ''
-        if operator:
-            operator_name = (getattr(operator, 'full_name', None) or 
-                           getattr(operator, 'username', None) or 
-                           getattr(operator, 'telegram_id', None) or '')
-        
-        site_name = getattr(site, 'name', '') if site else ''
-        register_name = getattr(register, 'name', '') if register else ''
-        
-        # Conversion sécurisée du statut
-        status_str = str(s.status.value) if hasattr(s.status, 'value') else str(s.status) if s.status else ''
-        
-        row = [
-            _format_date(s.opened_at),
-            _format_date(s.closed_at),
-            operator_name,
-            register_name,
-            site_name,
-            _format_amount(s.initial_amount),
-            _format_amount(s.total_sales),
-            str(s.number_of_sales or 0),
-            str(s.total_items or 0),
-            _format_amount(s.total_donations),
-            _format_amount(s.closing_amount),
-            _format_amount(s.actual_amount),
-            _format_amount(s.variance),
-            s.variance_comment or '',
-            status_str,
-            str(s.id)
-        ]
-        ws_details.append(row)
-    
-    # Largeurs colonnes détails
-    ws_details.column_dimensions['A'].width = 20 # Date Ouv
-    ws_details.column_dimensions['B'].width = 20 # Date Ferm
-    ws_details.column_dimensions['C'].width = 25 # Operateur
-    ws_details.column_dimensions['D'].width = 20 # Caisse
-    ws_details.column_dimensions['E'].width = 20 # Site
-    ws_details.column_dimensions['F'].width = 15 # Mnt Init
-    ws_details.column_dimensions['G'].width = 15 # Tot Ventes
-    ws_details.column_dimensions['H'].width = 12 # Nb Ventes
-    ws_details.column_dimensions['I'].width = 12 # Nb Articles
-    ws_details.column_dimensions['J'].width = 15 # Tot Dons
-    ws_details.column_dimensions['K'].width = 15 # Mnt Clot
-    ws_details.column_dimensions['L'].width = 15 # Mnt Reel
-    ws_details.column_dimensions['M'].width = 15 # Ecart
-    ws_details.column_dimensions['N'].width = 30 # Comm
-    ws_details.column_dimensions['O'].width = 12 # Statut
-    ws_details.column_dimensions['P'].width = 38 # UUID
-    
+    ]))
+
     # === ONGLET DÉTAILS TICKETS ===
     ws_tickets = wb.create_sheet("Détails Tickets")
-    
-    # En-têtes détails tickets
-    ticket_headers = [
+    _set_column_widths(ws_tickets, {
+        'A': 20,  # Numéro Ticket
+        'B': 20,  # Date Vente
+        'C': 30,  # Catégorie Principale
+        'D': 30,  # Catégorie Secondaire
+        'E': 12,  # Quantité
+        'F': 15,  # Poids
+        'G': 18,  # Prix Unitaire
+        'H': 18,  # Prix Total
+    })
+    ws_tickets.append(_header_row(ws_tickets, [
         'Numéro Ticket',
         'Date Vente',
         'Catégorie Principale',
@@ -402,181 +388,229 @@ def generate_bulk_cash_sessions_excel(
         'Poids (kg)',
         'Prix Unitaire (€)',
         'Prix Total (€)'
-    ]
-    ws_tickets.append(ticket_headers)
-    
-    # Appliquer style aux en-têtes
-    for cell in ws_tickets[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = border
-    
-    # Créer le mapping des catégories principales
-    # Récupérer toutes les catégories utilisées dans les SaleItem
-    from recyclic_api.models.category import Category
-    from uuid import UUID as UUIDType
-    category_values = set()
-    category_uuids = []
-    category_names = []
-    
-    for session in sessions_with_relations:
-        for sale in session.sales:
-            for item in sale.items:
-                if item.category:
-                    category_values.add(item.category)
-                    # Détecter si c'est un UUID ou un nom
-                    try:
-                        # Essayer de parser comme UUID
-                        uuid_val = UUIDType(item.category)
-                        category_uuids.append(uuid_val)
-                    except (ValueError, TypeError):
-                        # C'est un nom (ex: "EEE-1")
-                        category_names.append(item.category)
-    
-    # Charger les catégories et créer le mapping code → catégorie principale/secondaire
-    category_main_mapping = {}
-    category_secondary_mapping = {}  # Mapping value → nom catégorie secondaire (enfant direct du root)
-    categories_by_value = {}  # Mapping value (UUID ou name) → Category
-    main_categories_set = set()  # Set des noms de catégories principales
-    
-    if category_values:
-        # Charger les catégories par UUID
-        categories_by_uuid = {}
-        if category_uuids:
-            categories_uuid = db.query(Category).filter(
-                Category.id.in_(category_uuids)
-            ).all()
-            categories_by_uuid = {str(cat.id): cat for cat in categories_uuid}
-            for cat in categories_uuid:
-                categories_by_value[str(cat.id)] = cat
-        
-        # Charger les catégories par name
-        if category_names:
-            categories_name = db.query(Category).filter(
-                Category.name.in_(category_names)
-            ).all()
-            for cat in categories_name:
-                categories_by_value[cat.name] = cat
-        
-        # Charger aussi toutes les catégories principales pour s'assurer qu'elles sont dans le set
-        all_main_categories = db.query(Category).filter(
-            Category.parent_id.is_(None)
-        ).all()
-        for main_cat in all_main_categories:
-            main_categories_set.add(main_cat.name)
-        
-        # Pour chaque catégorie, trouver la catégorie principale (parent_id IS NULL)
-        for value in category_values:
-            cat = None
-            # Chercher par UUID ou par name
-            if value in categories_by_value:
-                cat = categories_by_value[value]
-            else:
-                # Essayer de trouver par UUID si c'est un UUID
-                try:
-                    uuid_val = UUIDType(value)
-                    if str(uuid_val) in categories_by_uuid:
-                        cat = categories_by_uuid[str(uuid_val)]
-                except (ValueError, TypeError):
-                    pass
-            
-            if cat:
-                # Construire la chaîne de cat → root pour extraire principale et secondaire
-                chain = [cat]
-                main_category = cat
-                visited = set()  # Éviter les boucles infinies
-                while main_category.parent_id is not None and main_category.id not in visited:
-                    visited.add(main_category.id)
-                    parent = db.query(Category).filter(
-                        Category.id == main_category.parent_id
-                    ).first()
-                    if parent:
-                        chain.append(parent)
-                        main_category = parent
-                    else:
-                        break
-                category_main_mapping[value] = main_category.name
-                # Catégorie secondaire = enfant direct du root dans la chaîne
-                # chain[0]=item, chain[-1]=root ; chain[-2] est la secondaire si len≥2
-                category_secondary_mapping[value] = chain[-2].name if len(chain) >= 2 else ''
-                # Stocker les catégories principales dans un set
-                if main_category.parent_id is None:
-                    main_categories_set.add(main_category.name)
-    
-    # Parcourir toutes les sessions, ventes et items pour créer les lignes
-    for session in sessions_with_relations:
-        if not session.sales:
-            continue
-        for sale in session.sales:
-            if not sale.items:
-                continue
-            sale_number = str(sale.id)[:8]  # Numéro de ticket (8 premiers caractères de l'UUID)
-            # Story B52-P3: Utiliser sale_date pour la date réelle du ticket
-            sale_date = _format_date(sale.sale_date or sale.created_at)
-            
-            for item in sale.items:
-                # Récupérer la catégorie principale (même si l'item a une sous-catégorie)
-                category_code = item.category or ''
-                if not category_code:
-                    continue
-                
-                # Si la catégorie n'est pas dans le mapping, c'est qu'elle n'existe pas en DB
-                # On l'exclut (filtrage strict sur catégories valides)
-                if category_code not in category_main_mapping:
-                    continue
-                
-                # Vérifier que la catégorie existe bien dans categories_by_value
-                if category_code not in categories_by_value:
-                    continue
-                
-                # Utiliser le mapping pour obtenir la catégorie principale
-                # Le mapping remonte automatiquement aux parents si nécessaire
-                main_category_name = category_main_mapping[category_code]
-                
-                # Vérifier que la catégorie principale finale est bien une catégorie principale
-                # (parent_id IS NULL)
-                if main_category_name not in main_categories_set:
-                    # Ce n'est pas une catégorie principale, skip
+    ]))
+
+    total_ca = 0.0
+    total_ventes = 0
+    total_articles = 0
+
+    # Les trois onglets sont alimentés en une seule passe, lot par lot
+    for batch in _iter_batches(query):
+        service.enrich_sessions_aggregates(batch)
+
+        for s in batch:
+            ca = s.total_sales or 0.0
+            nb_ventes = s.number_of_sales or 0
+            nb_articles = s.total_items or 0
+
+            total_ca += ca
+            total_ventes += nb_ventes
+            total_articles += nb_articles
+
+            ws_summary.append([
+                _format_date(s.opened_at),
+                _display_name(s.operator),
+                getattr(s.register, 'name', '') if s.register else '',
+                getattr(s.site, 'name', '') if s.site else '',
+                _format_amount(ca),
+                str(nb_ventes),
+                str(nb_articles),
+                _format_amount(s.variance),
+                _status_str(s)
+            ])
+            ws_details.append(_cash_session_row(s))
+
+            for sale in s.sales:
+                if not sale.items:
                     continue
-                
-                secondary_category_name = category_secondary_mapping.get(category_code, '')
-
-                # Inclure l'item avec la catégorie principale et secondaire
-                row = [
-                    sale_number,
-                    sale_date,
-                    main_category_name,
-                    secondary_category_name,
-                    str(item.quantity),
-                    _format_weight(item.weight),
-                    _format_amount(item.unit_price),
-                    _format_amount(item.total_price)
-                ]
-                ws_tickets.append(row)
-    
-    # Largeurs colonnes détails tickets
-    ws_tickets.column_dimensions['A'].width = 20  # Numéro Ticket
-    ws_tickets.column_dimensions['B'].width = 20  # Date Vente
-    ws_tickets.column_dimensions['C'].width = 30  # Catégorie Principale
-    ws_tickets.column_dimensions['D'].width = 30  # Catégorie Secondaire
-    ws_tickets.column_dimensions['E'].width = 12  # Quantité
-    ws_tickets.column_dimensions['F'].width = 15  # Poids
-    ws_tickets.column_dimensions['G'].width = 18  # Prix Unitaire
-    ws_tickets.column_dimensions['H'].width = 18  # Prix Total
-    
-    # Sauvegarder dans le buffer
-    wb.save(buffer)
+                sale_number = str(sale.id)[:8]  # Numéro de ticket (8 premiers caractères de l'UUID)
+                # Story B52-P3: Utiliser sale_date pour la date réelle du ticket
+                sale_date = _format_date(sale.sale_date or sale.created_at)
+
+                for item in sale.items:
+                    # Filtrage strict : catégorie (UUID ou nom) existante en DB et rattachée
+                    # à une catégorie principale (parent_id IS NULL)
+                    resolved = categories.main_and_secondary(item.category) if item.category else None
+                    if resolved is None:
+                        continue
+                    main_category, secondary_category_name = resolved
+                    if not main_category.is_root:
+                        continue
+
+                    ws_tickets.append([
+                        sale_number,
+                        sale_date,
+                        main_category.name,
+                        secondary_category_name,
+                        str(item.quantity),
+                        _format_weight(item.weight),
+                        _format_amount(item.unit_price),
+                        _format_amount(item.total_price)
+                    ])
+
+    # Ligne de totaux
+    ws_summary.append(_total_row(ws_summary, [
+        'TOTAL',
+        '',
+        '',
+        '',
+        _format_amount(total_ca),
+        str(total_ventes),
+        str(total_articles),
+        '',
+        ''
+    ]))
+
+    wb.save(destination)
+
+
+def stream_bulk_cash_sessions_excel(
+    db: Session,
+    filters: CashSessionFilters,
+    max_items: int = 10000
+) -> Iterator[bytes]:
+    """Génère l'export Excel des sessions dans un fichier temporaire et le retourne en flux."""
+    return _spool_workbook(lambda fileobj: write_bulk_cash_sessions_excel(db, filters, fileobj, max_items))
+
+
+def generate_bulk_cash_sessions_excel(
+    db: Session,
+    filters: CashSessionFilters,
+    max_items: int = 10000
+) -> BytesIO:
+    """
+    Génère un export Excel avec onglets "Résumé" et "Détails" pour toutes les sessions filtrées.
+
+    Args:
+        db: Session de base de données
+        filters: Filtres à appliquer
+        max_items: Nombre maximum d'éléments à exporter (sécurité)
+
+    Returns:
+        BytesIO contenant le fichier Excel
+    """
+    buffer = BytesIO()
+    write_bulk_cash_sessions_excel(db, filters, buffer, max_items)
     buffer.seek(0)
-    
     return buffer
 
 
-def _format_weight(value: Optional[float]) -> str:
-    """Format un poids avec virgule comme séparateur décimal (format français)"""
-    if value is None:
+# === TICKETS DE RÉCEPTION ===
+
+def _prepare_reception_tickets_export(
+    db: Session,
+    status: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    benevole_id: Optional[UUID],
+    search: Optional[str],
+    include_empty: bool,
+    max_items: int
+):
+    """Construit la requête filtrée et vérifie la limite de sécurité avant tout envoi."""
+    service = ReceptionService(db)
+    query = service.build_tickets_query(
+        status=status,
+        date_from=date_from,
+        date_to=date_to,
+        benevole_id=benevole_id,
+        search=search,
+        include_empty=include_empty
+    )
+
+    total = query.count()
+    if total > max_items:
+        raise ValueError(f"Trop de tickets à exporter ({total}). Maximum: {max_items}")
+
+    return service, query
+
+
+def _reception_ticket_columns(service: ReceptionService, ticket: TicketDepot) -> List[str]:
+    """Colonnes communes à toutes les lignes d'un ticket (identifiants, dates, totaux)."""
+    # B50-P2: _calculate_ticket_totals retourne 5 valeurs (total_lignes, total_poids, poids_entree, poids_direct, poids_sortie)
+    total_lignes, total_poids, _, _, _ = service._calculate_ticket_totals(ticket)
+    return [
+        str(ticket.id),
+        str(ticket.poste_id),
+        ticket.status,
+        _format_date(ticket.created_at),
+        _format_date(ticket.closed_at),
+        _display_name(ticket.benevole),
+        _format_weight(float(total_poids)),
+        str(total_lignes),
+    ]
+
+
+def _ligne_destination(ligne: LigneDepot) -> str:
+    if not ligne.destination:
         return ''
-    return f"{value:.3f}".replace('.', ',')
+    return ligne.destination.value if hasattr(ligne.destination, 'value') else str(ligne.destination)
+
+
+def _ligne_notes(ligne: LigneDepot) -> str:
+    return (ligne.notes or '').replace('\n', ' ').replace('\r', ' ').strip()
+
+
+def _reception_ticket_csv_rows(
+    service: ReceptionService,
+    categories: CategoryResolver,
+    ticket: TicketDepot
+) -> Iterator[List[str]]:
+    """Une ligne par ligne de dépôt (ou une ligne vide si le ticket n'a pas de lignes)."""
+    ticket_columns = _reception_ticket_columns(service, ticket)
+
+    if not ticket.lignes:
+        yield ticket_columns + ['', '', '', '', '', '']
+        return
+
+    for ligne in ticket.lignes:
+        category_label = ''
+        category_id = ''
+        category = categories.get_by_id(ligne.category_id)
+        if category:
+            category_label = category.name or ''
+            category_id = str(category.id)
+
+        yield ticket_columns + [
+            str(ligne.id),
+            category_id,
+            category_label,
+            _ligne_destination(ligne),
+            _format_weight(float(ligne.poids_kg)) if ligne.poids_kg else '',
+            _ligne_notes(ligne)
+        ]
+
+
+def stream_bulk_reception_tickets_csv(
+    db: Session,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    benevole_id: Optional[UUID] = None,
+    search: Optional[str] = None,
+    include_empty: bool = False,
+    max_items: int = 10000
+) -> Iterator[bytes]:
+    """
+    Génère en flux un export CSV détaillé des tickets de réception filtrés
+    (une ligne par ligne de dépôt).
+
+    Returns:
+        Itérateur de morceaux CSV encodés (UTF-8 avec BOM)
+    """
+    service, query = _prepare_reception_tickets_export(
+        db, status, date_from, date_to, benevole_id, search, include_empty, max_items
+    )
+    categories = CategoryResolver(db)
+
+    def _generate() -> Iterator[bytes]:
+        yield _csv_chunk([RECEPTION_TICKET_CSV_HEADERS], bom=True)
+        for batch in _iter_batches(query):
+            yield _csv_chunk(
+                row for ticket in batch for row in _reception_ticket_csv_rows(service, categories, ticket)
+            )
+
+    return _generate()
 
 
 def generate_bulk_reception_tickets_csv(
@@ -592,7 +626,7 @@ def generate_bulk_reception_tickets_csv(
     """
     Génère un export CSV détaillé de tous les tickets de réception filtrés.
     Une ligne par ligne de dépôt (LigneDepot).
-    
+
     Args:
         db: Session de base de données
         status: Statut du ticket (opened/closed)
@@ -602,44 +636,82 @@ def generate_bulk_reception_tickets_csv(
         search: Recherche textuelle
         include_empty: Inclure les tickets vides
         max_items: Nombre maximum d'éléments à exporter (sécurité)
-    
+
     Returns:
         BytesIO contenant le CSV
     """
-    from sqlalchemy.orm import selectinload
-    from recyclic_api.models.ticket_depot import TicketDepot
-    from recyclic_api.models.ligne_depot import LigneDepot
-    
-    service = ReceptionService(db)
-    
-    # Récupérer tous les tickets avec leurs lignes et catégories chargées
-    tickets, total = service.get_tickets_list(
-        page=1,
-        per_page=max_items,
+    return BytesIO(b"".join(stream_bulk_reception_tickets_csv(
+        db,
         status=status,
         date_from=date_from,
         date_to=date_to,
         benevole_id=benevole_id,
         search=search,
-        include_empty=include_empty
+        include_empty=include_empty,
+        max_items=max_items
+    )))
+
+
+def write_bulk_reception_tickets_excel(
+    db: Session,
+    destination: BinaryIO,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    benevole_id: Optional[UUID] = None,
+    search: Optional[str] = None,
+    include_empty: bool = False,
+    max_items: int = 10000
+) -> None:
+    """
+    Écrit un export Excel avec onglets "Résumé" et "Détail" des tickets filtrés
+    dans `destination`, en mode write_only (mémoire bornée quel que soit le volume).
+    """
+    service, query = _prepare_reception_tickets_export(
+        db, status, date_from, date_to, benevole_id, search, include_empty, max_items
     )
-    
-    if total > max_items:
-        raise ValueError(f"Trop de tickets à exporter ({total}). Maximum: {max_items}")
-    
-    # Recharger les tickets avec les lignes et catégories pour éviter N+1
-    ticket_ids = [ticket.id for ticket in tickets]
-    tickets_with_details = db.query(TicketDepot).options(
-        selectinload(TicketDepot.benevole),
-        selectinload(TicketDepot.lignes).selectinload(LigneDepot.category)
-    ).filter(TicketDepot.id.in_(ticket_ids)).all()
-    
-    buffer = BytesIO()
-    output = StringIO()
-    writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_MINIMAL)
-    
-    # En-têtes CSV - Détail (une ligne par ligne de dépôt)
-    headers = [
+    categories = CategoryResolver(db)
+
+    wb = Workbook(write_only=True)
+
+    # === ONGLET RÉSUMÉ ===
+    ws_summary = wb.create_sheet("Résumé")
+    _set_column_widths(ws_summary, {
+        'A': 38,  # UUID
+        'B': 12,
+        'C': 20,
+        'D': 20,
+        'E': 25,
+        'F': 38,  # Poste ID UUID
+        'G': 12,
+        'H': 18,
+    })
+    # En-têtes résumé (inclure ID Ticket et Poste ID pour correspondre au CSV)
+    ws_summary.append(_header_row(ws_summary, [
+        'ID Ticket', 'Statut', 'Date Création', 'Date Fermeture',
+        'Bénévole', 'Poste ID', 'Nb Lignes', 'Poids Total (kg)'
+    ]))
+
+    # === ONGLET DÉTAILS ===
+    ws_details = wb.create_sheet("Détail")
+    _set_column_widths(ws_details, {
+        'A': 38,  # ticket_id UUID
+        'B': 38,  # poste_id UUID
+        'C': 12,  # ticket_status
+        'D': 20,  # ticket_created_at
+        'E': 20,  # ticket_closed_at
+        'F': 25,  # benevole_username
+        'G': 18,  # ticket_total_poids_kg
+        'H': 12,  # ticket_total_lignes
+        'I': 38,  # ligne_id UUID
+        'J': 38,  # category_id UUID
+        'K': 30,  # category_principale
+        'L': 30,  # category_secondaire
+        'M': 15,  # destination
+        'N': 12,  # poids_kg
+        'O': 40,  # notes
+    })
+    ws_details.append(_header_row(ws_details, [
         'ticket_id',
         'poste_id',
         'ticket_status',
@@ -650,83 +722,106 @@ def generate_bulk_reception_tickets_csv(
         'ticket_total_lignes',
         'ligne_id',
         'category_id',
-        'category_label',
+        'category_principale',
+        'category_secondaire',
         'destination',
         'poids_kg',
         'notes'
-    ]
-    
-    writer.writerow(headers)
-    
-    # Écrire les données - une ligne par ligne de dépôt
-    for ticket in tickets_with_details:
-        # B50-P2: _calculate_ticket_totals retourne 5 valeurs (total_lignes, total_poids, poids_entree, poids_direct, poids_sortie)
-        total_lignes, total_poids, _, _, _ = service._calculate_ticket_totals(ticket)
-        
-        benevole_name = ''
-        if ticket.benevole:
-            benevole_name = (getattr(ticket.benevole, 'full_name', None) or 
-                           getattr(ticket.benevole, 'username', None) or 
-                           getattr(ticket.benevole, 'telegram_id', None) or '')
-        
-        # Si le ticket n'a pas de lignes, créer quand même une ligne pour le ticket
-        if not ticket.lignes:
-            row = [
+    ]))
+
+    total_lignes = 0
+    total_poids = 0.0
+
+    for batch in _iter_batches(query):
+        for ticket in batch:
+            nb_lignes, poids, _, _, _ = service._calculate_ticket_totals(ticket)
+            benevole_name = _display_name(ticket.benevole)
+
+            total_lignes += nb_lignes
+            total_poids += float(poids)
+
+            ws_summary.append([
                 str(ticket.id),
-                str(ticket.poste_id),
                 ticket.status,
                 _format_date(ticket.created_at),
                 _format_date(ticket.closed_at),
                 benevole_name,
-                _format_weight(float(total_poids)),
-                str(total_lignes),
-                '',  # ligne_id
-                '',  # category_id
-                '',  # category_label
-                '',  # destination
-                '',  # poids_kg
-                ''   # notes
-            ]
-            writer.writerow(row)
-        else:
+                str(ticket.poste_id),
+                str(nb_lignes),
+                _format_weight(float(poids))
+            ])
+
+            ticket_columns = _reception_ticket_columns(service, ticket)
+
+            # Si le ticket n'a pas de lignes, créer quand même une ligne pour le ticket
+            if not ticket.lignes:
+                ws_details.append(ticket_columns + ['', '', '', '', '', '', ''])
+                continue
+
             # Une ligne par ligne de dépôt
             for ligne in ticket.lignes:
-                category_label = ''
                 category_id = ''
-                if ligne.category:
-                    category_label = ligne.category.name or ''
-                    category_id = str(ligne.category.id) if ligne.category.id else ''
-                
-                destination_value = ''
-                if ligne.destination:
-                    destination_value = ligne.destination.value if hasattr(ligne.destination, 'value') else str(ligne.destination)
-                
-                notes = (ligne.notes or '').replace('\n', ' ').replace('\r', ' ').strip()
-                
-                row = [
-                    str(ticket.id),
-                    str(ticket.poste_id),
-                    ticket.status,
-                    _format_date(ticket.created_at),
-                    _format_date(ticket.closed_at),
-                    benevole_name,
-                    _format_weight(float(total_poids)),
-                    str(total_lignes),
+                category_principale = ''
+                category_secondaire = ''
+                category = categories.get_by_id(ligne.category_id)
+                if category:
+                    category_id = str(category.id)
+                    parent = categories.parent(category)
+                    if parent is not None:
+                        # La catégorie stockée est une sous-catégorie
+                        category_principale = parent.name or ''
+                        category_secondaire = category.name or ''
+                    else:
+                        # La catégorie stockée est déjà une racine
+                        category_principale = category.name or ''
+
+                ws_details.append(ticket_columns + [
                     str(ligne.id),
                     category_id,
-                    category_label,
-                    destination_value,
+                    category_principale,
+                    category_secondaire,
+                    _ligne_destination(ligne),
                     _format_weight(float(ligne.poids_kg)) if ligne.poids_kg else '',
-                    notes
-                ]
-                writer.writerow(row)
-    
-    # Convertir en bytes
-    csv_content = output.getvalue()
-    buffer.write(csv_content.encode('utf-8-sig'))
-    buffer.seek(0)
-    
-    return buffer
+                    _ligne_notes(ligne)
+                ])
+
+    # Ligne de totaux
+    ws_summary.append(_total_row(ws_summary, [
+        'TOTAL',
+        '',
+        '',
+        '',
+        '',
+        '',
+        str(total_lignes),
+        _format_weight(total_poids)
+    ]))
+
+    wb.save(destination)
+
+
+def stream_bulk_reception_tickets_excel(
+    db: Session,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    benevole_id: Optional[UUID] = None,
+    search: Optional[str] = None,
+    include_empty: bool = False,
+    max_items: int = 10000
+) -> Iterator[bytes]:
+    """Génère l'export Excel des tickets dans un fichier temporaire et le retourne en flux."""
+    return _spool_workbook(lambda fileobj: write_bulk_reception_tickets_excel(
+        db,
+        fileobj,
+        status=status,
+        date_from=date_from,
+        date_to=date_to,
+        benevole_id=benevole_id,
+        search=search,
+        include_empty=include_empty,
+        max_items=max_items
+    ))
 
 
 def generate_bulk_reception_tickets_excel(
@@ -741,7 +836,7 @@ def generate_bulk_reception_tickets_excel(
 ) -> BytesIO:
     """
     Génère un export Excel avec onglets "Résumé" et "Détails" pour tous les tickets filtrés.
-    
+
     Args:
         db: Session de base de données
         status: Statut du ticket (opened/closed)
@@ -751,251 +846,21 @@ def generate_bulk_reception_tickets_excel(
         search: Recherche textuelle
         include_empty: Inclure les tickets vides
         max_items: Nombre maximum d'éléments à exporter (sécurité)
-    
+
     Returns:
         BytesIO contenant le fichier Excel
     """
-    service = ReceptionService(db)
-    
-    # Récupérer tous les tickets
-    tickets, total = service.get_tickets_list(
-        page=1,
-        per_page=max_items,
+    buffer = BytesIO()
+    write_bulk_reception_tickets_excel(
+        db,
+        buffer,
         status=status,
         date_from=date_from,
         date_to=date_to,
         benevole_id=benevole_id,
         search=search,
-        include_empty=include_empty
+        include_empty=include_empty,
+        max_items=max_items
     )
-    
-    if total > max_items:
-        raise ValueError(f"Trop de tickets à exporter ({total}). Maximum: {max_items}")
-    
-    buffer = BytesIO()
-    wb = Workbook()
-    
-    # Supprimer la feuille par défaut si elle existe
-    if 'Sheet' in wb.sheetnames:
-        wb.remove(wb['Sheet'])
-    
-    # === ONGLET RÉSUMÉ ===
-    ws_summary = wb.create_sheet("Résumé")
-    
-    # Style des en-têtes
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    header_fill = PatternFill(start_color="3498DB", end_color="3498DB", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    # En-têtes résumé (inclure ID Ticket et Poste ID pour correspondre au CSV)
-    summary_headers = [
-        'ID Ticket', 'Statut', 'Date Création', 'Date Fermeture',
-        'Bénévole', 'Poste ID', 'Nb Lignes', 'Poids Total (kg)'
-    ]
-    ws_summary.append(summary_headers)
-    
-    # Appliquer style aux en-têtes
-    for cell in ws_summary[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = border
-    
-    # Données résumé
-    total_lignes = 0
-    total_poids = 0.0
-    
-    for ticket in tickets:
-        # B50-P2: _calculate_ticket_totals retourne 5 valeurs (total_lignes, total_poids, poids_entree, poids_direct, poids_sortie)
-        nb_lignes, poids, _, _, _ = service._calculate_ticket_totals(ticket)
-        
-        benevole_name = ''
-        if ticket.benevole:
-            benevole_name = (getattr(ticket.benevole, 'full_name', None) or 
-                           getattr(ticket.benevole, 'username', None) or 
-                           getattr(ticket.benevole, 'telegram_id', None) or '')
-        
-        total_lignes += nb_lignes
-        total_poids += float(poids)
-        
-        row = [
-            str(ticket.id),
-            ticket.status,
-            _format_date(ticket.created_at),
-            _format_date(ticket.closed_at),
-            benevole_name,
-            str(ticket.poste_id),
-            str(nb_lignes),
-            _format_weight(float(poids))
-        ]
-        ws_summary.append(row)
-    
-    # Ligne de totaux
-    ws_summary.append([
-        'TOTAL',
-        '',
-        '',
-        '',
-        '',
-        '',
-        str(total_lignes),
-        _format_weight(total_poids)
-    ])
-    
-    # Style ligne totaux
-    for cell in ws_summary[ws_summary.max_row]:
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="E8F4F8", end_color="E8F4F8", fill_type="solid")
-    
-    # Largeurs colonnes résumé
-    ws_summary.column_dimensions['A'].width = 38  # UUID
-    ws_summary.column_dimensions['B'].width = 12
-    ws_summary.column_dimensions['C'].width = 20
-    ws_summary.column_dimensions['D'].width = 20
-    ws_summary.column_dimensions['E'].width = 25
-    ws_summary.column_dimensions['F'].width = 38  # Poste ID UUID
-    ws_summary.column_dimensions['G'].width = 12
-    ws_summary.column_dimensions['H'].width = 18
-    
-    # === ONGLET DÉTAILS ===
-    ws_details = wb.create_sheet("Détail")
-    
-    # Recharger les tickets avec les lignes et catégories pour éviter N+1
-    from recyclic_api.models.ticket_depot import TicketDepot
-    from recyclic_api.models.ligne_depot import LigneDepot
-    from recyclic_api.models.category import Category
-    
-    ticket_ids = [ticket.id for ticket in tickets]
-    tickets_with_details = db.query(TicketDepot).options(
-        selectinload(TicketDepot.benevole),
-        selectinload(TicketDepot.lignes).selectinload(LigneDepot.category).selectinload(Category.parent)
-    ).filter(TicketDepot.id.in_(ticket_ids)).all()
-    
-    # En-têtes détails - une ligne par ligne de dépôt
-    detail_headers = [
-        'ticket_id',
-        'poste_id',
-        'ticket_status',
-        'ticket_created_at',
-        'ticket_closed_at',
-        'benevole_username',
-        'ticket_total_poids_kg',
-        'ticket_total_lignes',
-        'ligne_id',
-        'category_id',
-        'category_principale',
-        'category_secondaire',
-        'destination',
-        'poids_kg',
-        'notes'
-    ]
-    ws_details.append(detail_headers)
-    
-    # Appliquer style aux en-têtes
-    for cell in ws_details[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = border
-    
-    # Données détails - une ligne par ligne de dépôt
-    for ticket in tickets_with_details:
-        # B50-P2: _calculate_ticket_totals retourne 5 valeurs (total_lignes, total_poids, poids_entree, poids_direct, poids_sortie)
-        total_lignes, total_poids, _, _, _ = service._calculate_ticket_totals(ticket)
-        
-        benevole_name = ''
-        if ticket.benevole:
-            benevole_name = (getattr(ticket.benevole, 'full_name', None) or 
-                           getattr(ticket.benevole, 'username', None) or 
-                           getattr(ticket.benevole, 'telegram_id', None) or '')
-        
-        # Si le ticket n'a pas de lignes, créer quand même une ligne pour le ticket
-        if not ticket.lignes:
-            row = [
-                str(ticket.id),
-                str(ticket.poste_id),
-                ticket.status,
-                _format_date(ticket.created_at),
-                _format_date(ticket.closed_at),
-                benevole_name,
-                _format_weight(float(total_poids)),
-                str(total_lignes),
-                '',  # ligne_id
-                '',  # category_id
-                '',  # category_principale
-                '',  # category_secondaire
-                '',  # destination
-                '',  # poids_kg
-                ''   # notes
-            ]
-            ws_details.append(row)
-        else:
-            # Une ligne par ligne de dépôt
-            for ligne in ticket.lignes:
-                category_id = ''
-                category_principale = ''
-                category_secondaire = ''
-                if ligne.category:
-                    category_id = str(ligne.category.id) if ligne.category.id else ''
-                    if ligne.category.parent_id is not None and ligne.category.parent:
-                        # La catégorie stockée est une sous-catégorie
-                        category_principale = ligne.category.parent.name or ''
-                        category_secondaire = ligne.category.name or ''
-                    else:
-                        # La catégorie stockée est déjà une racine
-                        category_principale = ligne.category.name or ''
-                        category_secondaire = ''
-                
-                destination_value = ''
-                if ligne.destination:
-                    destination_value = ligne.destination.value if hasattr(ligne.destination, 'value') else str(ligne.destination)
-                
-                notes = (ligne.notes or '').replace('\n', ' ').replace('\r', ' ').strip()
-                
-                row = [
-                    str(ticket.id),
-                    str(ticket.poste_id),
-                    ticket.status,
-                    _format_date(ticket.created_at),
-                    _format_date(ticket.closed_at),
-                    benevole_name,
-                    _format_weight(float(total_poids)),
-                    str(total_lignes),
-                    str(ligne.id),
-                    category_id,
-                    category_principale,
-                    category_secondaire,
-                    destination_value,
-                    _format_weight(float(ligne.poids_kg)) if ligne.poids_kg else '',
-                    notes
-                ]
-                ws_details.append(row)
-    
-    # Largeurs colonnes détails
-    ws_details.column_dimensions['A'].width = 38  # ticket_id UUID
-    ws_details.column_dimensions['B'].width = 38  # poste_id UUID
-    ws_details.column_dimensions['C'].width = 12  # ticket_status
-    ws_details.column_dimensions['D'].width = 20  # ticket_created_at
-    ws_details.column_dimensions['E'].width = 20  # ticket_closed_at
-    ws_details.column_dimensions['F'].width = 25  # benevole_username
-    ws_details.column_dimensions['G'].width = 18  # ticket_total_poids_kg
-    ws_details.column_dimensions['H'].width = 12  # ticket_total_lignes
-    ws_details.column_dimensions['I'].width = 38  # ligne_id UUID
-    ws_details.column_dimensions['J'].width = 38  # category_id UUID
-    ws_details.column_dimensions['K'].width = 30  # category_principale
-    ws_details.column_dimensions['L'].width = 30  # category_secondaire
-    ws_details.column_dimensions['M'].width = 15  # destination
-    ws_details.column_dimensions['N'].width = 12  # poids_kg
-    ws_details.column_dimensions['O'].width = 40  # notes
-    
-    # Sauvegarder dans le buffer
-    wb.save(buffer)
     buffer.seek(0)
-    
     return buffer
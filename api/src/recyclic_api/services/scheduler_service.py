@@ -14,6 +14,7 @@ from contextlib import asynccontextmanager
 from recyclic_api.core.database import get_db
 from recyclic_api.core.database import SessionLocal
 from recyclic_api.services.anomaly_detection_service import get_anomaly_detection_service
+from recyclic_api.services.cash_session_service import CashSessionService
 from recyclic_api.models.cash_session import CashSession
 from recyclic_api.models.deposit import Deposit
 from recyclic_api.models.user import User
@@ -135,6 +136,24 @@ class SchedulerService:
 
         return {"status": "completed", "timestamp": datetime.now(timezone.utc)}
 
+    async def run_cash_session_totals_reconciliation_task(self):
+        """Tâche de réparation des compteurs incrémentaux des sessions de caisse."""
+        logger.info("Exécution de la réconciliation des compteurs de sessions de caisse")
+
+        try:
+            with SessionLocal() as db:
+                opened_since = datetime.now(timezone.utc) - timedelta(days=7)
+                repaired = CashSessionService(db).reconcile_session_totals(opened_since=opened_since)
+                if repaired:
+                    logger.warning(
+                        f"Compteurs corrigés pour {len(repaired)} session(s) de caisse: "
+                        f"{', '.join(str(session_id) for session_id in repaired)}"
+                    )
+                return {"repaired_sessions": len(repaired)}
+        except Exception as e:
+            logger.error(f"Erreur lors de la réconciliation des compteurs de sessions: {e}")
+            raise
+
     async def run_weekly_reports_task(self):
         """Tâche de génération des rapports hebdomadaires."""
         logger.info("Exécution de la génération des rapports hebdomadaires")
@@ -301,6 +320,14 @@ et envoie des notifications en cas de problème.
             enabled=True
         )
 
+        # Réconciliation des compteurs de sessions de caisse toutes les heures
+        self.add_task(
+            name="cash_session_totals_reconciliation",
+            func=self.run_cash_session_totals_reconciliation_task,
+            interval_minutes=60,
+            enabled=True
+        )
+
         # Rapports hebdomadaires tous les lundis à 8h
         self.add_task(
             name="weekly_reports",
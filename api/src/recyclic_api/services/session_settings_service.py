@@ -5,6 +5,7 @@ Service for managing session settings like token expiration.
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from recyclic_api.core.settings_cache import TOKEN_EXPIRATION_MINUTES, get_setting, invalidate_settings
 from recyclic_api.models.setting import Setting
 from recyclic_api.schemas.setting import SessionSettingsResponse, SessionSettingsUpdate
 
@@ -18,19 +19,9 @@ class SessionSettingsService:
     def get_session_settings(self) -> SessionSettingsResponse:
         """
         Récupère les paramètres de session.
-        Retourne 480 minutes par défaut si la valeur n'est pas trouvée.
+        Retourne 480 minutes par défaut si la valeur n'est pas trouvée ou invalide.
         """
-        setting = self.db.query(Setting).filter(
-            Setting.key == "token_expiration_minutes"
-        ).first()
-        
-        if setting:
-            try:
-                token_expiration_minutes = int(setting.value)
-            except (ValueError, TypeError):
-                token_expiration_minutes = 480  # Valeur par défaut
-        else:
-            token_expiration_minutes = 480  # Valeur par défaut
+        token_expiration_minutes = get_setting(TOKEN_EXPIRATION_MINUTES, self.db)
         
         return SessionSettingsResponse(
             token_expiration_minutes=token_expiration_minutes
@@ -73,6 +64,8 @@ class SessionSettingsService:
             self.db.rollback()
             raise ValueError(f"Erreur inattendue lors de la sauvegarde: {str(e)}") from e
         
+        invalidate_settings(TOKEN_EXPIRATION_MINUTES.key)
+        
         return SessionSettingsResponse(
             token_expiration_minutes=settings_update.token_expiration_minutes
         )
@@ -3,8 +3,15 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Callable, Optional
 
@@ -30,6 +37,106 @@ class UploadFailedError(RuntimeError):
     """Raised when a file fails to upload after all retries."""
 
 
+MANIFEST_FILENAME = ".kdrive-manifest.json"
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """State of a local file as last pushed to kDrive."""
+
+    remote_path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    etag: Optional[str] = None
+    synced_at: Optional[str] = None
+
+
+class SyncManifest:
+    """JSON record of synced files, used to upload only new or changed exports."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.entries: dict[str, ManifestEntry] = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path | str) -> "SyncManifest":
+        manifest = cls(path)
+        try:
+            raw = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return manifest
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable kDrive manifest %s: %s", manifest.path, exc)
+            return manifest
+
+        for relative, data in raw.get("files", {}).items():
+            try:
+                manifest.entries[relative] = ManifestEntry(**data)
+            except TypeError:
+                continue
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest atomically (a crash never leaves a truncated file)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": 1,
+            "files": {relative: asdict(entry) for relative, entry in sorted(self.entries.items())},
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def changed_entry(self, file_path: Path, relative: str, remote_path: str) -> Optional[ManifestEntry]:
+        """Entry to record once uploaded, or None when the file is already up to date on kDrive."""
+        stat = file_path.stat()
+        entry = self.entries.get(relative)
+        if entry is not None and entry.remote_path == remote_path:
+            if entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                return None
+            digest = _file_sha256(file_path)
+            if entry.sha256 == digest:
+                # Touched but identical content: refresh metadata without transferring
+                entry.size, entry.mtime_ns = stat.st_size, stat.st_mtime_ns
+                self.dirty = True
+                return None
+        else:
+            digest = _file_sha256(file_path)
+
+        return ManifestEntry(
+            remote_path=remote_path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            sha256=digest,
+        )
+
+    def record(self, relative: str, entry: ManifestEntry) -> None:
+        entry.synced_at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self.entries[relative] = entry
+            self.dirty = True
+
+    def retain(self, relatives: set[str]) -> None:
+        """Forget files that no longer exist locally."""
+        stale = set(self.entries) - relatives
+        for relative in stale:
+            del self.entries[relative]
+        if stale:
+            self.dirty = True
+
+
 class KDriveSyncService:
     """Service responsible for pushing local exports to Infomaniak kDrive via WebDAV."""
 
@@ -38,11 +145,19 @@ class KDriveSyncService:
         client_factory: Optional[Callable[[], Client]] = None,
         max_retries: Optional[int] = None,
         retry_delay_seconds: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        manifest_path: Optional[Path | str] = None,
     ) -> None:
         self._client_factory = client_factory or self._default_client_factory
-        self._client: Optional[Client] = None
+        # One WebDAV client per thread: uploads run in parallel during a sync cycle
+        self._local = threading.local()
         self.max_retries = max_retries or settings.KDRIVE_MAX_RETRIES
         self.retry_delay_seconds = retry_delay_seconds or settings.KDRIVE_RETRY_DELAY_SECONDS
+        self.max_workers = max(1, max_workers or settings.KDRIVE_SYNC_MAX_WORKERS)
+        self.manifest_path = manifest_path or settings.KDRIVE_SYNC_MANIFEST_PATH
+        # Remote directories known to exist (reset at each sync cycle)
+        self._known_directories: set[str] = set()
+        self._directories_lock = threading.Lock()
 
     def _default_client_factory(self) -> Client:
         """Instantiate a WebDAV client using environment configuration."""
@@ -63,12 +178,14 @@ class KDriveSyncService:
         return client
 
     def _get_client(self) -> Client:
-        if self._client is None:
-            self._client = self._client_factory()
-        return self._client
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._client_factory()
+            self._local.client = client
+        return client
 
     def _reset_client(self) -> None:
-        self._client = None
+        self._local.client = None
 
     def upload_file_to_kdrive(self, local_path: Path | str, remote_path: str) -> str:
         """Upload a single file to kDrive with retry logic."""
@@ -119,28 +236,80 @@ class KDriveSyncService:
         ) from last_error
 
     def sync_directory(self, local_directory: Path | str, remote_directory: str) -> list[Path]:
-        """Synchronise every file from a local folder to kDrive."""
+        """Upload new or changed files from a local folder to kDrive, in parallel."""
         base_dir = Path(local_directory)
         base_dir.mkdir(parents=True, exist_ok=True)
+        manifest = SyncManifest.load(self.manifest_path or base_dir / MANIFEST_FILENAME)
+        manifest_files = {manifest.path, manifest.path.with_name(manifest.path.name + ".tmp")}
 
-        uploaded: list[Path] = []
-        for file_path in sorted(p for p in base_dir.rglob("*") if p.is_file()):
+        with self._directories_lock:
+            self._known_directories.clear()
+
+        seen: set[str] = set()
+        pending: list[tuple[Path, str, ManifestEntry]] = []
+        for file_path in sorted(p for p in base_dir.rglob("*") if p.is_file() and p not in manifest_files):
             relative = file_path.relative_to(base_dir).as_posix()
-            remote_path = f"{remote_directory.rstrip('/')}/{relative}" if relative else remote_directory.rstrip('/')
+            remote_path = self._normalize_remote_path(f"{remote_directory.rstrip('/')}/{relative}")
+            seen.add(relative)
             try:
-                self.upload_file_to_kdrive(file_path, remote_path)
-                uploaded.append(file_path)
+                entry = manifest.changed_entry(file_path, relative, remote_path)
             except FileNotFoundError:
                 logger.warning("Skipped missing file during sync: %s", file_path)
-            except UploadFailedError:
-                # Already logged and notification dispatched; continue with next file
                 continue
+            if entry is not None:
+                pending.append((file_path, relative, entry))
+
+        manifest.retain(seen)
 
+        def _sync_one(item: tuple[Path, str, ManifestEntry]) -> Optional[Path]:
+            file_path, relative, entry = item
+            try:
+                self.upload_file_to_kdrive(file_path, entry.remote_path)
+            except FileNotFoundError:
+                logger.warning("Skipped missing file during sync: %s", file_path)
+                return None
+            except UploadFailedError:
+                # Already logged and notification dispatched; retried at next cycle
+                return None
+            entry.etag = self._remote_etag(entry.remote_path)
+            manifest.record(relative, entry)
+            return file_path
+
+        # Create each remote folder once, before the parallel uploads hit the cache
+        client = self._get_client() if pending else None
+        for remote_path in sorted({entry.remote_path for _, _, entry in pending}):
+            self._ensure_remote_directory(client, remote_path)
+
+        uploaded: list[Path] = []
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)), thread_name_prefix="kdrive-sync") as pool:
+                uploaded = [path for path in pool.map(_sync_one, pending) if path is not None]
+
+        if manifest.dirty:
+            manifest.save()
+
+        logger.info(
+            "kDrive sync cycle: %s files scanned, %s uploaded, %s up to date",
+            len(seen),
+            len(uploaded),
+            len(seen) - len(pending),
+        )
         return uploaded
 
+    def _remote_etag(self, remote_path: str) -> Optional[str]:
+        """Best-effort ETag of an uploaded file, kept in the manifest for reconciliation."""
+        info = getattr(self._get_client(), "info", None)
+        if info is None:
+            return None
+        try:
+            return (info(remote_path) or {}).get("etag")
+        except Exception as exc:  # noqa: BLE001 - the upload itself succeeded
+            logger.debug("Could not read remote etag for %s: %s", remote_path, exc)
+            return None
+
     def _ensure_remote_directory(self, client: Client, remote_path: str) -> None:
         remote_dir = self._extract_remote_directory(remote_path)
-        if not remote_dir:
+        if not remote_dir or remote_dir in self._known_directories:
             return
 
         try:
@@ -149,6 +318,10 @@ class KDriveSyncService:
                 client.mkdir(remote_dir)
         except Exception as exc:  # noqa: BLE001 - best effort
             logger.debug("Failed to ensure remote directory %s: %s", remote_dir, exc)
+            return
+
+        with self._directories_lock:
+            self._known_directories.add(remote_dir)
 
     @staticmethod
     def _extract_remote_directory(remote_path: str) -> str:
@@ -1,8 +1,9 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timezone
 import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
 
 from recyclic_api.models.user import User
 from recyclic_api.models.user_status_history import UserStatusHistory
@@ -11,6 +12,26 @@ from recyclic_api.models.sale import Sale
 from recyclic_api.models.deposit import Deposit
 from recyclic_api.models.login_history import LoginHistory
 from recyclic_api.schemas.admin import ActivityEvent, UserHistoryResponse
+from recyclic_api.utils.pagination import decode_cursor, encode_cursor
+
+
+# Sources de la chronologie : (code, type d'événement exposé).
+# Le code sert de départage stable entre deux événements à la même date et au même id
+# (ouverture/fermeture d'une même session de caisse).
+_SOURCE_ADMIN = 1
+_SOURCE_LOGIN = 2
+_SOURCE_SESSION_OPEN = 3
+_SOURCE_SESSION_CLOSE = 4
+_SOURCE_SALE = 5
+_SOURCE_DEPOSIT = 6
+
+_EVENT_TYPE_SOURCES = {
+    "ADMINISTRATION": (_SOURCE_ADMIN,),
+    "LOGIN": (_SOURCE_LOGIN,),
+    "SESSION CAISSE": (_SOURCE_SESSION_OPEN, _SOURCE_SESSION_CLOSE),
+    "VENTE": (_SOURCE_SALE,),
+    "DEPOT": (_SOURCE_DEPOSIT,),
+}
 
 
 class UserHistoryService:
@@ -27,6 +48,12 @@ class UserHistoryService:
         if dt.tzinfo is None:
             return dt.replace(tzinfo=timezone.utc)
         return dt
+
+    @classmethod
+    def decode_cursor(cls, cursor: str) -> Tuple[datetime, uuid.UUID, int]:
+        """Position (date, id, source) du dernier événement de la page précédente."""
+        event_date, ref_id, source = decode_cursor(cursor, tiebreakers=1)
+        return cls._aware(event_date), ref_id, source
     
     def get_user_activity_history(
         self,
@@ -35,18 +62,23 @@ class UserHistoryService:
         date_to: Optional[datetime] = None,
         event_type: Optional[str] = None,
         skip: int = 0,
-        limit: int = 20
+        limit: int = 20,
+        cursor: Optional[str] = None,
     ) -> UserHistoryResponse:
         """
         Récupère l'historique complet d'activité d'un utilisateur
         
+        La chronologie est fusionnée côté SQL (UNION ALL des sources, triée par date puis id) :
+        seule la page demandée est lue puis hydratée, avec une requête par source présente.
+        
         Args:
             user_id: ID de l'utilisateur
             date_from: Date de début du filtre (optionnel)
             date_to: Date de fin du filtre (optionnel)
             event_type: Type d'événement à filtrer (optionnel)
-            skip: Nombre d'éléments à ignorer pour la pagination
+            skip: Nombre d'éléments à ignorer pour la pagination (ignoré si cursor est fourni)
             limit: Nombre d'éléments par page
+            cursor: Curseur renvoyé dans next_cursor par la page précédente (pagination par clé)
             
         Returns:
             UserHistoryResponse: Réponse contenant les événements et métadonnées de pagination
@@ -55,303 +87,292 @@ class UserHistoryService:
             # Normaliser les bornes temporelles en UTC, si fournies
             date_from = self._aware(date_from)
             date_to = self._aware(date_to)
+            position = self.decode_cursor(cursor) if cursor else None
 
             # Vérifier que l'utilisateur existe
             user_uuid = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
-            user = self.db.query(User).filter(User.id == user_uuid).first()
+            user = self.db.query(User.id).filter(User.id == user_uuid).first()
             if not user:
                 raise ValueError(f"Utilisateur avec l'ID {user_id} non trouvé")
-            
-            # Récupérer tous les événements
-            events = []
-            
-            # 1. Événements d'administration (changements de statut)
-            admin_events = self._get_admin_events(user_uuid, date_from, date_to)
-            events.extend(admin_events)
-            
-            # 2. Événements de connexions
-            login_events = self._get_login_events(user_uuid, date_from, date_to)
-            events.extend(login_events)
 
-            # 3. Sessions de caisse
-            cash_session_events = self._get_cash_session_events(user_uuid, date_from, date_to)
-            events.extend(cash_session_events)
-            
-            # 4. Ventes
-            sale_events = self._get_sale_events(user_uuid, date_from, date_to)
-            events.extend(sale_events)
-            
-            # 5. Dépôts
-            deposit_events = self._get_deposit_events(user_uuid, date_from, date_to)
-            events.extend(deposit_events)
-            
-            # Appliquer le filtre par type d'événement
             if event_type:
-                events = [event for event in events if event.event_type == event_type]
-            
-            # Trier par date (plus récent en premier)
-            events.sort(key=lambda x: x.date, reverse=True)
-            
-            # Calculer la pagination
-            total_count = len(events)
+                sources = _EVENT_TYPE_SOURCES.get(event_type, ())
+            else:
+                sources = tuple(source for group in _EVENT_TYPE_SOURCES.values() for source in group)
+
+            offset = 0 if position else skip
             page = (skip // limit) + 1
-            has_next = (skip + limit) < total_count
-            has_prev = skip > 0
-            
-            # Appliquer la pagination
-            paginated_events = events[skip:skip + limit]
-            
+            has_prev = position is not None or skip > 0
+
+            if not sources:
+                return UserHistoryResponse(
+                    user_id=user_id,
+                    events=[],
+                    total_count=0,
+                    page=page,
+                    limit=limit,
+                    has_next=False,
+                    has_prev=has_prev,
+                )
+
+            timeline = self._timeline_query(user_uuid, sources, date_from, date_to).subquery("timeline")
+            total_count = self.db.execute(select(func.count()).select_from(timeline)).scalar_one()
+
+            page_query = select(timeline.c.source, timeline.c.ref_id, timeline.c.event_date)
+            if position:
+                last_date, last_id, last_source = position
+                page_query = page_query.where(
+                    or_(
+                        timeline.c.event_date < last_date,
+                        and_(timeline.c.event_date == last_date, timeline.c.ref_id < last_id),
+                        and_(
+                            timeline.c.event_date == last_date,
+                            timeline.c.ref_id == last_id,
+                            timeline.c.source < last_source,
+                        ),
+                    )
+                )
+            # Une ligne de plus que la page pour savoir s'il existe une page suivante
+            rows = self.db.execute(
+                page_query
+                .order_by(timeline.c.event_date.desc(), timeline.c.ref_id.desc(), timeline.c.source.desc())
+                .offset(offset)
+                .limit(limit + 1)
+            ).all()
+
+            has_next = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = None
+            if has_next:
+                last = rows[-1]
+                next_cursor = encode_cursor(self._aware(last.event_date), last.ref_id, last.source)
+
             return UserHistoryResponse(
                 user_id=user_id,
-                events=paginated_events,
+                events=self._hydrate_events(rows),
                 total_count=total_count,
                 page=page,
                 limit=limit,
                 has_next=has_next,
-                has_prev=has_prev
+                has_prev=has_prev,
+                next_cursor=next_cursor,
             )
             
         except ValueError:
-            # Propager les erreurs métier (ex: utilisateur introuvable)
+            # Propager les erreurs métier (ex: utilisateur introuvable, curseur invalide)
             raise
         except Exception as e:
             # Préserver un message clair mais laisser l'endpoint mapper en 500
             raise Exception(f"Erreur lors de la récupération de l'historique utilisateur: {str(e)}")
-    
-    def _get_admin_events(
-        self, 
-        user_id: uuid.UUID, 
-        date_from: Optional[datetime] = None, 
-        date_to: Optional[datetime] = None
-    ) -> List[ActivityEvent]:
-        """Récupère les événements d'administration (changements de statut)"""
-        query = self.db.query(UserStatusHistory).filter(UserStatusHistory.user_id == user_id)
-        
-        # Appliquer les filtres de date
-        if date_from:
-            query = query.filter(UserStatusHistory.change_date >= date_from)
-        if date_to:
-            query = query.filter(UserStatusHistory.change_date <= date_to)
-        
-        history_records = query.order_by(desc(UserStatusHistory.change_date)).all()
-        
-        events = []
-        for record in history_records:
-            # Déterminer la description basée sur le changement
-            if record.old_status is None:
-                description = f"Statut initial défini: {'Actif' if record.new_status else 'Inactif'}"
-            else:
-                old_status_text = "Actif" if record.old_status else "Inactif"
-                new_status_text = "Actif" if record.new_status else "Inactif"
-                description = f"Statut modifié de {old_status_text} vers {new_status_text}"
-            
-            if record.reason:
-                description += f" (Raison: {record.reason})"
-            
-            events.append(ActivityEvent(
-                id=record.id,
-                event_type="ADMINISTRATION",
-                description=description,
-                date=self._aware(record.change_date),
-                metadata={
-                    "old_status": record.old_status,
-                    "new_status": record.new_status,
-                    "reason": record.reason,
-                    "changed_by_admin_id": str(record.changed_by_admin_id)
-                }
-            ))
-        
-        return events
 
-    def _get_login_events(
+    def _timeline_query(
         self,
         user_id: uuid.UUID,
+        sources: Tuple[int, ...],
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-    ) -> List[ActivityEvent]:
-        """Récupère les événements de connexion (succès/échec)"""
-        query = self.db.query(LoginHistory).filter(LoginHistory.user_id == user_id)
+    ):
+        """UNION ALL des sources retenues, projetées sur (source, ref_id, event_date)."""
 
-        if date_from:
-            query = query.filter(LoginHistory.created_at >= date_from)
-        if date_to:
-            query = query.filter(LoginHistory.created_at <= date_to)
+        def branch(source: int, id_column, date_column, *criteria):
+            query = select(
+                literal(source).label("source"),
+                id_column.label("ref_id"),
+                date_column.label("event_date"),
+            ).where(date_column.isnot(None), *criteria)
+            if date_from:
+                query = query.where(date_column >= date_from)
+            if date_to:
+                query = query.where(date_column <= date_to)
+            return query
 
-        records = query.order_by(desc(LoginHistory.created_at)).all()
+        operator_sessions = select(CashSession.id).where(CashSession.operator_id == user_id)
+        builders = {
+            _SOURCE_ADMIN: lambda: branch(
+                _SOURCE_ADMIN, UserStatusHistory.id, UserStatusHistory.change_date,
+                UserStatusHistory.user_id == user_id,
+            ),
+            _SOURCE_LOGIN: lambda: branch(
+                _SOURCE_LOGIN, LoginHistory.id, LoginHistory.created_at,
+                LoginHistory.user_id == user_id,
+            ),
+            _SOURCE_SESSION_OPEN: lambda: branch(
+                _SOURCE_SESSION_OPEN, CashSession.id, CashSession.opened_at,
+                CashSession.operator_id == user_id,
+            ),
+            _SOURCE_SESSION_CLOSE: lambda: branch(
+                _SOURCE_SESSION_CLOSE, CashSession.id, CashSession.closed_at,
+                CashSession.operator_id == user_id,
+            ),
+            _SOURCE_SALE: lambda: branch(
+                _SOURCE_SALE, Sale.id, Sale.created_at,
+                Sale.cash_session_id.in_(operator_sessions),
+            ),
+            _SOURCE_DEPOSIT: lambda: branch(
+                _SOURCE_DEPOSIT, Deposit.id, Deposit.created_at,
+                Deposit.user_id == user_id,
+            ),
+        }
+        return union_all(*(builders[source]() for source in sources))
 
-        events: List[ActivityEvent] = []
-        for record in records:
-            if record.error_type == "logout":
-                status_text = "DÉCONNEXION"
-                reason_text = ""
-            else:
-                status_text = "CONNECTÉ" if record.success else "ÉCHEC CONNEXION"
-                reason_text = f" (Raison: {record.error_type})" if record.error_type else ""
+    def _hydrate_events(self, rows) -> List[ActivityEvent]:
+        """Charge les enregistrements de la page (une requête par source) et construit les événements."""
+        ids_by_source: Dict[int, List[uuid.UUID]] = {}
+        for row in rows:
+            ids_by_source.setdefault(row.source, []).append(row.ref_id)
+
+        def load(model, *sources: int) -> Dict[Any, Any]:
+            ids = {ref_id for source in sources for ref_id in ids_by_source.get(source, ())}
+            if not ids:
+                return {}
+            return {record.id: record for record in self.db.query(model).filter(model.id.in_(ids)).all()}
 
-            description = f"{status_text} depuis {record.client_ip or 'IP inconnue'}{reason_text}"
+        admin_records = load(UserStatusHistory, _SOURCE_ADMIN)
+        login_records = load(LoginHistory, _SOURCE_LOGIN)
+        sessions = load(CashSession, _SOURCE_SESSION_OPEN, _SOURCE_SESSION_CLOSE)
+        sales = load(Sale, _SOURCE_SALE)
+        deposits = load(Deposit, _SOURCE_DEPOSIT)
 
-            events.append(ActivityEvent(
-                id=record.id,
-                event_type="LOGIN",
-                description=description,
-                date=self._aware(record.created_at),
-                metadata={
-                    "success": record.success,
-                    "client_ip": record.client_ip,
-                    "error_type": record.error_type,
-                    "event": "logout" if record.error_type == "logout" else "login",
-                    "username": record.username,
-                }
-            ))
+        formatters = {
+            _SOURCE_ADMIN: (admin_records, self._admin_event),
+            _SOURCE_LOGIN: (login_records, self._login_event),
+            _SOURCE_SESSION_OPEN: (sessions, self._session_open_event),
+            _SOURCE_SESSION_CLOSE: (sessions, self._session_close_event),
+            _SOURCE_SALE: (sales, self._sale_event),
+            _SOURCE_DEPOSIT: (deposits, self._deposit_event),
+        }
 
+        events: List[ActivityEvent] = []
+        for row in rows:
+            records, formatter = formatters[row.source]
+            record = records.get(row.ref_id)
+            if record is not None:
+                events.append(formatter(record))
         return events
     
-    def _get_cash_session_events(
-        self, 
-        user_id: uuid.UUID, 
-        date_from: Optional[datetime] = None, 
-        date_to: Optional[datetime] = None
-    ) -> List[ActivityEvent]:
-        """Récupère les événements de sessions de caisse"""
-        # Récupérer les sessions de l'utilisateur; filtrage appliqué par événement (open/close)
-        sessions = (
-            self.db.query(CashSession)
-            .filter(CashSession.operator_id == user_id)
-            .order_by(desc(CashSession.opened_at))
-            .all()
-        )
+    def _admin_event(self, record: UserStatusHistory) -> ActivityEvent:
+        """Événement d'administration (changement de statut)"""
+        # Déterminer la description basée sur le changement
+        if record.old_status is None:
+            description = f"Statut initial défini: {'Actif' if record.new_status else 'Inactif'}"
+        else:
+            old_status_text = "Actif" if record.old_status else "Inactif"
+            new_status_text = "Actif" if record.new_status else "Inactif"
+            description = f"Statut modifié de {old_status_text} vers {new_status_text}"
         
-        events = []
-        for session in sessions:
-            # Événement d'ouverture de session
-            # Inclure l'événement d'ouverture si dans fenêtre temporelle
-            include_open = (
-                (date_from is None or (session.opened_at and session.opened_at >= date_from)) and
-                (date_to is None or (session.opened_at and session.opened_at <= date_to))
-            )
-            if include_open:
-                events.append(ActivityEvent(
-                    id=session.id,
-                    event_type="SESSION CAISSE",
-                    description=f"Session de caisse ouverte (Montant initial: {session.initial_amount}€)",
-                    date=self._aware(session.opened_at),
-                    metadata={
-                        "session_id": str(session.id),
-                        "status": session.status.value,
-                        "initial_amount": session.initial_amount,
-                        "site_id": str(session.site_id) if session.site_id else None
-                    }
-                ))
-            
-            # Événement de fermeture de session (si applicable)
-            if session.closed_at:
-                include_close = (
-                    (date_from is None or (session.closed_at and session.closed_at >= date_from)) and
-                    (date_to is None or (session.closed_at and session.closed_at <= date_to))
-                )
-                if include_close:
-                    events.append(ActivityEvent(
-                        id=f"{session.id}_closed",
-                        event_type="SESSION CAISSE",
-                        description=f"Session de caisse fermée (Total ventes: {session.total_sales or 0}€, Items: {session.total_items or 0})",
-                        date=self._aware(session.closed_at),
-                        metadata={
-                            "session_id": str(session.id),
-                            "status": session.status.value,
-                            "initial_amount": session.initial_amount,
-                            "total_sales": session.total_sales,
-                            "total_items": session.total_items,
-                            "final_amount": session.current_amount
-                        }
-                    ))
+        if record.reason:
+            description += f" (Raison: {record.reason})"
         
-        return events
+        return ActivityEvent(
+            id=record.id,
+            event_type="ADMINISTRATION",
+            description=description,
+            date=self._aware(record.change_date),
+            metadata={
+                "old_status": record.old_status,
+                "new_status": record.new_status,
+                "reason": record.reason,
+                "changed_by_admin_id": str(record.changed_by_admin_id)
+            }
+        )
+
+    def _login_event(self, record: LoginHistory) -> ActivityEvent:
+        """Événement de connexion (succès/échec/déconnexion)"""
+        if record.error_type == "logout":
+            status_text = "DÉCONNEXION"
+            reason_text = ""
+        else:
+            status_text = "CONNECTÉ" if record.success else "ÉCHEC CONNEXION"
+            reason_text = f" (Raison: {record.error_type})" if record.error_type else ""
+
+        description = f"{status_text} depuis {record.client_ip or 'IP inconnue'}{reason_text}"
+
+        return ActivityEvent(
+            id=record.id,
+            event_type="LOGIN",
+            description=description,
+            date=self._aware(record.created_at),
+            metadata={
+                "success": record.success,
+                "client_ip": record.client_ip,
+                "error_type": record.error_type,
+                "event": "logout" if record.error_type == "logout" else "login",
+                "username": record.username,
+            }
+        )
     
-    def _get_sale_events(
-        self, 
-        user_id: uuid.UUID, 
-        date_from: Optional[datetime] = None, 
-        date_to: Optional[datetime] = None
-    ) -> List[ActivityEvent]:
-        """Récupère les événements de ventes via les sessions de caisse"""
-        # Récupérer les sessions de caisse de l'utilisateur
-        cash_sessions = self.db.query(CashSession).filter(CashSession.operator_id == user_id).all()
-        session_ids = [session.id for session in cash_sessions]
-        
-        if not session_ids:
-            return []
-        
-        query = self.db.query(Sale).filter(Sale.cash_session_id.in_(session_ids))
-        
-        # Appliquer les filtres de date
-        if date_from:
-            query = query.filter(Sale.created_at >= date_from)
-        if date_to:
-            query = query.filter(Sale.created_at <= date_to)
-        
-        sales = query.order_by(desc(Sale.created_at)).all()
-        
-        events = []
-        for sale in sales:
-            events.append(ActivityEvent(
-                id=sale.id,
-                event_type="VENTE",
-                description=f"Vente effectuée (Montant: {sale.total_amount}€)",
-                date=self._aware(sale.created_at),
-                metadata={
-                    "sale_id": str(sale.id),
-                    "total_amount": sale.total_amount,
-                    "cash_session_id": str(sale.cash_session_id)
-                }
-            ))
-        
-        return events
+    def _session_open_event(self, session: CashSession) -> ActivityEvent:
+        """Événement d'ouverture de session de caisse"""
+        return ActivityEvent(
+            id=session.id,
+            event_type="SESSION CAISSE",
+            description=f"Session de caisse ouverte (Montant initial: {session.initial_amount}€)",
+            date=self._aware(session.opened_at),
+            metadata={
+                "session_id": str(session.id),
+                "status": session.status.value,
+                "initial_amount": session.initial_amount,
+                "site_id": str(session.site_id) if session.site_id else None
+            }
+        )
+
+    def _session_close_event(self, session: CashSession) -> ActivityEvent:
+        """Événement de fermeture de session de caisse"""
+        return ActivityEvent(
+            id=f"{session.id}_closed",
+            event_type="SESSION CAISSE",
+            description=f"Session de caisse fermée (Total ventes: {session.total_sales or 0}€, Items: {session.total_items or 0})",
+            date=self._aware(session.closed_at),
+            metadata={
+                "session_id": str(session.id),
+                "status": session.status.value,
+                "initial_amount": session.initial_amount,
+                "total_sales": session.total_sales,
+                "total_items": session.total_items,
+                "final_amount": session.current_amount
+            }
+        )
     
-    def _get_deposit_events(
-        self, 
-        user_id: uuid.UUID, 
-        date_from: Optional[datetime] = None, 
-        date_to: Optional[datetime] = None
-    ) -> List[ActivityEvent]:
-        """Récupère les événements de dépôts"""
-        query = self.db.query(Deposit).filter(Deposit.user_id == user_id)
-        
-        # Appliquer les filtres de date
-        if date_from:
-            query = query.filter(Deposit.created_at >= date_from)
-        if date_to:
-            query = query.filter(Deposit.created_at <= date_to)
-        
-        deposits = query.order_by(desc(Deposit.created_at)).all()
-        
-        events = []
-        for deposit in deposits:
-            # Déterminer la description basée sur le statut
-            if deposit.status.value == "completed":
-                description = f"Dépôt validé: {deposit.description or 'Objet non spécifié'}"
-                if deposit.category:
-                    description += f" (Catégorie: {deposit.category.value})"
-            elif deposit.status.value == "classified":
-                description = f"Dépôt classifié: {deposit.description or 'Objet non spécifié'}"
-                if deposit.eee_category:
-                    description += f" (Catégorie EEE: {deposit.eee_category.value})"
-            else:
-                description = f"Dépôt créé: {deposit.description or 'Objet non spécifié'} (Statut: {deposit.status.value})"
-            
-            events.append(ActivityEvent(
-                id=deposit.id,
-                event_type="DEPOT",
-                description=description,
-                date=self._aware(deposit.created_at),
-                metadata={
-                    "deposit_id": str(deposit.id),
-                    "status": deposit.status.value,
-                    "category": deposit.category.value if deposit.category else None,
-                    "eee_category": deposit.eee_category.value if deposit.eee_category else None,
-                    "weight": deposit.weight,
-                    "confidence_score": deposit.confidence_score,
-                    "site_id": str(deposit.site_id) if deposit.site_id else None
-                }
-            ))
+    def _sale_event(self, sale: Sale) -> ActivityEvent:
+        """Événement de vente (sessions de caisse de l'utilisateur)"""
+        return ActivityEvent(
+            id=sale.id,
+            event_type="VENTE",
+            description=f"Vente effectuée (Montant: {sale.total_amount}€)",
+            date=self._aware(sale.created_at),
+            metadata={
+                "sale_id": str(sale.id),
+                "total_amount": sale.total_amount,
+                "cash_session_id": str(sale.cash_session_id)
+            }
+        )
+    
+    def _deposit_event(self, deposit: Deposit) -> ActivityEvent:
+        """Événement de dépôt"""
+        # Déterminer la description basée sur le statut
+        if deposit.status.value == "completed":
+            description = f"Dépôt validé: {deposit.description or 'Objet non spécifié'}"
+            if deposit.category:
+                description += f" (Catégorie: {deposit.category.value})"
+        elif deposit.status.value == "classified":
+            description = f"Dépôt classifié: {deposit.description or 'Objet non spécifié'}"
+            if deposit.eee_category:
+                description += f" (Catégorie EEE: {deposit.eee_category.value})"
+        else:
+            description = f"Dépôt créé: {deposit.description or 'Objet non spécifié'} (Statut: {deposit.status.value})"
         
-        return events
+        return ActivityEvent(
+            id=deposit.id,
+            event_type="DEPOT",
+            description=description,
+            date=self._aware(deposit.created_at),
+            metadata={
+                "deposit_id": str(deposit.id),
+                "status": deposit.status.value,
+                "category": deposit.category.value if deposit.category else None,
+                "eee_category": deposit.eee_category.value if deposit.eee_category else None,
+                "weight": deposit.weight,
+                "confidence_score": deposit.confidence_score,
+                "site_id": str(deposit.site_id) if deposit.site_id else None
+            }
+        )
@@ -2,41 +2,25 @@
 Authentication metrics collection system for monitoring and observability.
 """
 import time
-from collections import defaultdict, deque
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
-from threading import Lock
 import logging
 
-logger = logging.getLogger(__name__)
-
+from recyclic_api.utils.metrics_store import WindowedMetricsStore
 
-@dataclass
-class AuthMetric:
-    """Represents a single authentication attempt metric."""
-    timestamp: float
-    username: str
-    success: bool
-    elapsed_ms: float
-    client_ip: str = "unknown"
-    user_id: Optional[str] = None
-    error_type: Optional[str] = None
+logger = logging.getLogger(__name__)
 
 
 class AuthMetricsCollector:
-    """Collects and manages authentication metrics."""
+    """Collects and manages authentication metrics (shared by all workers through Redis)."""
 
-    def __init__(self, max_history: int = 10000):
+    def __init__(self, redis_client=None):
         """
         Initialize the metrics collector.
 
         Args:
-            max_history: Maximum number of metrics to keep in memory
+            redis_client: Redis client to use (defaults to the application client)
         """
-        self.max_history = max_history
-        self._metrics_history: deque = deque(maxlen=max_history)
-        self._counters = defaultdict(int)
-        self._lock = Lock()
+        self._store = WindowedMetricsStore("auth", redis_client)
 
     def record_login_attempt(
         self,
@@ -58,25 +42,20 @@ class AuthMetricsCollector:
             user_id: User ID (if successful)
             error_type: Type of error (if failed)
         """
-        metric = AuthMetric(
-            timestamp=time.time(),
-            username=username,
-            success=success,
-            elapsed_ms=elapsed_ms,
-            client_ip=client_ip,
-            user_id=user_id,
-            error_type=error_type
-        )
-
-        with self._lock:
-            self._metrics_history.append(metric)
-
-            # Update counters
-            if success:
-                self._counters["login_success_total"] += 1
-            else:
-                self._counters["login_errors_total"] += 1
-                self._counters[f"login_errors_by_type_{error_type or 'unknown'}"] += 1
+        counters = {"attempts": 1}
+        if success:
+            counters["success"] = 1
+            totals = {"login_success_total": 1}
+        else:
+            counters["failure"] = 1
+            counters[f"error:{error_type or 'unknown'}"] = 1
+            counters[f"ip:{client_ip}"] = 1
+            totals = {
+                "login_errors_total": 1,
+                f"login_errors_by_type_{error_type or 'unknown'}": 1,
+            }
+
+        self._store.record(counters=counters, latencies={"login": elapsed_ms}, totals=totals)
 
     def get_metrics_summary(self, hours: int = 24) -> Dict[str, Any]:
         """
@@ -88,15 +67,10 @@ class AuthMetricsCollector:
         Returns:
             Dictionary containing metrics summary
         """
-        cutoff_time = time.time() - (hours * 3600)
+        window = self._store.window(hours)
+        total_attempts = window.get("attempts")
 
-        with self._lock:
-            recent_metrics = [
-                m for m in self._metrics_history
-                if m.timestamp >= cutoff_time
-            ]
-
-        if not recent_metrics:
+        if not total_attempts:
             return {
                 "total_attempts": 0,
                 "success_count": 0,
@@ -108,39 +82,27 @@ class AuthMetricsCollector:
             }
 
         # Calculate basic stats
-        total_attempts = len(recent_metrics)
-        success_count = sum(1 for m in recent_metrics if m.success)
-        failure_count = total_attempts - success_count
-        success_rate = (success_count / total_attempts) * 100 if total_attempts > 0 else 0
+        success_count = window.get("success")
+        failure_count = window.get("failure")
+        success_rate = (success_count / total_attempts) * 100
 
         # Calculate latency statistics
-        latencies = [m.elapsed_ms for m in recent_metrics]
+        latency = window.latency("login")
         latency_metrics = {
-            "min_ms": min(latencies) if latencies else 0,
-            "max_ms": max(latencies) if latencies else 0,
-            "avg_ms": sum(latencies) / len(latencies) if latencies else 0
+            "min_ms": latency.min_ms or 0,
+            "max_ms": latency.max_ms or 0,
+            "avg_ms": latency.avg_ms
         }
 
-        # Error breakdown
-        error_breakdown = defaultdict(int)
-        for metric in recent_metrics:
-            if not metric.success:
-                error_breakdown[metric.error_type or "unknown"] += 1
-
-        # IP breakdown (for failed attempts)
-        ip_breakdown = defaultdict(int)
-        for metric in recent_metrics:
-            if not metric.success:
-                ip_breakdown[metric.client_ip] += 1
-
         return {
             "total_attempts": total_attempts,
             "success_count": success_count,
             "failure_count": failure_count,
             "success_rate_percent": round(success_rate, 2),
             "latency_metrics": latency_metrics,
-            "error_breakdown": dict(error_breakdown),
-            "ip_breakdown": dict(ip_breakdown),
+            "error_breakdown": window.prefixed("error:"),
+            # IP breakdown (for failed attempts)
+            "ip_breakdown": window.prefixed("ip:"),
             "time_period_hours": hours,
             "timestamp": time.time()
         }
@@ -154,32 +116,28 @@ class AuthMetricsCollector:
         """
         metrics = []
 
-        with self._lock:
-            # Add counter metrics
-            for counter_name, value in self._counters.items():
-                metrics.append(f"# TYPE {counter_name} counter")
-                metrics.append(f"{counter_name} {value}")
+        # Add counter metrics
+        for counter_name, value in self._store.totals().items():
+            metrics.append(f"# TYPE {counter_name} counter")
+            metrics.append(f"{counter_name} {value}")
 
-        # Add current summary metrics
-        summary = self.get_metrics_summary(hours=1)  # Last hour
+        # Add current window metrics (last hour)
+        window = self._store.window(hours=1)
+        total_attempts = window.get("attempts")
+        success_rate = window.get("success") / total_attempts if total_attempts else 0
 
+        metrics.extend(window.latency("login").prometheus_lines("login_latency_ms"))
         metrics.extend([
-            "# TYPE login_latency_ms histogram",
-            f"login_latency_ms_sum {summary['latency_metrics'].get('avg_ms', 0) * summary['total_attempts']}",
-            f"login_latency_ms_count {summary['total_attempts']}",
-
             "# TYPE login_success_rate gauge",
-            f"login_success_rate {summary['success_rate_percent'] / 100}",
+            f"login_success_rate {success_rate}",
         ])
 
         return metrics
 
     def reset_metrics(self) -> None:
         """Reset all metrics (useful for testing)."""
-        with self._lock:
-            self._metrics_history.clear()
-            self._counters.clear()
+        self._store.reset()
 
 
 # Global metrics collector instance
-auth_metrics = AuthMetricsCollector()
\ No newline at end of file
+auth_metrics = AuthMetricsCollector()
@@ -2,12 +2,11 @@
 Email metrics collection system for monitoring and observability.
 """
 import time
-from collections import defaultdict, deque
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
-from threading import Lock
 import logging
-import statistics
+
+from recyclic_api.utils.metrics_store import WindowedMetricsStore
 
 logger = logging.getLogger(__name__)
 
@@ -26,19 +25,16 @@ class EmailMetric:
 
 
 class EmailMetricsCollector:
-    """Collects and manages email sending metrics."""
+    """Collects and manages email sending metrics (shared by all workers through Redis)."""
 
-    def __init__(self, max_history: int = 10000):
+    def __init__(self, redis_client=None):
         """
         Initialize the metrics collector.
 
         Args:
-            max_history: Maximum number of metrics to keep in memory
+            redis_client: Redis client to use (defaults to the application client)
         """
-        self.max_history = max_history
-        self._metrics_history: deque = deque(maxlen=max_history)
-        self._counters = defaultdict(int)
-        self._lock = Lock()
+        self._store = WindowedMetricsStore("email", redis_client)
 
     def record_email_send(
         self,
@@ -73,16 +69,22 @@ class EmailMetricsCollector:
             error_detail=error_detail
         )
 
-        with self._lock:
-            self._metrics_history.append(metric)
-
-            # Update counters
-            if success:
-                self._counters[f"emails_sent_total_{provider}_success"] += 1
-                self._log_success(metric)
-            else:
-                self._counters[f"emails_failed_total_{provider}_{error_type or 'unknown'}"] += 1
-                self._log_error(metric)
+        outcome = "success" if success else "failure"
+        counters = {"total": 1, outcome: 1, f"provider:{provider}:{outcome}": 1}
+        if success:
+            totals = {f"emails_sent_total_{provider}_success": 1}
+            self._log_success(metric)
+        else:
+            counters[f"error:{error_type or 'unknown'}"] = 1
+            totals = {f"emails_failed_total_{provider}_{error_type or 'unknown'}": 1}
+            self._log_error(metric)
+
+        self._store.record(
+            counters=counters,
+            latencies={"send": elapsed_ms},
+            totals=totals,
+            timestamp=metric.timestamp,
+        )
 
     def _log_success(self, metric: EmailMetric) -> None:
         """Log successful email send with structured logging."""
@@ -123,15 +125,10 @@ class EmailMetricsCollector:
         Returns:
             Dictionary containing metrics summary
         """
-        cutoff_time = time.time() - (hours * 3600)
+        window = self._store.window(hours)
+        total_emails = window.get("total")
 
-        with self._lock:
-            recent_metrics = [
-                m for m in self._metrics_history
-                if m.timestamp >= cutoff_time
-            ]
-
-        if not recent_metrics:
+        if not total_emails:
             return {
                 "total_emails": 0,
                 "success_count": 0,
@@ -143,34 +140,25 @@ class EmailMetricsCollector:
             }
 
         # Calculate basic stats
-        total_emails = len(recent_metrics)
-        success_count = sum(1 for m in recent_metrics if m.success)
-        failure_count = total_emails - success_count
-        success_rate = (success_count / total_emails) * 100 if total_emails > 0 else 0
+        success_count = window.get("success")
+        failure_count = window.get("failure")
+        success_rate = (success_count / total_emails) * 100
 
-        # Calculate latency statistics
-        latencies = [m.elapsed_ms for m in recent_metrics]
+        # Calculate latency statistics (percentiles from the histogram buckets)
+        latency = window.latency("send")
         latency_metrics = {
-            "min_ms": min(latencies) if latencies else 0,
-            "max_ms": max(latencies) if latencies else 0,
-            "avg_ms": statistics.mean(latencies) if latencies else 0,
-            "p50_ms": statistics.median(latencies) if latencies else 0,
-            "p95_ms": statistics.quantiles(latencies, n=20)[18] if len(latencies) >= 20 else (max(latencies) if latencies else 0)
+            "min_ms": latency.min_ms or 0,
+            "max_ms": latency.max_ms or 0,
+            "avg_ms": latency.avg_ms,
+            "p50_ms": latency.quantile(0.5),
+            "p95_ms": latency.quantile(0.95)
         }
 
-        # Error breakdown
-        error_breakdown = defaultdict(int)
-        for metric in recent_metrics:
-            if not metric.success:
-                error_breakdown[metric.error_type or "unknown"] += 1
-
         # Provider breakdown
-        provider_breakdown = defaultdict(lambda: {"success": 0, "failure": 0})
-        for metric in recent_metrics:
-            if metric.success:
-                provider_breakdown[metric.provider]["success"] += 1
-            else:
-                provider_breakdown[metric.provider]["failure"] += 1
+        provider_breakdown: Dict[str, Dict[str, int]] = {}
+        for name, count in window.prefixed("provider:").items():
+            provider, _, outcome = name.rpartition(":")
+            provider_breakdown.setdefault(provider, {"success": 0, "failure": 0})[outcome] = count
 
         return {
             "total_emails": total_emails,
@@ -178,8 +166,8 @@ class EmailMetricsCollector:
             "failure_count": failure_count,
             "success_rate_percent": round(success_rate, 2),
             "latency_metrics": latency_metrics,
-            "error_breakdown": dict(error_breakdown),
-            "provider_breakdown": dict(provider_breakdown),
+            "error_breakdown": window.prefixed("error:"),
+            "provider_breakdown": provider_breakdown,
             "time_period_hours": hours,
             "timestamp": time.time()
         }
@@ -193,32 +181,28 @@ class EmailMetricsCollector:
         """
         metrics = []
 
-        with self._lock:
-            # Add counter metrics
-            for counter_name, value in self._counters.items():
-                metrics.append(f"# TYPE {counter_name} counter")
-                metrics.append(f"{counter_name} {value}")
+        # Add counter metrics
+        for counter_name, value in self._store.totals().items():
+            metrics.append(f"# TYPE {counter_name} counter")
+            metrics.append(f"{counter_name} {value}")
 
-        # Add current summary metrics
-        summary = self.get_metrics_summary(hours=1)  # Last hour
+        # Add current window metrics (last hour)
+        window = self._store.window(hours=1)
+        total_emails = window.get("total")
+        success_rate = window.get("success") / total_emails if total_emails else 0
 
+        metrics.extend(window.latency("send").prometheus_lines("email_send_latency_ms"))
         metrics.extend([
-            "# TYPE email_send_latency_ms histogram",
-            f"email_send_latency_ms_sum {summary['latency_metrics'].get('avg_ms', 0) * summary['total_emails']}",
-            f"email_send_latency_ms_count {summary['total_emails']}",
-
             "# TYPE email_success_rate gauge",
-            f"email_success_rate {summary['success_rate_percent'] / 100}",
+            f"email_success_rate {success_rate}",
         ])
 
         return metrics
 
     def reset_metrics(self) -> None:
         """Reset all metrics (useful for testing)."""
-        with self._lock:
-            self._metrics_history.clear()
-            self._counters.clear()
+        self._store.reset()
 
 
 # Global metrics collector instance
-email_metrics = EmailMetricsCollector()
\ No newline at end of file
+email_metrics = EmailMetricsCollector()
@@ -0,0 +1,77 @@
+"""
+Requêtes conditionnelles (ETag / If-None-Match) pour les GET interrogés en boucle.
+
+L'ETag est l'empreinte du corps JSON canonique : un client qui renvoie
+l'ETag reçu obtient `304 Not Modified` (sans corps) tant que la réponse
+n'a pas changé. Pour un corps déjà sérialisé (et mis en cache), l'ETag fort
+est l'empreinte des octets envoyés.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+# Le client garde la réponse mais la revalide à chaque utilisation
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(payload: Any) -> str:
+    """ETag faible dérivé du contenu JSON (clés triées, indépendant de la sérialisation)."""
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"), default=str)
+    return f'W/"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def render_json(payload: Any) -> bytes:
+    """Corps JSON identique à celui de JSONResponse, prêt à être conservé en cache."""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def strong_etag(body: bytes) -> str:
+    """ETag fort : empreinte exacte des octets du corps."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible (RFC 9110) de l'ETag courant avec l'en-tête If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional_json_response(
+    request: Request,
+    payload: Any,
+    *,
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+) -> Response:
+    """Réponse JSON portant un ETag, ou 304 si le client possède déjà cette version."""
+    content = jsonable_encoder(payload)
+    return conditional_response(request, render_json(content), compute_etag(content), cache_control=cache_control)
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    *,
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+) -> Response:
+    """Corps JSON déjà sérialisé avec son ETag, ou 304 si l'en-tête If-None-Match correspond."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,268 @@
+"""
+Windowed metrics store shared by all API workers.
+
+Events are pre-aggregated in Redis into per-minute and per-hour buckets
+(counters, latency histograms, exact min/max), so a summary over N hours
+reads at most 59 minute buckets plus N + 1 hour buckets, whatever the traffic,
+and every worker sees the same numbers.
+"""
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+MINUTE_SECONDS = 60
+HOUR_SECONDS = 3600
+
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (
+    5, 10, 25, 50, 75, 100, 150, 200, 300, 500, 750,
+    1000, 1500, 2000, 3000, 5000, 10000, 30000, math.inf,
+)
+
+_WARNING_INTERVAL_SECONDS = 60.0
+
+
+def _bound_label(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else f"{bound:g}"
+
+
+def _bucket_for(value_ms: float) -> str:
+    for bound in LATENCY_BUCKETS_MS:
+        if value_ms <= bound:
+            return _bound_label(bound)
+    return "+Inf"
+
+
+@dataclass
+class LatencyHistogram:
+    """Latency distribution of one window (bucket counts are not cumulative)."""
+    count: int = 0
+    sum_ms: float = 0.0
+    min_ms: Optional[float] = None
+    max_ms: Optional[float] = None
+    buckets: Dict[float, int] = field(default_factory=dict)
+
+    @property
+    def avg_ms(self) -> float:
+        return self.sum_ms / self.count if self.count else 0
+
+    def quantile(self, q: float) -> float:
+        """
+        Nearest-rank quantile, resolved to the upper bound of its bucket.
+
+        The result is clamped to the exact min/max of the window, so a window
+        whose values all fall in one bucket still reports real latencies.
+        """
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        value = self.max_ms
+        for bound in sorted(self.buckets):
+            seen += self.buckets[bound]
+            if seen >= rank:
+                value = bound
+                break
+        if value is None or math.isinf(value):
+            value = self.max_ms
+        if self.max_ms is not None:
+            value = min(value, self.max_ms)
+        if self.min_ms is not None:
+            value = max(value, self.min_ms)
+        return value
+
+    def prometheus_lines(self, name: str) -> List[str]:
+        lines = [f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound in LATENCY_BUCKETS_MS:
+            cumulative += self.buckets.get(bound, 0)
+            lines.append(f'{name}_bucket{{le="{_bound_label(bound)}"}} {cumulative}')
+        lines.append(f"{name}_sum {self.sum_ms}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+@dataclass
+class MetricsWindow:
+    """Counters and latency histograms merged over a time window."""
+    counters: Dict[str, int] = field(default_factory=dict)
+    latencies: Dict[str, LatencyHistogram] = field(default_factory=dict)
+
+    def get(self, name: str) -> int:
+        return self.counters.get(name, 0)
+
+    def prefixed(self, prefix: str) -> Dict[str, int]:
+        """Counters whose name starts with `prefix`, keyed by the rest of the name."""
+        return {
+            name[len(prefix):]: value
+            for name, value in self.counters.items()
+            if name.startswith(prefix) and value
+        }
+
+    def latency(self, name: str) -> LatencyHistogram:
+        return self.latencies.get(name, LatencyHistogram())
+
+
+class WindowedMetricsStore:
+    """
+    Redis-backed, time-bucketed metrics for one namespace.
+
+    Keys (all expiring after METRICS_RETENTION_HOURS):
+        metrics:{ns}:m:{minute}      hash of counters/histograms for one minute
+        metrics:{ns}:h:{hour}        same for one hour
+        metrics:{ns}:m|h:{n}:ext     sorted set holding the exact min/max latencies
+        metrics:{ns}:u:{name}:{min}  HyperLogLog of distinct values for one minute
+        metrics:{ns}:totals          lifetime counters (Prometheus)
+
+    Redis failures never propagate: a lost event is better than a failed login.
+    """
+
+    def __init__(self, namespace: str, redis_client=None):
+        self.namespace = namespace
+        self._redis = redis_client
+        self._last_warning = 0.0
+
+    @property
+    def redis(self):
+        return self._redis if self._redis is not None else get_redis()
+
+    def _key(self, *parts: Any) -> str:
+        return ":".join(["metrics", self.namespace, *map(str, parts)])
+
+    def _warn(self, action: str, exc: Exception) -> None:
+        now = time.monotonic()
+        if now - self._last_warning >= _WARNING_INTERVAL_SECONDS:
+            self._last_warning = now
+            logger.warning(f"Metrics store '{self.namespace}' unavailable ({action}): {exc}")
+
+    def record(
+        self,
+        counters: Optional[Mapping[str, int]] = None,
+        latencies: Optional[Mapping[str, float]] = None,
+        unique: Optional[Mapping[str, str]] = None,
+        totals: Optional[Mapping[str, int]] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """
+        Record one event in its minute and hour buckets (single round trip).
+
+        Args:
+            counters: Windowed counters to increment
+            latencies: Latency samples in ms, by histogram name
+            unique: Values to count as distinct, by set name (last hour only)
+            totals: Lifetime counters to increment
+            timestamp: Event time (defaults to now)
+        """
+        ts = time.time() if timestamp is None else timestamp
+        minute = int(ts // MINUTE_SECONDS)
+        hour = int(ts // HOUR_SECONDS)
+        ttl = (settings.METRICS_RETENTION_HOURS + 1) * HOUR_SECONDS
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for bucket in (self._key("m", minute), self._key("h", hour)):
+                for name, amount in (counters or {}).items():
+                    pipe.hincrby(bucket, name, amount)
+                if latencies:
+                    ext = f"{bucket}:ext"
+                    for name, value in latencies.items():
+                        pipe.hincrby(bucket, f"lat:{name}:count", 1)
+                        pipe.hincrbyfloat(bucket, f"lat:{name}:sum", value)
+                        pipe.hincrby(bucket, f"lat:{name}:le:{_bucket_for(value)}", 1)
+                        pipe.zadd(ext, {f"{name}:min": value}, lt=True)
+                        pipe.zadd(ext, {f"{name}:max": value}, gt=True)
+                    pipe.expire(ext, ttl)
+                pipe.expire(bucket, ttl)
+            for name, value in (unique or {}).items():
+                unique_key = self._key("u", name, minute)
+                pipe.pfadd(unique_key, value)
+                pipe.expire(unique_key, 2 * HOUR_SECONDS)
+            for name, amount in (totals or {}).items():
+                pipe.hincrby(self._key("totals"), name, amount)
+            pipe.execute()
+        except Exception as exc:
+            self._warn("record", exc)
+
+    def window(self, hours: float, now: Optional[float] = None) -> MetricsWindow:
+        """Merge the buckets covering the last `hours` hours (minute precision)."""
+        now = time.time() if now is None else now
+        start_minute = int((now - hours * HOUR_SECONDS) // MINUTE_SECONDS)
+        end_minute = int(now // MINUTE_SECONDS)
+        # Leading partial hour from minute buckets, then whole hour buckets
+        first_hour = -(-start_minute * MINUTE_SECONDS // HOUR_SECONDS)
+        buckets = [
+            self._key("m", minute)
+            for minute in range(start_minute, min(first_hour * 60, end_minute + 1))
+        ]
+        buckets += [self._key("h", hour) for hour in range(first_hour, int(now // HOUR_SECONDS) + 1)]
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for bucket in buckets:
+                pipe.hgetall(bucket)
+                pipe.zrange(f"{bucket}:ext", 0, -1, withscores=True)
+            replies = pipe.execute()
+        except Exception as exc:
+            self._warn("read", exc)
+            return MetricsWindow()
+
+        result = MetricsWindow()
+        for fields, extremes in zip(replies[0::2], replies[1::2]):
+            for name, raw in fields.items():
+                if not name.startswith("lat:"):
+                    result.counters[name] = result.counters.get(name, 0) + int(raw)
+                    continue
+                hist_name, _, rest = name[4:].partition(":")
+                histogram = result.latencies.setdefault(hist_name, LatencyHistogram())
+                if rest == "count":
+                    histogram.count += int(raw)
+                elif rest == "sum":
+                    histogram.sum_ms += float(raw)
+                elif rest.startswith("le:"):
+                    bound = float(rest[3:].replace("+Inf", "inf"))
+                    histogram.buckets[bound] = histogram.buckets.get(bound, 0) + int(raw)
+            for member, score in extremes:
+                hist_name, _, which = member.rpartition(":")
+                histogram = result.latencies.setdefault(hist_name, LatencyHistogram())
+                if which == "min":
+                    histogram.min_ms = score if histogram.min_ms is None else min(histogram.min_ms, score)
+                elif which == "max":
+                    histogram.max_ms = score if histogram.max_ms is None else max(histogram.max_ms, score)
+        return result
+
+    def count_unique(self, name: str, minutes: int = 60, now: Optional[float] = None) -> int:
+        """Approximate number of distinct values recorded under `name` in the last minutes."""
+        now = time.time() if now is None else now
+        end_minute = int(now // MINUTE_SECONDS)
+        keys = [self._key("u", name, minute) for minute in range(end_minute - minutes + 1, end_minute + 1)]
+        try:
+            return int(self.redis.pfcount(*keys))
+        except Exception as exc:
+            self._warn("read", exc)
+            return 0
+
+    def totals(self) -> Dict[str, int]:
+        """Lifetime counters, for the Prometheus exposition."""
+        try:
+            raw = self.redis.hgetall(self._key("totals"))
+        except Exception as exc:
+            self._warn("read", exc)
+            return {}
+        return {name: int(value) for name, value in sorted(raw.items())}
+
+    def reset(self) -> None:
+        """Delete every key of the namespace (useful for testing)."""
+        try:
+            client = self.redis
+            keys = list(client.scan_iter(match=self._key("*"), count=500))
+            for start in range(0, len(keys), 500):
+                client.delete(*keys[start:start + 500])
+        except Exception as exc:
+            self._warn("reset", exc)
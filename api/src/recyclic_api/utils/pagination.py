@@ -0,0 +1,165 @@
+"""
+Pagination par clé (keyset) et comptage des listes volumineuses.
+
+Les listes d'historique (sessions de caisse, ventes, tickets de réception) sont
+triées par (date décroissante, id décroissant). Le curseur `next_cursor` encode
+la position de la dernière ligne d'une page ; la page suivante filtre
+`(date, id) < (date_curseur, id_curseur)` au lieu de sauter N lignes avec
+OFFSET, ce qui garde un coût constant quelle que soit la profondeur.
+
+Le total peut être exact (`COUNT(*)` sur la requête filtrée) ou estimé par le
+planificateur PostgreSQL (`EXPLAIN`), sans exécuter la requête.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Literal, Optional, Tuple, TypeVar, get_args
+
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_AUTO = "auto"
+# Type des paramètres `count_mode` des endpoints : FastAPI rejette toute autre valeur
+CountMode = Literal["exact", "estimated", "auto"]
+COUNT_MODES = get_args(CountMode)
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Curseur de pagination illisible ou falsifié."""
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    items: List[T]
+    total: int
+    next_cursor: Optional[str] = None
+    total_estimated: bool = False
+
+
+def encode_cursor(timestamp: datetime, row_id: uuid.UUID, *tiebreakers: int) -> str:
+    """
+    Encode la position (date, id) de la dernière ligne d'une page, suivie des
+    éventuelles clés entières de départage (ex. source d'une chronologie fusionnée).
+    """
+    payload = json.dumps([timestamp.isoformat(), str(row_id), *tiebreakers])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, tiebreakers: int = 0) -> Tuple[Any, ...]:
+    """Décode un curseur de `encode_cursor` : (date, id, *départages entiers)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != 2 + tiebreakers:
+            raise ValueError("Nombre de clés inattendu")
+        raw_timestamp, raw_id, *extra = values
+        return (datetime.fromisoformat(raw_timestamp), uuid.UUID(raw_id), *(int(value) for value in extra))
+    except (ValueError, TypeError, AttributeError) as exc:
+        raise InvalidCursorError("Curseur de pagination invalide") from exc
+
+
+def keyset_filter(timestamp_column, id_column, cursor: str):
+    """Lignes situées après le curseur dans l'ordre (date desc, id desc)."""
+    last_timestamp, last_id = decode_cursor(cursor)
+    # Borne `date <= curseur` redondante : garantit un parcours d'intervalle sur l'index de date
+    return and_(
+        timestamp_column <= last_timestamp,
+        or_(
+            timestamp_column < last_timestamp,
+            and_(timestamp_column == last_timestamp, id_column < last_id),
+        ),
+    )
+
+
+def fetch_keyset_page(
+    query: Query,
+    timestamp_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Page de `limit` lignes triées par (date desc, id desc) et curseur de la suivante.
+
+    Avec un curseur, `offset` est ignoré. Sans curseur, la page est lue par
+    OFFSET (compatibilité skip/page) mais renvoie quand même un curseur.
+    """
+    if cursor:
+        query = query.filter(keyset_filter(timestamp_column, id_column, cursor))
+        offset = 0
+
+    # Une ligne de plus que la page pour savoir s'il existe une page suivante
+    rows = (
+        query.order_by(None)
+        .order_by(timestamp_column.desc(), id_column.desc())
+        .offset(offset)
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, timestamp_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+
+class ExplainJson(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` d'une requête, exécuté comme elle (paramètres liés et convertis)."""
+
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(ExplainJson, "postgresql")
+def _compile_explain_json(element: ExplainJson, compiler, **kw) -> str:
+    # Les paramètres de la requête sont collectés par le compilateur : leurs
+    # convertisseurs (Enum -> nom stocké, UUID...) s'appliquent à l'exécution
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_row_count(db: Session, query: Query) -> Optional[int]:
+    """Nombre de lignes prévu par EXPLAIN (PostgreSQL uniquement, sinon None)."""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    plan = db.execute(ExplainJson(query.order_by(None).statement)).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(
+    db: Session,
+    query: Query,
+    count_mode: str = COUNT_EXACT,
+    exact_threshold: Optional[int] = None,
+) -> Tuple[int, bool]:
+    """
+    Total des lignes de la requête, et s'il est estimé.
+
+    `estimated` utilise le plan PostgreSQL ; `auto` ne l'utilise qu'au-delà de
+    `exact_threshold` lignes prévues. Hors PostgreSQL le total est toujours exact.
+    """
+    if count_mode != COUNT_EXACT:
+        estimate = estimate_row_count(db, query)
+        if estimate is not None and (
+            count_mode == COUNT_ESTIMATED or exact_threshold is None or estimate > exact_threshold
+        ):
+            return estimate, True
+    return query.order_by(None).count(), False
@@ -9,6 +9,7 @@ from pathlib import Path
 # /app/tests/conftest.py -> /app
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import importlib.util
 import types
 
 if "reportlab" not in sys.modules:
@@ -47,7 +48,9 @@ if "reportlab" not in sys.modules:
     sys.modules["reportlab.lib.enums"] = enums
     sys.modules["reportlab.platypus"] = platypus
 
-if "openpyxl" not in sys.modules:
+# Stub openpyxl uniquement s'il n'est pas installé : les exports XLSX (write_only,
+# WriteOnlyCell) et leurs tests relisent les classeurs avec le vrai openpyxl.
+if "openpyxl" not in sys.modules and importlib.util.find_spec("openpyxl") is None:
     class _DummyCell:
         def __init__(self):
             self.font = None
@@ -193,6 +196,8 @@ def create_tables_if_not_exist():
                         WHEN duplicate_object THEN null;
                     END $$;
                 """))
+                # Opérateurs trigrammes des index de recherche du journal d'audit
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
                 conn.commit()
         Base.metadata.create_all(bind=engine)
         print("✅ Tables créées avec succès")
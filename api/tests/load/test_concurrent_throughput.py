@@ -0,0 +1,147 @@
+"""
+Load test for the hot cashier/dashboard endpoints under concurrent traffic.
+
+Compares throughput of 50 concurrent clients against sequential requests and
+measures event-loop lag meanwhile: blocking SQLAlchemy calls must run in the
+threadpool (sync handlers / worker threads), not on the event loop.
+"""
+import asyncio
+import time
+from typing import List, Tuple
+from uuid import uuid4
+
+import httpx
+import pytest
+from httpx import ASGITransport
+from sqlalchemy.orm import sessionmaker
+
+from recyclic_api.core.config import settings
+from recyclic_api.core.database import get_db
+from recyclic_api.core.security import create_access_token, hash_password
+from recyclic_api.main import app
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+from recyclic_api.models.sale import Sale
+from recyclic_api.models.sale_item import SaleItem
+from recyclic_api.models.site import Site
+from recyclic_api.models.user import User, UserRole, UserStatus
+
+CONCURRENT_CLIENTS = 50
+REQUESTS_PER_CLIENT = 4
+
+
+@pytest.fixture
+def pooled_sessions(db_engine):
+    """One session per request (the default test override shares a single session, unsafe across threads)."""
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield factory
+    finally:
+        if previous is not None:
+            app.dependency_overrides[get_db] = previous
+        else:
+            app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def seeded_admin_token(pooled_sessions):
+    """Committed data (visible from every pooled connection), removed afterwards."""
+    db = pooled_sessions()
+    admin = User(
+        id=uuid4(),
+        username=f"load_admin_{uuid4().hex[:8]}",
+        hashed_password=hash_password("LoadTest123!"),
+        role=UserRole.ADMIN,
+        status=UserStatus.ACTIVE,
+        is_active=True,
+    )
+    site = Site(id=uuid4(), name="Site Load Test")
+    db.add_all([admin, site])
+    db.flush()
+    session = CashSession(
+        id=uuid4(),
+        operator_id=admin.id,
+        site_id=site.id,
+        initial_amount=50.0,
+        current_amount=50.0,
+        status=CashSessionStatus.OPEN,
+    )
+    db.add(session)
+    db.flush()
+    sales = []
+    for _ in range(50):
+        sale = Sale(id=uuid4(), cash_session_id=session.id, operator_id=admin.id, total_amount=10.0, donation=0.0)
+        sales.append(sale)
+        db.add(sale)
+        db.flush()
+        db.add(SaleItem(sale_id=sale.id, category="EEE-1", quantity=1, weight=1.5, unit_price=10.0, total_price=10.0))
+    db.commit()
+
+    yield create_access_token(data={"sub": str(admin.id)})
+
+    for sale in sales:
+        db.query(SaleItem).filter(SaleItem.sale_id == sale.id).delete()
+        db.delete(sale)
+    db.delete(session)
+    db.delete(site)
+    db.delete(admin)
+    db.commit()
+    db.close()
+
+
+async def _measure(path: str, headers: dict, concurrency: int) -> Tuple[float, float]:
+    """Returns (requests per second, max event-loop lag in ms) for concurrency clients."""
+    total_requests = CONCURRENT_CLIENTS * REQUESTS_PER_CLIENT
+    lags: List[float] = []
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        interval = 0.01
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append((time.perf_counter() - start - interval) * 1000)
+
+    async def worker(client: httpx.AsyncClient, count: int):
+        for _ in range(count):
+            response = await client.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+
+    transport = ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        monitor = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, total_requests // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await monitor
+
+    return total_requests / elapsed, max(lags, default=0.0)
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+@pytest.mark.parametrize("endpoint", ["/sales/?limit=50", "/stats/live"])
+async def test_throughput_at_50_concurrent_clients(seeded_admin_token, endpoint):
+    path = f"{settings.API_V1_STR}{endpoint}"
+    headers = {"Authorization": f"Bearer {seeded_admin_token}"}
+
+    sequential_rps, sequential_lag = await _measure(path, headers, concurrency=1)
+    concurrent_rps, concurrent_lag = await _measure(path, headers, concurrency=CONCURRENT_CLIENTS)
+
+    print(f"\nThroughput {endpoint}:")
+    print(f"  sequential: {sequential_rps:.1f} req/s (max loop lag {sequential_lag:.1f}ms)")
+    print(f"  {CONCURRENT_CLIENTS} clients: {concurrent_rps:.1f} req/s (max loop lag {concurrent_lag:.1f}ms)")
+
+    # Concurrent clients must not serialise behind a blocked event loop
+    assert concurrent_rps >= sequential_rps * 0.9
+    assert concurrent_lag < 250, f"Event loop blocked for {concurrent_lag:.1f}ms under load"
@@ -273,3 +273,51 @@ class TestLoginPerformance:
 
         # Performance should still meet requirements even with metrics collection
         assert avg_response_time < 600, f"Average response time with metrics {avg_response_time:.2f}ms exceeds 600ms requirement"
+
+    @pytest.mark.skip(reason="Performance tests disabled in unit suite; run in perf pipeline")
+    async def test_login_latency_percentiles_20_concurrent(self, test_user_credentials):
+        """
+        Shift-change scenario: 20 cashiers log in at the same time.
+
+        Measures p50/p95 latency and the event-loop lag meanwhile: bcrypt runs in
+        the dedicated worker pool, so the loop keeps serving other requests.
+        """
+        base_url = "http://testserver"
+        concurrency = 20
+        rounds = 3
+        lags: List[float] = []
+        stop = asyncio.Event()
+
+        async def heartbeat():
+            interval = 0.01
+            while not stop.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(interval)
+                lags.append((time.perf_counter() - start - interval) * 1000)
+
+        transport = ASGITransport(app=app)
+        response_times: List[float] = []
+        async with httpx.AsyncClient(transport=transport, base_url=base_url) as client:
+            monitor = asyncio.create_task(heartbeat())
+            for _ in range(rounds):
+                response_times.extend(await asyncio.gather(*(
+                    self.single_login_request(client, test_user_credentials)
+                    for _ in range(concurrency)
+                )))
+            stop.set()
+            await monitor
+
+        quantiles = statistics.quantiles(response_times, n=20)
+        p50_response_time = statistics.median(response_times)
+        p95_response_time = quantiles[18]
+        max_loop_lag = max(lags, default=0.0)
+
+        print(f"\nLogin Performance Results ({concurrency} concurrent logins x {rounds}):")
+        print(f"  P50 response time: {p50_response_time:.2f}ms")
+        print(f"  P95 response time: {p95_response_time:.2f}ms")
+        print(f"  Max event loop lag: {max_loop_lag:.2f}ms")
+
+        assert p50_response_time < 1500, f"P50 response time {p50_response_time:.2f}ms is too high at shift change"
+        assert p95_response_time < 3000, f"P95 response time {p95_response_time:.2f}ms is too high at shift change"
+        # A bcrypt verification (~250ms) on the loop would show up here
+        assert max_loop_lag < 200, f"Event loop blocked for {max_loop_lag:.2f}ms during logins"
@@ -0,0 +1,100 @@
+"""
+Tests de la lecture groupée de la présence utilisateur (ActivityService.get_presence_bulk).
+
+Utilise fakeredis comme stand-in local de Redis.
+"""
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from recyclic_api.services.activity_service import ActivityService
+
+
+pytestmark = pytest.mark.no_db
+
+
+class CountingFakeRedis(fakeredis.FakeRedis):
+    """FakeRedis qui compte les commandes envoyées (≈ allers-retours réseau)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.command_count = 0
+
+    def execute_command(self, *args, **options):
+        self.command_count += 1
+        return super().execute_command(*args, **options)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = CountingFakeRedis(decode_responses=True)
+    monkeypatch.setattr("recyclic_api.services.activity_service.get_redis", lambda: client)
+    return client
+
+
+def test_presence_bulk_matches_per_user_lookups(fake_redis):
+    now = int(time.time())
+    fake_redis.set("last_activity:u1", now - 120)
+    fake_redis.set("last_logout:u2", now - 60)
+    fake_redis.set("last_activity:u3", "not-a-number")
+
+    service = ActivityService()
+    presence = service.get_presence_bulk(["u1", "u2", "u3", "u4"])
+
+    minutes_u1, logout_u1 = presence["u1"]
+    assert minutes_u1 == pytest.approx(2, abs=0.1)
+    assert logout_u1 is None
+    assert presence["u2"] == (None, now - 60)
+    assert presence["u3"] == (None, None)
+    assert presence["u4"] == (None, None)
+    # La valeur invalide est nettoyée, comme dans get_last_activity_timestamp
+    assert fake_redis.get("last_activity:u3") is None
+
+
+def test_presence_bulk_uses_constant_round_trips(fake_redis):
+    service = ActivityService()
+    user_ids = [f"user-{i}" for i in range(ActivityService.BULK_CHUNK_SIZE)]
+    for user_id in user_ids:
+        service.redis.set(f"last_activity:{user_id}", int(time.time()))
+
+    fake_redis.command_count = 0
+    presence = service.get_presence_bulk(user_ids)
+
+    assert len(presence) == len(user_ids)
+    assert fake_redis.command_count == 1
+
+
+@pytest.mark.performance
+def test_presence_bulk_benchmark(fake_redis):
+    """Micro-benchmark: lecture groupée vs 2 GET par utilisateur pour 500 bénévoles."""
+    service = ActivityService()
+    user_ids = [f"user-{i}" for i in range(500)]
+    now = int(time.time())
+    for user_id in user_ids:
+        fake_redis.set(f"last_activity:{user_id}", now)
+        fake_redis.set(f"last_logout:{user_id}", now - 3600)
+
+    fake_redis.command_count = 0
+    start = time.perf_counter()
+    for user_id in user_ids:
+        service.get_minutes_since_activity(user_id)
+        service.get_last_logout_timestamp(user_id)
+    per_user_elapsed = time.perf_counter() - start
+    per_user_commands = fake_redis.command_count
+
+    fake_redis.command_count = 0
+    start = time.perf_counter()
+    service.get_presence_bulk(user_ids)
+    bulk_elapsed = time.perf_counter() - start
+    bulk_commands = fake_redis.command_count
+
+    print(
+        f"Présence 500 utilisateurs: par utilisateur {per_user_commands} commandes "
+        f"en {per_user_elapsed * 1000:.1f}ms, groupée {bulk_commands} commande(s) "
+        f"en {bulk_elapsed * 1000:.1f}ms"
+    )
+    assert per_user_commands == 1000
+    assert bulk_commands == 1
+    assert bulk_elapsed < per_user_elapsed
@@ -0,0 +1,188 @@
+"""
+Recherche dans le journal d'audit (AuditLogService, GET /admin/audit-log).
+
+- Recherche libre sur description et détails JSON, caractères LIKE échappés
+- Total exact ou estimé selon count_mode
+- Benchmark PostgreSQL sur un million d'entrées : index trigrammes utilisés
+  et total estimé sans COUNT(*)
+"""
+import json
+import time
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.security import create_access_token, hash_password
+from recyclic_api.models.audit_log import AuditActionType, AuditLog
+from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.services.audit_log_service import AuditLogFilters, AuditLogService
+from recyclic_api.utils.pagination import COUNT_ESTIMATED, COUNT_EXACT
+
+
+BENCH_ROWS = 1_000_000
+
+
+def _admin(db_session: Session) -> User:
+    admin = User(
+        username=f"audit_admin_{uuid.uuid4().hex[:8]}",
+        hashed_password=hash_password("password"),
+        role=UserRole.ADMIN,
+        status=UserStatus.APPROVED,
+        is_active=True,
+    )
+    db_session.add(admin)
+    db_session.commit()
+    return admin
+
+
+@pytest.fixture
+def audit_entries(db_session: Session):
+    marker = uuid.uuid4().hex[:8]
+    entries = [
+        AuditLog(
+            action_type=AuditActionType.USER_UPDATED.value,
+            description=f"{marker} profil modifié",
+            details_json={"field": "email"},
+        ),
+        AuditLog(
+            action_type=AuditActionType.USER_UPDATED.value,
+            description=f"{marker} autre modification",
+            details_json={"field": f"phone_{marker}"},
+        ),
+        AuditLog(
+            action_type=AuditActionType.PIN_RESET.value,
+            description=f"{marker} remise à 100% du PIN",
+            details_json=None,
+        ),
+    ]
+    db_session.add_all(entries)
+    db_session.commit()
+    return marker
+
+
+def test_search_matches_description_and_details(db_session: Session, audit_entries):
+    service = AuditLogService(db_session)
+
+    entries, total, estimated = service.search(
+        AuditLogFilters(search=f"phone_{audit_entries}"), page=1, page_size=20, count_mode=COUNT_EXACT
+    )
+    assert [entry.description for entry in entries] == [f"{audit_entries} autre modification"]
+    assert (total, estimated) == (1, False)
+
+    entries, total, _ = service.search(
+        AuditLogFilters(search=audit_entries, action_type=AuditActionType.USER_UPDATED.value),
+        page=1,
+        page_size=20,
+        count_mode=COUNT_EXACT,
+    )
+    assert total == 2
+
+
+def test_search_escapes_like_wildcards(db_session: Session, audit_entries):
+    service = AuditLogService(db_session)
+
+    entries, total, _ = service.search(
+        AuditLogFilters(search=f"{audit_entries} remise à 100%"), page=1, page_size=20, count_mode=COUNT_EXACT
+    )
+    assert total == 1
+    assert entries[0].action_type == AuditActionType.PIN_RESET.value
+
+    # "_" et "%" ne sont pas des jokers
+    _, total, _ = service.search(AuditLogFilters(search=f"{audit_entries}_"), page=1, page_size=20, count_mode=COUNT_EXACT)
+    assert total == 0
+
+
+def test_estimated_count_never_below_displayed_rows(db_session: Session, audit_entries):
+    entries, total, estimated = AuditLogService(db_session).search(
+        AuditLogFilters(search=audit_entries), page=1, page_size=20, count_mode=COUNT_ESTIMATED
+    )
+    assert len(entries) == 3
+    assert total >= 3
+    # Pas d'estimation hors PostgreSQL : total exact
+    if db_session.get_bind().dialect.name != "postgresql":
+        assert (total, estimated) == (3, False)
+
+
+def test_audit_log_endpoint_reports_count_mode(client, db_session: Session, audit_entries):
+    admin = _admin(db_session)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id)})}"}
+
+    response = client.get(
+        "/api/v1/admin/audit-log",
+        params={"search": audit_entries, "count_mode": "exact"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    pagination = response.json()["pagination"]
+    assert pagination["total_count"] == 3
+    assert pagination["total_count_estimated"] is False
+
+    response = client.get("/api/v1/admin/audit-log", params={"count_mode": "approx"}, headers=headers)
+    assert response.status_code == 422
+
+
+def _used_indexes(plan: dict) -> set:
+    found = set()
+    if plan.get("Index Name"):
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        found |= _used_indexes(child)
+    return found
+
+
+@pytest.mark.performance
+def test_search_benchmark_million_rows(db_engine):
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("Index trigrammes et estimation du total uniquement sur PostgreSQL")
+
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection)
+    try:
+        db.execute(
+            text(
+                """
+                INSERT INTO audit_logs (id, timestamp, action_type, target_type, description, details_json)
+                SELECT gen_random_uuid(),
+                       now() - g * interval '1 minute',
+                       (ARRAY['user_updated', 'login_success', 'pin_reset'])[1 + g % 3],
+                       'user',
+                       'Action ' || g || ' sur le compte ' || md5(g::text),
+                       jsonb_build_object('request_id', md5((g * 7)::text), 'seq', g)
+                FROM generate_series(1, :rows) AS g
+                """
+            ),
+            {"rows": BENCH_ROWS},
+        )
+        db.execute(text("ANALYZE audit_logs"))
+
+        service = AuditLogService(db)
+        filters = AuditLogFilters(search="compte 4f")
+        statement = service.build_query(filters).statement
+        compiled = statement.compile(dialect=db_engine.dialect, compile_kwargs={"literal_binds": True})
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar_one()
+        plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+        used = _used_indexes(plan)
+        assert {"ix_audit_logs_description_trgm", "ix_audit_logs_details_trgm"} <= used, json.dumps(plan, indent=2)
+
+        started = time.perf_counter()
+        _, exact_total, _ = service.search(filters, page=1, page_size=20, count_mode=COUNT_EXACT)
+        exact_duration = time.perf_counter() - started
+
+        started = time.perf_counter()
+        entries, estimated_total, estimated = service.search(filters, page=1, page_size=20, count_mode=COUNT_ESTIMATED)
+        estimated_duration = time.perf_counter() - started
+
+        print(
+            f"\nAudit log ({BENCH_ROWS} lignes) : exact={exact_total} en {exact_duration * 1000:.0f} ms, "
+            f"estimé={estimated_total} en {estimated_duration * 1000:.0f} ms"
+        )
+        assert estimated
+        assert len(entries) == 20
+        assert estimated_duration < exact_duration
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
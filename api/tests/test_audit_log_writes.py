@@ -0,0 +1,136 @@
+"""
+Écriture des entrées d'audit dans la transaction de l'appelant et
+résolution groupée des acteurs dans GET /admin/audit-log.
+"""
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.audit import has_pending_writes, log_audit
+from recyclic_api.core.security import create_access_token, hash_password
+from recyclic_api.models.audit_log import AuditActionType, AuditLog
+from recyclic_api.models.user import User, UserRole, UserStatus
+
+
+def _user(db_session: Session, role: UserRole = UserRole.USER, **kwargs) -> User:
+    user = User(
+        username=f"audit_{uuid.uuid4().hex[:8]}",
+        hashed_password=hash_password("password"),
+        role=role,
+        status=UserStatus.APPROVED,
+        is_active=True,
+        **kwargs,
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+def test_log_audit_joins_pending_transaction(db_session: Session):
+    actor = _user(db_session)
+    target = User(username=f"audit_{uuid.uuid4().hex[:8]}", hashed_password="x")
+    db_session.add(target)
+    assert has_pending_writes(db_session)
+
+    entry = log_audit(AuditActionType.USER_CREATED, actor=actor, description="joined", db=db_session)
+
+    # Pas de commit intermédiaire : l'entrée attend le commit de l'appelant
+    assert entry in db_session.new
+    assert target in db_session.new
+
+    db_session.rollback()
+    assert db_session.query(AuditLog).filter(AuditLog.description == "joined").first() is None
+
+
+def test_log_audit_commits_alone_on_clean_session(db_session: Session):
+    actor = _user(db_session)
+    assert not has_pending_writes(db_session)
+
+    entry = log_audit(AuditActionType.PIN_RESET, actor=actor, description="standalone", db=db_session)
+
+    assert entry is not None
+    assert not has_pending_writes(db_session)
+    stored = db_session.query(AuditLog).filter(AuditLog.id == entry.id).one()
+    assert stored.actor_id == actor.id
+
+
+def test_flushed_writes_are_detected_until_commit(db_session: Session):
+    db_session.add(User(username=f"audit_{uuid.uuid4().hex[:8]}", hashed_password="x"))
+    db_session.flush()
+    assert not db_session.new
+    assert has_pending_writes(db_session)
+
+    db_session.commit()
+    assert not has_pending_writes(db_session)
+
+
+def test_update_user_status_writes_history_and_audit_in_one_commit(client, db_session: Session):
+    admin = _user(db_session, role=UserRole.ADMIN)
+    target = _user(db_session)
+    commits = []
+
+    def _count_commit(session):
+        commits.append(session)
+
+    event.listen(db_session, "after_commit", _count_commit)
+    try:
+        response = client.put(
+            f"/api/v1/admin/users/{target.id}/status",
+            json={"status": "approved", "is_active": False, "reason": "test"},
+            headers={"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id)})}"},
+        )
+    finally:
+        event.remove(db_session, "after_commit", _count_commit)
+
+    assert response.status_code == 200
+    assert len(commits) == 1
+    assert db_session.query(AuditLog).filter(
+        AuditLog.action_type == AuditActionType.USER_ROLE_CHANGED.value,
+        AuditLog.target_id == target.id,
+    ).count() == 1
+
+
+def test_audit_log_resolves_actors_in_one_query(client, db_session: Session):
+    admin = _user(db_session, role=UserRole.ADMIN, first_name="Ada", last_name="Admin")
+    actors = [_user(db_session, first_name=f"Actor{i}") for i in range(5)]
+    for actor in actors:
+        log_audit(
+            AuditActionType.USER_UPDATED,
+            actor=actor,
+            target_id=admin.id,
+            target_type="user",
+            description=f"Mise à jour de {admin.id}",
+            db=db_session,
+        )
+
+    user_queries = []
+
+    def _count_user_queries(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            user_queries.append(statement)
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", _count_user_queries)
+    try:
+        response = client.get(
+            "/api/v1/admin/audit-log",
+            params={"action_type": AuditActionType.USER_UPDATED.value},
+            headers={"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id)})}"},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _count_user_queries)
+
+    assert response.status_code == 200
+    entries = response.json()["entries"]
+    assert len(entries) == 5
+    assert {entry["actor_username"] for entry in entries} == {
+        f"Actor{i} (@{actor.username})" for i, actor in enumerate(actors)
+    }
+    assert all(entry["target_username"] == f"Ada Admin (@{admin.username})" for entry in entries)
+    assert f"Ada Admin (@{admin.username})" in entries[0]["description"]
+    # Requêtes d'authentification + une seule requête groupée pour acteurs et cibles,
+    # quel que soit le nombre d'entrées
+    assert len([query for query in user_queries if " IN (" in query]) == 1
+    assert len(user_queries) < len(entries)
@@ -0,0 +1,174 @@
+"""
+Tests de l'export bulk en flux des sessions de caisse.
+
+Tests vérifient:
+- Le CSV est émis par morceaux (un par lot de sessions) et identique à l'export bufferisé
+- Le XLSX (openpyxl write_only) conserve onglets, en-têtes stylés et ligne de totaux
+- Benchmark : pic mémoire de l'export en fonction du nombre de sessions
+"""
+import io
+import resource
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.security import hash_password
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+from recyclic_api.models.sale import Sale
+from recyclic_api.models.sale_item import SaleItem
+from recyclic_api.models.site import Site
+from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.schemas.cash_session import CashSessionFilters
+from recyclic_api.services import report_service
+from recyclic_api.services.report_service import (
+    generate_bulk_cash_sessions_csv,
+    stream_bulk_cash_sessions_csv,
+    stream_bulk_cash_sessions_excel,
+)
+
+
+def _filters() -> CashSessionFilters:
+    return CashSessionFilters.model_construct(
+        skip=0,
+        limit=100000,
+        status=None,
+        operator_id=None,
+        site_id=None,
+        date_from=None,
+        date_to=None,
+        search=None,
+        include_empty=True,
+    )
+
+
+@pytest.fixture
+def make_sessions(db_session: Session):
+    operator = User(
+        id=uuid4(),
+        username=f"stream_{uuid4().hex[:8]}",
+        hashed_password=hash_password("testpass"),
+        role=UserRole.USER,
+        status=UserStatus.ACTIVE,
+        is_active=True,
+    )
+    site = Site(id=uuid4(), name="Site Streaming")
+    db_session.add_all([operator, site])
+    db_session.commit()
+
+    def _make(count: int) -> None:
+        now = datetime.now(timezone.utc)
+        for i in range(count):
+            session = CashSession(
+                id=uuid4(),
+                operator_id=operator.id,
+                site_id=site.id,
+                initial_amount=50.0,
+                status=CashSessionStatus.CLOSED,
+                opened_at=now - timedelta(hours=i + 1),
+                closed_at=now - timedelta(hours=i),
+                total_sales=12.5,
+                total_items=1,
+            )
+            sale = Sale(id=uuid4(), cash_session_id=session.id, total_amount=12.5, donation=1.0)
+            item = SaleItem(
+                id=uuid4(),
+                sale_id=sale.id,
+                category="EEE-1",
+                quantity=1,
+                weight=2.0,
+                unit_price=12.5,
+                total_price=12.5,
+            )
+            db_session.add_all([session, sale, item])
+        db_session.commit()
+
+    return _make
+
+
+def test_csv_is_streamed_in_batches(db_session: Session, make_sessions, monkeypatch):
+    make_sessions(7)
+    monkeypatch.setattr(report_service, "EXPORT_BATCH_SIZE", 3)
+
+    chunks = list(stream_bulk_cash_sessions_csv(db_session, _filters()))
+
+    # En-têtes + 3 lots (3 + 3 + 1 sessions)
+    assert len(chunks) == 4
+    assert chunks[0].startswith(b"\xef\xbb\xbf")
+    lines = b"".join(chunks).decode("utf-8-sig").splitlines()
+    assert len(lines) == 8
+    assert lines[0].startswith("Date Ouverture;")
+    assert b"".join(chunks) == generate_bulk_cash_sessions_csv(db_session, _filters()).getvalue()
+
+
+def test_limit_checked_before_streaming(db_session: Session, make_sessions):
+    make_sessions(3)
+
+    with pytest.raises(ValueError, match="Trop de sessions"):
+        stream_bulk_cash_sessions_csv(db_session, _filters(), max_items=2)
+
+
+def test_streamed_excel_keeps_sheets_and_styles(db_session: Session, make_sessions):
+    make_sessions(4)
+
+    content = b"".join(stream_bulk_cash_sessions_excel(db_session, _filters()))
+    wb = load_workbook(io.BytesIO(content))
+
+    assert wb.sheetnames == ["Résumé", "Détails", "Détails Tickets"]
+    ws_summary = wb["Résumé"]
+    assert all(cell.font.bold for cell in ws_summary[1])
+    assert ws_summary.max_row == 6  # En-têtes + 4 sessions + totaux
+    total_row = ws_summary[ws_summary.max_row]
+    assert total_row[0].value == "TOTAL"
+    assert total_row[0].font.bold is True
+    assert total_row[5].value == "4"  # Nb Ventes
+    assert wb["Détails"].max_row == 5
+    assert wb["Détails"].column_dimensions["P"].width == 38
+
+
+def test_export_endpoint_streams_csv(admin_client, make_sessions):
+    make_sessions(2)
+
+    response = admin_client.post(
+        "/api/v1/admin/reports/cash-sessions/export-bulk",
+        json={"filters": {"include_empty": True}, "format": "csv"},
+    )
+
+    assert response.status_code == 200
+    assert "text/csv" in response.headers["content-type"]
+    assert len(response.content.decode("utf-8-sig").splitlines()) >= 3
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("export_format", ["csv", "excel"])
+def test_export_peak_memory_bounded(db_session: Session, make_sessions, export_format):
+    """Benchmark : pic mémoire (tracemalloc + RSS) de l'export en fonction du nombre de sessions."""
+    stream = stream_bulk_cash_sessions_csv if export_format == "csv" else stream_bulk_cash_sessions_excel
+    created = 0
+    peaks = {}
+
+    for target in (500, 2000, 5000):
+        make_sessions(target - created)
+        created = target
+        db_session.expire_all()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in stream(db_session, _filters()))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        peaks[target] = peak
+        print(
+            f"export {export_format} {target} sessions: {size / 1024:.0f} Ko en {elapsed:.2f}s, "
+            f"pic Python {peak / 1024 / 1024:.1f} Mo, "
+            f"RSS max processus {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} Mo"
+        )
+
+    # 10x plus de sessions ne doit pas multiplier le pic mémoire (lots de taille fixe)
+    assert peaks[5000] < peaks[500] * 2.5
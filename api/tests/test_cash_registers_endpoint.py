@@ -7,9 +7,13 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from uuid import uuid4
 
+from sqlalchemy import event
+
 from recyclic_api.models.cash_register import CashRegister
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
 from recyclic_api.models.site import Site
 from recyclic_api.models.user import User, UserRole
+from recyclic_api.utils.http_cache import compute_etag, etag_matches
 
 
 class TestCashRegistersEndpoint:
@@ -349,4 +353,88 @@ class TestCashRegistersEndpoint:
         assert response.status_code == 409
         data = response.json()
         assert "detail" in data
-        assert "poste" in data["detail"].lower()
\ No newline at end of file
+        assert "poste" in data["detail"].lower()
+
+
+class TestCashRegistersStatusEndpoint:
+    """Tests pour GET /api/v1/cash-registers/status (tableau des postes)."""
+
+    def _open_session(self, db_session: Session, register: CashRegister) -> CashSession:
+        operator = db_session.query(User).filter(User.role == UserRole.ADMIN).first()
+        session = CashSession(
+            operator_id=operator.id,
+            site_id=register.site_id,
+            register_id=register.id,
+            initial_amount=50.0,
+            current_amount=50.0,
+            status=CashSessionStatus.OPEN,
+        )
+        db_session.add(session)
+        db_session.commit()
+        return session
+
+    def _registers(self, db_session: Session, count: int):
+        site = Site(id=uuid4(), name="Site Statut", is_active=True)
+        registers = [
+            CashRegister(id=uuid4(), name=f"Statut {index}", site_id=site.id, is_active=True)
+            for index in range(count)
+        ]
+        db_session.add(site)
+        db_session.add_all(registers)
+        db_session.commit()
+        return registers
+
+    def test_status_reads_open_sessions_in_one_query(self, admin_client: TestClient, db_session: Session):
+        """Une seule requête sur cash_sessions, quel que soit le nombre de postes."""
+        registers = self._registers(db_session, 5)
+        self._open_session(db_session, registers[1])
+
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            response = admin_client.get("/api/v1/cash-registers/status")
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+        assert response.status_code == 200
+        by_id = {item["id"]: item for item in response.json()["data"]}
+        assert by_id[str(registers[1].id)]["is_open"] is True
+        assert [by_id[str(r.id)]["is_open"] for r in registers if r is not registers[1]] == [False] * 4
+        assert len([s for s in statements if "FROM cash_sessions" in s]) == 1
+
+    def test_status_etag_returns_304_until_a_session_changes(self, admin_client: TestClient, db_session: Session):
+        """If-None-Match avec l'ETag courant : 304 sans corps ; une ouverture de session change l'ETag."""
+        registers = self._registers(db_session, 2)
+
+        first = admin_client.get("/api/v1/cash-registers/status")
+        etag = first.headers["ETag"]
+        assert first.status_code == 200
+
+        not_modified = admin_client.get("/api/v1/cash-registers/status", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["ETag"] == etag
+
+        self._open_session(db_session, registers[0])
+
+        changed = admin_client.get("/api/v1/cash-registers/status", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert next(r for r in changed.json()["data"] if r["id"] == str(registers[0].id))["is_open"] is True
+
+
+@pytest.mark.no_db
+def test_etag_weak_comparison():
+    """Comparaison faible : préfixe W/, listes et joker acceptés."""
+    etag = compute_etag({"data": [1, 2], "total": 2})
+    assert etag == compute_etag({"total": 2, "data": [1, 2]})
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag)
+    assert not etag_matches(None, etag)
@@ -76,11 +76,11 @@ def report_environment(monkeypatch, tmp_path):
     fake_email_service.report_dir = report_dir
 
     monkeypatch.setattr(
-        'recyclic_api.api.api_v1.endpoints.cash_sessions.generate_cash_session_report',
+        'recyclic_api.services.cash_session_close_jobs.generate_cash_session_report',
         _fake_generate,
     )
     monkeypatch.setattr(
-        'recyclic_api.api.api_v1.endpoints.cash_sessions.get_email_service',
+        'recyclic_api.services.cash_session_close_jobs.get_email_service',
         lambda: fake_email_service,
     )
 
@@ -0,0 +1,129 @@
+"""
+Tests des compteurs incrémentaux des sessions de caisse.
+
+- POST /sales met à jour total_sales/total_items par incrément atomique
+  dans la même transaction que la vente
+- CashSessionService.reconcile_session_totals corrige les écarts
+- Test de charge: p95 de POST /sales en fonction de la taille de la session
+"""
+import statistics
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from recyclic_api.core.security import create_access_token, hash_password
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+from recyclic_api.models.sale import Sale
+from recyclic_api.models.site import Site
+from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.services.cash_session_service import CashSessionService
+
+
+@pytest.fixture
+def open_session(db_session: Session):
+    user = User(
+        id=uuid4(),
+        username=f"cashier_{uuid4().hex}@test.com",
+        hashed_password=hash_password("password123"),
+        role=UserRole.USER,
+        status=UserStatus.ACTIVE,
+        is_active=True,
+    )
+    site = Site(id=uuid4(), name="Site compteurs")
+    db_session.add_all([user, site])
+    db_session.flush()
+
+    session = CashSession(
+        id=uuid4(),
+        operator_id=user.id,
+        site_id=site.id,
+        initial_amount=100.0,
+        current_amount=100.0,
+        status=CashSessionStatus.OPEN,
+        opened_at=datetime.utcnow(),
+    )
+    db_session.add(session)
+    db_session.commit()
+
+    return {
+        "session": session,
+        "headers": {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"},
+    }
+
+
+def _sale_payload(session_id, amount: float) -> dict:
+    return {
+        "cash_session_id": str(session_id),
+        "items": [
+            {"category": "EEE-1", "quantity": 1, "weight": 1.0, "unit_price": amount, "total_price": amount}
+        ],
+        "total_amount": amount,
+        "payment_method": "cash",
+    }
+
+
+def test_create_sale_increments_session_counters(client, db_session: Session, open_session):
+    session = open_session["session"]
+
+    for amount in (10.0, 5.5):
+        response = client.post("/api/v1/sales/", json=_sale_payload(session.id, amount), headers=open_session["headers"])
+        assert response.status_code == 200, response.text
+
+    db_session.expire_all()
+    refreshed = db_session.get(CashSession, session.id)
+    assert refreshed.total_sales == pytest.approx(15.5)
+    assert refreshed.total_items == 2
+    assert refreshed.current_amount == pytest.approx(115.5)
+
+
+def test_reconcile_session_totals_repairs_drift(db_session: Session, open_session):
+    session = open_session["session"]
+    db_session.add_all([
+        Sale(id=uuid4(), cash_session_id=session.id, total_amount=20.0),
+        Sale(id=uuid4(), cash_session_id=session.id, total_amount=7.5),
+    ])
+    session.total_sales = 3.0
+    session.total_items = 9
+    db_session.commit()
+
+    service = CashSessionService(db_session)
+    repaired = service.reconcile_session_totals(session_id=session.id)
+
+    assert repaired == [session.id]
+    db_session.expire_all()
+    refreshed = db_session.get(CashSession, session.id)
+    assert refreshed.total_sales == pytest.approx(27.5)
+    assert refreshed.total_items == 2
+    assert refreshed.current_amount == pytest.approx(127.5)
+
+    # Une seconde passe ne trouve plus d'écart
+    assert service.reconcile_session_totals(session_id=session.id) == []
+
+
+@pytest.mark.performance
+def test_create_sale_p95_latency_independent_of_session_size(client, db_session: Session, open_session):
+    """Test de charge: le p95 de POST /sales ne doit pas croître avec la taille de la session."""
+    session = open_session["session"]
+    p95_by_size = {}
+
+    for target_size in (0, 500, 2000):
+        existing = db_session.query(Sale).filter(Sale.cash_session_id == session.id).count()
+        db_session.add_all([
+            Sale(id=uuid4(), cash_session_id=session.id, total_amount=1.0)
+            for _ in range(target_size - existing)
+        ])
+        db_session.commit()
+
+        latencies = []
+        for _ in range(40):
+            start = time.perf_counter()
+            response = client.post("/api/v1/sales/", json=_sale_payload(session.id, 2.0), headers=open_session["headers"])
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+        p95_by_size[target_size] = statistics.quantiles(latencies, n=20)[18]
+
+    print("p95 POST /sales (ms) par taille de session:", {k: round(v, 1) for k, v in p95_by_size.items()})
+    assert p95_by_size[2000] < p95_by_size[0] * 2 + 20
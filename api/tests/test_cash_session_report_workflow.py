@@ -63,7 +63,7 @@ def test_cash_session_report_workflow(monkeypatch, tmp_path: Path, client: TestC
     fake_email_service = MagicMock()
     fake_email_service.send_email.return_value = True
     monkeypatch.setattr(
-        'recyclic_api.api.api_v1.endpoints.cash_sessions.get_email_service',
+        'recyclic_api.services.cash_session_close_jobs.get_email_service',
         lambda: fake_email_service,
     )
 
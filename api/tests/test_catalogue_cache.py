@@ -0,0 +1,175 @@
+"""
+Tests du cache des réponses du catalogue (services.catalogue_cache) et des
+requêtes conditionnelles sur les endpoints de catégories et boutons prédéfinis.
+
+Utilise fakeredis comme stand-in local de Redis pour la version partagée.
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from recyclic_api.core.config import settings
+from recyclic_api.models.category import Category
+from recyclic_api.models.preset_button import ButtonType, PresetButton
+from recyclic_api.services import catalogue_cache as catalogue_cache_module
+from recyclic_api.services import category_tree as category_tree_module
+from recyclic_api.services.catalogue_cache import CatalogueResponseCache, invalidate_catalogue
+from recyclic_api.utils.http_cache import conditional_response, render_json, strong_etag
+
+
+def _request(headers=None) -> Request:
+    raw = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.fixture
+def cache_env(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(catalogue_cache_module, "get_redis", lambda: client)
+    monkeypatch.setattr(category_tree_module, "get_redis", lambda: client)
+    monkeypatch.setattr(settings, "CATALOGUE_CACHE_TTL_SECONDS", 300)
+    builds = []
+
+    def _build():
+        builds.append(1)
+        return [{"id": "1", "name": "Électroménager", "n": len(builds)}]
+
+    return client, builds, _build
+
+
+@pytest.mark.no_db
+def test_body_is_serialised_once_until_version_changes(cache_env):
+    client, builds, build = cache_env
+    worker_a, worker_b = CatalogueResponseCache(), CatalogueResponseCache()
+
+    first = worker_a.get("reception:categories", build)
+    assert worker_a.get("reception:categories", build) is first
+    worker_b.get("reception:categories", build)
+    assert len(builds) == 2
+    assert json.loads(first.body)[0]["name"] == "Électroménager"
+    assert first.etag == strong_etag(first.body)
+
+    # Écriture traitée par un autre processus : version incrémentée dans Redis
+    client.incr(catalogue_cache_module.CATALOGUE_VERSION_KEY)
+
+    assert worker_a.get("reception:categories", build).etag != first.etag
+    assert len(builds) == 3
+
+
+@pytest.mark.no_db
+def test_keys_are_cached_separately_and_async_builders_supported(cache_env):
+    _, builds, build = cache_env
+    cache = CatalogueResponseCache()
+
+    async def _abuild():
+        return build()
+
+    sale = asyncio.run(cache.aget(("categories:sale-tickets", None), _abuild))
+    active = asyncio.run(cache.aget(("categories:sale-tickets", True), _abuild))
+    again = asyncio.run(cache.aget(("categories:sale-tickets", None), _abuild))
+
+    assert again is sale and active is not sale
+    assert len(builds) == 2
+
+
+@pytest.mark.no_db
+def test_category_and_preset_writes_bump_catalogue_version(cache_env):
+    client, builds, build = cache_env
+    catalogue_cache_module.catalogue_cache.clear()
+
+    catalogue_cache_module.catalogue_cache.get("presets:active", build)
+    invalidate_catalogue()
+    catalogue_cache_module.catalogue_cache.get("presets:active", build)
+    category_tree_module.invalidate_category_tree()
+
+    assert client.get(catalogue_cache_module.CATALOGUE_VERSION_KEY) == "2"
+    assert len(builds) == 2
+
+
+@pytest.mark.no_db
+def test_cache_bypassed_without_redis(cache_env, monkeypatch):
+    _, builds, build = cache_env
+
+    def _unavailable():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(catalogue_cache_module, "get_redis", _unavailable)
+    cache = CatalogueResponseCache()
+
+    first = cache.get("presets:active", build)
+    second = cache.get("presets:active", build)
+
+    assert len(builds) == 2
+    assert first.version is None and first.etag != second.etag
+
+
+@pytest.mark.no_db
+def test_conditional_response_serves_cached_bytes_or_304():
+    payload = [{"id": "1", "name": "Électroménager", "price": None}]
+    body = render_json(payload)
+    etag = strong_etag(body)
+
+    # Mêmes octets que la réponse JSON standard de FastAPI
+    assert body == JSONResponse(content=payload).body
+    assert not etag.startswith("W/")
+
+    full = conditional_response(_request(), body, etag)
+    assert full.status_code == 200 and full.body == body
+    assert full.headers["etag"] == etag
+    assert full.headers["cache-control"] == "private, no-cache"
+    assert full.headers["content-type"] == "application/json"
+
+    not_modified = conditional_response(_request({"If-None-Match": f'"other", {etag}'}), body, etag)
+    assert not_modified.status_code == 304 and not_modified.body == b""
+    assert not_modified.headers["etag"] == etag
+
+
+class TestCatalogueEndpoints:
+    """ETag et 304 sur les listes relues par les postes de caisse et de réception."""
+
+    @pytest.mark.parametrize("path", [
+        "/api/v1/categories/sale-tickets",
+        "/api/v1/categories/entry-tickets",
+        "/api/v1/reception/categories",
+        "/api/v1/presets/active",
+    ])
+    def test_if_none_match_returns_304(self, admin_client: TestClient, db_session: Session, path):
+        category = Category(name="Catalogue ETag", is_active=True)
+        db_session.add(category)
+        db_session.commit()
+        db_session.add(PresetButton(
+            name="Don", category_id=category.id, preset_price=1,
+            button_type=ButtonType.DONATION, sort_order=1, is_active=True,
+        ))
+        db_session.commit()
+
+        first = admin_client.get(path)
+        assert first.status_code == 200
+        assert len(first.json()) >= 1
+        etag = first.headers["ETag"]
+        assert first.headers["Cache-Control"] == "private, no-cache"
+
+        not_modified = admin_client.get(path, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["ETag"] == etag
+
+    def test_category_write_changes_etag(self, admin_client: TestClient, db_session: Session):
+        category = Category(name="Avant", is_active=True)
+        db_session.add(category)
+        db_session.commit()
+
+        etag = admin_client.get("/api/v1/categories/sale-tickets").headers["ETag"]
+        assert admin_client.put(f"/api/v1/categories/{category.id}", json={"name": "Après"}).status_code == 200
+
+        changed = admin_client.get("/api/v1/categories/sale-tickets", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert "Après" in [c["name"] for c in changed.json()]
@@ -0,0 +1,87 @@
+"""
+Tests de l'index de matching flou des catégories (CategoryMatcher).
+"""
+import random
+import time
+
+import pytest
+
+from recyclic_api.services.category_matcher import CategoryMatcher
+
+Levenshtein = pytest.importorskip("Levenshtein")
+
+
+pytestmark = pytest.mark.no_db
+
+
+def _catalogue(names):
+    return [{"id": f"00000000-0000-0000-0000-{index:012d}", "name": name} for index, name in enumerate(names)]
+
+
+def _loop_match(label, categories, threshold):
+    """Implémentation de référence : boucle Python sur tout le catalogue."""
+    best_match, best_score = None, 0.0
+    for cat in categories:
+        score = Levenshtein.ratio(label.strip().lower(), cat["name"].strip().lower()) * 100
+        if score > best_score:
+            best_score = score
+            best_match = {"category_id": cat["id"], "category_name": cat["name"], "confidence": round(best_score, 2)}
+    if best_match and best_match["confidence"] >= threshold:
+        return best_match
+    return None
+
+
+def _random_words(count, rng):
+    alphabet = "abcdeéilnorstu "
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 18))).strip() or "x"
+        for _ in range(count)
+    ]
+
+
+def test_matches_like_reference_loop():
+    rng = random.Random(42)
+    categories = _catalogue(["Vaisselle", "Électroménager", "DEEE", "Textile"] + _random_words(120, rng))
+    labels = ["vaiselle", "  TEXTILE ", "electromenager", "xyz"] + _random_words(300, rng)
+    matcher = CategoryMatcher(categories)
+
+    for threshold in (0.0, 60.0, 80.0):
+        batched = matcher.match_many(labels, threshold)
+        for label in labels:
+            assert batched[label] == _loop_match(label, categories, threshold), label
+
+
+def test_exact_match_and_lookups():
+    matcher = CategoryMatcher(_catalogue(["Vaisselle", "DEEE"]))
+
+    assert matcher.match("VAISSELLE ", 80.0)["confidence"] == 100.0
+    assert matcher.match("XYZ123", 80.0) is None
+    assert matcher.get_by_name("DEEE")["id"].endswith("1")
+    assert matcher.get_by_name("deee") is None
+    assert matcher.get_by_id("00000000-0000-0000-0000-000000000000")["name"] == "Vaisselle"
+    assert CategoryMatcher([]).match_many(["a"], 0.0) == {"a": None}
+
+
+@pytest.mark.performance
+def test_benchmark_2000_labels_against_500_categories():
+    rng = random.Random(7)
+    categories = _catalogue(_random_words(500, rng))
+    labels = list(dict.fromkeys(_random_words(2000, rng)))
+    matcher = CategoryMatcher(categories)
+
+    start = time.perf_counter()
+    batched = matcher.match_many(labels, 80.0)
+    batched_elapsed = time.perf_counter() - start
+
+    sample = labels[:200]
+    start = time.perf_counter()
+    for label in sample:
+        _loop_match(label, categories, 80.0)
+    loop_elapsed = (time.perf_counter() - start) * len(labels) / len(sample)
+
+    print(f"\nFuzzy matching {len(labels)} libellés x {len(categories)} catégories:")
+    print(f"  boucle Python (extrapolée): {loop_elapsed * 1000:.0f}ms")
+    print(f"  CategoryMatcher.match_many: {batched_elapsed * 1000:.0f}ms")
+
+    assert len(batched) == len(labels)
+    assert batched_elapsed * 3 < loop_elapsed
@@ -0,0 +1,78 @@
+"""
+Tests du résolveur de catégories/presets partagé par les exports et rapports.
+"""
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from recyclic_api.models.category import Category
+from recyclic_api.models.preset_button import PresetButton, ButtonType
+from recyclic_api.services.category_resolver import CategoryResolver
+
+
+@pytest.fixture
+def category_tree(db_session: Session):
+    root = Category(id=uuid4(), name=f"Root-{uuid4().hex[:6]}")
+    db_session.add(root)
+    db_session.flush()
+    secondary = Category(id=uuid4(), name=f"Secondary-{uuid4().hex[:6]}", parent_id=root.id)
+    db_session.add(secondary)
+    db_session.flush()
+    leaf = Category(id=uuid4(), name=f"Leaf-{uuid4().hex[:6]}", parent_id=secondary.id)
+    preset = PresetButton(
+        id=uuid4(),
+        name="Don",
+        category_id=root.id,
+        preset_price=0,
+        button_type=ButtonType.DONATION,
+    )
+    db_session.add_all([leaf, preset])
+    db_session.commit()
+    return {"root": root, "secondary": secondary, "leaf": leaf, "preset": preset}
+
+
+def test_resolves_by_id_and_by_name(db_session: Session, category_tree):
+    resolver = CategoryResolver(db_session)
+    leaf = category_tree["leaf"]
+
+    assert resolver.get_by_id(str(leaf.id)).name == leaf.name
+    assert resolver.get_by_id(str(leaf.id).upper()).name == leaf.name
+    assert resolver.get(leaf.name).id == leaf.id
+    assert resolver.get_by_id(leaf.name) is None
+    assert resolver.get("EEE-inconnue") is None
+
+
+def test_main_and_secondary_walks_to_root(db_session: Session, category_tree):
+    resolver = CategoryResolver(db_session)
+
+    main, secondary_name = resolver.main_and_secondary(str(category_tree["leaf"].id))
+    assert main.name == category_tree["root"].name
+    assert main.is_root
+    assert secondary_name == category_tree["secondary"].name
+
+    main, secondary_name = resolver.main_and_secondary(category_tree["root"].name)
+    assert main.name == category_tree["root"].name
+    assert secondary_name == ""
+
+
+def test_lookups_do_not_query_per_item(db_session: Session, category_tree):
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        resolver = CategoryResolver(db_session)
+        for _ in range(50):
+            resolver.main_and_secondary(str(category_tree["leaf"].id))
+            resolver.preset_name(category_tree["preset"].id)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    # Une requête pour l'arbre des catégories, une pour les presets
+    assert len(statements) == 2
+    assert resolver.preset_name(str(category_tree["preset"].id)) == "Don"
@@ -0,0 +1,152 @@
+"""
+Tests de l'arbre des catégories en mémoire (services.category_tree).
+
+Utilise fakeredis comme stand-in local de Redis pour la version partagée.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from recyclic_api.core.config import settings
+from recyclic_api.services import category_tree as category_tree_module
+from recyclic_api.services.category_tree import (
+    CategoryNode,
+    CategoryTree,
+    CategoryTreeCache,
+    invalidate_category_tree,
+)
+from recyclic_api.schemas.category import CategoryRead
+
+
+pytestmark = pytest.mark.no_db
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _node(name, parent=None, **overrides) -> CategoryNode:
+    values = dict(
+        id=uuid4(),
+        name=name,
+        official_name=None,
+        is_active=True,
+        parent_id=parent.id if parent is not None else None,
+        price=None,
+        max_price=None,
+        display_order=0,
+        display_order_entry=0,
+        is_visible=True,
+        shortcut_key=None,
+        created_at=NOW,
+        updated_at=NOW,
+        deleted_at=None,
+    )
+    values.update(overrides)
+    return CategoryNode(**values)
+
+
+@pytest.fixture
+def nodes():
+    eee = _node("EEE")
+    small = _node("Petit électroménager", eee)
+    kettle = _node("Bouilloire", small, price=Decimal("2.00"))
+    furniture = _node("Mobilier")
+    chair = _node("Chaise", furniture, is_active=False)
+    return {"eee": eee, "small": small, "kettle": kettle, "furniture": furniture, "chair": chair}
+
+
+def test_tree_lookups(nodes):
+    tree = CategoryTree(nodes.values())
+
+    assert [n.name for n in tree.roots()] == ["EEE", "Mobilier"]
+    assert tree.children(nodes["eee"].id) == (nodes["small"],)
+    assert tree.parent(nodes["kettle"].id) == nodes["small"]
+    assert tree.parent(nodes["eee"].id) is None
+    assert tree.root(nodes["kettle"].id) == nodes["eee"]
+    assert tree.depth(nodes["eee"].id) == 1
+    assert tree.depth(nodes["kettle"].id) == 3
+    assert [n.name for n in tree.breadcrumb(nodes["kettle"].id)] == ["EEE", "Petit électroménager", "Bouilloire"]
+    assert tree.breadcrumb(uuid4()) == []
+    # Les nœuds se lisent directement comme CategoryRead
+    assert CategoryRead.model_validate(nodes["kettle"]).parent_id == str(nodes["small"].id)
+
+
+def test_walk_is_preorder_and_prunes_excluded_branches(nodes):
+    tree = CategoryTree(nodes.values())
+
+    walked = [(n.name, level) for n, level in tree.walk(include=lambda n: n.is_active)]
+
+    assert walked == [("EEE", 0), ("Petit électroménager", 1), ("Bouilloire", 2), ("Mobilier", 0)]
+
+
+def test_parent_loop_does_not_hang():
+    first = _node("A")
+    second = _node("B", first)
+    first = CategoryNode(**{**first.__dict__, "parent_id": second.id})
+    tree = CategoryTree([first, second])
+
+    assert tree.roots() == ()
+    assert len(tree.breadcrumb(first.id)) == 2
+    assert tree.depth(first.id) > 2
+
+
+@pytest.fixture
+def cache_env(monkeypatch, nodes):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(category_tree_module, "get_redis", lambda: client)
+    monkeypatch.setattr(settings, "CATEGORY_TREE_CACHE_TTL_SECONDS", 300)
+    loads = []
+
+    def _load(db, version=None):
+        loads.append(version)
+        return CategoryTree(nodes.values(), version=version)
+
+    monkeypatch.setattr(category_tree_module, "load_category_tree", _load)
+    return client, loads
+
+
+def test_cache_reuses_tree_until_version_changes(cache_env):
+    client, loads = cache_env
+    worker_a, worker_b = CategoryTreeCache(), CategoryTreeCache()
+
+    tree = worker_a.get(db=None)
+    assert worker_a.get(db=None) is tree
+    worker_b.get(db=None)
+    assert loads == ["0", "0"]
+
+    # Écriture traitée par un autre processus : version incrémentée dans Redis
+    client.incr(category_tree_module.CATEGORY_TREE_VERSION_KEY)
+
+    assert worker_a.get(db=None) is not tree
+    worker_b.get(db=None)
+    assert loads == ["0", "0", "1", "1"]
+
+
+def test_invalidate_clears_local_tree_and_bumps_version(cache_env):
+    client, loads = cache_env
+    category_tree_module.category_tree_cache.clear()
+
+    category_tree_module.get_category_tree(db=None)
+    invalidate_category_tree()
+    category_tree_module.get_category_tree(db=None)
+
+    assert client.get(category_tree_module.CATEGORY_TREE_VERSION_KEY) == "1"
+    assert loads == ["0", "1"]
+
+
+def test_cache_bypassed_without_redis(cache_env, monkeypatch):
+    _, loads = cache_env
+
+    def _unavailable():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(category_tree_module, "get_redis", _unavailable)
+    cache = CategoryTreeCache()
+
+    cache.get(db=None)
+    cache.get(db=None)
+
+    assert loads == [None, None]
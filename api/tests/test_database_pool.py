@@ -0,0 +1,25 @@
+"""
+Tests de la configuration du pool de connexions.
+"""
+import pytest
+
+from recyclic_api.core import database
+from recyclic_api.core.config import settings
+
+
+pytestmark = pytest.mark.no_db
+
+
+def test_pool_options_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 15)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 5)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 10)
+
+    assert database.pool_options("postgresql://u@h/db") == {
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_size": 15,
+        "max_overflow": 5,
+        "pool_timeout": 10,
+    }
+    # SQLite : pas de dimensionnement (pools mono-connexion)
+    assert database.pool_options("sqlite:///./test.db") == {"pool_recycle": settings.DB_POOL_RECYCLE}
@@ -1,53 +1,77 @@
 """
 Tests pour l'endpoint d'export de base de données (Story B11-P2)
-Pattern: Mocks & Overrides (évite d'exécuter pg_dump réel en test)
+Pattern: Mocks & Overrides (pg_dump remplacé par un petit script Python qui écrit sur stdout)
 """
 
+import asyncio
+import sys
+
 import pytest
-import os
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.core.config import settings
+from recyclic_api.models.user import UserRole, UserStatus
 from recyclic_api.core.security import create_access_token
+from recyclic_api.services.db_dump_service import (
+    PgCommandError,
+    PgDumpStream,
+    parse_database_url,
+    pg_dump_command,
+)
 from tests.factories import UserFactory
 
+DUMP_CHUNKS = 5
+DUMP_CHUNK_SIZE = 256 * 1024
+DUMP_CHUNK = b"PGDMP" + b"x" * DUMP_CHUNK_SIZE
+
+
+def _fake_pg_dump(script: str):
+    """Remplace la commande pg_dump par un script Python ; conserve la commande réelle demandée."""
+    commands = []
+
+    def _command(conn, output_path=None):
+        commands.append(pg_dump_command(conn, output_path))
+        return [sys.executable, "-c", script]
+
+    return _command, commands
+
+
+STREAMING_SCRIPT = f"""
+import sys
+for _ in range({DUMP_CHUNKS}):
+    sys.stdout.buffer.write(b"PGDMP" + b"x" * {DUMP_CHUNK_SIZE})
+    sys.stdout.buffer.flush()
+"""
+
+
+@pytest.fixture
+def postgres_url(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql://recyclic:secret@db:5432/recyclic")
+
 
 class TestDatabaseExportEndpoint:
     """Tests pour l'endpoint POST /api/v1/admin/db/export"""
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.FileResponse')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.os.path.exists')
     def test_export_database_success_as_super_admin(
         self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        mock_file_response: Mock,
+        postgres_url,
         super_admin_client: TestClient
     ):
-        """Teste qu'un super-admin peut exporter la base de données avec succès."""
+        """Teste qu'un super-admin peut exporter la base de données avec succès (sortie de pg_dump transmise telle quelle)."""
         # Arrange
-        # Mock pg_dump successful execution
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mock_exists.return_value = True
-
-        # Mock FileResponse pour éviter l'erreur de fichier inexistant
-        from fastapi.responses import Response
-        mock_file_response.return_value = Response(
-            content=b"Dump content",
-            media_type="application/octet-stream",
-            headers={"content-disposition": "attachment; filename=recyclic_db_export_test.dump"}
-        )
+        fake_command, commands = _fake_pg_dump(STREAMING_SCRIPT)
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/export")
+        with patch('recyclic_api.api.api_v1.endpoints.db_export.pg_dump_command', fake_command):
+            response = super_admin_client.post("/api/v1/admin/db/export")
 
         # Assert
         assert response.status_code == 200
-        assert "recyclic_db_export_" in str(mock_file_response.call_args)
-        assert mock_subprocess.called
+        assert response.content == DUMP_CHUNK * DUMP_CHUNKS
+        assert "recyclic_db_export_" in response.headers["content-disposition"]
+        assert len(commands) == 1
 
     def test_export_database_requires_authentication(self, client: TestClient):
         """Teste que l'endpoint nécessite une authentification."""
@@ -89,108 +113,111 @@ class TestDatabaseExportEndpoint:
         # require_super_admin_role() retourne 401 pour les non-super-admins même s'ils sont authentifiés
         assert response.status_code == 401
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.os.path.exists')
     def test_export_database_pg_dump_failure_returns_500(
         self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
+        postgres_url,
         super_admin_client: TestClient
     ):
-        """Teste que l'échec de pg_dump retourne une erreur 500."""
+        """Teste que l'échec de pg_dump avant toute donnée retourne une erreur 500."""
         # Arrange
-        # Mock pg_dump failed execution
-        mock_subprocess.return_value = MagicMock(
-            returncode=1,
-            stderr="pg_dump: error: connection failed"
+        fake_command, _ = _fake_pg_dump(
+            "import sys; sys.stderr.write('pg_dump: error: connection failed'); sys.exit(1)"
         )
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/export")
+        with patch('recyclic_api.api.api_v1.endpoints.db_export.pg_dump_command', fake_command):
+            response = super_admin_client.post("/api/v1/admin/db/export")
 
         # Assert
         assert response.status_code == 500
         assert "Database export failed" in response.json()["detail"]
+        assert "connection failed" in response.json()["detail"]
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.os.path.exists')
-    def test_export_database_file_not_created_returns_500(
-        self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que l'absence de fichier créé retourne une erreur 500."""
-        # Arrange
-        # Mock pg_dump successful but file not created
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mock_exists.return_value = False
-
-        # Act
-        response = super_admin_client.post("/api/v1/admin/db/export")
-
-        # Assert
-        assert response.status_code == 500
-        assert "Export file was not created" in response.json()["detail"]
-
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
     def test_export_database_timeout_returns_504(
         self,
-        mock_subprocess: Mock,
+        postgres_url,
+        monkeypatch,
         super_admin_client: TestClient
     ):
-        """Teste que le timeout de pg_dump retourne une erreur 504."""
+        """Teste qu'un pg_dump qui ne produit rien pendant le délai d'inactivité retourne une erreur 504."""
         # Arrange
-        # Mock pg_dump timeout
-        from subprocess import TimeoutExpired
-        mock_subprocess.side_effect = TimeoutExpired(cmd="pg_dump", timeout=300)
+        monkeypatch.setattr(settings, "DB_EXPORT_IDLE_TIMEOUT_SECONDS", 0.2)
+        fake_command, _ = _fake_pg_dump("import time; time.sleep(30)")
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/export")
+        with patch('recyclic_api.api.api_v1.endpoints.db_export.pg_dump_command', fake_command):
+            response = super_admin_client.post("/api/v1/admin/db/export")
 
         # Assert
         assert response.status_code == 504
         assert "timeout" in response.json()["detail"].lower()
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.FileResponse')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_export.os.path.exists')
-    def test_export_database_filename_contains_timestamp(
+    def test_export_database_invalid_url_returns_500(
         self,
-        mock_exists: Mock,
-        mock_subprocess: Mock,
-        mock_file_response: Mock,
+        monkeypatch,
         super_admin_client: TestClient
     ):
-        """Teste que le nom du fichier contient un timestamp."""
+        """Teste qu'une DATABASE_URL non PostgreSQL retourne une erreur 500."""
         # Arrange
-        # Mock pg_dump successful execution
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
-        mock_exists.return_value = True
-
-        # Mock FileResponse
-        from fastapi.responses import Response
-        mock_file_response.return_value = Response(
-            content=b"Dump content",
-            media_type="application/octet-stream",
-            headers={"content-disposition": "attachment; filename=recyclic_db_export_20250101_120000.dump"}
-        )
+        monkeypatch.setattr(settings, "DATABASE_URL", "sqlite:///./test.db")
 
         # Act
         response = super_admin_client.post("/api/v1/admin/db/export")
 
         # Assert
-        assert response.status_code == 200
-        # Vérifier que FileResponse a été appelé avec un filename contenant timestamp
-        call_args = mock_file_response.call_args
-        filename = call_args.kwargs.get('filename', '')
-        assert "recyclic_db_export_" in filename
-        assert ".dump" in filename
-        # Vérifier que pg_dump utilise le format custom (-F c) et compression (-Z 9)
-        subprocess_call = mock_subprocess.call_args
-        assert subprocess_call is not None
-        cmd_args = subprocess_call[0][0] if subprocess_call[0] else []
-        assert "-F" in cmd_args
-        assert "c" in cmd_args[cmd_args.index("-F") + 1] if "-F" in cmd_args else False
-        assert "-Z" in cmd_args
-        assert "9" in cmd_args[cmd_args.index("-Z") + 1] if "-Z" in cmd_args else False
+        assert response.status_code == 500
+        assert "Invalid database URL scheme" in response.json()["detail"]
+
+
+@pytest.mark.no_db
+def test_pg_dump_command_streams_custom_compressed_format():
+    """pg_dump écrit sur stdout (pas de -f) au format custom compressé."""
+    conn = parse_database_url("postgresql://recyclic:p%40ss@db:5433/recyclic")
+    cmd_args = pg_dump_command(conn)
+
+    assert conn.password == "p@ss" and conn.port == "5433"
+    assert "-f" not in cmd_args
+    assert cmd_args[cmd_args.index("-F") + 1] == "c"
+    assert cmd_args[cmd_args.index("-Z") + 1] == "9"
+    # Mot de passe transmis par l'environnement uniquement
+    assert "p@ss" not in cmd_args
+    assert conn.env["PGPASSWORD"] == "p@ss"
+
+
+@pytest.mark.no_db
+def test_dump_stream_reads_in_chunks_and_reports_late_failure():
+    """Blocs bornés par chunk_size ; un échec après le premier bloc interrompt le flux."""
+    script = (
+        "import sys; sys.stdout.buffer.write(b'a' * 300000); sys.stdout.buffer.flush();"
+        "sys.stderr.write('pg_dump: error: lost connection'); sys.exit(1)"
+    )
+
+    async def _consume():
+        stream = PgDumpStream([sys.executable, "-c", script], env=None, idle_timeout=5, chunk_size=65536)
+        await stream.start()
+        sizes = []
+        with pytest.raises(PgCommandError) as excinfo:
+            async for chunk in stream.chunks():
+                sizes.append(len(chunk))
+        return sizes, excinfo.value
+
+    sizes, error = asyncio.run(_consume())
+    assert sum(sizes) == 300000
+    assert max(sizes) <= 65536
+    assert "lost connection" in error.stderr
+
+
+@pytest.mark.no_db
+def test_dump_stream_kills_pg_dump_when_client_goes_away():
+    """Un téléchargement abandonné termine le processus pg_dump."""
+    script = "import sys\nwhile True:\n    sys.stdout.buffer.write(b'x' * 65536)\n    sys.stdout.buffer.flush()"
+
+    async def _abandon():
+        stream = PgDumpStream([sys.executable, "-c", script], env=None, idle_timeout=5)
+        await stream.start()
+        chunks = stream.chunks()
+        await chunks.__anext__()
+        await chunks.aclose()
+        return stream._process.returncode
+
+    assert asyncio.run(_abandon()) is not None
@@ -1,73 +1,123 @@
 """
 Tests pour l'endpoint d'import de base de données (Story B46-P2)
-Pattern: Mocks & Overrides (évite d'exécuter pg_restore réel en test)
+Pattern: Mocks & Overrides (pg_restore / pg_dump / psql remplacés par de petits scripts Python)
+
+En test, la file de tâches est exécutée immédiatement (JOB_QUEUE_EAGER) : la
+réponse contient l'état final du job de restauration.
 """
 
+import asyncio
+import sys
+
 import pytest
-import os
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from io import BytesIO
+from starlette.datastructures import UploadFile
 
-from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.core.config import settings
+from recyclic_api.models.user import UserRole, UserStatus
 from recyclic_api.core.security import create_access_token
+from recyclic_api.services import db_restore_jobs
+from recyclic_api.services.db_dump_service import (
+    PgCommandError,
+    UploadTooLargeError,
+    pg_dump_command,
+    pg_restore_command,
+    save_upload,
+)
+from recyclic_api.services.db_restore_jobs import _restore_failed
 from tests.factories import UserFactory
 
+DUMP_CONTENT = b"PGDMP\x01\x00\x00\x00"
+VALIDATE = 'recyclic_api.api.api_v1.endpoints.db_import.count_dump_items'
+
+RESTORE_OK = """
+import sys
+for index in range(4):
+    sys.stderr.write(f"pg_restore: creating TABLE public.t{index}\\n")
+    sys.stderr.write(f"pg_restore: processing data for table public.t{index}\\n")
+"""
+
+
+class FakeTools:
+    """Commandes pg_* réelles demandées par le job, exécutées sous forme de scripts Python."""
+
+    def __init__(self, backup="pass", terminate="import sys; sys.exit(1)", restore=RESTORE_OK):
+        self.calls = {}
+        self.scripts = {"backup": backup, "terminate": terminate, "restore": restore}
+
+    def _fake(self, name, builder):
+        def _command(*args, **kwargs):
+            real = builder(*args, **kwargs)
+            self.calls[name] = real
+            script = self.scripts[name]
+            if name == "backup":
+                # La sauvegarde écrit réellement le fichier demandé (-f)
+                script = f"{script}\nopen({real[real.index('-f') + 1]!r}, 'wb').write(b'PGDMP')"
+            return [sys.executable, "-c", script]
+        return _command
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(db_restore_jobs, "pg_dump_command", self._fake("backup", pg_dump_command))
+        monkeypatch.setattr(db_restore_jobs, "terminate_connections_command", self._fake("terminate", lambda conn: ["psql"]))
+        monkeypatch.setattr(db_restore_jobs, "pg_restore_command", self._fake("restore", pg_restore_command))
+        return self
+
+
+@pytest.fixture
+def import_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql://recyclic:secret@db:5432/recyclic")
+    monkeypatch.setattr(settings, "DB_BACKUP_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "DB_RESTORE_JOBS", 3)
+    return tmp_path
+
+
+def _upload(client: TestClient, content: bytes = DUMP_CONTENT, filename: str = "test.dump"):
+    files = {"file": (filename, BytesIO(content), "application/octet-stream")}
+    return client.post("/api/v1/admin/db/import", files=files)
+
 
 class TestDatabaseImportEndpoint:
     """Tests pour l'endpoint POST /api/v1/admin/db/import"""
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.makedirs')
     def test_import_database_success_as_super_admin(
         self,
-        mock_makedirs: Mock,
-        mock_subprocess: Mock,
+        import_env,
+        monkeypatch,
         super_admin_client: TestClient
     ):
         """Teste qu'un super-admin peut importer la base de données avec succès."""
         # Arrange
-        # Mock successful validation, backup and restore
-        def side_effect(*args, **kwargs):
-            # First call: pg_restore --list (validation)
-            # Second call: pg_dump (backup)
-            # Third call: pg_restore (restore)
-            call_count = len(mock_subprocess.call_args_list)
-            return MagicMock(returncode=0, stderr="", stdout="")
-        
-        mock_subprocess.side_effect = side_effect
-        mock_makedirs.return_value = None
-
-        # Create a test dump file (binary format)
-        dump_content = b"PGDMP\x01\x00\x00\x00"  # Minimal valid dump header
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
+        tools = FakeTools().install(monkeypatch)
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        with patch(VALIDATE, AsyncMock(return_value=8)) as mock_validate:
+            response = _upload(super_admin_client)
 
         # Assert
-        assert response.status_code == 200
+        assert response.status_code == 202
         response_data = response.json()
-        assert "Import de la base de données effectué avec succès" in response_data["message"]
         assert response_data["imported_file"] == "test.dump"
-        assert "backup_created" in response_data
+        assert response_data["job_status"] == "succeeded"
+        assert response_data["job_id"]
+        assert response_data["status_url"].endswith(f"/admin/jobs/{response_data['job_id']}")
         assert "pre_restore_" in response_data["backup_created"]
-        assert mock_subprocess.called
-        # Vérifier que pg_restore --list a été appelé pour la validation
-        assert len(mock_subprocess.call_args_list) >= 1
-        first_call = mock_subprocess.call_args_list[0]
-        assert "pg_restore" in first_call[0][0]
-        assert "--list" in first_call[0][0]
+        # Le fichier validé est celui écrit sur disque dans le dossier des sauvegardes
+        validated_path = mock_validate.await_args.args[0]
+        assert validated_path.parent == import_env
+        restore_cmd = tools.calls["restore"]
+        assert restore_cmd[-1] == str(validated_path)
+        assert "--jobs=3" in restore_cmd
+        # Dump importé supprimé après restauration, sauvegarde conservée
+        assert not validated_path.exists()
+        assert (import_env / response_data["backup_created"]).exists()
 
     def test_import_database_requires_authentication(self, client: TestClient):
         """Teste que l'endpoint nécessite une authentification."""
-        # Arrange
-        dump_content = b"PGDMP\x01\x00\x00\x00"
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
-
         # Act
-        response = client.post("/api/v1/admin/db/import", files=files)
+        response = _upload(client)
 
         # Assert
         assert response.status_code == 401
@@ -77,12 +127,8 @@ class TestDatabaseImportEndpoint:
         admin_client: TestClient
     ):
         """Teste que l'endpoint nécessite le rôle SUPER_ADMIN (ADMIN n'est pas suffisant)."""
-        # Arrange
-        dump_content = b"PGDMP\x01\x00\x00\x00"
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
-
         # Act
-        response = admin_client.post("/api/v1/admin/db/import", files=files)
+        response = _upload(admin_client)
 
         # Assert
         assert response.status_code == 403
@@ -101,11 +147,8 @@ class TestDatabaseImportEndpoint:
         access_token = create_access_token(data={"sub": str(user.id)})
         client.headers = {"Authorization": f"Bearer {access_token}"}
 
-        dump_content = b"PGDMP\x01\x00\x00\x00"
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
-
         # Act
-        response = client.post("/api/v1/admin/db/import", files=files)
+        response = _upload(client)
 
         # Assert
         assert response.status_code == 401
@@ -145,206 +188,119 @@ class TestDatabaseImportEndpoint:
         assert response.status_code == 413
         assert "trop volumineux" in response.json()["detail"]
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.makedirs')
     def test_import_database_validation_failure_returns_400(
         self,
-        mock_makedirs: Mock,
-        mock_subprocess: Mock,
+        import_env,
         super_admin_client: TestClient
     ):
         """Teste que l'échec de la validation (pg_restore --list) retourne une erreur 400."""
         # Arrange
-        # Mock validation failure
-        mock_subprocess.return_value = MagicMock(
-            returncode=1,
-            stderr="pg_restore: error: invalid dump file"
-        )
-        mock_makedirs.return_value = None
-
-        dump_content = b"invalid dump content"
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
+        validate = AsyncMock(side_effect=PgCommandError("pg_restore --list failed", "pg_restore: error: invalid dump file"))
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        with patch(VALIDATE, validate):
+            response = _upload(super_admin_client, b"invalid dump content")
 
         # Assert
         assert response.status_code == 400
         assert ".dump n'est pas valide" in response.json()["detail"]
+        # Le fichier refusé ne reste pas dans le dossier des sauvegardes
+        assert list(import_env.iterdir()) == []
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.makedirs')
-    def test_import_database_backup_failure_returns_500(
+    def test_import_database_backup_failure_fails_job(
         self,
-        mock_makedirs: Mock,
-        mock_subprocess: Mock,
+        import_env,
+        monkeypatch,
         super_admin_client: TestClient
     ):
-        """Teste que l'échec de la sauvegarde automatique retourne une erreur 500."""
+        """Teste que l'échec de la sauvegarde automatique fait échouer le job sans restaurer."""
         # Arrange
-        # Mock validation success but backup failure
-        def side_effect(*args, **kwargs):
-            call_count = len(mock_subprocess.call_args_list)
-            if call_count == 0:
-                # Validation succeeds
-                return MagicMock(returncode=0, stderr="")
-            else:
-                # Backup fails
-                return MagicMock(returncode=1, stderr="pg_dump: error: connection failed")
-        
-        mock_subprocess.side_effect = side_effect
-        mock_makedirs.return_value = None
-
-        dump_content = b"PGDMP\x01\x00\x00\x00"
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
+        tools = FakeTools(backup="import sys; sys.stderr.write('pg_dump: error: connection failed'); sys.exit(1)")
+        tools.install(monkeypatch)
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        with patch(VALIDATE, AsyncMock(return_value=8)):
+            response = _upload(super_admin_client)
 
         # Assert
-        assert response.status_code == 500
-        assert "sauvegarde automatique" in response.json()["detail"]
+        assert response.status_code == 202
+        assert response.json()["job_status"] == "failed"
+        assert "sauvegarde automatique" in response.json()["job_error"]
+        assert "restore" not in tools.calls
+        assert list(import_env.glob("import_*.dump")) == []
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.makedirs')
-    def test_import_database_restore_failure_returns_500(
+    def test_import_database_restore_failure_fails_job(
         self,
-        mock_makedirs: Mock,
-        mock_subprocess: Mock,
+        import_env,
+        monkeypatch,
         super_admin_client: TestClient
     ):
-        """Teste que l'échec de la restauration retourne une erreur 500."""
+        """Teste que l'échec de la restauration fait échouer le job."""
         # Arrange
-        # Mock successful validation and backup but failed restore
-        def side_effect(*args, **kwargs):
-            call_count = len(mock_subprocess.call_args_list)
-            if call_count == 0:
-                # Validation succeeds
-                return MagicMock(returncode=0, stderr="")
-            elif call_count == 1:
-                # Backup succeeds
-                return MagicMock(returncode=0, stderr="")
-            else:
-                # Restore fails
-                return MagicMock(returncode=1, stderr="pg_restore: error: database error")
-        
-        mock_subprocess.side_effect = side_effect
-        mock_makedirs.return_value = None
-
-        dump_content = b"PGDMP\x01\x00\x00\x00"
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
+        FakeTools(restore="import sys; sys.stderr.write('pg_restore: error: database error'); sys.exit(1)").install(monkeypatch)
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        with patch(VALIDATE, AsyncMock(return_value=8)):
+            response = _upload(super_admin_client)
 
         # Assert
-        assert response.status_code == 500
-        assert "restauration" in response.json()["detail"]
+        assert response.status_code == 202
+        assert response.json()["job_status"] == "failed"
+        assert "restauration" in response.json()["job_error"]
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.makedirs')
-    def test_import_database_timeout_returns_504(
+    def test_import_database_restore_timeout_fails_job(
         self,
-        mock_makedirs: Mock,
-        mock_subprocess: Mock,
+        import_env,
+        monkeypatch,
         super_admin_client: TestClient
     ):
-        """Teste que le timeout de l'import retourne une erreur 504."""
+        """Teste qu'une restauration trop longue est interrompue."""
         # Arrange
-        # Mock timeout during restore
-        from subprocess import TimeoutExpired
-        def side_effect(*args, **kwargs):
-            call_count = len(mock_subprocess.call_args_list)
-            if call_count == 0:
-                # Validation succeeds
-                return MagicMock(returncode=0, stderr="")
-            elif call_count == 1:
-                # Backup succeeds
-                return MagicMock(returncode=0, stderr="")
-            else:
-                # Restore times out
-                raise TimeoutExpired(cmd="pg_restore", timeout=600)
-        
-        mock_subprocess.side_effect = side_effect
-        mock_makedirs.return_value = None
-
-        dump_content = b"PGDMP\x01\x00\x00\x00"
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
+        monkeypatch.setattr(settings, "DB_RESTORE_TIMEOUT_SECONDS", 0.5)
+        FakeTools(restore="import time; time.sleep(30)").install(monkeypatch)
 
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        with patch(VALIDATE, AsyncMock(return_value=8)):
+            response = _upload(super_admin_client)
 
         # Assert
-        assert response.status_code == 504
-        assert "timeout" in response.json()["detail"].lower()
+        assert response.status_code == 202
+        assert response.json()["job_status"] == "failed"
+        assert "TimeoutError" in response.json()["job_error"]
 
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.makedirs')
-    def test_import_database_creates_automatic_backup(
+    def test_import_database_validation_timeout_returns_504(
         self,
-        mock_makedirs: Mock,
-        mock_subprocess: Mock,
+        import_env,
         super_admin_client: TestClient
     ):
-        """Teste que l'import crée automatiquement une sauvegarde dans /backups."""
-        # Arrange
-        # Mock successful validation, backup and restore
-        def side_effect(*args, **kwargs):
-            return MagicMock(returncode=0, stderr="", stdout="")
-        
-        mock_subprocess.side_effect = side_effect
-        mock_makedirs.return_value = None
-
-        dump_content = b"PGDMP\x01\x00\x00\x00"
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
-
+        """Teste que le timeout de la validation retourne une erreur 504."""
         # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+        with patch(VALIDATE, AsyncMock(side_effect=asyncio.TimeoutError())):
+            response = _upload(super_admin_client)
 
         # Assert
-        assert response.status_code == 200
-        response_data = response.json()
-        assert "backup_created" in response_data
-        assert "pre_restore_" in response_data["backup_created"]
-        assert response_data["backup_path"].startswith("/backups/")
-        
-        # Vérifier que pg_dump a été appelé pour la sauvegarde (deuxième appel après validation)
-        assert mock_subprocess.called
-        assert len(mock_subprocess.call_args_list) >= 2
-        # Le deuxième appel devrait être pg_dump (backup)
-        backup_call = mock_subprocess.call_args_list[1]
-        assert "pg_dump" in backup_call[0][0]
-        assert "-F" in backup_call[0][0]
-        # Vérifier que le format est custom (c) et compression (Z 9)
-        cmd_args = backup_call[0][0]
-        assert "c" in cmd_args[cmd_args.index("-F") + 1] if "-F" in cmd_args else False
-
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.subprocess.run')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.makedirs')
-    @patch('recyclic_api.api.api_v1.endpoints.db_import.os.unlink')
-    def test_import_database_cleans_up_temporary_files(
-        self,
-        mock_unlink: Mock,
-        mock_makedirs: Mock,
-        mock_subprocess: Mock,
-        super_admin_client: TestClient
-    ):
-        """Teste que les fichiers temporaires sont nettoyés après l'import."""
-        # Arrange
-        # Mock successful validation, backup and restore
-        def side_effect(*args, **kwargs):
-            return MagicMock(returncode=0, stderr="", stdout="")
-        
-        mock_subprocess.side_effect = side_effect
-        mock_makedirs.return_value = None
+        assert response.status_code == 504
+        assert "timeout" in response.json()["detail"].lower()
 
-        dump_content = b"PGDMP\x01\x00\x00\x00"
-        files = {"file": ("test.dump", BytesIO(dump_content), "application/octet-stream")}
 
-        # Act
-        response = super_admin_client.post("/api/v1/admin/db/import", files=files)
+@pytest.mark.no_db
+def test_save_upload_copies_in_chunks_and_enforces_limit(tmp_path):
+    """Le fichier reçu est copié par blocs ; la copie partielle est supprimée au-delà de la limite."""
+    content = b"PGDMP" + b"x" * 300000
+    destination = tmp_path / "import.dump"
 
-        # Assert
-        assert response.status_code == 200
-        # Vérifier que os.unlink a été appelé pour nettoyer le fichier temporaire
-        assert mock_unlink.called
+    size = asyncio.run(save_upload(UploadFile(BytesIO(content)), destination, max_bytes=len(content), chunk_size=65536))
+    assert size == len(content)
+    assert destination.read_bytes() == content
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_upload(UploadFile(BytesIO(content)), destination, max_bytes=100000, chunk_size=65536))
+    assert not destination.exists()
+
+
+@pytest.mark.no_db
+def test_restore_warnings_are_not_failures():
+    """Les erreurs ignorées par pg_restore ne font pas échouer l'import."""
+    assert not _restore_failed(0, "")
+    assert not _restore_failed(1, "pg_restore: warning: errors ignored on restore: 2\n")
+    assert _restore_failed(1, "pg_restore: error: could not connect to database\n")
@@ -5,15 +5,19 @@ import pytest
 import time
 from unittest.mock import patch, MagicMock
 
-from recyclic_api.utils.email_metrics import EmailMetricsCollector, EmailMetric
+fakeredis = pytest.importorskip("fakeredis")
+
+from recyclic_api.core.config import settings
+from recyclic_api.utils.email_metrics import EmailMetricsCollector
 
 
 class TestEmailMetricsCollector:
     """Test cases for EmailMetricsCollector class."""
 
     def setup_method(self):
-        """Set up a fresh metrics collector for each test."""
-        self.collector = EmailMetricsCollector(max_history=100)
+        """Set up a fresh metrics collector (on an empty fake Redis) for each test."""
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        self.collector = EmailMetricsCollector(redis_client=self.redis)
 
     def test_record_successful_email(self):
         """Test recording a successful email send."""
@@ -26,16 +30,14 @@ class TestEmailMetricsCollector:
         )
 
         # Check that the metric was recorded
-        assert len(self.collector._metrics_history) == 1
-        metric = self.collector._metrics_history[0]
-        assert metric.to_email == "test@example.com"
-        assert metric.success is True
-        assert metric.elapsed_ms == 150.0
-        assert metric.provider == "brevo"
-        assert metric.message_id == "msg-123"
+        summary = self.collector.get_metrics_summary(hours=1)
+        assert summary["total_emails"] == 1
+        assert summary["success_count"] == 1
+        assert summary["latency_metrics"]["max_ms"] == 150.0
+        assert summary["provider_breakdown"] == {"brevo": {"success": 1, "failure": 0}}
 
         # Check counters
-        assert self.collector._counters["emails_sent_total_brevo_success"] == 1
+        assert "emails_sent_total_brevo_success 1" in self.collector.get_prometheus_metrics()
 
     def test_record_failed_email(self):
         """Test recording a failed email send."""
@@ -49,17 +51,14 @@ class TestEmailMetricsCollector:
         )
 
         # Check that the metric was recorded
-        assert len(self.collector._metrics_history) == 1
-        metric = self.collector._metrics_history[0]
-        assert metric.to_email == "test@example.com"
-        assert metric.success is False
-        assert metric.elapsed_ms == 75.0
-        assert metric.provider == "brevo"
-        assert metric.error_type == "api_exception"
-        assert metric.error_detail == "Invalid API key"
+        summary = self.collector.get_metrics_summary(hours=1)
+        assert summary["total_emails"] == 1
+        assert summary["failure_count"] == 1
+        assert summary["latency_metrics"]["min_ms"] == 75.0
+        assert summary["error_breakdown"] == {"api_exception": 1}
 
         # Check counters
-        assert self.collector._counters["emails_failed_total_brevo_api_exception"] == 1
+        assert "emails_failed_total_brevo_api_exception 1" in self.collector.get_prometheus_metrics()
 
     def test_metrics_summary_empty(self):
         """Test metrics summary when no data is available."""
@@ -154,30 +153,47 @@ class TestEmailMetricsCollector:
         """Test resetting metrics."""
         # Record some metrics
         self.collector.record_email_send("test@example.com", True, 100.0, "brevo")
-        assert len(self.collector._metrics_history) == 1
-        assert len(self.collector._counters) > 0
+        assert self.collector.get_metrics_summary(hours=1)["total_emails"] == 1
 
         # Reset metrics
         self.collector.reset_metrics()
 
         # Check everything is cleared
-        assert len(self.collector._metrics_history) == 0
-        assert len(self.collector._counters) == 0
+        assert self.collector.get_metrics_summary(hours=1)["total_emails"] == 0
+        assert self.redis.keys("metrics:email:*") == []
+
+    def test_metrics_shared_between_collectors(self):
+        """Collectors of different workers on the same Redis report the same totals."""
+        other_worker = EmailMetricsCollector(redis_client=self.redis)
+
+        self.collector.record_email_send("a@example.com", True, 100.0, "brevo")
+        other_worker.record_email_send("b@example.com", False, 300.0, "brevo", error_type="timeout")
 
-    def test_max_history_limit(self):
-        """Test that metrics history respects max_history limit."""
-        collector = EmailMetricsCollector(max_history=3)
+        for collector in (self.collector, other_worker):
+            summary = collector.get_metrics_summary(hours=24)
+            assert summary["total_emails"] == 2
+            assert summary["latency_metrics"]["min_ms"] == 100.0
+            assert summary["latency_metrics"]["max_ms"] == 300.0
+            assert summary["provider_breakdown"]["brevo"] == {"success": 1, "failure": 1}
 
-        # Add 5 metrics (should only keep last 3)
-        for i in range(5):
-            collector.record_email_send(f"test{i}@example.com", True, 100.0, "brevo")
+    def test_prometheus_latency_histogram_buckets(self):
+        """Latency histogram buckets are cumulative and end with +Inf."""
+        for elapsed_ms in (4.0, 60.0, 60000.0):
+            self.collector.record_email_send("test@example.com", True, elapsed_ms, "brevo")
 
-        # Should only have 3 metrics
-        assert len(collector._metrics_history) == 3
+        metrics = self.collector.get_prometheus_metrics()
+
+        assert 'email_send_latency_ms_bucket{le="5"} 1' in metrics
+        assert 'email_send_latency_ms_bucket{le="75"} 2' in metrics
+        assert 'email_send_latency_ms_bucket{le="+Inf"} 3' in metrics
+        assert "email_send_latency_ms_count 3" in metrics
+
+    def test_metrics_expire_after_retention(self):
+        """Buckets expire with the retention period instead of growing without bound."""
+        self.collector.record_email_send("test@example.com", True, 100.0, "brevo")
 
-        # Should be the last 3 emails
-        emails = [m.to_email for m in collector._metrics_history]
-        assert emails == ["test2@example.com", "test3@example.com", "test4@example.com"]
+        ttls = [self.redis.ttl(key) for key in self.redis.keys("metrics:email:*") if not key.endswith(":totals")]
+        assert ttls and all(0 < ttl <= (settings.METRICS_RETENTION_HOURS + 1) * 3600 for ttl in ttls)
 
     @patch('recyclic_api.utils.email_metrics.logger')
     def test_logging_success(self, mock_logger):
@@ -0,0 +1,253 @@
+"""
+Tests de la file de tâches de fond (services.job_queue).
+
+Utilise fakeredis comme stand-in local de Redis ; les exécutions immédiates
+reçoivent une session SQLite en mémoire à la place de celle de la requête.
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from recyclic_api.core.config import settings
+from recyclic_api.services import job_queue as jq
+from recyclic_api.services.job_queue import JobQueue, JobStatus, job_handler, report_job_progress
+
+
+pytestmark = pytest.mark.no_db
+
+calls = []
+
+
+@job_handler("test_ok")
+def _ok_handler(db, job):
+    calls.append(job.payload)
+    return {"done": True}
+
+
+@job_handler("test_flaky")
+def _flaky_handler(db, job):
+    job.result["steps"] = job.result.get("steps", 0) + 1
+    if job.attempts < 2:
+        raise RuntimeError("temporarily unavailable")
+    return job.result
+
+
+@job_handler("test_broken")
+def _broken_handler(db, job):
+    raise RuntimeError("boom")
+
+
+@job_handler("test_progress")
+def _progress_handler(db, job):
+    report_job_progress(job, step="restore", percent=50)
+    # État visible par un autre processus pendant l'exécution
+    stored = progress_queues[-1].get(job.id) if progress_queues else None
+    calls.append(stored.result if stored else job.result.copy())
+    return {"progress": {"step": "done", "percent": 100}}
+
+
+@job_handler("test_db_write_then_fail")
+def _db_write_then_fail_handler(db, job):
+    db.execute(text("INSERT INTO notes (body) VALUES ('job')"))
+    if job.payload.get("fail"):
+        raise RuntimeError("report generation failed")
+
+
+progress_queues = []
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    calls.clear()
+    monkeypatch.setattr(settings, "JOB_QUEUE_EAGER", False)
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_DELAY_SECONDS", 10)
+    return JobQueue(fakeredis.FakeRedis(decode_responses=True))
+
+
+@pytest.fixture
+def request_db():
+    """Session empruntée à la requête (exécution immédiate d'un job)."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE notes (body TEXT)"))
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def test_enqueue_reserve_execute(queue, request_db):
+    job = queue.enqueue("test_ok", {"session_id": "abc"})
+
+    assert job.status == JobStatus.QUEUED
+    assert calls == []
+    assert queue.depth() == {"queued": 1, "delayed": 0, "processing": 0}
+
+    reserved = queue.reserve(timeout=0.1)
+    assert reserved.id == job.id
+    assert queue.depth()["processing"] == 1
+
+    done = queue.execute(reserved, db=request_db)
+    assert done.status == JobStatus.SUCCEEDED
+    assert done.result == {"done": True}
+    assert calls == [{"session_id": "abc"}]
+    assert queue.depth() == {"queued": 0, "delayed": 0, "processing": 0}
+
+    stored = queue.get(job.id)
+    assert stored.status == JobStatus.SUCCEEDED
+    assert stored.wait_seconds is not None and stored.duration_seconds is not None
+    assert [j.id for j in queue.list_recent(status=JobStatus.SUCCEEDED)] == [job.id]
+
+
+def test_failed_attempt_is_delayed_then_retried_with_saved_progress(queue, request_db):
+    job = queue.enqueue("test_flaky", {})
+
+    first = queue.execute(queue.reserve(timeout=0.1), db=request_db)
+    assert first.status == JobStatus.RETRYING
+    assert "temporarily unavailable" in first.last_error
+    assert queue.depth() == {"queued": 0, "delayed": 1, "processing": 0}
+
+    # Pas encore à échéance (backoff de 10 s)
+    assert queue.promote_due() == 0
+    assert queue.promote_due(now=jq.time.time() + 11) == 1
+
+    second = queue.execute(queue.reserve(timeout=0.1), db=request_db)
+    assert second.id == job.id
+    assert second.status == JobStatus.SUCCEEDED
+    assert second.attempts == 2
+    assert second.result == {"steps": 2}
+
+
+def test_job_fails_after_max_attempts_and_can_be_retried(queue, request_db):
+    job = queue.enqueue("test_broken", {})
+
+    for _ in range(3):
+        queue.promote_due(now=jq.time.time() + 3600)
+        last = queue.execute(queue.reserve(timeout=0.1), db=request_db)
+
+    assert last.status == JobStatus.FAILED
+    assert last.attempts == 3
+    assert queue.depth() == {"queued": 0, "delayed": 0, "processing": 0}
+
+    retried = queue.retry(job.id)
+    assert retried.status == JobStatus.QUEUED
+    assert retried.attempts == 0
+    assert queue.depth()["queued"] == 1
+
+
+def test_stale_processing_jobs_are_requeued(queue):
+    job = queue.enqueue("test_ok", {})
+    reserved = queue.reserve(timeout=0.1)
+    reserved.status = JobStatus.RUNNING
+    reserved.started_at = jq._now()
+    queue._save(reserved)
+
+    assert queue.requeue_stale(older_than_seconds=60) == 0
+    assert queue.requeue_stale(older_than_seconds=-1) == 1
+    assert queue.depth() == {"queued": 1, "delayed": 0, "processing": 0}
+    assert queue.reserve(timeout=0.1).id == job.id
+
+
+def test_stale_job_without_attempt_left_is_failed_not_requeued(queue):
+    """Une restauration (max_attempts=1) interrompue n'est jamais rejouée automatiquement."""
+    job = queue.enqueue("test_ok", {}, max_attempts=1)
+    reserved = queue.reserve(timeout=0.1)
+    reserved.attempts = 1
+    reserved.status = JobStatus.RUNNING
+    reserved.started_at = jq._now()
+    queue._save(reserved)
+
+    assert queue.requeue_stale(older_than_seconds=-1) == 0
+    assert queue.depth() == {"queued": 0, "delayed": 0, "processing": 0}
+    stored = queue.get(job.id)
+    assert stored.status == JobStatus.FAILED
+    assert stored.last_error
+    assert calls == []
+
+    # Relance explicite par un admin toujours possible
+    assert queue.retry(job.id).status == JobStatus.QUEUED
+
+
+def test_execute_refuses_job_with_exhausted_attempts(queue, request_db):
+    job = queue.enqueue("test_ok", {}, max_attempts=1)
+    reserved = queue.reserve(timeout=0.1)
+    reserved.attempts = 1
+    queue._save(reserved)
+
+    done = queue.execute(reserved, db=request_db)
+
+    assert done.status == JobStatus.FAILED
+    assert done.attempts == 1
+    assert calls == []
+    assert queue.depth()["processing"] == 0
+
+
+def test_visibility_timeout_outlasts_backup_and_restore():
+    assert settings.JOB_VISIBILITY_TIMEOUT_SECONDS > (
+        settings.DB_BACKUP_TIMEOUT_SECONDS + settings.DB_RESTORE_TIMEOUT_SECONDS
+    )
+
+
+def test_eager_mode_runs_inline(queue, monkeypatch, request_db):
+    monkeypatch.setattr(settings, "JOB_QUEUE_EAGER", True)
+
+    job = queue.enqueue("test_ok", {"n": 1}, db=request_db)
+
+    assert job.status == JobStatus.SUCCEEDED
+    assert calls == [{"n": 1}]
+    assert queue.depth()["queued"] == 0
+
+
+def test_enqueue_falls_back_inline_when_redis_is_down(queue, request_db):
+    class DownRedis(fakeredis.FakeRedis):
+        def set(self, *args, **kwargs):
+            raise ConnectionError("redis down")
+
+    job = JobQueue(DownRedis(decode_responses=True)).enqueue("test_broken", {}, db=request_db)
+
+    # Exécuté une fois dans la requête, sans reprogrammation possible
+    assert job.status == JobStatus.FAILED
+    assert job.attempts == 1
+
+
+def test_failed_inline_job_rolls_back_its_writes_on_the_request_session(queue, monkeypatch, request_db):
+    monkeypatch.setattr(settings, "JOB_QUEUE_EAGER", True)
+    request_db.execute(text("INSERT INTO notes (body) VALUES ('request')"))
+
+    job = queue.enqueue("test_db_write_then_fail", {"fail": True}, db=request_db)
+
+    # Écritures du job annulées, celles de la requête conservées, session utilisable
+    assert job.status == JobStatus.FAILED
+    assert request_db.execute(text("SELECT body FROM notes")).scalars().all() == ["request"]
+
+
+def test_successful_inline_job_keeps_its_writes(queue, monkeypatch, request_db):
+    monkeypatch.setattr(settings, "JOB_QUEUE_EAGER", True)
+
+    job = queue.enqueue("test_db_write_then_fail", {}, db=request_db)
+
+    assert job.status == JobStatus.SUCCEEDED
+    assert request_db.execute(text("SELECT body FROM notes")).scalars().all() == ["job"]
+
+
+def test_progress_is_published_while_running(queue, request_db):
+    progress_queues[:] = [queue]
+    job = queue.enqueue("test_progress", {})
+
+    done = queue.execute(queue.reserve(timeout=0.1), db=request_db)
+
+    assert calls == [{"progress": {"step": "restore", "percent": 50}}]
+    assert done.status == JobStatus.SUCCEEDED
+    assert queue.get(job.id).result == {"progress": {"step": "done", "percent": 100}}
+
+
+def test_progress_of_inline_job_is_kept_on_the_job(queue, request_db):
+    progress_queues.clear()
+
+    job = JobQueue(queue.redis).execute(jq.Job(id="inline", type="test_progress", payload={}), db=request_db, persist=False)
+
+    assert calls == [{"progress": {"step": "restore", "percent": 50}}]
+    assert queue.get("inline") is None
+    assert job.result["progress"]["percent"] == 100
@@ -0,0 +1,321 @@
+"""
+Pagination par clé (curseur) des listes de sessions de caisse, ventes et tickets
+de réception.
+
+- Le parcours par curseur renvoie exactement les lignes du parcours par offset,
+  dans le même ordre (date desc, id desc), y compris à dates égales
+- Curseur invalide refusé (400)
+- Benchmark PostgreSQL : page 1 vs page 500, offset vs curseur
+"""
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+from recyclic_api.models.poste_reception import PosteReception
+from recyclic_api.models.sale import PaymentMethod, Sale
+from recyclic_api.models.site import Site
+from recyclic_api.models.ticket_depot import TicketDepot
+from recyclic_api.models.user import User, UserRole, UserStatus
+from recyclic_api.schemas.cash_session import CashSessionFilters
+from recyclic_api.services.cash_session_service import CashSessionService
+from recyclic_api.services.reception_service import ReceptionService
+from recyclic_api.utils.pagination import ExplainJson, InvalidCursorError, decode_cursor, encode_cursor
+
+
+BENCH_SESSIONS = 50_000
+BENCH_PAGE_SIZE = 20
+
+
+def _operator(db_session: Session) -> User:
+    user = User(
+        username=f"keyset_{uuid.uuid4().hex[:8]}",
+        hashed_password="x",
+        role=UserRole.USER,
+        status=UserStatus.ACTIVE,
+    )
+    db_session.add(user)
+    db_session.flush()
+    return user
+
+
+@pytest.fixture
+def sessions(db_session: Session):
+    operator = _operator(db_session)
+    site = Site(name=f"keyset-site-{uuid.uuid4().hex[:8]}", is_active=True)
+    db_session.add(site)
+    db_session.flush()
+
+    base = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+    created = []
+    for index in range(7):
+        # Trois sessions partagent la même date d'ouverture : départage par id
+        opened_at = base if index < 3 else base + timedelta(days=index)
+        session = CashSession(
+            operator_id=operator.id,
+            site_id=site.id,
+            initial_amount=10.0,
+            current_amount=10.0,
+            status=CashSessionStatus.CLOSED,
+            opened_at=opened_at,
+            total_sales=5.0,
+            total_items=1,
+        )
+        db_session.add(session)
+        created.append(session)
+    db_session.commit()
+    return site, operator, created
+
+
+def _walk(fetch_page):
+    ids, cursor = [], None
+    while True:
+        items, cursor = fetch_page(cursor)
+        ids.extend(items)
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.no_db
+def test_cursor_round_trip_and_invalid_cursor():
+    opened_at = datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+    row_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(opened_at, row_id)) == (opened_at, row_id)
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("pas-un-curseur")
+
+
+@pytest.mark.no_db
+def test_cursor_tiebreakers_must_match_expected_shape():
+    """Même format pour toutes les listes ; les clés de départage sont vérifiées au décodage."""
+    event_date = datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+    ref_id = uuid.uuid4()
+    history_cursor = encode_cursor(event_date, ref_id, 4)
+
+    assert decode_cursor(history_cursor, tiebreakers=1) == (event_date, ref_id, 4)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(history_cursor)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(event_date, ref_id), tiebreakers=1)
+
+
+def test_cash_session_cursor_walk_matches_offset_order(db_session: Session, sessions):
+    site, _, created = sessions
+    service = CashSessionService(db_session)
+
+    offset_page = service.get_sessions_page(CashSessionFilters(site_id=str(site.id), limit=100))
+    expected = [session.id for session in offset_page.items]
+    assert len(expected) == len(created)
+    assert offset_page.next_cursor is None
+
+    def fetch(cursor):
+        page = service.get_sessions_page(CashSessionFilters(site_id=str(site.id), limit=3, cursor=cursor))
+        assert page.total == len(created)
+        return [session.id for session in page.items], page.next_cursor
+
+    assert _walk(fetch) == expected
+
+
+def test_cash_sessions_endpoint_returns_next_cursor(admin_client, db_session: Session, sessions):
+    site, _, created = sessions
+
+    first = admin_client.get("/v1/cash-sessions/", params={"site_id": str(site.id), "limit": 4})
+    assert first.status_code == 200
+    body = first.json()
+    assert body["total"] == len(created)
+    assert body["total_estimated"] is False
+    assert body["next_cursor"]
+
+    second = admin_client.get(
+        "/v1/cash-sessions/", params={"site_id": str(site.id), "limit": 4, "cursor": body["next_cursor"]}
+    )
+    assert second.status_code == 200
+    ids = [row["id"] for row in body["data"]] + [row["id"] for row in second.json()["data"]]
+    assert sorted(ids) == sorted(str(session.id) for session in created)
+    assert second.json()["next_cursor"] is None
+
+    invalid = admin_client.get("/v1/cash-sessions/", params={"cursor": "invalide"})
+    assert invalid.status_code == 400
+
+
+@pytest.mark.no_db
+def test_explain_binds_go_through_type_processors():
+    """L'EXPLAIN d'estimation lie les paramètres comme la requête : Enum -> nom stocké."""
+    statement = select(CashSession.id).where(CashSession.status == CashSessionStatus.OPEN)
+    compiled = ExplainJson(statement).compile(dialect=postgresql.psycopg2.dialect())
+
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+    (name, value), = compiled.params.items()
+    assert compiled._bind_processors[name](value) == "OPEN"
+
+
+def test_cash_sessions_estimated_count_with_enum_filter(admin_client, db_session: Session, sessions):
+    site, _, created = sessions
+
+    response = admin_client.get(
+        "/v1/cash-sessions/",
+        params={"site_id": str(site.id), "status": "closed", "count_mode": "estimated"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["data"]) == len(created)
+    if db_session.get_bind().dialect.name == "postgresql":
+        assert body["total_estimated"] is True
+    else:
+        assert (body["total"], body["total_estimated"]) == (len(created), False)
+
+
+def test_sales_endpoint_cursor_headers(admin_client, db_session: Session, sessions):
+    _, operator, created = sessions
+    base = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    sales = [
+        Sale(
+            cash_session_id=created[0].id,
+            operator_id=operator.id,
+            total_amount=1.0,
+            donation=0.0,
+            payment_method=PaymentMethod.CASH,
+            created_at=base + timedelta(minutes=index // 2),
+            sale_date=base + timedelta(minutes=index // 2),
+        )
+        for index in range(5)
+    ]
+    db_session.add_all(sales)
+    db_session.commit()
+    expected = [
+        sale.id for sale in sorted(sales, key=lambda sale: (sale.created_at, sale.id), reverse=True)
+    ]
+
+    def fetch(cursor):
+        params = {"limit": 2, "count_mode": "exact", "pagination": "keyset"}
+        if cursor:
+            params["cursor"] = cursor
+        response = admin_client.get("/v1/sales/", params=params)
+        assert response.status_code == 200
+        assert int(response.headers["X-Total-Count"]) >= len(sales)
+        return [uuid.UUID(row["id"]) for row in response.json()], response.headers.get("X-Next-Cursor")
+
+    # Les ventes les plus récentes de la base sont celles créées ici (2030)
+    first_ids, cursor = fetch(None)
+    second_ids, cursor = fetch(cursor)
+    third_ids, _ = fetch(cursor)
+    assert (first_ids + second_ids + third_ids)[: len(expected)] == expected
+
+
+def test_sales_endpoint_defaults_to_offset_pagination(admin_client, db_session: Session, sessions):
+    _, operator, created = sessions
+    db_session.add_all([
+        Sale(cash_session_id=created[0].id, operator_id=operator.id, total_amount=1.0, donation=0.0,
+             payment_method=PaymentMethod.CASH, sale_date=datetime(2030, 1, 1, tzinfo=timezone.utc))
+        for _ in range(3)
+    ])
+    db_session.commit()
+
+    # Les appelants skip/limit existants gardent l'ordre et les en-têtes d'avant
+    response = admin_client.get("/v1/sales/", params={"skip": 0, "limit": 2})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+    assert "X-Total-Count" not in response.headers
+
+
+def test_reception_tickets_cursor_walk(db_session: Session):
+    benevole = _operator(db_session)
+    poste = PosteReception(opened_by_user_id=benevole.id)
+    db_session.add(poste)
+    db_session.flush()
+    base = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    tickets = [
+        TicketDepot(poste_id=poste.id, benevole_user_id=benevole.id, created_at=base + timedelta(hours=index // 2))
+        for index in range(5)
+    ]
+    db_session.add_all(tickets)
+    db_session.commit()
+
+    service = ReceptionService(db_session)
+    expected = [
+        ticket.id for ticket in service.get_tickets_page(per_page=100, benevole_id=benevole.id, include_empty=True).items
+    ]
+    assert sorted(expected) == sorted(ticket.id for ticket in tickets)
+
+    def fetch(cursor):
+        page = service.get_tickets_page(per_page=2, cursor=cursor, benevole_id=benevole.id, include_empty=True)
+        return [ticket.id for ticket in page.items], page.next_cursor
+
+    assert _walk(fetch) == expected
+    with pytest.raises(InvalidCursorError):
+        service.get_tickets_page(cursor="invalide")
+
+
+@pytest.mark.performance
+def test_deep_page_latency_offset_vs_cursor(db_engine):
+    """Page 1 vs page 500 des sessions de caisse : OFFSET contre curseur."""
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("Benchmark de pagination uniquement sur PostgreSQL")
+
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection)
+    try:
+        operator = _operator(db)
+        site = Site(name=f"keyset-bench-{uuid.uuid4().hex[:8]}", is_active=True)
+        db.add(site)
+        db.flush()
+        db.execute(
+            text(
+                """
+                INSERT INTO cash_sessions (id, operator_id, site_id, initial_amount, current_amount,
+                                           status, opened_at, closed_at, total_sales, total_items)
+                SELECT gen_random_uuid(), :operator_id, :site_id, 50, 50, 'CLOSED'::cashsessionstatus,
+                       now() - g * interval '10 minutes', now() - g * interval '10 minutes' + interval '8 hours',
+                       10, 1
+                FROM generate_series(1, :rows) AS g
+                """
+            ),
+            {"operator_id": operator.id, "site_id": site.id, "rows": BENCH_SESSIONS},
+        )
+        db.execute(text("ANALYZE cash_sessions"))
+        service = CashSessionService(db)
+
+        def timed(filters):
+            started = time.perf_counter()
+            page = service.get_sessions_page(filters)
+            return page, time.perf_counter() - started
+
+        deep = 500
+        _, offset_first = timed(CashSessionFilters(site_id=str(site.id), limit=BENCH_PAGE_SIZE, count_mode="estimated"))
+        _, offset_deep = timed(
+            CashSessionFilters(
+                site_id=str(site.id), limit=BENCH_PAGE_SIZE, skip=(deep - 1) * BENCH_PAGE_SIZE, count_mode="estimated"
+            )
+        )
+
+        # Curseur de la page 499 obtenu une fois, hors mesure
+        previous = service.get_sessions_page(
+            CashSessionFilters(site_id=str(site.id), limit=BENCH_PAGE_SIZE, skip=(deep - 2) * BENCH_PAGE_SIZE)
+        )
+        cursor_page, cursor_deep = timed(
+            CashSessionFilters(
+                site_id=str(site.id), limit=BENCH_PAGE_SIZE, cursor=previous.next_cursor, count_mode="estimated"
+            )
+        )
+
+        print(
+            f"\nSessions ({BENCH_SESSIONS} lignes) : page 1 {offset_first * 1000:.1f} ms, "
+            f"page {deep} offset {offset_deep * 1000:.1f} ms, page {deep} curseur {cursor_deep * 1000:.1f} ms"
+        )
+        assert cursor_page.total_estimated
+        assert len(cursor_page.items) == BENCH_PAGE_SIZE
+        assert cursor_deep < offset_deep
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
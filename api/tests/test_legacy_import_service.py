@@ -259,3 +259,131 @@ class TestLegacyImportServiceExecute:
         assert result["total_errors"] > 0
         assert any("non mappée" in err.lower() or "absente" in err.lower() for err in result["errors"])
 
+
+    def test_execute_bulk_insert_in_batches(self, db_session):
+        """Les lignes sont insérées par lots dans une seule transaction."""
+        from recyclic_api.models.user import User, UserRole, UserStatus
+        from recyclic_api.models.ligne_depot import LigneDepot
+        from recyclic_api.core.security import hash_password
+
+        admin_user = User(
+            id=uuid4(),
+            username="admin@test.com",
+            hashed_password=hash_password("testpass"),
+            role=UserRole.ADMIN,
+            status=UserStatus.ACTIVE
+        )
+        db_session.add(admin_user)
+        cat = Category(name="Vaisselle", is_active=True)
+        db_session.add(cat)
+        db_session.commit()
+
+        lines = ["date,category,poids_kg,destination,notes"]
+        lines += [f"2025-01-{day:02d},Vaisselle,1.5,MAGASIN," for day in (15, 16) for _ in range(7)]
+        lines.append("2025-01-16,Vaisselle,2,INCONNUE,")
+        csv_content = ("\n".join(lines) + "\n").encode("utf-8")
+
+        mapping_json = {
+            "mappings": {"Vaisselle": {"category_id": str(cat.id), "category_name": "Vaisselle", "confidence": 100.0}},
+            "unmapped": []
+        }
+
+        service = LegacyImportService(db_session)
+        service.BULK_INSERT_BATCH_SIZE = 3
+        commits = []
+        original_commit = db_session.commit
+        db_session.commit = lambda: (commits.append(1), original_commit())[1]
+        try:
+            result = service.execute(csv_content, mapping_json, admin_user.id)
+        finally:
+            db_session.commit = original_commit
+
+        assert result["tickets_created"] == 2
+        assert result["lignes_imported"] == 14
+        assert result["total_errors"] == 1
+        assert "Destination invalide" in result["errors"][0]
+        assert len(commits) == 1
+        assert db_session.query(LigneDepot).filter(LigneDepot.category_id == cat.id).count() == 14
+
+    @pytest.mark.performance
+    def test_execute_bulk_import_throughput(self, db_session):
+        """Benchmark: débit (lignes/seconde) d'un import de 50 000 lignes."""
+        import time
+        from recyclic_api.models.user import User, UserRole, UserStatus
+        from recyclic_api.core.security import hash_password
+
+        admin_user = User(
+            id=uuid4(),
+            username="admin@test.com",
+            hashed_password=hash_password("testpass"),
+            role=UserRole.ADMIN,
+            status=UserStatus.ACTIVE
+        )
+        db_session.add(admin_user)
+        cat = Category(name="Vaisselle", is_active=True)
+        db_session.add(cat)
+        db_session.commit()
+
+        row_count = 50_000
+        lines = ["date,category,poids_kg,destination,notes"]
+        lines += [f"2024-{(i % 12) + 1:02d}-{(i % 28) + 1:02d},Vaisselle,1.5,MAGASIN," for i in range(row_count)]
+        csv_content = ("\n".join(lines) + "\n").encode("utf-8")
+        mapping_json = {
+            "mappings": {"Vaisselle": {"category_id": str(cat.id), "category_name": "Vaisselle", "confidence": 100.0}},
+            "unmapped": []
+        }
+
+        service = LegacyImportService(db_session)
+        start = time.perf_counter()
+        result = service.execute(csv_content, mapping_json, admin_user.id)
+        elapsed = time.perf_counter() - start
+
+        rows_per_second = row_count / elapsed
+        print(f"Import legacy: {row_count} lignes en {elapsed:.2f}s ({rows_per_second:.0f} lignes/s)")
+        assert result["lignes_imported"] == row_count
+        assert rows_per_second > 2_000
+
+
+class TestLegacyImportServiceLLMBatches:
+    """Tests du fallback LLM par batches concurrents."""
+
+    def test_analyze_llm_only_persists_each_batch_in_cache(self, db_session, monkeypatch):
+        from recyclic_api.core.config import settings
+        from recyclic_api.models.legacy_category_mapping_cache import LegacyCategoryMappingCache
+
+        cat = Category(name="Vaisselle", is_active=True)
+        db_session.add(cat)
+        db_session.commit()
+        monkeypatch.setattr(settings, "LEGACY_IMPORT_LLM_BATCH_SIZE", 2)
+        monkeypatch.setattr(settings, "LEGACY_IMPORT_LLM_RETRY_BASE_DELAY_SECONDS", 0)
+
+        class FakeLLMClient:
+            provider_name = "llm-fake"
+
+            def suggest_mappings(self, unmapped, known_categories):
+                if "Boom" in unmapped:
+                    raise RuntimeError("LLM indisponible")
+                return {
+                    name: {"target_name": "Vaisselle" if name != "Inconnu" else "Absente", "confidence": 150}
+                    for name in unmapped
+                }
+
+        service = LegacyImportService(db_session, llm_client=FakeLLMClient())
+        result = service.analyze_llm_only(["Assiettes", "Bols", "Inconnu", "Boom", "Tasses"])
+
+        assert set(result["mappings"]) == {"Assiettes", "Bols", "Tasses"}
+        assert result["mappings"]["Bols"]["confidence"] == 100.0
+        stats = result["statistics"]
+        assert stats["llm_batches_total"] == 3
+        assert stats["llm_batches_failed"] == 1
+        assert stats["llm_unmapped_after_llm"] == 2
+        assert "LLM indisponible" in stats["llm_last_error"]
+        assert stats["llm_provider_used"] == "llm-fake"
+
+        cached = {
+            row.source_name_normalized: row
+            for row in db_session.query(LegacyCategoryMappingCache).all()
+        }
+        assert {"assiettes", "bols", "tasses"} <= set(cached)
+        assert cached["bols"].provider == "llm-fake"
+        assert cached["bols"].target_category_id == cat.id
@@ -0,0 +1,111 @@
+"""
+Tests du cache partagé des stats live (ReceptionLiveStatsService).
+
+Utilise fakeredis comme stand-in local de Redis ; les agrégations SQL sont
+remplacées par des compteurs d'appels.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from recyclic_api.core.config import settings
+from recyclic_api.services.reception_stats_service import ReceptionLiveStatsService
+
+
+pytestmark = pytest.mark.no_db
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr("recyclic_api.services.reception_stats_service.get_redis", lambda: client)
+    monkeypatch.setattr(settings, "LIVE_STATS_CACHE_TTL_SECONDS", 5)
+    return client
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = ReceptionLiveStatsService(db=None)
+    service.aggregation_calls = 0
+
+    def fake_reception(site_id, threshold, start_of_today):
+        service.aggregation_calls += 1
+        return {
+            "tickets_open": 2,
+            "tickets_closed": 3,
+            "items_received": 4,
+            "weight_in": Decimal("37.5"),
+            "weight_exit": Decimal("1.5"),
+        }
+
+    def fake_sales(site_id, threshold, start_of_today):
+        return {
+            "tickets_count": 2,
+            "turnover": Decimal("150"),
+            "donations": Decimal("12"),
+            "last_ticket_amount": Decimal("75"),
+            "weight_sold": Decimal("18"),
+        }
+
+    monkeypatch.setattr(service, "_aggregate_reception_stats", fake_reception)
+    monkeypatch.setattr(service, "_aggregate_sales_stats", fake_sales)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_unified_stats_computed_once_per_ttl(fake_redis, service):
+    first = await service.get_unified_live_stats(period_type="daily")
+    second = await service.get_unified_live_stats(period_type="daily")
+
+    assert service.aggregation_calls == 1
+    assert second == first
+    assert isinstance(second["period_start"], datetime)
+    assert second["weight_out"] == 19.5
+
+
+@pytest.mark.asyncio
+async def test_cache_keyed_by_site_and_window(fake_redis, service):
+    await service.get_unified_live_stats(period_type="daily")
+    await service.get_unified_live_stats(period_type="24h")
+    await service.get_unified_live_stats(period_type="daily", site_id="site-1")
+    await service.get_live_stats()
+
+    assert service.aggregation_calls == 4
+    assert sorted(fake_redis.keys("live_stats:*")) == [
+        "live_stats:reception:all:24h",
+        "live_stats:unified:all:24h",
+        "live_stats:unified:all:daily",
+        "live_stats:unified:site-1:daily",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_when_ttl_is_zero(fake_redis, service, monkeypatch):
+    monkeypatch.setattr(settings, "LIVE_STATS_CACHE_TTL_SECONDS", 0)
+
+    await service.get_live_stats()
+    await service.get_live_stats()
+
+    assert service.aggregation_calls == 2
+    assert fake_redis.keys("live_stats:*") == []
+
+
+@pytest.mark.asyncio
+async def test_stats_computed_when_redis_unavailable(service, monkeypatch):
+    class _BrokenRedis:
+        def get(self, *args, **kwargs):
+            raise ConnectionError("redis down")
+
+        def set(self, *args, **kwargs):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr("recyclic_api.services.reception_stats_service.get_redis", lambda: _BrokenRedis())
+    monkeypatch.setattr(settings, "LIVE_STATS_CACHE_TTL_SECONDS", 5)
+
+    stats = await service.get_live_stats()
+
+    assert stats["tickets_open"] == 2
+    assert service.aggregation_calls == 1
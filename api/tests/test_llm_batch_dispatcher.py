@@ -0,0 +1,150 @@
+"""
+Tests de LLMBatchDispatcher contre un faux serveur OpenRouter local (B47-P5).
+
+Le serveur HTTP tourne dans un thread et répond au format chat/completions ;
+il mesure le nombre de requêtes simultanées et peut simuler erreurs et lenteurs.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import pytest
+
+from recyclic_api.services.llm_batch_dispatcher import LLMBatchDispatcher
+from recyclic_api.services.llm_openrouter_client import OpenRouterCategoryMappingClient
+
+
+pytestmark = pytest.mark.no_db
+
+
+class MockOpenRouter:
+    """Faux endpoint /chat/completions qui mappe chaque catégorie vers 'Vaisselle'."""
+
+    def __init__(self, delay: float = 0.0, failures_before_success: int = 0) -> None:
+        self.delay = delay
+        self.failures_before_success = failures_before_success
+        self.requests: List[List[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                return None
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                payload = json.loads(body["messages"][1]["content"])
+                status, response = mock.handle(payload["unmapped_categories"])
+                raw = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def handle(self, unmapped: List[str]):
+        with self._lock:
+            self.requests.append(unmapped)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self.failures_before_success > 0
+            if fail:
+                self.failures_before_success -= 1
+        try:
+            time.sleep(self.delay)
+            if fail:
+                return 503, {"error": "overloaded"}
+            mappings = {name: {"target_name": "Vaisselle", "confidence": 90} for name in unmapped}
+            return 200, {"choices": [{"message": {"content": json.dumps({"mappings": mappings})}}]}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def __enter__(self) -> "MockOpenRouter":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _client(server: MockOpenRouter) -> OpenRouterCategoryMappingClient:
+    return OpenRouterCategoryMappingClient(api_key="test-key", model="test-model", base_url=server.base_url)
+
+
+def _batches(count: int, size: int = 5) -> List[List[str]]:
+    return [[f"cat-{b}-{i}" for i in range(size)] for b in range(count)]
+
+
+def test_batches_are_sent_concurrently_with_bounded_pool() -> None:
+    batches = _batches(8)
+    landed: List[int] = []
+
+    with MockOpenRouter(delay=0.2) as server:
+        dispatcher = LLMBatchDispatcher(_client(server), concurrency=4, timeout_seconds=5, max_retries=0)
+        start = time.perf_counter()
+        outcomes = dispatcher.dispatch(batches, ["Vaisselle"], on_batch=lambda outcome: landed.append(outcome.index))
+        elapsed = time.perf_counter() - start
+
+    assert [outcome.index for outcome in outcomes] == list(range(8))
+    assert all(outcome.succeeded for outcome in outcomes)
+    assert outcomes[3].suggestions["cat-3-0"]["target_name"] == "Vaisselle"
+    assert sorted(landed) == list(range(8))
+    assert server.max_in_flight == 4
+    # 8 batches de 0,2 s par 4 : ~0,4 s au lieu de 1,6 s en série
+    assert elapsed < 1.2
+
+
+def test_failed_batch_is_retried() -> None:
+    with MockOpenRouter(failures_before_success=1) as server:
+        dispatcher = LLMBatchDispatcher(
+            _client(server), concurrency=1, timeout_seconds=5, max_retries=2, retry_base_delay_seconds=0.01
+        )
+        outcomes = dispatcher.dispatch(_batches(1), ["Vaisselle"])
+
+    assert outcomes[0].succeeded
+    assert outcomes[0].attempts == 2
+    assert len(server.requests) == 2
+
+
+def test_batch_timeout_is_reported_after_retries() -> None:
+    with MockOpenRouter(delay=0.5) as server:
+        dispatcher = LLMBatchDispatcher(
+            _client(server), concurrency=2, timeout_seconds=0.1, max_retries=1, retry_base_delay_seconds=0.01
+        )
+        outcomes = dispatcher.dispatch(_batches(1), ["Vaisselle"])
+
+    assert not outcomes[0].succeeded
+    assert outcomes[0].attempts == 2
+    assert "Timeout" in outcomes[0].error
+
+
+def test_sync_only_clients_run_in_threads() -> None:
+    calls: List[List[str]] = []
+
+    class SyncClient:
+        provider_name = "fake"
+
+        def suggest_mappings(self, unmapped: List[str], known_categories: List[str]) -> Dict[str, dict]:
+            calls.append(unmapped)
+            return {unmapped[0]: {"target_name": "Vaisselle", "confidence": 80}}
+
+    outcomes = LLMBatchDispatcher(SyncClient(), concurrency=3, max_retries=0).dispatch(_batches(3), ["Vaisselle"])
+
+    assert len(calls) == 3
+    assert [list(outcome.suggestions) for outcome in outcomes] == [["cat-0-0"], ["cat-1-0"], ["cat-2-0"]]
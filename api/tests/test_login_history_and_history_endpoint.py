@@ -9,14 +9,21 @@ from datetime import datetime, timedelta
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
+from recyclic_api.api.api_v1.endpoints import auth as auth_endpoints
 from recyclic_api.models.user import User, UserRole, UserStatus
 from recyclic_api.models.login_history import LoginHistory
 from recyclic_api.core.auth import create_access_token
 from recyclic_api.core.security import hash_password
 
 
+@pytest.fixture(autouse=True)
+def login_attempts_on_test_connection(db_session: Session, monkeypatch):
+    """La tâche de fond du login ouvre sa propre session : on la lie à la connexion du test."""
+    monkeypatch.setattr(auth_endpoints, "SessionLocal", sessionmaker(bind=db_session.get_bind()))
+
+
 @pytest.fixture
 def admin_user(db_session: Session) -> User:
     user = User(
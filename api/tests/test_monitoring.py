@@ -293,7 +293,13 @@ class TestSchedulerService:
         """Test la configuration des tâches par défaut."""
         scheduler_service.setup_default_tasks()
         
-        expected_tasks = ["anomaly_detection", "health_check", "cleanup", "weekly_reports"]
+        expected_tasks = [
+            "anomaly_detection",
+            "health_check",
+            "cleanup",
+            "cash_session_totals_reconciliation",
+            "weekly_reports",
+        ]
         for task_name in expected_tasks:
             assert task_name in scheduler_service.tasks
 
@@ -352,8 +358,8 @@ class TestMonitoringIntegration:
         # Vérifications
         assert isinstance(result, dict)
         assert 'anomalies' in result
-        assert len(scheduler_service.tasks) == 4
-        assert scheduler_service.get_status()["total_tasks"] == 4
+        assert len(scheduler_service.tasks) == 5
+        assert scheduler_service.get_status()["total_tasks"] == 5
 
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+"""
+Tests de la vérification des mots de passe dans le pool bcrypt dédié.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from recyclic_api.core import security
+from recyclic_api.core.security import hash_password, verify_password_pooled
+
+
+pytestmark = pytest.mark.no_db
+
+
+def test_verify_password_pooled_matches_sync_result():
+    hashed = hash_password("StrongP@ssw0rd!")
+
+    assert verify_password_pooled("StrongP@ssw0rd!", hashed) is True
+    assert verify_password_pooled("wrong", hashed) is False
+
+
+def test_verification_runs_in_the_bcrypt_pool(monkeypatch):
+    threads = []
+
+    def fake_verify(plain, hashed):
+        threads.append(threading.current_thread().name)
+        return True
+
+    monkeypatch.setattr(security, "verify_password", fake_verify)
+
+    # Plusieurs threads de requêtes (handlers synchrones) vérifient en même temps
+    with ThreadPoolExecutor(max_workers=8) as request_threads:
+        results = list(request_threads.map(lambda _: verify_password_pooled("pw", "hash"), range(8)))
+
+    assert all(results)
+    assert all(name.startswith("password-hash") for name in threads)
@@ -0,0 +1,78 @@
+"""
+Tests du cache des ensembles de permissions (core.permission_cache).
+
+Utilise fakeredis comme stand-in local de Redis.
+"""
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from recyclic_api.core.permission_cache import PermissionCache
+
+
+pytestmark = pytest.mark.no_db
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr("recyclic_api.core.permission_cache.get_redis", lambda: client)
+    return client
+
+
+class _Loader:
+    def __init__(self, permissions):
+        self.permissions = set(permissions)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return set(self.permissions)
+
+
+def test_permissions_loaded_once_then_served_from_cache(fake_redis):
+    cache = PermissionCache()
+    loader = _Loader({"caisse.access"})
+
+    assert cache.get_permissions("user-1", loader) == {"caisse.access"}
+    assert cache.get_permissions("user-1", loader) == {"caisse.access"}
+    assert loader.calls == 1
+
+
+def test_redis_layer_shared_between_workers(fake_redis):
+    loader = _Loader({"reception.access"})
+    PermissionCache().get_permissions("user-1", loader)
+
+    # Un autre worker (cache local vide) lit l'ensemble depuis Redis
+    other_worker_loader = _Loader(set())
+    assert PermissionCache().get_permissions("user-1", other_worker_loader) == {"reception.access"}
+    assert other_worker_loader.calls == 0
+
+
+def test_invalidate_forces_reload_in_every_worker(fake_redis):
+    worker_a = PermissionCache()
+    worker_b = PermissionCache()
+    loader = _Loader({"caisse.access"})
+    worker_a.get_permissions("user-1", loader)
+    worker_b.get_permissions("user-1", loader)
+
+    loader.permissions = set()
+    worker_a.invalidate()
+
+    assert worker_b.get_permissions("user-1", loader) == frozenset()
+    assert loader.calls == 2
+
+
+def test_cache_bypassed_when_redis_unavailable(monkeypatch):
+    class _BrokenRedis:
+        def get(self, *args, **kwargs):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr("recyclic_api.core.permission_cache.get_redis", lambda: _BrokenRedis())
+    cache = PermissionCache()
+    loader = _Loader({"caisse.access"})
+
+    cache.get_permissions("user-1", loader)
+    cache.get_permissions("user-1", loader)
+
+    assert loader.calls == 2
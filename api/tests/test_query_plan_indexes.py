@@ -0,0 +1,315 @@
+"""
+Non-régression des plans d'exécution sur les clés étrangères chaudes.
+
+Un jeu de données de volume réaliste (sessions, ventes, lignes, paiements,
+tickets de réception) est inséré dans une transaction annulée en fin de module,
+puis `EXPLAIN (FORMAT JSON)` vérifie que les requêtes clés des services de caisse,
+de réception et de statistiques passent par les index attendus
+(migration perf_hot_fk_indexes).
+
+PostgreSQL uniquement : les plans SQLite ne sont pas représentatifs.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Set
+
+import pytest
+from sqlalchemy import and_, func, select, text
+from sqlalchemy.orm import Session
+
+from recyclic_api.models.cash_register import CashRegister
+from recyclic_api.models.cash_session import CashSession, CashSessionStatus
+from recyclic_api.models.category import Category
+from recyclic_api.models.ligne_depot import LigneDepot
+from recyclic_api.models.payment_transaction import PaymentTransaction
+from recyclic_api.models.poste_reception import PosteReception
+from recyclic_api.models.sale import Sale
+from recyclic_api.models.sale_item import SaleItem
+from recyclic_api.models.site import Site
+from recyclic_api.models.ticket_depot import TicketDepot
+from recyclic_api.models.user import User, UserRole, UserStatus
+
+
+# Jeu de données volumineux : exclu de la CI rapide avec -m "not performance"
+pytestmark = pytest.mark.performance
+
+SESSIONS = 5000
+SALES_PER_SESSION = 10
+ITEMS_PER_SALE = 2
+POSTES = 500
+TICKETS_PER_POSTE = 20
+LIGNES_PER_TICKET = 3
+REGISTERS = 20
+OPERATORS = 50
+HISTORY_DAYS = 365
+
+INDEX_NODE_TYPES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+class PlanFixture:
+    def __init__(self, db: Session, now: datetime, registers, operators, site, category):
+        self.db = db
+        self.now = now
+        self.registers = registers
+        self.operators = operators
+        self.site = site
+        self.category = category
+
+    def any_id(self, table: str) -> uuid.UUID:
+        return self.db.execute(text(f"SELECT id FROM {table} ORDER BY id LIMIT 1 OFFSET 42")).scalar_one()
+
+    def explain(self, statement) -> dict:
+        sql = statement.compile(dialect=self.db.bind.dialect, compile_kwargs={"literal_binds": True})
+        raw = self.db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+        return (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+
+def _used_indexes(plan: dict) -> Set[str]:
+    found = set()
+    if plan.get("Node Type") in INDEX_NODE_TYPES:
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        found |= _used_indexes(child)
+    return found
+
+
+def _assert_uses_index(fixture: PlanFixture, statement, index_name: str) -> None:
+    plan = fixture.explain(statement)
+    used = _used_indexes(plan)
+    assert index_name in used, f"{index_name} non utilisé, plan: {json.dumps(plan, indent=2)}"
+
+
+@pytest.fixture(scope="module")
+def plan_db(db_engine) -> Iterator[PlanFixture]:
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("Plans d'exécution vérifiés uniquement sur PostgreSQL")
+
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection)
+    now = datetime.now(timezone.utc)
+    try:
+        suffix = uuid.uuid4().hex[:8]
+        site = Site(name=f"plan-site-{suffix}", is_active=True)
+        category = Category(name=f"plan-cat-{suffix}", is_active=True)
+        db.add_all([site, category])
+        operators = [
+            User(
+                username=f"plan-op-{suffix}-{i}",
+                hashed_password="x",
+                role=UserRole.USER,
+                status=UserStatus.ACTIVE,
+            )
+            for i in range(OPERATORS)
+        ]
+        db.add_all(operators)
+        db.flush()
+        registers = [CashRegister(name=f"plan-reg-{suffix}-{i}", site_id=site.id) for i in range(REGISTERS)]
+        db.add_all(registers)
+        db.flush()
+
+        params = {
+            "now": now,
+            "site_id": site.id,
+            "category_id": category.id,
+            "operator_ids": [str(user.id) for user in operators],
+            "register_ids": [str(register.id) for register in registers],
+            "history_days": HISTORY_DAYS,
+        }
+
+        # Une seule session ouverte par poste de caisse, les autres sont fermées
+        db.execute(
+            text(
+                """
+                INSERT INTO cash_sessions (id, operator_id, site_id, register_id, initial_amount,
+                                           current_amount, status, opened_at, closed_at)
+                SELECT gen_random_uuid(),
+                       (CAST(:operator_ids AS uuid[]))[1 + g % cardinality(CAST(:operator_ids AS uuid[]))],
+                       :site_id,
+                       (CAST(:register_ids AS uuid[]))[1 + g % cardinality(CAST(:register_ids AS uuid[]))],
+                       50, 50,
+                       CASE WHEN g <= cardinality(CAST(:register_ids AS uuid[])) THEN 'OPEN' ELSE 'CLOSED' END::cashsessionstatus,
+                       :now - (g % :history_days) * interval '1 day',
+                       CASE WHEN g <= cardinality(CAST(:register_ids AS uuid[])) THEN NULL
+                            ELSE :now - (g % :history_days) * interval '1 day' + interval '8 hours' END
+                FROM generate_series(1, :sessions) AS g
+                """
+            ),
+            {**params, "sessions": SESSIONS},
+        )
+        db.execute(
+            text(
+                """
+                INSERT INTO sales (id, cash_session_id, operator_id, total_amount, donation, payment_method, created_at)
+                SELECT gen_random_uuid(), cs.id, cs.operator_id, 10, 0, 'CASH',
+                       cs.opened_at + n * interval '10 minutes'
+                FROM cash_sessions cs CROSS JOIN generate_series(1, :per_session) AS n
+                WHERE cs.site_id = :site_id
+                """
+            ),
+            {**params, "per_session": SALES_PER_SESSION},
+        )
+        db.execute(
+            text(
+                """
+                INSERT INTO sale_items (id, sale_id, category, quantity, weight, unit_price, total_price)
+                SELECT gen_random_uuid(), s.id, 'EEE-1', 1, 1.5, 5, 5
+                FROM sales s
+                JOIN cash_sessions cs ON cs.id = s.cash_session_id
+                CROSS JOIN generate_series(1, :per_sale) AS n
+                WHERE cs.site_id = :site_id
+                """
+            ),
+            {**params, "per_sale": ITEMS_PER_SALE},
+        )
+        db.execute(
+            text(
+                """
+                INSERT INTO payment_transactions (id, sale_id, payment_method, amount, created_at)
+                SELECT gen_random_uuid(), s.id, 'CASH', s.total_amount, s.created_at
+                FROM sales s
+                JOIN cash_sessions cs ON cs.id = s.cash_session_id
+                WHERE cs.site_id = :site_id
+                """
+            ),
+            params,
+        )
+        db.execute(
+            text(
+                """
+                INSERT INTO poste_reception (id, opened_by_user_id, opened_at, closed_at, status)
+                SELECT gen_random_uuid(),
+                       (CAST(:operator_ids AS uuid[]))[1 + g % cardinality(CAST(:operator_ids AS uuid[]))],
+                       :now - (g % :history_days) * interval '1 day',
+                       :now - (g % :history_days) * interval '1 day' + interval '6 hours',
+                       'closed'
+                FROM generate_series(1, :postes) AS g
+                """
+            ),
+            {**params, "postes": POSTES},
+        )
+        db.execute(
+            text(
+                """
+                INSERT INTO ticket_depot (id, poste_id, benevole_user_id, created_at, closed_at, status)
+                SELECT gen_random_uuid(), p.id, p.opened_by_user_id,
+                       p.opened_at + n * interval '10 minutes',
+                       p.opened_at + n * interval '10 minutes' + interval '5 minutes',
+                       'closed'
+                FROM poste_reception p CROSS JOIN generate_series(1, :per_poste) AS n
+                WHERE p.opened_by_user_id = ANY(CAST(:operator_ids AS uuid[]))
+                """
+            ),
+            {**params, "per_poste": TICKETS_PER_POSTE},
+        )
+        db.execute(
+            text(
+                """
+                INSERT INTO ligne_depot (id, ticket_id, category_id, poids_kg, destination, is_exit)
+                SELECT gen_random_uuid(), t.id, :category_id, 2.5, 'MAGASIN', false
+                FROM ticket_depot t
+                JOIN poste_reception p ON p.id = t.poste_id
+                CROSS JOIN generate_series(1, :per_ticket) AS n
+                WHERE p.opened_by_user_id = ANY(CAST(:operator_ids AS uuid[]))
+                """
+            ),
+            {**params, "per_ticket": LIGNES_PER_TICKET},
+        )
+
+        for table in (
+            "cash_sessions", "sales", "sale_items", "payment_transactions",
+            "poste_reception", "ticket_depot", "ligne_depot",
+        ):
+            db.execute(text(f"ANALYZE {table}"))
+
+        yield PlanFixture(db, now, registers, operators, site, category)
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+def test_open_session_by_register_uses_partial_index(plan_db):
+    # CashSessionService.get_open_session_by_register
+    statement = select(CashSession).where(
+        and_(
+            CashSession.register_id == plan_db.registers[3].id,
+            CashSession.status == CashSessionStatus.OPEN,
+        )
+    )
+    _assert_uses_index(plan_db, statement, "ix_cash_sessions_open_register")
+
+
+def test_open_session_by_operator_uses_composite_index(plan_db):
+    # CashSessionService.get_open_session_by_operator
+    statement = select(CashSession).where(
+        and_(
+            CashSession.operator_id == plan_db.operators[7].id,
+            CashSession.status == CashSessionStatus.OPEN,
+            CashSession.opened_at >= plan_db.now - timedelta(days=90),
+        )
+    ).limit(1)
+    _assert_uses_index(plan_db, statement, "ix_cash_sessions_operator_status_opened_at")
+
+
+def test_daily_sessions_use_opened_at_index(plan_db):
+    # CashSessionService.get_daily_sessions
+    start = (plan_db.now - timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
+    statement = select(CashSession).where(
+        and_(CashSession.opened_at >= start, CashSession.opened_at < start + timedelta(days=1))
+    ).order_by(CashSession.opened_at)
+    plan = plan_db.explain(statement)
+    assert _used_indexes(plan) & {"ix_cash_sessions_opened_at", "ix_cash_sessions_site_id_opened_at"}
+
+
+def test_session_sales_use_cash_session_index(plan_db):
+    # Agrégats de session (CashSessionService, export_service)
+    statement = select(func.count(Sale.id), func.sum(Sale.total_amount)).where(
+        Sale.cash_session_id == plan_db.any_id("cash_sessions")
+    )
+    _assert_uses_index(plan_db, statement, "ix_sales_cash_session_id")
+
+
+def test_sale_items_and_payments_use_sale_index(plan_db):
+    sale_id = plan_db.any_id("sales")
+    _assert_uses_index(plan_db, select(SaleItem).where(SaleItem.sale_id == sale_id), "ix_sale_items_sale_id")
+    _assert_uses_index(
+        plan_db,
+        select(PaymentTransaction).where(PaymentTransaction.sale_id == sale_id),
+        "ix_payment_transactions_sale_id",
+    )
+
+
+def test_sales_by_day_use_created_at_index(plan_db):
+    # StatsService / ReceptionLiveStatsService : CA et ventes du jour
+    start = plan_db.now - timedelta(days=1)
+    statement = select(func.coalesce(func.sum(Sale.total_amount), 0)).where(Sale.created_at >= start)
+    _assert_uses_index(plan_db, statement, "ix_sales_created_at")
+
+
+def test_reception_tickets_and_lines_use_fk_indexes(plan_db):
+    _assert_uses_index(
+        plan_db,
+        select(TicketDepot).where(TicketDepot.poste_id == plan_db.any_id("poste_reception")),
+        "ix_ticket_depot_poste_id",
+    )
+    _assert_uses_index(
+        plan_db,
+        select(func.sum(LigneDepot.poids_kg)).where(LigneDepot.ticket_id == plan_db.any_id("ticket_depot")),
+        "ix_ligne_depot_ticket_id",
+    )
+
+
+def test_reception_stats_by_day_use_date_indexes(plan_db):
+    start = plan_db.now - timedelta(days=1)
+    _assert_uses_index(
+        plan_db,
+        select(func.count(TicketDepot.id)).where(TicketDepot.created_at >= start),
+        "ix_ticket_depot_created_at",
+    )
+    _assert_uses_index(
+        plan_db,
+        select(PosteReception.id).where(PosteReception.opened_at >= start),
+        "ix_poste_reception_opened_at",
+    )
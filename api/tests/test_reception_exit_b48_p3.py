@@ -377,7 +377,7 @@ class TestReceptionExitStats:
         # Calculer weight_in
         service = ReceptionLiveStatsService(db_session)
         threshold = now - timedelta(hours=24)
-        weight_in = service._calculate_weight_in(None, threshold, start_of_today)
+        weight_in = service._aggregate_reception_stats(None, threshold, start_of_today)["weight_in"]
 
         # weight_in doit inclure uniquement la ligne entrée (10kg), pas la sortie (5kg)
         assert weight_in == Decimal("10.000"), f"weight_in devrait être 10.000, obtenu {weight_in}"
@@ -442,12 +442,11 @@ class TestReceptionExitStats:
 
         # Calculer weight_out
         service = ReceptionLiveStatsService(db_session)
-        threshold = now - timedelta(hours=24)
-        weight_out = service._calculate_weight_out(None, threshold, start_of_today)
+        weight_out = (await service.get_live_stats())["weight_out"]
 
         # weight_out doit inclure la ligne sortie (7.5kg)
         # Note: weight_out inclut aussi les ventes, mais ici on n'en a pas
-        assert weight_out == Decimal("7.500"), f"weight_out devrait être 7.500, obtenu {weight_out}"
+        assert weight_out == 7.5, f"weight_out devrait être 7.5, obtenu {weight_out}"
 
     @pytest.mark.asyncio
     async def test_weight_in_weight_out_with_mixed_lines(self, db_session: Session):
@@ -535,13 +534,12 @@ class TestReceptionExitStats:
 
         # Calculer weight_in et weight_out
         service = ReceptionLiveStatsService(db_session)
-        threshold = now - timedelta(hours=24)
-        weight_in = service._calculate_weight_in(None, threshold, start_of_today)
-        weight_out = service._calculate_weight_out(None, threshold, start_of_today)
+        stats = await service.get_live_stats()
+        weight_in, weight_out = stats["weight_in"], stats["weight_out"]
 
         # weight_in = 12 + 8 = 20kg (uniquement entrées)
-        assert weight_in == Decimal("20.000"), f"weight_in devrait être 20.000, obtenu {weight_in}"
+        assert weight_in == 20.0, f"weight_in devrait être 20.0, obtenu {weight_in}"
 
         # weight_out = 3 + 2.5 = 5.5kg (uniquement sorties, pas de ventes)
-        assert weight_out == Decimal("5.500"), f"weight_out devrait être 5.500, obtenu {weight_out}"
+        assert weight_out == 5.5, f"weight_out devrait être 5.5, obtenu {weight_out}"
 
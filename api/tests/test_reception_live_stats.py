@@ -29,7 +29,7 @@ class TestReceptionLiveStatsService:
         service = ReceptionLiveStatsService(db_session)
         now = datetime.now(timezone.utc)
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        count = service._count_open_tickets(None, start_of_today)
+        count = service._aggregate_reception_stats(None, start_of_today, start_of_today)["tickets_open"]
         assert count == 0
 
     def test_count_open_tickets_with_open_and_closed(self, db_session: Session):
@@ -78,7 +78,7 @@ class TestReceptionLiveStatsService:
         service = ReceptionLiveStatsService(db_session)
         now = datetime.now(timezone.utc)
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        count = service._count_open_tickets(None, start_of_today)
+        count = service._aggregate_reception_stats(None, start_of_today, start_of_today)["tickets_open"]
         assert count == 1
 
     def test_count_closed_tickets_24h_no_recent_closures(self, db_session: Session):
@@ -87,7 +87,7 @@ class TestReceptionLiveStatsService:
         now = datetime.now(timezone.utc)
         threshold = now - timedelta(hours=24)
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        count = service._count_closed_tickets_24h(None, threshold, start_of_today)
+        count = service._aggregate_reception_stats(None, threshold, start_of_today)["tickets_closed"]
         assert count == 0
 
     def test_count_closed_tickets_24h_with_recent_and_old(self, db_session: Session):
@@ -132,7 +132,7 @@ class TestReceptionLiveStatsService:
         now = datetime.now(timezone.utc)
         threshold = now - timedelta(hours=24)
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        count = service._count_closed_tickets_24h(None, threshold, start_of_today)
+        count = service._aggregate_reception_stats(None, threshold, start_of_today)["tickets_closed"]
         assert count == 1
 
     def test_calculate_turnover_24h_no_sales(self, db_session: Session):
@@ -141,7 +141,7 @@ class TestReceptionLiveStatsService:
         now = datetime.now(timezone.utc)
         threshold = now - timedelta(hours=24)
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        turnover = service._calculate_turnover_24h(None, threshold, start_of_today)
+        turnover = service._aggregate_sales_stats(None, threshold, start_of_today)["turnover"]
         assert turnover == Decimal('0')
 
     def test_calculate_turnover_24h_with_sales(self, db_session: Session):
@@ -198,7 +198,7 @@ class TestReceptionLiveStatsService:
         now = datetime.now(timezone.utc)
         threshold = now - timedelta(hours=24)
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        turnover = service._calculate_turnover_24h(None, threshold, start_of_today)
+        turnover = service._aggregate_sales_stats(None, threshold, start_of_today)["turnover"]
         assert turnover == Decimal('100.50')
 
     def test_calculate_donations_24h_no_donations(self, db_session: Session):
@@ -207,7 +207,7 @@ class TestReceptionLiveStatsService:
         now = datetime.now(timezone.utc)
         threshold = now - timedelta(hours=24)
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        donations = service._calculate_donations_24h(None, threshold, start_of_today)
+        donations = service._aggregate_sales_stats(None, threshold, start_of_today)["donations"]
         assert donations == Decimal('0')
 
     def test_calculate_donations_24h_with_donations(self, db_session: Session):
@@ -276,7 +276,7 @@ class TestReceptionLiveStatsService:
         now = datetime.now(timezone.utc)
         threshold = now - timedelta(hours=24)
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        donations = service._calculate_donations_24h(None, threshold, start_of_today)
+        donations = service._aggregate_sales_stats(None, threshold, start_of_today)["donations"]
         assert donations == Decimal('5.50')
 
     def test_calculate_weight_in_open_and_recent_closed(self, db_session: Session):
@@ -345,10 +345,11 @@ class TestReceptionLiveStatsService:
         now = datetime.now(timezone.utc)
         threshold = now - timedelta(hours=24)
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        weight_in = service._calculate_weight_in(None, threshold, start_of_today)
+        weight_in = service._aggregate_reception_stats(None, threshold, start_of_today)["weight_in"]
         assert weight_in == Decimal('15.75')  # 10.5 + 5.25, old weight excluded
 
-    def test_calculate_weight_out_recent_sales(self, db_session: Session):
+    @pytest.mark.asyncio
+    async def test_weight_out_recent_sales(self, db_session: Session):
         """Test calculating weight sold from recent sales."""
         # Create test data
         user = User(
@@ -414,11 +415,8 @@ class TestReceptionLiveStatsService:
         db_session.commit()
 
         service = ReceptionLiveStatsService(db_session)
-        now = datetime.now(timezone.utc)
-        threshold = now - timedelta(hours=24)
-        start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        weight_out = service._calculate_weight_out(None, threshold, start_of_today)
-        assert weight_out == Decimal('6.25')  # 2.5 + 3.75, old weight excluded
+        stats = await service.get_live_stats()
+        assert stats["weight_out"] == 6.25  # 2.5 + 3.75, old weight excluded
 
     @pytest.mark.asyncio
     async def test_get_live_stats_full_scenario(self, db_session: Session):
@@ -8,7 +8,14 @@ import time
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 
-from recyclic_api.utils.session_metrics import SessionMetricsCollector, SessionMetric
+fakeredis = pytest.importorskip("fakeredis")
+
+from recyclic_api.utils.session_metrics import SessionMetricsCollector
+
+
+def _collector(redis_client=None) -> SessionMetricsCollector:
+    """Collector on its own fake Redis (or on a shared one, to simulate several workers)."""
+    return SessionMetricsCollector(redis_client=redis_client or fakeredis.FakeRedis(decode_responses=True))
 
 
 @pytest.mark.no_db
@@ -17,7 +24,7 @@ class TestSessionMetricsCollector:
 
     def setup_method(self):
         """Set up a fresh metrics collector for each test."""
-        self.collector = SessionMetricsCollector(max_history=100)
+        self.collector = _collector()
 
     def test_record_successful_refresh(self):
         """Test recording a successful refresh token operation."""
@@ -30,16 +37,14 @@ class TestSessionMetricsCollector:
         )
 
         # Check that the metric was recorded
-        assert len(self.collector._metrics_history) == 1
-        metric = self.collector._metrics_history[0]
-        assert metric.user_id == "user-123"
-        assert metric.operation == "refresh_success"
-        assert metric.elapsed_ms == 45.5
-        assert metric.client_ip == "192.168.1.1"
-        assert metric.site_id == "site-1"
+        summary = self.collector.get_metrics_summary(hours=1)
+        assert summary["refresh_success_count"] == 1
+        assert summary["active_sessions_estimate"] == 1
+        assert summary["latency_metrics"]["avg_ms"] == 45.5
+        assert summary["site_breakdown"] == {"site-1": {"success": 1, "failure": 0}}
 
         # Check counters
-        assert self.collector._counters["session_refresh_success"] == 1
+        assert "session_refresh_success 1" in self.collector.get_prometheus_metrics()
 
     def test_record_failed_refresh(self):
         """Test recording a failed refresh token operation."""
@@ -52,14 +57,16 @@ class TestSessionMetricsCollector:
         )
 
         # Check that the metric was recorded
-        assert len(self.collector._metrics_history) == 1
-        metric = self.collector._metrics_history[0]
-        assert metric.operation == "refresh_failure"
-        assert metric.error_type == "invalid_token"
+        summary = self.collector.get_metrics_summary(hours=1)
+        assert summary["refresh_failure_count"] == 1
+        assert summary["error_breakdown"] == {"invalid_token": 1}
+        assert summary["ip_breakdown"] == {"192.168.1.1": 1}
+        assert summary["active_sessions_estimate"] == 0
 
         # Check counters
-        assert self.collector._counters["session_refresh_failure"] == 1
-        assert self.collector._counters["session_refresh_failure_invalid_token"] == 1
+        metrics = self.collector.get_prometheus_metrics()
+        assert "session_refresh_failure 1" in metrics
+        assert "session_refresh_failure_invalid_token 1" in metrics
 
     def test_record_logout_forced(self):
         """Test recording a forced logout."""
@@ -70,13 +77,12 @@ class TestSessionMetricsCollector:
         )
 
         # Check that the metric was recorded
-        assert len(self.collector._metrics_history) == 1
-        metric = self.collector._metrics_history[0]
-        assert metric.operation == "logout_forced"
-        assert metric.user_id == "user-123"
+        summary = self.collector.get_metrics_summary(hours=1)
+        assert summary["total_operations"] == 1
+        assert summary["logout_forced_count"] == 1
 
         # Check counters
-        assert self.collector._counters["session_logout_forced"] == 1
+        assert "session_logout_forced 1" in self.collector.get_prometheus_metrics()
 
     def test_record_logout_manual(self):
         """Test recording a manual logout."""
@@ -87,17 +93,16 @@ class TestSessionMetricsCollector:
         )
 
         # Check that the metric was recorded
-        assert len(self.collector._metrics_history) == 1
-        metric = self.collector._metrics_history[0]
-        assert metric.operation == "logout_manual"
+        summary = self.collector.get_metrics_summary(hours=1)
+        assert summary["logout_manual_count"] == 1
 
         # Check counters
-        assert self.collector._counters["session_logout_manual"] == 1
+        assert "session_logout_manual 1" in self.collector.get_prometheus_metrics()
 
     def test_get_metrics_summary(self):
         """Test getting metrics summary."""
         # Use a fresh collector to avoid interference from other tests
-        collector = SessionMetricsCollector(max_history=100)
+        collector = _collector()
         
         # Record some metrics
         for i in range(10):
@@ -160,14 +165,47 @@ class TestSessionMetricsCollector:
         """Test resetting all metrics."""
         # Record some metrics
         self.collector.record_refresh(user_id="user-1", success=True, elapsed_ms=50.0)
-        assert len(self.collector._metrics_history) == 1
+        assert self.collector.get_metrics_summary(hours=1)["total_operations"] == 1
 
         # Reset
         self.collector.reset_metrics()
 
         # Verify reset
-        assert len(self.collector._metrics_history) == 0
-        assert len(self.collector._counters) == 0
+        summary = self.collector.get_metrics_summary(hours=1)
+        assert summary["total_operations"] == 0
+        assert summary["active_sessions_estimate"] == 0
+        assert "session_refresh_success 1" not in self.collector.get_prometheus_metrics()
+
+    def test_metrics_shared_between_workers(self):
+        """Two collectors on the same Redis (two workers) see the same window."""
+        shared_redis = fakeredis.FakeRedis(decode_responses=True)
+        worker_a = _collector(shared_redis)
+        worker_b = _collector(shared_redis)
+
+        worker_a.record_refresh(user_id="user-1", success=True, elapsed_ms=30.0)
+        worker_b.record_refresh(user_id="user-1", success=True, elapsed_ms=90.0)
+        worker_b.record_refresh(user_id="user-2", success=False, elapsed_ms=10.0, error_type="expired")
+
+        for collector in (worker_a, worker_b):
+            summary = collector.get_metrics_summary(hours=24)
+            assert summary["refresh_success_count"] == 2
+            assert summary["refresh_failure_count"] == 1
+            assert summary["latency_metrics"]["min_ms"] == 10.0
+            assert summary["latency_metrics"]["max_ms"] == 90.0
+            # Same user refreshed through two workers: a single active session
+            assert summary["active_sessions_estimate"] == 1
+
+    def test_summary_window_excludes_older_buckets(self):
+        """Events older than the requested window are not counted."""
+        now = time.time()
+        with patch("time.time", return_value=now - 5 * 3600):
+            self.collector.record_refresh(user_id="user-old", success=True, elapsed_ms=50.0)
+        self.collector.record_refresh(user_id="user-new", success=True, elapsed_ms=50.0)
+
+        assert self.collector.get_metrics_summary(hours=2)["refresh_success_count"] == 1
+        assert self.collector.get_metrics_summary(hours=24)["refresh_success_count"] == 2
+        # Active sessions only cover the last hour
+        assert self.collector.get_metrics_summary(hours=24)["active_sessions_estimate"] == 1
 
 
 class TestSessionMetricsEndpoint:
@@ -252,7 +290,7 @@ class TestSessionMetricsAlerting:
 
     def test_failure_rate_threshold_detection(self):
         """Test detecting failure rate above threshold (5% over 15 min)."""
-        collector = SessionMetricsCollector(max_history=1000)
+        collector = _collector()
         
         # Simulate 100 refresh attempts with 6 failures (6% failure rate)
         for i in range(94):
@@ -284,7 +322,7 @@ class TestSessionMetricsAlerting:
 
     def test_prometheus_metrics_for_alerting(self):
         """Test that Prometheus metrics can be used for alerting."""
-        collector = SessionMetricsCollector(max_history=100)
+        collector = _collector()
         
         # Record metrics
         for i in range(10):
@@ -0,0 +1,156 @@
+"""
+Cache typé des paramètres applicatifs (core.settings_cache).
+
+- Lectures répétées servies sans requête SQL tant que le cache est valide
+- Valeurs hors bornes ou invalides remplacées par la valeur par défaut
+- Invalidation locale après écriture et propagation par Redis pub/sub
+"""
+import time
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from recyclic_api.core import settings_cache as settings_cache_module
+from recyclic_api.core.config import settings
+from recyclic_api.core.security import create_access_token
+from recyclic_api.core.settings_cache import (
+    ACTIVITY_THRESHOLD_MINUTES,
+    REFRESH_TOKEN_MAX_HOURS,
+    TOKEN_EXPIRATION_MINUTES,
+    get_setting,
+    invalidate_settings,
+    settings_cache,
+    start_settings_invalidation_listener,
+    stop_settings_invalidation_listener,
+)
+from recyclic_api.models.setting import Setting
+from recyclic_api.services.activity_service import ActivityService
+from recyclic_api.services.refresh_token_service import RefreshTokenService
+
+
+@pytest.fixture(autouse=True)
+def cache_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "SETTINGS_CACHE_TTL_SECONDS", 300)
+    settings_cache.clear()
+    yield
+    settings_cache.clear()
+
+
+@pytest.fixture
+def settings_queries(db_session: Session):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM settings" in statement:
+            statements.append(statement)
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _record)
+
+
+def _set(db_session: Session, key: str, value: str) -> None:
+    setting = db_session.query(Setting).filter(Setting.key == key).first()
+    if setting is None:
+        db_session.add(Setting(key=key, value=value))
+    else:
+        setting.value = value
+    db_session.commit()
+
+
+def test_repeated_reads_use_a_single_query(db_session: Session, settings_queries):
+    _set(db_session, "token_expiration_minutes", "120")
+    _set(db_session, "refresh_token_max_hours", "48")
+    settings_queries.clear()
+
+    assert get_setting(TOKEN_EXPIRATION_MINUTES, db_session) == 120
+    assert RefreshTokenService(db_session)._get_refresh_token_max_hours() == 48
+    assert ActivityService(db_session).get_activity_threshold_minutes() == ACTIVITY_THRESHOLD_MINUTES.default
+    for _ in range(50):
+        create_access_token({"sub": "user"})
+
+    # Tous les paramètres connus sont chargés ensemble
+    assert len(settings_queries) == 1
+
+
+def test_invalidation_reloads_written_value(db_session: Session):
+    _set(db_session, "activity_threshold_minutes", "20")
+    service = ActivityService(db_session)
+    assert service.get_activity_threshold_minutes() == 20
+
+    _set(db_session, "activity_threshold_minutes", "45")
+    assert service.get_activity_threshold_minutes() == 20
+
+    ActivityService.refresh_cache(45)
+    assert service.get_activity_threshold_minutes() == 45
+
+
+def test_invalid_values_fall_back_to_defaults(db_session: Session):
+    _set(db_session, "token_expiration_minutes", "20000")
+    _set(db_session, "refresh_token_max_hours", "abc")
+
+    assert get_setting(TOKEN_EXPIRATION_MINUTES, db_session) == TOKEN_EXPIRATION_MINUTES.default
+    assert get_setting(REFRESH_TOKEN_MAX_HOURS, db_session) == REFRESH_TOKEN_MAX_HOURS.default
+
+
+def test_session_settings_update_invalidates_cache(db_session: Session):
+    from recyclic_api.schemas.setting import SessionSettingsUpdate
+    from recyclic_api.services.session_settings_service import SessionSettingsService
+
+    service = SessionSettingsService(db_session)
+    assert service.get_session_settings().token_expiration_minutes == get_setting(TOKEN_EXPIRATION_MINUTES, db_session)
+
+    service.update_session_settings(SessionSettingsUpdate(token_expiration_minutes=90))
+    assert get_setting(TOKEN_EXPIRATION_MINUTES, db_session) == 90
+
+
+@pytest.mark.no_db
+def test_invalidation_is_propagated_through_redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    publisher = fakeredis.FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(settings_cache_module, "get_redis", lambda: publisher)
+
+    # Cache chaud d'un autre processus (valeurs chargées sans base)
+    monkeypatch.setattr(settings_cache, "_load", lambda db: {TOKEN_EXPIRATION_MINUTES.key: 60})
+    assert get_setting(TOKEN_EXPIRATION_MINUTES) == 60
+    monkeypatch.setattr(settings_cache, "_load", lambda db: {TOKEN_EXPIRATION_MINUTES.key: 30})
+    assert get_setting(TOKEN_EXPIRATION_MINUTES) == 60
+
+    listener = start_settings_invalidation_listener()
+    assert listener is not None
+    try:
+        # Abonnement effectif avant publication
+        deadline = time.monotonic() + 2
+        while not publisher.pubsub_numsub(settings.SETTINGS_INVALIDATION_CHANNEL)[0][1]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        publisher.publish(settings.SETTINGS_INVALIDATION_CHANNEL, TOKEN_EXPIRATION_MINUTES.key)
+
+        deadline = time.monotonic() + 2
+        while get_setting(TOKEN_EXPIRATION_MINUTES) != 30:
+            assert time.monotonic() < deadline, "invalidation non reçue"
+            time.sleep(0.01)
+    finally:
+        stop_settings_invalidation_listener(listener)
+
+
+@pytest.mark.no_db
+def test_invalidate_settings_publishes_keys(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(settings_cache_module, "get_redis", lambda: client)
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(settings.SETTINGS_INVALIDATION_CHANNEL)
+
+    invalidate_settings(TOKEN_EXPIRATION_MINUTES.key)
+
+    deadline = time.monotonic() + 2
+    message = None
+    while message is None and time.monotonic() < deadline:
+        message = pubsub.get_message(timeout=0.1)
+    assert message is not None
+    assert message["data"] == TOKEN_EXPIRATION_MINUTES.key
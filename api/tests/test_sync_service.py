@@ -10,7 +10,9 @@ import pytest
 from recyclic_api.core.config import settings
 from recyclic_api.services import sync_service
 from recyclic_api.services.sync_service import (
+    MANIFEST_FILENAME,
     KDriveSyncService,
+    SyncManifest,
     UploadFailedError,
     schedule_periodic_kdrive_sync,
 )
@@ -44,6 +46,9 @@ class DummyClient:
         self.mkdir_calls.append(normalized)
         self.existing_dirs.add(normalized)
 
+    def info(self, remote_path: str) -> dict:
+        return {"etag": f"etag-{sum(1 for path, _ in self.uploads if path == remote_path)}"}
+
 
 def _client_factory(client: DummyClient):
     def _factory() -> DummyClient:
@@ -126,6 +131,95 @@ def test_sync_directory_uploads_all_files(tmp_path: Path) -> None:
     assert ("/backup/nested/b.csv", str(file_b)) in client.uploads
 
 
+def test_sync_directory_only_uploads_new_or_changed_files(tmp_path: Path) -> None:
+    base_dir = tmp_path / "exports"
+    base_dir.mkdir()
+    file_a = base_dir / "a.csv"
+    file_a.write_text("a", encoding="utf-8")
+    file_b = base_dir / "b.csv"
+    file_b.write_text("b", encoding="utf-8")
+
+    client = DummyClient()
+    service = KDriveSyncService(client_factory=_client_factory(client), max_retries=1, retry_delay_seconds=0)
+
+    assert set(service.sync_directory(base_dir, "/backup")) == {file_a, file_b}
+
+    # Second cycle: nothing changed, nothing transferred, no remote round-trip
+    client.check_calls.clear()
+    assert service.sync_directory(base_dir, "/backup") == []
+    assert len(client.uploads) == 2
+    assert client.check_calls == []
+
+    # Same content re-written (new mtime): hash matches, no upload
+    file_a.write_text("a", encoding="utf-8")
+    file_b.write_text("b modified", encoding="utf-8")
+    file_c = base_dir / "c.csv"
+    file_c.write_text("c", encoding="utf-8")
+
+    assert set(service.sync_directory(base_dir, "/backup")) == {file_b, file_c}
+    assert len(client.uploads) == 4
+
+
+def test_sync_manifest_records_hash_and_etag(tmp_path: Path) -> None:
+    base_dir = tmp_path / "exports"
+    base_dir.mkdir()
+    (base_dir / "a.csv").write_text("a", encoding="utf-8")
+    manifest_path = tmp_path / "state" / "manifest.json"
+
+    client = DummyClient()
+    KDriveSyncService(
+        client_factory=_client_factory(client), max_retries=1, retry_delay_seconds=0, manifest_path=manifest_path
+    ).sync_directory(base_dir, "/backup")
+
+    manifest = SyncManifest.load(manifest_path)
+    entry = manifest.entries["a.csv"]
+    assert entry.remote_path == "/backup/a.csv"
+    assert entry.size == 1
+    assert len(entry.sha256) == 64
+    assert entry.etag == "etag-1"
+    assert entry.synced_at is not None
+
+    # A fresh service (e.g. after restart) reuses the persisted manifest
+    other = KDriveSyncService(
+        client_factory=_client_factory(client), max_retries=1, retry_delay_seconds=0, manifest_path=manifest_path
+    )
+    assert other.sync_directory(base_dir, "/backup") == []
+
+
+def test_sync_directory_checks_each_remote_folder_once_per_cycle(tmp_path: Path) -> None:
+    base_dir = tmp_path / "exports"
+    nested = base_dir / "nested"
+    nested.mkdir(parents=True)
+    for index in range(10):
+        (nested / f"file_{index}.csv").write_text(str(index), encoding="utf-8")
+
+    client = DummyClient()
+    service = KDriveSyncService(
+        client_factory=_client_factory(client), max_retries=1, retry_delay_seconds=0, max_workers=4
+    )
+
+    uploaded = service.sync_directory(base_dir, "/backup")
+
+    assert len(uploaded) == 10
+    assert client.check_calls == ["/backup/nested"]
+    assert client.mkdir_calls == ["/backup/nested"]
+    assert (base_dir / MANIFEST_FILENAME).exists()
+    assert all(path != str(base_dir / MANIFEST_FILENAME) for _, path in client.uploads)
+
+
+def test_failed_upload_is_retried_next_cycle(tmp_path: Path) -> None:
+    base_dir = tmp_path / "exports"
+    base_dir.mkdir()
+    file_a = base_dir / "a.csv"
+    file_a.write_text("a", encoding="utf-8")
+
+    client = DummyClient(failures_before_success=1)
+    service = KDriveSyncService(client_factory=_client_factory(client), max_retries=1, retry_delay_seconds=0)
+
+    assert service.sync_directory(base_dir, "/backup") == []
+    assert service.sync_directory(base_dir, "/backup") == [file_a]
+
+
 def test_schedule_periodic_sync_disabled(monkeypatch) -> None:
     monkeypatch.setattr(settings, "KDRIVE_SYNC_ENABLED", False)
     assert schedule_periodic_kdrive_sync() is None
@@ -0,0 +1,128 @@
+"""
+Tests unitaires de l'index des logs transactionnels (B48-P2).
+
+Vérifie l'indexation, les filtres, la pagination et le backfill depuis
+des fichiers rotatifs, sans dépendre de la base de données.
+"""
+import json
+import logging
+from datetime import datetime, timezone
+
+import pytest
+
+from recyclic_api.core import transaction_log_store as transaction_log_store_module
+from recyclic_api.core.logging import IndexedRotatingFileHandler
+from recyclic_api.core.transaction_log_store import (
+    TransactionLogStore,
+    backfill_transaction_log_store,
+    parse_log_line,
+    prune_transaction_log_store,
+)
+
+
+pytestmark = pytest.mark.no_db
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TransactionLogStore(tmp_path / "index.sqlite3")
+
+
+def _entries():
+    return [
+        {"event": "SESSION_OPENED", "user_id": "user-1", "session_id": "session-1", "timestamp": "2025-12-09T10:00:00Z"},
+        {"event": "TICKET_OPENED", "user_id": "user-1", "session_id": "session-1", "timestamp": "2025-12-09T10:05:00+00:00Z"},
+        {"event": "SESSION_OPENED", "user_id": "user-2", "session_id": "session-2", "timestamp": "2025-12-09T11:00:00Z"},
+        {"event": "TICKET_RESET", "user_id": "user-2", "session_id": "session-2", "timestamp": "2025-12-09T11:05:00Z"},
+    ]
+
+
+def test_query_returns_most_recent_first(store):
+    store.append_many(_entries())
+
+    entries, total = store.query(limit=2)
+
+    assert total == 4
+    assert [e["event"] for e in entries] == ["TICKET_RESET", "SESSION_OPENED"]
+    assert entries[1]["user_id"] == "user-2"
+
+
+def test_query_filters_and_paginates(store):
+    store.append_many(_entries())
+
+    entries, total = store.query(event_type="SESSION_OPENED", limit=1, offset=1)
+    assert total == 2
+    assert len(entries) == 1
+    assert entries[0]["user_id"] == "user-1"
+
+    entries, total = store.query(
+        user_id="user-1",
+        start_date=datetime(2025, 12, 9, 10, 1, tzinfo=timezone.utc),
+        end_date=datetime(2025, 12, 9, 10, 30, tzinfo=timezone.utc),
+    )
+    assert total == 1
+    assert entries[0]["event"] == "TICKET_OPENED"
+
+
+def test_parse_log_line_handles_legacy_message_format():
+    legacy = json.dumps({"message": "{'event': 'SESSION_OPENED', 'user_id': 'u'}", "level": "INFO"})
+
+    assert parse_log_line(legacy) == {"event": "SESSION_OPENED", "user_id": "u"}
+    assert parse_log_line("not json") is None
+    assert parse_log_line("   ") is None
+
+
+def test_backfill_reads_rotated_files_and_is_idempotent(store, tmp_path):
+    current = tmp_path / "transactions.log"
+    rotated = tmp_path / "transactions.log.1"
+    entries = _entries()
+    rotated.write_text("\n".join(json.dumps(e) for e in entries[:2]) + "\ninvalid line\n", encoding="utf-8")
+    current.write_text("\n".join(json.dumps(e) for e in entries[2:]) + "\n", encoding="utf-8")
+
+    assert backfill_transaction_log_store(store=store, files=[current, rotated]) == 4
+    assert backfill_transaction_log_store(store=store, files=[current, rotated]) == 4
+
+    _, total = store.query()
+    assert total == 4
+
+
+def test_prune_drops_entries_older_than_oldest_kept_file(store, tmp_path):
+    current = tmp_path / "transactions.log"
+    oldest = tmp_path / "transactions.log.1"
+    entries = _entries()
+    store.append_many([{"event": "NO_TIMESTAMP"}, *entries])
+    oldest.write_text("\n".join(json.dumps(e) for e in entries[2:3]) + "\n", encoding="utf-8")
+    current.write_text(json.dumps(entries[3]) + "\n", encoding="utf-8")
+
+    assert prune_transaction_log_store(store=store, files=[current, oldest]) == 3
+    assert prune_transaction_log_store(store=store, files=[current, oldest]) == 0
+
+    remaining, total = store.query()
+    assert total == 2
+    assert [e["event"] for e in remaining] == ["TICKET_RESET", "SESSION_OPENED"]
+    # Sans fichier rotatif, rien n'est supprimé
+    assert prune_transaction_log_store(store=store, files=[current]) == 0
+
+
+def test_rotation_prunes_index_in_step(store, tmp_path, monkeypatch):
+    log_file = tmp_path / "transactions.log"
+    monkeypatch.setattr(transaction_log_store_module, "TRANSACTION_LOG_FILE", log_file)
+    monkeypatch.setattr(transaction_log_store_module, "BACKUP_COUNT", 1)
+    handler = IndexedRotatingFileHandler(
+        str(log_file), maxBytes=1, backupCount=1, encoding="utf-8",
+        on_rollover=lambda: prune_transaction_log_store(store),
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        for entry in _entries():
+            # Même ordre que le QueueListener : fichier (rotation éventuelle) puis index
+            record = logging.LogRecord("transaction_audit", logging.INFO, __file__, 0, json.dumps(entry), None, None)
+            handler.handle(record)
+            store.append(entry)
+    finally:
+        handler.close()
+
+    # Seuls transactions.log et transactions.log.1 subsistent : les deux dernières entrées
+    remaining, total = store.query()
+    assert total == 2
+    assert [e["event"] for e in remaining] == ["TICKET_RESET", "SESSION_OPENED"]
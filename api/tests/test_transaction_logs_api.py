@@ -9,16 +9,17 @@ import json
 import time
 from pathlib import Path
 
-from recyclic_api.core.logging import TRANSACTION_LOG_FILE, log_transaction_event, shutdown_transaction_logger
+from recyclic_api.core import transaction_log_store as transaction_log_store_module
+from recyclic_api.core.transaction_log_store import TransactionLogStore, backfill_transaction_log_store
 
 
 @pytest.fixture(autouse=True)
-def setup_test_logs():
-    """Créer des logs de test avant chaque test."""
-    # Nettoyer les logs existants
-    if TRANSACTION_LOG_FILE.exists():
-        with open(TRANSACTION_LOG_FILE, 'w') as f:
-            f.write('')
+def setup_test_logs(tmp_path, monkeypatch):
+    """Créer des logs de test avant chaque test (fichier et index dans un répertoire temporaire)."""
+    log_file = tmp_path / "transactions.log"
+    store = TransactionLogStore(tmp_path / "transactions_index.sqlite3")
+    # L'endpoint lit l'index partagé du processus : on le remplace par l'index temporaire
+    monkeypatch.setattr(transaction_log_store_module, "_store", store)
     
     # Créer quelques logs de test
     test_logs = [
@@ -59,18 +60,14 @@ def setup_test_logs():
     ]
     
     # Écrire les logs dans le fichier
-    TRANSACTION_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(TRANSACTION_LOG_FILE, 'w', encoding='utf-8') as f:
+    with open(log_file, 'w', encoding='utf-8') as f:
         for log in test_logs:
             f.write(json.dumps(log, ensure_ascii=False) + '\n')
     
-    yield
+    # Indexer les logs écrits (l'endpoint lit l'index, pas les fichiers)
+    backfill_transaction_log_store(store=store, files=[log_file])
     
-    # Nettoyer après le test
-    shutdown_transaction_logger()
-    if TRANSACTION_LOG_FILE.exists():
-        with open(TRANSACTION_LOG_FILE, 'w') as f:
-            f.write('')
+    yield store
 
 
 class TestTransactionLogsAPI:
@@ -7,6 +7,7 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from recyclic_api.models.ticket_depot import TicketDepot, TicketDepotStatus
@@ -145,6 +146,24 @@ class TestUnifiedLiveStatsService:
         assert stats["tickets_open"] == 1
         assert stats["weight_in"] == 10.5
 
+    @pytest.mark.asyncio
+    async def test_get_unified_live_stats_uses_two_aggregate_queries(self, db_session: Session):
+        """All KPIs are computed by one reception query and one sales query."""
+        statements = []
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            service = ReceptionLiveStatsService(db_session)
+            await service.get_unified_live_stats(period_type="daily")
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+
+        assert len(statements) == 2
+
     @pytest.mark.asyncio
     async def test_get_unified_live_stats_24h_period(self, db_session: Session):
         """Test unified stats with 24h sliding period."""
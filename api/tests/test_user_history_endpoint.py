@@ -340,3 +340,58 @@ class TestUserHistoryEndpoint:
                 assert "deposit_id" in metadata
                 assert "status" in metadata
                 assert "category" in metadata or "eee_category" in metadata
+
+    def test_get_user_history_cursor_pagination(self, client: TestClient, admin_token: str, sample_user_history_data: dict):
+        """La pagination par curseur parcourt toute la chronologie sans doublon, dans l'ordre"""
+        user_id = str(sample_user_history_data["user"].id)
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        full = client.get(f"/api/v1/admin/users/{user_id}/history", headers=headers).json()
+        assert full["next_cursor"] is None
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            response = client.get(f"/api/v1/admin/users/{user_id}/history", params=params, headers=headers)
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total_count"] == full["total_count"]
+            seen.extend(event["id"] for event in data["events"])
+            if not data["has_next"]:
+                assert data["next_cursor"] is None
+                break
+            params = {"limit": 2, "cursor": data["next_cursor"]}
+            assert len(seen) < 100
+
+        assert seen == [event["id"] for event in full["events"]]
+        assert f"{sample_user_history_data['cash_session'].id}_closed" in seen
+
+    def test_get_user_history_session_events_filter(self, client: TestClient, admin_token: str, sample_user_history_data: dict):
+        """Le filtre SESSION CAISSE renvoie ouverture et fermeture, compte calculé côté SQL"""
+        user_id = str(sample_user_history_data["user"].id)
+
+        response = client.get(
+            f"/api/v1/admin/users/{user_id}/history",
+            params={"event_type": "SESSION CAISSE"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] == 2
+        assert [event["id"] for event in data["events"]] == [
+            f"{sample_user_history_data['cash_session'].id}_closed",
+            str(sample_user_history_data["cash_session"].id),
+        ]
+
+    def test_get_user_history_invalid_cursor(self, client: TestClient, admin_token: str, sample_user_history_data: dict):
+        """Un curseur illisible est refusé en 400"""
+        user_id = str(sample_user_history_data["user"].id)
+
+        response = client.get(
+            f"/api/v1/admin/users/{user_id}/history",
+            params={"cursor": "pas-un-curseur"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 400
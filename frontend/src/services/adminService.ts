@@ -510,8 +510,12 @@ export const adminService = {
   /**
    * Importe une sauvegarde de base de données (réservé aux Super-Admins)
    * Remplace la base de données existante par le contenu du fichier .dump (format binaire PostgreSQL)
+   * La restauration est exécutée en tâche de fond : son avancement est suivi jusqu'à la fin.
    */
-  async importDatabase(file: File): Promise<{ message: string; imported_file: string; backup_created: string; backup_path: string; timestamp: string }> {
+  async importDatabase(
+    file: File,
+    onProgress?: (progress: { step: string; percent?: number | null }) => void
+  ): Promise<{ message: string; job_id: string; imported_file: string; backup_created: string; backup_path: string; timestamp: string }> {
     try {
       // Créer un FormData pour l'upload de fichier
       const formData = new FormData();
@@ -521,9 +525,32 @@ export const adminService = {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
-        timeout: 600000, // 10 minutes timeout (import peut être long)
+        timeout: 600000, // 10 minutes timeout (envoi de fichiers volumineux)
       });
 
+      let job = { status: response.data.job_status, last_error: response.data.job_error, result: {} as any };
+      let pollFailures = 0;
+      while (job.status !== 'succeeded' && job.status !== 'failed') {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        try {
+          const jobResponse = await axiosClient.get(`/v1/admin/jobs/${response.data.job_id}`);
+          job = jobResponse.data;
+          pollFailures = 0;
+        } catch (pollError) {
+          // Les connexions sont coupées pendant la restauration : quelques échecs sont attendus
+          if (++pollFailures >= 10) {
+            throw pollError;
+          }
+          continue;
+        }
+        if (onProgress && job.result?.progress) {
+          onProgress(job.result.progress);
+        }
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.last_error || 'La restauration a échoué');
+      }
+
       console.log('Import de base de données réussi:', response.data);
       return response.data;
     } catch (error) {